@@ -0,0 +1,171 @@
+# Maliyet bazlı kabul kontrolü (admission control) ve yük atma
+# Ağır uç noktalar ortak bir kapasite bütçesinden maliyetleri kadar birim alır.
+# Bütçe doluysa istek kısa bir süre sırada (FIFO, son tarihli) bekler; sıra da doluysa
+# veya süre aşılırsa 429 + Retry-After ile reddedilir. Hafif uç noktalar (/, /api/calculate,
+# /api/profiles) bu kontrolden geçmez, aşırı yükte de gecikmeleri değişmez.
+
+import contextlib
+import functools
+import math
+import os
+import threading
+import time
+from collections import deque
+
+from flask import Response, jsonify
+
+ADMISSION_CAPACITY = int(os.environ.get('ADMISSION_CAPACITY', 8))
+QUEUE_TIMEOUT = float(os.environ.get('ADMISSION_QUEUE_TIMEOUT', 10))
+
+# sınıf -> (maliyet birimi, en fazla bekleyen istek)
+COST_CLASSES = {
+    'heavy': (int(os.environ.get('ADMISSION_HEAVY_COST', 4)), int(os.environ.get('ADMISSION_HEAVY_QUEUE', 8))),
+    'medium': (1, 32),
+}
+
+# Servis süresi için üstel hareketli ortalama katsayısı
+EWMA_ALPHA = 0.2
+
+
+class Rejected(Exception):
+    def __init__(self, reason, retry_after):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    def __init__(self, capacity=ADMISSION_CAPACITY, classes=None, queue_timeout=QUEUE_TIMEOUT):
+        self.capacity = capacity
+        self.classes = dict(classes or COST_CLASSES)
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self._in_use = 0
+        self._queue = deque()
+        self._stats = {
+            name: {'running': 0, 'queued': 0, 'admitted': 0, 'rejected_queue_full': 0,
+                   'rejected_timeout': 0, 'service_time': None}
+            for name in self.classes
+        }
+
+    def _cost(self, name):
+        # Kapasiteden büyük maliyet asla kabul edilemezdi
+        return min(self.classes[name][0], self.capacity)
+
+    def retry_after(self, name):
+        # Önündeki iş miktarı / kapasite x ortalama servis süresi (saniye, en az 1)
+        with self._cond:
+            return self._retry_after(name)
+
+    def _retry_after(self, name):
+        service = self._stats[name]['service_time'] or 1.0
+        ahead = self._in_use + sum(self._cost(n) for n, _ in self._queue)
+        return max(1, math.ceil(service * (ahead + self._cost(name)) / self.capacity))
+
+    def acquire(self, name, timeout=None):
+        # timeout: sırada en fazla bekleme (saniye), varsayılan queue_timeout
+        cost = self._cost(name)
+        stats = self._stats[name]
+        with self._cond:
+            if not self._queue and self._in_use + cost <= self.capacity:
+                self._admit(name, cost)
+                return
+
+            if stats['queued'] >= self.classes[name][1]:
+                stats['rejected_queue_full'] += 1
+                raise Rejected('Server is busy, admission queue is full', self._retry_after(name))
+
+            ticket = (name, object())
+            self._queue.append(ticket)
+            stats['queued'] += 1
+            deadline = time.monotonic() + (self.queue_timeout if timeout is None else timeout)
+            try:
+                # Sıranın başı ve yeterli kapasite olduğunda kabul edilir (FIFO, atlama yok)
+                while not (self._queue[0] is ticket and self._in_use + cost <= self.capacity):
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        stats['rejected_timeout'] += 1
+                        raise Rejected('Server is busy, timed out in admission queue',
+                                       self._retry_after(name))
+                    self._cond.wait(remaining)
+                self._admit(name, cost)
+            finally:
+                self._queue.remove(ticket)
+                stats['queued'] -= 1
+                self._cond.notify_all()
+
+    def _admit(self, name, cost):
+        self._in_use += cost
+        self._stats[name]['running'] += 1
+        self._stats[name]['admitted'] += 1
+
+    def release(self, name, elapsed):
+        with self._cond:
+            self._in_use -= self._cost(name)
+            stats = self._stats[name]
+            stats['running'] -= 1
+            previous = stats['service_time']
+            stats['service_time'] = elapsed if previous is None else (
+                (1 - EWMA_ALPHA) * previous + EWMA_ALPHA * elapsed)
+            self._cond.notify_all()
+
+    @contextlib.contextmanager
+    def slot(self, name, timeout=None):
+        # İstek dışı iş (arka plan analizi) için: aynı bütçe ve sıra, Rejected yukarı iletilir
+        self.acquire(name, timeout)
+        start = time.monotonic()
+        try:
+            yield
+        finally:
+            self.release(name, time.monotonic() - start)
+
+    def limit(self, name):
+        # Flask view dekoratörü
+        def decorator(view):
+            @functools.wraps(view)
+            def wrapper(*args, **kwargs):
+                try:
+                    self.acquire(name)
+                except Rejected as e:
+                    response = jsonify({'error': e.reason, 'retry_after': e.retry_after})
+                    response.status_code = 429
+                    response.headers['Retry-After'] = str(e.retry_after)
+                    return response
+
+                start = time.monotonic()
+                streamed = False
+                try:
+                    response = view(*args, **kwargs)
+                    # Akış yanıtında (SSE) iş yanıt döndükten sonra üretici iş parçacığında
+                    # sürer; kapasite üretici bitince bırakılır (sse.ProgressStream.on_finish).
+                    # İstemcinin kopması kapasiteyi boşaltmaz: bağlantı açıp kapatarak bütçe
+                    # aşılamaz. Diğer yanıtlarda iş zaten bitmiştir, hemen bırakılır
+                    on_finish = getattr(response.response, 'on_finish', None) \
+                        if isinstance(response, Response) and response.is_streamed else None
+                    if on_finish is not None:
+                        on_finish(lambda: self.release(name, time.monotonic() - start))
+                        streamed = True
+                    return response
+                finally:
+                    if not streamed:
+                        self.release(name, time.monotonic() - start)
+            return wrapper
+        return decorator
+
+    def stats(self):
+        with self._cond:
+            return {
+                'capacity': self.capacity,
+                'in_use': self._in_use,
+                'queue_depth': len(self._queue),
+                'queue_timeout': self.queue_timeout,
+                'classes': {
+                    name: dict(stats, cost=self._cost(name), max_queue=self.classes[name][1],
+                               service_time=round(stats['service_time'], 3)
+                               if stats['service_time'] is not None else None)
+                    for name, stats in self._stats.items()
+                },
+            }
+
+
+admission = AdmissionController()
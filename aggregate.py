@@ -0,0 +1,98 @@
+# Grafik toplamaları
+# Etiket sayıları, skor histogramı ve 2-D yoğunluk ızgaraları önbellekteki dizilerden
+# NumPy histogramlarıyla hesaplanır; istemciye aday sayısından bağımsız küçük bir yük gider.
+
+import numpy as np
+
+from scoring import LABELS
+
+DEFAULT_BINS = 20
+DEFAULT_GRID = 24
+MAX_BINS = 200
+MAX_GRID = 128
+
+# (x, y, x log ölçekli mi, y log ölçekli mi)
+DENSITY_PAIRS = {
+    'period_depth': ('period', 'depth', True, True),
+    'mag_score': ('star_mag', 'score', False, False),
+}
+
+
+def label_counts(codes):
+    counts = np.bincount(np.asarray(codes, dtype=np.int64), minlength=len(LABELS))
+    return {label: int(counts[i]) for i, label in enumerate(LABELS)}
+
+
+def score_histogram(score, bins=DEFAULT_BINS, score_range=(0.0, 100.0)):
+    score = np.asarray(score, dtype=np.float64)
+    counts, edges = np.histogram(score[np.isfinite(score)], bins=bins, range=score_range)
+    return {'edges': np.round(edges, 4).tolist(), 'counts': counts.tolist()}
+
+
+def _edges(values, bins, log):
+    # Eksen sınırları verinin kendisinden; periyot / derinlik birkaç mertebe yayıldığı için log
+    if log:
+        values = values[values > 0]
+    if len(values) == 0:
+        return None
+    lo, hi = values.min(), values.max()
+    if log:
+        lo, hi = np.log10(lo), np.log10(hi)
+    if hi <= lo:
+        lo, hi = lo - 0.5, hi + 0.5
+    edges = np.linspace(lo, hi, bins + 1)
+    return 10.0 ** edges if log else edges
+
+
+def density_grid(x, y, bins=DEFAULT_GRID, log_x=False, log_y=False):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    keep = np.isfinite(x) & np.isfinite(y)
+    if log_x:
+        keep &= x > 0
+    if log_y:
+        keep &= y > 0
+    x, y = x[keep], y[keep]
+
+    x_edges = _edges(x, bins, log_x)
+    y_edges = _edges(y, bins, log_y)
+    if x_edges is None or y_edges is None:
+        return {'x_edges': [], 'y_edges': [], 'counts': [], 'max': 0,
+                'log_x': log_x, 'log_y': log_y}
+
+    # Log eksenlerde histogram log uzayında alınır, kenarlar gerçek değerlerle döner
+    hx = np.log10(x) if log_x else x
+    hy = np.log10(y) if log_y else y
+    counts, _, _ = np.histogram2d(
+        hx, hy,
+        bins=(np.log10(x_edges) if log_x else x_edges, np.log10(y_edges) if log_y else y_edges),
+    )
+    counts = counts.astype(np.int64)
+    return {
+        'x_edges': np.round(x_edges, 6).tolist(),
+        'y_edges': np.round(y_edges, 6).tolist(),
+        # counts[i][j]: i. x aralığı, j. y aralığı
+        'counts': counts.tolist(),
+        'max': int(counts.max()) if counts.size else 0,
+        'log_x': log_x,
+        'log_y': log_y,
+    }
+
+
+def aggregate(columns, bins=DEFAULT_BINS, grid=DEFAULT_GRID, score_range=(0.0, 100.0)):
+    bins = max(1, min(int(bins), MAX_BINS))
+    grid = max(1, min(int(grid), MAX_GRID))
+    score = np.asarray(columns['score'], dtype=np.float64)
+
+    density = {}
+    for name, (x_key, y_key, log_x, log_y) in DENSITY_PAIRS.items():
+        grid_data = density_grid(columns[x_key], columns[y_key], grid, log_x, log_y)
+        grid_data.update({'x': x_key, 'y': y_key})
+        density[name] = grid_data
+
+    return {
+        'total': int(len(score)),
+        'labels': label_counts(columns['codes']),
+        'score_histogram': score_histogram(score, bins, score_range),
+        'density': density,
+    }
@@ -3,17 +3,78 @@
 
 from flask import Flask, request, jsonify, send_file
 from flask_cors import CORS
-import pandas as pd
 import numpy as np
-import requests
 from datetime import datetime
+import base64
+import hashlib
 import io
+import os
+
+from admission import admission
+from aggregate import DEFAULT_BINS, DEFAULT_GRID, aggregate
+from candidate_table import CandidateTable
+from columnar_io import ColumnarFile, columnar_kind
+from diff import DEFAULT_LIMIT, DEFAULT_THRESHOLD, UnkeyedSnapshot, diff_tables, id_order
+from fits_io import read_lightcurve
+from jobs import JobQueueFull, background_jobs
+from lazy_imports import lazy_import
+from memtrack import MemoryBudgetExceeded, estimate_columnar, estimate_upload, memory
+from preview import Preview
+from profiles import DEFAULT_PROFILE, get_profile, get_profiles, score_profiles
+from result_cache import results_cache
+from scoring import LABELS, WEIGHTS
+from singleflight import nasa_flights
+from snapshot import SNAPSHOT_TTL, snapshots
+from sse import ProgressStream, StreamError, sse_response
+from tap_client import (DEFAULT_PARTITIONS, TAP_BASE_URL, TAP_MODES, TapClient, TapError,
+                        build_query, read_csv_chunks)
+from transit_fit import LightCurveBatch, refine_catalog
+from upload_cache import RESULT_FORMAT_VERSION, cache_key, read_upload, split_csv, upload_cache
+from units import SAMPLE_ROWS, convert, convert_errors, infer_units, parse_hints, units_key
+from uncertainty import DEFAULT_DRAWS, MAX_DRAWS, PARAMS, score_probabilities
+from vetting import demote_labels, flag_names, vet_candidates
+
+# pandas yalnızca dosya / katalog okuyan uç noktalarda yüklenir (bkz. lazy_imports)
+pd = lazy_import('pandas')
 
 app = Flask(__name__)
 CORS(app)
 
 # NASA API URL
-NASA_API_URL = "https://exoplanetarchive.ipac.caltech.edu/TAP/sync"
+NASA_TAP_URL = os.environ.get('NASA_TAP_URL', TAP_BASE_URL).rstrip('/')
+NASA_API_URL = f"{NASA_TAP_URL}/sync"
+# sync: tek istek, async: TAP iş protokolü, partitioned: paralel anahtar aralıkları
+TAP_MODE = os.environ.get('TAP_MODE', 'sync')
+TAP_PARTITIONS = int(os.environ.get('TAP_PARTITIONS', DEFAULT_PARTITIONS))
+# Açılışta yüklenecek önceden skorlanmış snapshot'lar (python cli.py warm -o <dizin>)
+WARM_SNAPSHOT_DIR = os.environ.get('WARM_SNAPSHOT_DIR')
+# Süresi (SNAPSHOT_TTL) geçmiş snapshot bu kadar saniye daha hemen döner, taze sürüm arka
+# planda indirilir; hazır snapshot verildiyse yaşı ne olursa olsun
+SNAPSHOT_MAX_STALE = float(os.environ.get('SNAPSHOT_MAX_STALE', 'inf' if WARM_SNAPSHOT_DIR else 0))
+
+if WARM_SNAPSHOT_DIR:
+    print(f"🔥 Hazır snapshot: {len(snapshots.seed(WARM_SNAPSHOT_DIR))} dosya yüklendi ({WARM_SNAPSHOT_DIR})")
+
+NASA_TABLES = {
+    'toi': {
+        'table': 'toi',
+        'columns': '*',
+        'where': None,
+        'key': 'toi',
+    },
+    'koi': {
+        'table': 'cumulative',
+        'columns': 'kepid, koi_period, koi_period_err1, koi_period_err2, koi_duration, koi_duration_err1, koi_duration_err2, koi_depth, koi_depth_err1, koi_depth_err2, koi_kepmag',
+        'where': "koi_disposition IN ('CANDIDATE','CONFIRMED') AND koi_period IS NOT NULL AND koi_duration IS NOT NULL AND koi_depth IS NOT NULL AND koi_kepmag IS NOT NULL",
+        'key': 'kepid',
+    },
+}
+# Akış halinde okunan TAP yanıtında parça başına satır
+STREAM_CHUNK_ROWS = 2000
+# Ön izleme (mode=preview): yalnızca skor kolonları okunduğu için daha büyük parçalar
+PREVIEW_CHUNK_ROWS = 50000
+# Ön izleme sonrası arka plan analizinin kapasite sırasında en fazla bekleyeceği süre (saniye)
+JOB_ADMISSION_TIMEOUT = float(os.environ.get('JOB_ADMISSION_TIMEOUT', 300))
 
 
 # Fonksiyonlar
@@ -51,24 +112,17 @@ def f_duration(x):
 
 def calculate_score(period, duration, depth, star_mag, source='toi'):
     try:
+        # Birimler gün / saat / ppm (form etiketleri); dosya ve katalog kolonları
+        # skorlanmadan önce units.convert ile çevrilir
         period = float(period)
         duration = float(duration)
-
-        # Kepler için duration günden saate çevirme
-        if source == 'koi':
-            duration *= 24.0
-
-        # Kepler için depth çok küçük olabilir (0-1 arası), ppm'e çevirme
-        if source == 'koi' and depth < 1:
-            depth *= 1e6
-
         depth = float(depth)
         star_mag_norm = normalize_star_mag(star_mag, source)
 
         if star_mag_norm is None:
             return None
 
-        w = (0.58, 0.27, 0.08, 0.07)
+        w = WEIGHTS
         score = (
                 w[0] * star_mag_norm +
                 w[1] * f_depth(depth) +
@@ -88,19 +142,42 @@ def get_label(score, mid=46.0, high=80.0):
     return "APC"
 
 
-def load_nasa_csv(source):
+def load_nasa_csv(source, chunksize=None):
+    # chunksize verilirse DataFrame parçaları üreten okuyucu döner
     return pd.read_csv(
         source,
         engine="python",
         comment="#",
-        skip_blank_lines=True
+        skip_blank_lines=True,
+        chunksize=chunksize
     )
 
 
+def stream_nasa_csv(spec, mode='sync', chunksize=STREAM_CHUNK_ROWS, progress=None, refresh=False):
+    # TAP yanıtı indirilirken okunur: gzip açma ve CSV ayrıştırma veri geldikçe parça parça,
+    # ham metin / çözülmüş string / DataFrame aynı anda bellekte tutulmaz.
+    # progress sözlüğüne her parçada ağdan okunan bayt sayısı yazılır (sync / async).
+    # refresh: yarım kalmış bir çekimin diskteki parçaları (partitioned) kullanılmaz
+    client = TapClient(NASA_TAP_URL)
+    if mode == 'partitioned':
+        yield from client.fetch_partitioned(spec['columns'], spec['table'], spec['key'], spec['where'],
+                                            n_partitions=TAP_PARTITIONS, chunksize=chunksize,
+                                            max_age=0 if refresh else None)
+        return
+
+    query = build_query(spec['columns'], spec['table'], spec['where'])
+    with client.open(query, mode) as r:
+        for df in read_csv_chunks(r.raw, chunksize):
+            if progress is not None:
+                progress['bytes'] = r.raw.tell()
+            yield df
+
+
 def safe_float(x):
+    # None / NaN -> None (pd.isna ile aynı, pandas yüklenmeden)
+    if x is None or (isinstance(x, float) and x != x):
+        return None
     try:
-        if pd.isna(x):
-            return None
         return float(str(x).strip())
     except:
         return None
@@ -151,6 +228,166 @@ def find_columns(df):
     return col_map
 
 
+def find_error_columns(df, col_map):
+    # NASA tablolarındaki asimetrik hata kolonları: pl_orbpererr1/2, koi_period_err1/2
+    err_map = {}
+    columns_lower = {col.lower().strip(): col for col in df.columns}
+
+    for key in ('period', 'duration', 'depth', 'star_mag'):
+        if key not in col_map:
+            continue
+        base = col_map[key].lower().strip()
+        for sep in ('err', '_err'):
+            plus = columns_lower.get(f'{base}{sep}1')
+            minus = columns_lower.get(f'{base}{sep}2')
+            if plus or minus:
+                err_map[key] = (plus, minus)
+                break
+
+    return err_map
+
+
+def error_arrays(df, col_mapping):
+    # Belirsizlik için {parametre: (üst hata, alt hata)} tam boy diziler
+    err_map = find_error_columns(df, col_mapping)
+
+    def column(name):
+        if name is None:
+            return np.full(len(df), np.nan)
+        return pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=float)
+
+    return {key: (column(plus), column(minus)) for key, (plus, minus) in err_map.items()}
+
+
+def get_draws(args):
+    # uncertainty=1 ise örnek sayısı (draws), değilse None
+    if args.get('uncertainty', '').lower() not in ('1', 'true', 'yes'):
+        return None
+    try:
+        draws = int(args.get('draws', DEFAULT_DRAWS))
+    except ValueError:
+        draws = DEFAULT_DRAWS
+    return max(10, min(draws, MAX_DRAWS))
+
+
+def get_unit_hints(args):
+    # units=depth:ppm,duration:days -> {'depth': 'ppm', ...}; hatalı değerde ValueError
+    return parse_hints(args.get('units', ''))
+
+
+def get_profile_args(args):
+    # profile=: birincil skor profili; profiles=a,b: yan yana karşılaştırılacak ek profiller
+    profile = args.get('profile') or DEFAULT_PROFILE
+    compare = [p.strip() for p in args.get('profiles', '').split(',') if p.strip()]
+    for name in [profile] + compare:
+        get_profile(name)
+    return profile, [p for p in compare if p != profile]
+
+
+def extract_columns(df, col_mapping):
+    # safe_float ile aynı: eksik kolon veya sayıya çevrilemeyen değer NaN olur
+    arrays = {}
+    for key in ('period', 'duration', 'depth', 'star_mag'):
+        if key in col_mapping:
+            arrays[key] = pd.to_numeric(df[col_mapping[key]], errors='coerce').to_numpy(dtype=float)
+        else:
+            arrays[key] = np.full(len(df), np.nan)
+    return arrays
+
+
+def column_units(df, col_mapping, hints=None):
+    # Kolon birimleri ilk SAMPLE_ROWS satırdan bir kez çıkarılır; parçalı okumada ilk parçadan.
+    # hints: kullanıcının verdiği birimler (get_unit_hints), çıkarımın önüne geçer
+    return infer_units(col_mapping, extract_columns(df.head(SAMPLE_ROWS), col_mapping), hints)
+
+
+def score_dataframe(df, col_mapping, source, id_prefix=None, profile=DEFAULT_PROFILE, compare=(), draws=None,
+                    units=None):
+    ids = df[col_mapping['id']].to_numpy() if 'id' in col_mapping else None
+    errors = error_arrays(df, col_mapping) if draws else None
+    if units is None:
+        units = column_units(df, col_mapping)
+    return score_arrays(extract_columns(df, col_mapping), df.index.to_numpy(), source, ids, id_prefix,
+                        profile, compare, draws, errors, units)
+
+
+def score_arrays(arrays, index, source, ids=None, id_prefix=None, profile=DEFAULT_PROFILE, compare=(),
+                 draws=None, errors=None, units=None):
+    # arrays: period / duration / depth / star_mag (float64), index: dosyadaki satır numaraları,
+    # errors: error_arrays() biçiminde hata dizileri (draws verildiyse), units: infer_units()
+    # çıktısı; kolonlar skorlamadan önce gün / saat / ppm'e çevrilir ve tabloya öyle yazılır
+    arrays = convert(arrays, units)
+    scored = score_profiles([profile] + list(compare), arrays['period'], arrays['duration'],
+                            arrays['depth'], arrays['star_mag'], source)
+    score, codes = scored[profile]
+    rows = np.flatnonzero(np.isfinite(score))
+
+    columns = {key: arrays[key][rows] for key in ('period', 'duration', 'depth', 'star_mag')}
+    columns['score'] = score[rows]
+    columns['label'] = codes[rows]
+    for name in compare:
+        other_score, other_codes = scored[name]
+        columns[f'score_{name}'] = other_score[rows]
+        columns[f'label_{name}'] = other_codes[rows]
+
+    if draws and len(rows):
+        values = {key: arrays[key][rows] for key in PARAMS}
+        row_errors = {key: (plus[rows], minus[rows])
+                      for key, (plus, minus) in convert_errors(errors or {}, units).items()}
+        columns.update(score_probabilities(values, row_errors, source, n_draws=draws, profile=profile))
+
+    table = CandidateTable(columns, ids[rows] if ids is not None else None, id_prefix, index[rows])
+    return table.round().sort()
+
+
+def merge_scored(parts):
+    # score_dataframe parçalarını (dosya sırasında) birleştirir; parçalar kendi içinde sıralı
+    # olduğu için kararlı sıralama tek seferde skorlanmış tabloyla aynı sırayı verir
+    return CandidateTable.concat(parts).sort()
+
+
+def snapshot_tables(table):
+    # 'by_id': kimlik sıralaması, /api/diff birleştirmesi için yayın anında bir kez
+    keys = table.ids if table.ids is not None else table.rows
+    return {'rows': table.to_arrays(), 'by_id': {'order': id_order(keys, table['period'])}}
+
+
+def table_from_snapshot(snap):
+    return CandidateTable.from_arrays(snap.table('rows'), snap.meta.get('id_prefix'))
+
+
+ROW_FORMATS = ('json', 'columnar')
+
+
+def rows_format(args):
+    # rows=json: satır sözlükleri 'data' altında; rows=columnar: ikili kolon tablosu
+    # (CandidateTable.to_binary) base64 olarak 'columns' altında, arayüzdeki sanal tablo için
+    fmt = args.get('rows') or 'json'
+    if fmt not in ROW_FORMATS:
+        raise ValueError(f'Invalid rows format, expected one of {list(ROW_FORMATS)}')
+    return fmt
+
+
+def add_rows(payload, table, fmt='json'):
+    if fmt == 'columnar':
+        payload['columns'] = base64.b64encode(table.to_binary()).decode('ascii')
+    else:
+        payload['data'] = table.to_records()
+    return payload
+
+
+def summarize(table):
+    scores = table.values('score')
+    n = len(scores)
+    return {
+        'total': n,
+        'mean': round(float(np.mean(scores)), 2) if n else 0,
+        'median': round(float(np.median(scores)), 2) if n else 0,
+        'std': round(float(np.std(scores)), 2) if n else 0,
+        'pass_rate': round(float(np.count_nonzero(scores >= 80) / n * 100), 2) if n else 0
+    }
+
+
 # HTML Template
 HTML_TEMPLATE = '''<!DOCTYPE html>
 <html lang="tr">
@@ -349,6 +586,24 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
 
         .data-table { width: 100%; overflow-x: auto; margin-top: 20px; }
 
+        .vt-tools { display: flex; gap: 10px; margin-top: 15px; }
+        .vt-tools input, .vt-tools select { flex: 1; padding: 8px 12px; font-size: 14px; }
+        .vt-grid { min-width: 760px; }
+        .vt-row {
+            display: grid;
+            grid-template-columns: var(--vt-columns);
+            align-items: center;
+            height: 40px;
+            border-bottom: 1px solid rgba(255, 255, 255, 0.1);
+        }
+        .vt-row > div { padding: 0 12px; overflow: hidden; text-overflow: ellipsis; white-space: nowrap; }
+        .vt-head { background: rgba(0, 212, 255, 0.2); font-weight: 600; cursor: pointer; user-select: none; }
+        .vt-viewport { position: relative; overflow-y: auto; }
+        .vt-body { position: absolute; top: 0; left: 0; right: 0; will-change: transform; }
+        .vt-body .vt-row:hover { background: rgba(255, 255, 255, 0.05); }
+        .vt-body .label-badge { padding: 2px 12px; margin: 0; }
+        .vt-strong { font-weight: 700; }
+
         table { width: 100%; border-collapse: collapse; }
 
         th, td {
@@ -438,6 +693,19 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
         position: relative;
         height: 300px;
         }
+
+        .density-canvas {
+        width: 100%;
+        background: rgba(255, 255, 255, 0.03);
+        border-radius: 8px;
+        }
+
+        .density-axis {
+        text-align: center;
+        margin-top: 10px;
+        color: #aaa;
+        font-size: 0.85em;
+        }
         
         
         .creators {
@@ -506,24 +774,46 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
                     <option value="koi">🔭 Kepler Objects of Interest (KOI)</option>
                 </select>
             </div>
+            <div class="form-group">
+                <label>Skorlama Profili</label>
+                <select id="nasaProfile" class="profile-select"><option value="default">default</option></select>
+            </div>
+            <div class="form-group">
+                <label>
+                    <input type="checkbox" id="nasaUncertainty" style="width: auto;"> Belirsizlik analizi (Monte Carlo, katalog hata kolonları)
+                </label>
+            </div>
             <button onclick="fetchNasaAuto()" id="nasaBtn">🚀 Veriyi Getir ve Analiz Et</button>
             <button onclick="exportResults('nasa')" id="exportNasaBtn" style="display:none;">💾 Excel'e İndir</button>
             <div id="nasaResult"></div>
         </div>
 
         <div id="file" class="content">
-            <h2>CSV/Excel Dosya Analizi</h2>
+            <h2>CSV/Excel/Parquet Dosya Analizi</h2>
             <div class="info-message">
                 <strong>📋 Desteklenen Kolon İsimleri:</strong><br>
                 • ID: toi, tic, kepid, koi, pl_name, id<br>
                 • Periyot: period, orbper, koi_period, pl_orbper<br>
                 • Süre: duration, trandur, koi_duration, pl_trandur<br>
                 • Derinlik: depth, trandept, koi_depth, pl_trandep<br>
-                • Parlaklık: tmag, kepmag, koi_kepmag, st_tmag
+                • Parlaklık: tmag, kepmag, koi_kepmag, st_tmag<br>
+                • FITS ışık eğrisi (TESS/Kepler LC): periyot ve t0 zorunlu, süre/derinlik başlangıç tahmini
             </div>
             <div class="form-group">
-                <label>Dosya Seç (CSV, XLS, XLSX)</label>
-                <input type="file" id="fileInput" accept=".csv,.xlsx,.xls">
+                <label>Dosya Seç (CSV, XLS, XLSX, FITS)</label>
+                <input type="file" id="fileInput" accept=".csv,.xlsx,.xls,.parquet,.pq,.feather,.arrow,.arrows,.ipc,.fits,.fit">
+            </div>
+            <div class="form-group" id="fitsParams">
+                <label>FITS için Katalog Efemerisi (Periyot gün / t0 BJD / Süre saat / Derinlik ppm)</label>
+                <div style="display: grid; grid-template-columns: repeat(4, 1fr); gap: 10px;">
+                    <input type="number" id="fitsPeriod" step="0.000001" placeholder="Periyot">
+                    <input type="number" id="fitsT0" step="0.000001" placeholder="t0">
+                    <input type="number" id="fitsDuration" step="0.01" placeholder="Süre">
+                    <input type="number" id="fitsDepth" step="1" placeholder="Derinlik">
+                </div>
+                <label style="margin-top: 10px;">
+                    <input type="checkbox" id="fitsDemote" style="width: auto;"> Tek/çift, ikincil tutulma veya V şekli bayrağı varsa etiketi düşür
+                </label>
             </div>
             <div class="form-group">
                 <label>Veri Kaynağı (Dosya için)</label>
@@ -533,6 +823,20 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
                     <option value="koi">Kepler Verisi</option>
                 </select>
             </div>
+            <div class="form-group">
+                <label>Skorlama Profili</label>
+                <select id="fileProfile" class="profile-select"><option value="default">default</option></select>
+            </div>
+            <div class="form-group">
+                <label>
+                    <input type="checkbox" id="fileUncertainty" style="width: auto;"> Belirsizlik analizi (Monte Carlo, hata kolonları)
+                </label>
+            </div>
+            <div class="form-group">
+                <label>
+                    <input type="checkbox" id="filePreview" style="width: auto;"> Hızlı ön izleme (büyük CSV; istatistikler ve en iyi adaylar hemen, tam analiz arka planda)
+                </label>
+            </div>
             <button onclick="analyzeFile()" id="fileBtn">📊 Analiz Et</button>
             <button onclick="exportResults('file')" id="exportFileBtn" style="display:none;">💾 Excel'e İndir</button>
             <div id="fileResult"></div>
@@ -561,7 +865,26 @@ HTML_TEMPLATE = '''<!DOCTYPE html>
 
         window.addEventListener('DOMContentLoaded', function() {
         displayHistory();
+        loadProfiles();
         });
+
+        // Sunucudaki skorlama profilleri (scoring_profiles.json)
+        async function loadProfiles() {
+            try {
+                const response = await fetch('/api/profiles');
+                if (!response.ok) return;
+                const result = await response.json();
+                const options = result.profiles
+                    .map(p => `<option value="${p.name}">${p.name} (CP ≥ ${p.labels.high}, PC ≥ ${p.labels.mid})</option>`)
+                    .join('');
+                document.querySelectorAll('.profile-select').forEach(select => {
+                    select.innerHTML = options;
+                    select.value = result.default;
+                });
+            } catch (error) {
+                console.error('Profil listesi alınamadı', error);
+            }
+        }
         // Sorgu geçmişi için localStorage kullanımı
         const HISTORY_KEY = 'exoplanet_query_history';
         const MAX_HISTORY = 10;
@@ -783,12 +1106,14 @@ function loadQueryFromHistory(index) {
             `;
 
             try {
-                const response = await fetch(`/api/nasa_auto?source=${source}`);
-                if (!response.ok) throw new Error('NASA bağlantı hatası');
-
-                const result = await response.json();
-                currentData = { type: source, data: result.data };
-                displayResults('nasaResult', result.data, result.stats);
+                const uncertainty = document.getElementById('nasaUncertainty').checked ? '&uncertainty=1' : '';
+                const profile = encodeURIComponent(document.getElementById('nasaProfile').value);
+                // İndirme sürerken ara sonuçlar gösterilir (SSE)
+                const result = await streamAnalysis(`/api/nasa_auto/stream?source=${source}&profile=${profile}${uncertainty}&rows=columnar`,
+                                                    {}, 'nasaResult', 'NASA bağlantı hatası');
+                const rows = resultRows(result);
+                currentData = { type: source, rows: rows, resultId: result.result_id };
+                displayResults('nasaResult', rows, result.stats, result.result_id);
                 document.getElementById('exportNasaBtn').style.display = 'inline-block';
             } catch (error) {
                 document.getElementById('nasaResult').innerHTML = `
@@ -819,22 +1144,42 @@ function loadQueryFromHistory(index) {
             const formData = new FormData();
             formData.append('file', fileInput.files[0]);
             formData.append('source', document.getElementById('fileSource').value);
+            formData.append('period', document.getElementById('fitsPeriod').value);
+            formData.append('t0', document.getElementById('fitsT0').value);
+            formData.append('duration', document.getElementById('fitsDuration').value);
+            formData.append('depth', document.getElementById('fitsDepth').value);
+            formData.append('demote', document.getElementById('fitsDemote').checked ? '1' : '0');
+            formData.append('uncertainty', document.getElementById('fileUncertainty').checked ? '1' : '0');
+            formData.append('profile', document.getElementById('fileProfile').value);
+            const preview = document.getElementById('filePreview').checked;
+            formData.append('mode', preview ? 'preview' : 'full');
+            formData.append('rows', 'columnar');
 
             try {
-                const response = await fetch('/api/analyze_file', {
-                    method: 'POST',
-                    body: formData
-                });
-
-                if (!response.ok) {
-                    const errorData = await response.json();
-                    throw new Error(errorData.error || 'Dosya analiz hatası');
+                // CSV / Excel / Parquet / Arrow: skorlanan her parçadan sonra ara sonuçlar (SSE); FITS ve ön izleme tek yanıt
+                const streamed = !preview && !/[.]fits?$/i.test(fileInput.files[0].name);
+                let result;
+                if (streamed) {
+                    result = await streamAnalysis('/api/analyze_file/stream', { method: 'POST', body: formData },
+                                                  'fileResult', 'Dosya analiz hatası');
+                } else {
+                    const response = await fetch('/api/analyze_file', {
+                        method: 'POST',
+                        body: formData
+                    });
+                    result = await readJson(response, 'Dosya analiz hatası');
                 }
 
-                const result = await response.json();
-                currentData = { type: 'file', data: result.data };
-                displayResults('fileResult', result.data, result.stats);
+                const rows = resultRows(result);
+                currentData = { type: 'file', rows: rows, resultId: result.result_id };
+                const note = result.preview
+                    ? `⏳ Ön izleme: istatistikler kesin, tabloda en yüksek skorlu ${rows.table.rows} aday, grafikler ${result.sample} adaylık örneklemden. Tam analiz arka planda sürüyor...`
+                    : unitsNote(result.units);
+                displayResults('fileResult', rows, result.stats, result.result_id, note);
                 document.getElementById('exportFileBtn').style.display = 'inline-block';
+                if (result.preview && result.job_id) {
+                    pollJob('fileResult', result.job_id);
+                }
             } catch (error) {
                 document.getElementById('fileResult').innerHTML = `
                     <div class="error-message">Hata: ${error.message}</div>
@@ -844,19 +1189,88 @@ function loadQueryFromHistory(index) {
             }
         }
 
-        function createClassificationChart(data, targetId) {
-        // Sınıflandırma sayılarını hesaplayalım
-        const counts = {
-        'CP': 0,
-        'PC': 0,
-        'APC': 0
-         };
-    
-        data.forEach(row => {
-        counts[row.label]++;
-        });
-    
-        // Canvas oluşturma
+        async function readJson(response, fallback) {
+            if (response.status === 429) {
+                throw new Error(`Sunucu yoğun, ${response.headers.get('Retry-After') || 'birkaç'} sn sonra tekrar deneyin`);
+            }
+            if (!response.ok) {
+                const errorData = await response.json().catch(() => ({}));
+                throw new Error(errorData.error || fallback);
+            }
+            return response.json();
+        }
+
+        async function streamAnalysis(url, options, targetId, fallback) {
+            // SSE olayları fetch akışından okunur (POST + dosya için EventSource kullanılamaz).
+            // progress: ilerleme satırı, partial: ara sonuçlar, done: akışsız yanıtla aynı içerik
+            const response = await fetch(url, options);
+            if (!response.ok) return readJson(response, fallback);
+
+            const reader = response.body.getReader();
+            const decoder = new TextDecoder();
+            let buffer = '';
+            let progress = 'Veri bekleniyor...';
+            while (true) {
+                const { value, done } = await reader.read();
+                if (done) break;
+                buffer += decoder.decode(value, { stream: true });
+
+                let end;
+                while ((end = buffer.indexOf('\\n\\n')) >= 0) {
+                    const frame = buffer.slice(0, end);
+                    buffer = buffer.slice(end + 2);
+                    let event = 'message';
+                    let data = '';
+                    frame.split('\\n').forEach(line => {
+                        if (line.startsWith('event: ')) event = line.slice(7);
+                        else if (line.startsWith('data: ')) data += line.slice(6);
+                    });
+                    if (!data) continue;
+
+                    const payload = JSON.parse(data);
+                    if (event === 'error') throw new Error(payload.error || fallback);
+                    if (event === 'done') return payload;
+                    if (event === 'progress') {
+                        const mb = payload.bytes != null ? `, ${(payload.bytes / 1048576).toFixed(1)} MB` : '';
+                        progress = `⏳ ${payload.rows.toLocaleString()} satır işlendi${mb}, ${payload.candidates.toLocaleString()} aday...`;
+                        const note = document.getElementById(`${targetId}-preview`);
+                        if (note) note.textContent = progress;
+                    }
+                    if (event === 'partial') {
+                        displayResults(targetId, resultRows(payload), payload.stats, null, progress);
+                    }
+                }
+            }
+            throw new Error(fallback);
+        }
+
+        async function pollJob(targetId, jobId) {
+            // Ön izlemeden sonra kesin analiz bitince sonuçlar yerine konur
+            while (true) {
+                await new Promise(resolve => setTimeout(resolve, 1000));
+                try {
+                    const response = await fetch(`/api/jobs/${jobId}?rows=columnar`);
+                    if (response.status === 429) continue;
+                    const job = await response.json();
+                    if (!response.ok || job.status === 'error') {
+                        const note = document.getElementById(`${targetId}-preview`);
+                        if (note) note.textContent = `Tam analiz başarısız: ${job.error || 'bilinmeyen hata'}`;
+                        return;
+                    }
+                    if (job.status === 'done') {
+                        const rows = resultRows(job);
+                        currentData = { type: 'file', rows: rows, resultId: job.result_id };
+                        displayResults(targetId, rows, job.stats, job.result_id, unitsNote(job.units));
+                        return;
+                    }
+                } catch (error) {
+                    return;
+                }
+            }
+        }
+
+        function createClassificationChart(targetId) {
+        // Grafikler /api/aggregate'ten gelen özet veriden çizilir (satır sayısından bağımsız)
          const canvasId = `chart-${targetId}`;
         const chartHtml = `
         <div class="chart-container">
@@ -864,15 +1278,105 @@ function loadQueryFromHistory(index) {
             <div class="chart-wrapper">
                 <canvas id="${canvasId}"></canvas>
             </div>
-            <div style="text-align: center; margin-top: 15px; color: #aaa;">
-                <span style="color: #00ff88;">■</span> CP: ${counts.CP} | 
-                <span style="color: #ffaa00;">■</span> PC: ${counts.PC} | 
-                <span style="color: #ff0055;">■</span> APC: ${counts.APC}
-             </div>
+            <div id="${canvasId}-counts" style="text-align: center; margin-top: 15px; color: #aaa;"></div>
          </div>
+        <div class="chart-container">
+            <h4>📈 Skor Histogramı</h4>
+            <div class="chart-wrapper">
+                <canvas id="${canvasId}-hist"></canvas>
+            </div>
+        </div>
+        <div class="chart-container">
+            <h4>🌌 Periyot – Derinlik Yoğunluğu (log)</h4>
+            <canvas id="${canvasId}-period_depth" class="density-canvas" width="480" height="300"></canvas>
+            <div id="${canvasId}-period_depth-axis" class="density-axis"></div>
+        </div>
+        <div class="chart-container">
+            <h4>⭐ Parlaklık – Skor Yoğunluğu</h4>
+            <canvas id="${canvasId}-mag_score" class="density-canvas" width="480" height="300"></canvas>
+            <div id="${canvasId}-mag_score-axis" class="density-axis"></div>
+        </div>
             `;
-    
-        return { html: chartHtml, counts, canvasId };
+
+        return { html: chartHtml, canvasId };
+        }
+
+        async function loadAggregates(canvasId, resultId) {
+            if (!resultId) return;
+            try {
+                const response = await fetch(`/api/aggregate?result_id=${resultId}&bins=20&grid=24`);
+                const agg = await response.json();
+                if (!response.ok) throw new Error(agg.error || `HTTP ${response.status}`);
+                const counts = agg.labels;
+                document.getElementById(`${canvasId}-counts`).innerHTML = `
+                    <span style="color: #00ff88;">■</span> CP: ${counts.CP} |
+                    <span style="color: #ffaa00;">■</span> PC: ${counts.PC} |
+                    <span style="color: #ff0055;">■</span> APC: ${counts.APC}`;
+                renderChart(canvasId, counts);
+                renderHistogram(`${canvasId}-hist`, agg.score_histogram);
+                Object.entries(agg.density).forEach(([name, grid]) => renderDensity(`${canvasId}-${name}`, grid));
+            } catch (error) {
+                console.error('Grafik verisi alınamadı', error);
+                const counts = document.getElementById(`${canvasId}-counts`);
+                if (counts) counts.innerHTML = `<div class="error-message">Grafik verisi alınamadı: ${error.message}</div>`;
+            }
+        }
+
+        function renderHistogram(canvasId, hist) {
+            const ctx = document.getElementById(canvasId);
+            if (!ctx) return;
+            const labels = hist.counts.map((_, i) => `${hist.edges[i].toFixed(0)}–${hist.edges[i + 1].toFixed(0)}`);
+            new Chart(ctx, {
+                type: 'bar',
+                data: {
+                    labels,
+                    datasets: [{
+                        label: 'Aday sayısı',
+                        data: hist.counts,
+                        backgroundColor: 'rgba(0, 212, 255, 0.6)',
+                        borderColor: 'rgba(0, 212, 255, 1)',
+                        borderWidth: 1
+                    }]
+                },
+                options: {
+                    responsive: true,
+                    maintainAspectRatio: false,
+                    plugins: { legend: { display: false } },
+                    scales: {
+                        x: { ticks: { color: '#aaa' } },
+                        y: { ticks: { color: '#aaa' }, beginAtZero: true }
+                    }
+                }
+            });
+        }
+
+        function renderDensity(canvasId, grid) {
+            // Izgara hücreleri doğrudan canvas'a boyanır; maliyet yalnızca ızgara boyutuna bağlı
+            const canvas = document.getElementById(canvasId);
+            if (!canvas || !grid.counts.length) return;
+            const ctx = canvas.getContext('2d');
+            const nx = grid.counts.length;
+            const ny = grid.counts[0].length;
+            const cw = canvas.width / nx;
+            const ch = canvas.height / ny;
+            const scale = Math.log1p(grid.max || 1);
+
+            ctx.clearRect(0, 0, canvas.width, canvas.height);
+            for (let i = 0; i < nx; i++) {
+                for (let j = 0; j < ny; j++) {
+                    const c = grid.counts[i][j];
+                    if (!c) continue;
+                    const t = Math.log1p(c) / scale;
+                    ctx.fillStyle = `rgba(0, ${Math.round(120 + 135 * t)}, 255, ${0.15 + 0.85 * t})`;
+                    ctx.fillRect(i * cw, canvas.height - (j + 1) * ch, Math.ceil(cw), Math.ceil(ch));
+                }
+            }
+
+            const fmt = v => Math.abs(v) >= 1000 ? v.toExponential(1) : +v.toPrecision(3);
+            const xs = grid.x_edges, ys = grid.y_edges;
+            document.getElementById(`${canvasId}-axis`).innerHTML =
+                `${grid.x}: ${fmt(xs[0])} → ${fmt(xs[xs.length - 1])}${grid.log_x ? ' (log)' : ''} &nbsp;|&nbsp; ` +
+                `${grid.y}: ${fmt(ys[0])} → ${fmt(ys[ys.length - 1])}${grid.log_y ? ' (log)' : ''} &nbsp;|&nbsp; maks: ${grid.max}`;
         }
 
         function renderChart(canvasId, counts) {
@@ -932,83 +1436,394 @@ function loadQueryFromHistory(index) {
              });
                 }
                 
-        function displayResults(targetId, data, stats) {
+        // Sunucunun kolon başına çıkarıp çevirdiği birimler (yalnızca dönüşüm olduysa)
+        function unitsNote(units) {
+            const names = { period: 'periyot', duration: 'süre', depth: 'derinlik' };
+            const targets = { period: 'gün', duration: 'saat', depth: 'ppm' };
+            const unitNames = { days: 'gün', hours: 'saat', minutes: 'dakika', ppm: 'ppm', ppt: 'ppt', percent: '%', fraction: 'kesir' };
+            const converted = Object.entries(units || {}).filter(([, u]) => u.factor !== 1);
+            if (!converted.length) return null;
+            return '📏 Birim dönüşümü: ' + converted.map(([key, u]) =>
+                `${names[key]} ${unitNames[u.unit]} → ${targets[key]} (${u.column})`).join(', ');
+        }
+
+        function displayResults(targetId, rows, stats, resultId, note) {
          // Grafik verileri
-        const chartData = createClassificationChart(data, targetId);
+        const chartData = createClassificationChart(targetId);
+        const columns = tableColumns(rows.table);
+        // Tahmini istatistik (stats.estimated): ~ ile, altında %95 güven aralığı
+        const approx = stats.estimated ? '~' : '';
+        const interval = (name, unit = '') => stats.estimated && stats.intervals[name]
+            ? `<div class="stat-label">${stats.intervals[name][0]}${unit} – ${stats.intervals[name][1]}${unit}</div>` : '';
     
         let html = `
         <div class="result-card">
             <h3>Analiz Sonuçları</h3>
+            ${note ? `<div class="info-message" id="${targetId}-preview">${note}</div>` : ''}
             <div class="stats-grid">
                 <div class="stat-card">
                     <div class="stat-value">${stats.total}</div>
                     <div class="stat-label">Toplam Kayıt</div>
                 </div>
                 <div class="stat-card">
-                    <div class="stat-value">${stats.mean}</div>
+                    <div class="stat-value">${approx}${stats.mean}</div>
                     <div class="stat-label">Ortalama Skor</div>
+                    ${interval('mean')}
                 </div>
                 <div class="stat-card">
-                    <div class="stat-value">${stats.median}</div>
+                    <div class="stat-value">${approx}${stats.median}</div>
                     <div class="stat-label">Medyan</div>
+                    ${interval('median')}
                 </div>
                 <div class="stat-card">
-                    <div class="stat-value">${stats.pass_rate}%</div>
+                    <div class="stat-value">${approx}${stats.pass_rate}%</div>
                     <div class="stat-label">Geçme Oranı (≥80)</div>
+                    ${interval('pass_rate', '%')}
                 </div>
             </div>
             
             ${chartData.html}
             
-            <h4>En İyi ${Math.min(100, data.length)} Aday</h4>
+            <h4>Adaylar (<span id="${targetId}-count">${rows.table.rows.toLocaleString()}</span>)</h4>
+            <div class="vt-tools">
+                <input type="text" id="${targetId}-search" placeholder="ID ara...">
+                <select id="${targetId}-label">
+                    <option value="-1">Tüm etiketler</option>
+                    <option value="0">CP</option>
+                    <option value="1">PC</option>
+                    <option value="2">APC</option>
+                </select>
+                <input type="number" id="${targetId}-min" placeholder="En düşük skor" step="1">
+            </div>
             <div class="data-table">
-                <table>
-                    <thead>
-                        <tr>
-                            <th>ID</th>
-                            <th>Skor</th>
-                            <th>Label</th>
-                            <th>Periyot</th>
-                            <th>Süre</th>
-                            <th>Derinlik</th>
-                            <th>Parlaklık</th>
-                        </tr>
-                    </thead>
-                    <tbody>
-                    `;
-
-            data.slice(0, 100).forEach(row => {
-             html += `
-            <tr>
-                <td>${row.id}</td>
-                <td><strong>${row.score}</strong></td>
-                <td><span class="label-badge label-${row.label}">${row.label}</span></td>
-                <td>${row.period}</td>
-                <td>${row.duration}</td>
-                <td>${row.depth}</td>
-                <td>${row.star_mag}</td>
-             </tr>
-             `;
-            });
+                <div class="vt-grid" style="--vt-columns: ${columns.map(c => c.width).join(' ')}">
+                    <div class="vt-row vt-head" id="${targetId}-head">
+                        ${columns.map(c => `<div data-key="${c.key}">${c.title}</div>`).join('')}
+                    </div>
+                    <div class="vt-viewport" id="${targetId}-viewport">
+                        <div class="vt-spacer" id="${targetId}-spacer"></div>
+                        <div class="vt-body" id="${targetId}-body"></div>
+                    </div>
+                </div>
+            </div>
+        </div>`;
 
-        html += `</tbody></table></div></div>`;
         document.getElementById(targetId).innerHTML = html;
+        mountTable(targetId, rows, columns);
     
             // Grafik render 
-            setTimeout(() => renderChart(chartData.canvasId, chartData.counts), 100);
+            loadAggregates(chartData.canvasId, resultId);
+            }
+
+        // --- Sanal sonuç tablosu ---
+        // Sonuçlar rows=columnar ile ikili kolon tablosu olarak gelir (CandidateTable.to_binary);
+        // yalnızca görünen satırlar çizilir, süzme / sıralama Web Worker'da tipli diziler üzerinde.
+        // Ara sonuçlar ve ön izleme (birkaç yüz satır) JSON satırlarından aynı yapıya çevrilir.
+        const ROW_HEIGHT = 40;
+        const VISIBLE_ROWS = 15;
+        const OVERSCAN = 10;
+        const tableWorkers = {};
+
+        function decodeTable(buffer) {
+            const view = new DataView(buffer);
+            const headerLength = view.getUint32(4, true);
+            const decoder = new TextDecoder();
+            const header = JSON.parse(decoder.decode(new Uint8Array(buffer, 8, headerLength)));
+            const base = 8 + headerLength;
+            const n = header.rows;
+            const columns = {};
+            header.columns.forEach(c => {
+                const at = base + c.offset;
+                const col = Object.assign({}, c);
+                if (c.type === 'f32') col.values = new Float32Array(buffer, at, n);
+                else if (c.type === 'f64') col.values = new Float64Array(buffer, at, n);
+                else if (c.type === 'i32') col.values = new Int32Array(buffer, at, n);
+                else if (c.type === 'u8') col.values = new Uint8Array(buffer, at, n);
+                else {
+                    // Metin tek seferde çözülür; yalnızca ASCII ise bayt konumları karakter konumudur
+                    const offsets = new Uint32Array(buffer, at, n + 1);
+                    const bytes = new Uint8Array(buffer, base + c.data, c.length);
+                    const text = decoder.decode(bytes);
+                    const ascii = text.length === c.length;
+                    col.text = i => ascii ? text.slice(offsets[i], offsets[i + 1])
+                                          : decoder.decode(bytes.subarray(offsets[i], offsets[i + 1]));
+                }
+                columns[c.name] = col;
+            });
+            return { rows: n, columns: columns };
+        }
+
+        function cellText(col, i) {
+            if (!col) return '';
+            if (col.type === 'json') {
+                const v = col.values[i];
+                return v === null || v === undefined ? '' : String(v);
+            }
+            if (col.text) return col.prefix + col.text(i);
+            const v = col.values[i];
+            if (col.labels) return col.labels[v];
+            if (col.prefix) return col.prefix + v;
+            if (!isFinite(v)) return '';
+            return col.decimals === null || col.decimals === undefined ? String(v) : String(Number(v.toFixed(col.decimals)));
+        }
+
+        function sortValue(col, i) {
+            // Sayısal kolonlarda değerin kendisi, metinlerde gösterilen metin
+            if (col.values && col.type !== 'json' && !col.prefix) return col.values[i];
+            const v = col.type === 'json' ? col.values[i] : undefined;
+            // JSON'daki boş sayı (null) ikili tablodaki NaN gibi sona sıralanır
+            if (v === null) return NaN;
+            return typeof v === 'number' ? v : cellText(col, i);
+        }
+
+        function labelCode(col, i) {
+            return col.labels ? col.values[i] : ['CP', 'PC', 'APC'].indexOf(col.values[i]);
+        }
+
+        function computeOrder(table, query) {
+            // Süzülen satırların sıralı indeksleri (Uint32Array); eşitlikte sunucu sırası korunur
+            const n = table.rows;
+            const label = table.columns.label;
+            const score = table.columns.score;
+            const id = table.columns.id;
+            const text = (query.text || '').toLowerCase();
+            const minScore = query.minScore;
+            const index = new Uint32Array(n);
+            let m = 0;
+            for (let i = 0; i < n; i++) {
+                if (query.label >= 0 && labelCode(label, i) !== query.label) continue;
+                if (minScore !== null && !(sortValue(score, i) >= minScore)) continue;
+                if (text && cellText(id, i).toLowerCase().indexOf(text) < 0) continue;
+                index[m++] = i;
+            }
+            const order = index.slice(0, m);
+            const col = query.key ? table.columns[query.key] : null;
+            if (col) {
+                const dir = query.desc ? -1 : 1;
+                const keys = new Array(n);
+                for (let k = 0; k < m; k++) keys[order[k]] = sortValue(col, order[k]);
+                order.sort((a, b) => {
+                    const x = keys[a], y = keys[b];
+                    if (x !== y) {
+                        // Boş değerler (NaN) yönden bağımsız olarak sonda
+                        if (x !== x) return 1;
+                        if (y !== y) return -1;
+                        return (x < y ? -1 : 1) * dir;
+                    }
+                    return a - b;
+                });
+            }
+            return order;
+        }
+
+        // Worker kaynağı aynı fonksiyonlardan üretilir (tek HTML sayfası, ayrı dosya yok)
+        const WORKER_SOURCE = [decodeTable, cellText, sortValue, labelCode, computeOrder].map(f => f.toString()).join('\\n') + `
+            let table = null;
+            onmessage = e => {
+                if (e.data.buffer) table = decodeTable(e.data.buffer);
+                const order = computeOrder(table, e.data.query);
+                postMessage({ seq: e.data.seq, order: order }, [order.buffer]);
+            };`;
+        const WORKER_URL = URL.createObjectURL(new Blob([WORKER_SOURCE], { type: 'text/javascript' }));
+
+        function base64ToBuffer(text) {
+            const binary = atob(text);
+            const bytes = new Uint8Array(binary.length);
+            for (let i = 0; i < binary.length; i++) bytes[i] = binary.charCodeAt(i);
+            return bytes.buffer;
+        }
+
+        function resultRows(result) {
+            // { table, buffer }: ikili tablo varsa onun görünümleri, yoksa JSON satırları
+            if (result.columns) {
+                const buffer = base64ToBuffer(result.columns);
+                return { table: decodeTable(buffer), buffer: buffer };
+            }
+            const records = result.data || [];
+            const names = records.length ? Object.keys(records[0]) : [];
+            const columns = {};
+            names.forEach(name => {
+                columns[name] = { name: name, type: 'json', values: records.map(r => r[name]) };
+            });
+            return { table: { rows: records.length, columns: columns }, buffer: null };
+        }
+
+        function tableRecords(table) {
+            // Dışa aktarma yedeği (sonuç sunucu önbelleğinde yoksa): satır sözlükleri
+            const names = Object.keys(table.columns);
+            const records = [];
+            for (let i = 0; i < table.rows; i++) {
+                const record = {};
+                names.forEach(name => {
+                    const col = table.columns[name];
+                    const v = sortValue(col, i);
+                    record[name] = typeof v === 'number' && !col.labels ? (isFinite(v) ? Number(cellText(col, i)) : null) : cellText(col, i);
+                });
+                records.push(record);
+            }
+            return records;
+        }
+
+        function tableColumns(table) {
+            const columns = [
+                { key: 'id', title: 'ID', parts: ['id'], width: 'minmax(140px, 1.6fr)' },
+                { key: 'score', title: 'Skor', parts: ['score'], width: 'minmax(70px, 1fr)', strong: true },
+                { key: 'label', title: 'Label', parts: ['label'], width: 'minmax(80px, 1fr)', badge: true },
+                { key: 'period', title: 'Periyot', parts: ['period'], width: 'minmax(80px, 1fr)' },
+                { key: 'duration', title: 'Süre', parts: ['duration'], width: 'minmax(70px, 1fr)' },
+                { key: 'depth', title: 'Derinlik', parts: ['depth'], width: 'minmax(80px, 1fr)' },
+                { key: 'star_mag', title: 'Parlaklık', parts: ['star_mag'], width: 'minmax(80px, 1fr)' },
+            ];
+            if (table.columns.p_cp) {
+                columns.push({ key: 'p_cp', title: 'P(CP / PC / APC)', parts: ['p_cp', 'p_pc', 'p_apc'], sep: ' / ', width: 'minmax(170px, 1.6fr)' });
+                columns.push({ key: 'score_lo', title: 'Skor Aralığı', parts: ['score_lo', 'score_hi'], sep: ' – ', width: 'minmax(110px, 1.2fr)' });
+            }
+            return columns;
+        }
+
+        function mountTable(targetId, rows, columns) {
+            const table = rows.table;
+            const viewport = document.getElementById(`${targetId}-viewport`);
+            const spacer = document.getElementById(`${targetId}-spacer`);
+            const body = document.getElementById(`${targetId}-body`);
+            const head = document.getElementById(`${targetId}-head`);
+            const count = document.getElementById(`${targetId}-count`);
+            const query = { key: null, desc: true, label: -1, minScore: null, text: '' };
+            let order = null;
+            let seq = 0;
+            let frame = null;
+            const pool = [];
+
+            if (tableWorkers[targetId]) tableWorkers[targetId].terminate();
+            // Worker yalnızca ikili tabloda (büyük sonuçlar); tampon kopyası worker'a devredilir
+            const worker = rows.buffer && window.Worker ? new Worker(WORKER_URL) : null;
+            tableWorkers[targetId] = worker;
+            let sendBuffer = worker ? rows.buffer.slice(0) : null;
+            if (worker) {
+                worker.onmessage = e => {
+                    if (e.data.seq === seq) setOrder(e.data.order);
+                };
+            }
+
+            function rowElement() {
+                const row = document.createElement('div');
+                row.className = 'vt-row';
+                columns.forEach(c => {
+                    const cell = document.createElement('div');
+                    if (c.strong) cell.className = 'vt-strong';
+                    if (c.badge) {
+                        const badge = document.createElement('span');
+                        cell.appendChild(badge);
+                    }
+                    row.appendChild(cell);
+                });
+                return row;
+            }
+
+            function render() {
+                frame = null;
+                const total = order ? order.length : table.rows;
+                const first = Math.max(0, Math.floor(viewport.scrollTop / ROW_HEIGHT) - OVERSCAN);
+                const last = Math.min(total, first + VISIBLE_ROWS + 2 * OVERSCAN);
+                while (pool.length < last - first) body.appendChild(pool[pool.push(rowElement()) - 1]);
+                body.style.transform = `translateY(${first * ROW_HEIGHT}px)`;
+                pool.forEach((row, k) => {
+                    const position = first + k;
+                    row.style.display = position < last ? '' : 'none';
+                    if (position >= last) return;
+                    const i = order ? order[position] : position;
+                    columns.forEach((c, j) => {
+                        const text = c.parts.map(name => cellText(table.columns[name], i)).join(c.sep || '');
+                        const cell = row.children[j];
+                        if (c.badge) {
+                            cell.firstChild.textContent = text;
+                            cell.firstChild.className = `label-badge label-${text}`;
+                        } else {
+                            cell.textContent = text;
+                        }
+                    });
+                });
+            }
+
+            function schedule() {
+                if (frame === null) frame = requestAnimationFrame(render);
+            }
+
+            function setOrder(next) {
+                order = next;
+                const total = order ? order.length : table.rows;
+                count.textContent = total === table.rows ? total.toLocaleString()
+                                                          : `${total.toLocaleString()} / ${table.rows.toLocaleString()}`;
+                spacer.style.height = `${total * ROW_HEIGHT}px`;
+                viewport.style.height = `${Math.max(1, Math.min(total, VISIBLE_ROWS)) * ROW_HEIGHT}px`;
+                schedule();
+            }
+
+            function update() {
+                seq += 1;
+                if (worker) {
+                    const message = { seq: seq, query: query };
+                    if (sendBuffer) {
+                        message.buffer = sendBuffer;
+                        worker.postMessage(message, [sendBuffer]);
+                        sendBuffer = null;
+                    } else {
+                        worker.postMessage(message);
+                    }
+                } else {
+                    setOrder(computeOrder(table, query));
+                }
+                head.querySelectorAll('[data-key]').forEach(el => {
+                    const column = columns.find(c => c.key === el.dataset.key);
+                    el.textContent = column.title + (query.key === column.key ? (query.desc ? ' ▼' : ' ▲') : '');
+                });
             }
+
+            head.addEventListener('click', e => {
+                const key = e.target.dataset && e.target.dataset.key;
+                if (!key) return;
+                // İlk tıklama büyükten küçüğe (sunucu sırası gibi), ikinci tıklama ters
+                query.desc = query.key === key ? !query.desc : true;
+                query.key = key;
+                update();
+            });
+            let typing = null;
+            document.getElementById(`${targetId}-search`).addEventListener('input', e => {
+                clearTimeout(typing);
+                typing = setTimeout(() => { query.text = e.target.value.trim(); update(); }, 200);
+            });
+            document.getElementById(`${targetId}-label`).addEventListener('change', e => {
+                query.label = Number(e.target.value);
+                update();
+            });
+            document.getElementById(`${targetId}-min`).addEventListener('input', e => {
+                query.minScore = e.target.value === '' ? null : Number(e.target.value);
+                update();
+            });
+            viewport.addEventListener('scroll', schedule, { passive: true });
+
+            // Sunucu sırası (skora göre) ile hemen çizilir; worker tabloyu arka planda yükler
+            setOrder(null);
+            if (worker) update();
+        }
+
         async function exportResults(type) {
-            if (!currentData || !currentData.data || currentData.data.length === 0) {
+            if (!currentData || currentData.rows.table.rows === 0) {
                 alert('Dışa aktarılacak veri yok!');
                 return;
             }
 
             try {
-                const response = await fetch('/api/export', {
+                // Sonuç sunucuda önbellekteyse yalnızca result_id gönderilir
+                const post = body => fetch('/api/export', {
                     method: 'POST',
                     headers: { 'Content-Type': 'application/json' },
-                    body: JSON.stringify({ data: currentData.data })
+                    body: JSON.stringify(body)
                 });
+                let response = currentData.resultId ? await post({ result_id: currentData.resultId }) : null;
+                if (!response || response.status === 404) {
+                    response = await post({ data: tableRecords(currentData.rows.table) });
+                }
 
                 if (!response.ok) throw new Error('Export hatası');
 
@@ -1034,6 +1849,8 @@ function loadQueryFromHistory(index) {
 
 # Routes
 @app.route('/api/analyze_file', methods=['POST'])
+@admission.limit('heavy')
+@memory.track
 def analyze_file():
     source = request.form.get('source', 'file')
     try:
@@ -1044,94 +1861,501 @@ def analyze_file():
         if file.filename == '':
             return jsonify({'error': 'Empty filename'}), 400
 
-        if file.filename.endswith('.csv'):
-            df = load_nasa_csv(file)
-        elif file.filename.endswith(('.xlsx', '.xls')):
-            df = pd.read_excel(file)
-        else:
-            return jsonify({'error': 'Unsupported format'}), 400
+        if file.filename.endswith(('.fits', '.fit')):
+            return analyze_lightcurve(file, request.form, source)
 
-        col_mapping = find_columns(df)
+        try:
+            upload = prepare_upload(file, request.form, source)
+        except (KeyError, ValueError) as e:
+            return jsonify({'error': e.args[0]}), 400
 
-        #Otomatik kaynak algılama sistemi (TOI / KOI)
-        if source == 'file':
-            cols = [c.lower() for c in df.columns]
+        # Ön izleme: örneklem + ilk k aday hemen döner, kesin analiz arka planda sürer
+        if upload['cached'] is None and upload['kind'] == 'csv' and request.form.get('mode') == 'preview':
+            return preview_upload(upload)
 
-            if any('kepmag' in c or 'koi_' in c for c in cols):
-                source = 'koi'
-            elif any('tmag' in c or 'toi' in c for c in cols):
-                source = 'toi'
+        payload = upload_payload(upload)
+        with memory.stage('serialize'):
+            return jsonify(add_rows(payload, payload.pop('table'), upload['rows']))
+
+    except MemoryBudgetExceeded as e:
+        return jsonify({'error': str(e), 'estimate': e.estimate, 'budget': e.budget}), 413
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        results = []
-        for _, row in df.iterrows():
-            try:
-                period = safe_float(row[col_mapping['period']]) if 'period' in col_mapping else None
-                duration = safe_float(row[col_mapping['duration']]) if 'duration' in col_mapping else None
-                depth = safe_float(row[col_mapping['depth']]) if 'depth' in col_mapping else None
-                star_mag = safe_float(row[col_mapping['star_mag']]) if 'star_mag' in col_mapping else None
-
-                if None in [period, duration, depth, star_mag]:
-                    continue
-
-                score = calculate_score(period, duration, depth, star_mag, source)
-                if score is None:
-                    continue
-
-                if 'id' in col_mapping:
-                    raw_id = row[col_mapping['id']]
-                    obj_id = f"FILE-{raw_id}"
-                else:
-                    obj_id = f"ROW-{_ + 1}"
-                results.append({
-                    'id': str(obj_id),
-                    'period': round(period, 2),
-                    'duration': round(duration, 2),
-                    'depth': round(depth, 0),
-                    'star_mag': round(star_mag, 2),
-                    'score': round(score, 1),
-                    'label': get_label(score)
-                })
-            except:
-                continue
-
-        results.sort(key=lambda x: x['score'], reverse=True)
-
-        scores = [r['score'] for r in results]
-        stats = {
-            'total': len(results),
-            'mean': round(np.mean(scores), 2) if scores else 0,
-            'median': round(np.median(scores), 2) if scores else 0,
-            'std': round(np.std(scores), 2) if scores else 0,
-            'pass_rate': round((sum(1 for s in scores if s >= 80) / len(scores) * 100), 2) if scores else 0
-        }
-
-        return jsonify({'data': results, 'stats': stats})
 
+@app.route('/api/analyze_file/stream', methods=['POST'])
+@admission.limit('heavy')
+def analyze_file_stream():
+    # analyze_file'ın SSE sürümü (CSV / Excel / Parquet / Arrow): her skorlanan parçadan sonra ilerleme ve ara sonuç
+    source = request.form.get('source', 'file')
+    try:
+        file = request.files.get('file')
+        if file is None or file.filename == '':
+            return jsonify({'error': 'No file'}), 400
+        if file.filename.endswith(('.fits', '.fit')):
+            return jsonify({'error': 'FITS light curves are analyzed with /api/analyze_file'}), 400
+
+        try:
+            upload = prepare_upload(file, request.form, source)
+        except (KeyError, ValueError) as e:
+            return jsonify({'error': e.args[0]}), 400
+
+    except MemoryBudgetExceeded as e:
+        return jsonify({'error': str(e), 'estimate': e.estimate, 'budget': e.budget}), 413
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+    def work(stream):
+        # Üretici istek döndükten sonra sürer: bellek kaydı onun iş parçacığında tutulur
+        with memory.background('analyze_file_stream'):
+            payload = upload_payload(upload, stream.chunk)
+            with memory.stage('serialize'):
+                return add_rows(payload, payload.pop('table'), upload['rows'])
+
+    return sse_response(ProgressStream().run(work))
+
+
+def upload_kind(filename):
+    if filename.endswith('.csv'):
+        return 'csv'
+    if filename.endswith(('.xlsx', '.xls')):
+        return 'excel'
+    return columnar_kind(filename)
+
+
+def prepare_upload(file, form, source):
+    # Yüklemeyi okur, önbellek anahtarını ve bellek planını çıkarır; hatalı parametrede
+    # KeyError / ValueError, bütçe aşımında MemoryBudgetExceeded
+    kind = upload_kind(file.filename)
+    if kind is None:
+        raise ValueError('Unsupported format')
+
+    profile, compare = get_profile_args(form)
+    draws = get_draws(form)
+    hints = get_unit_hints(form)
+    rows = rows_format(form)
+
+    # Aynı içerik + kaynak + skor sürümü daha önce skorlandıysa diskten döner
+    with memory.stage('parse'):
+        memory.check_upload(request.content_length)
+        data, digest = read_upload(file.stream, check=memory.check_upload)
+    version = scoring_version(profile, compare, draws)
+    key = cache_key('upload', digest, source, version, sorted(hints.items()))
+    cached = upload_cache.get(key)
+
+    # Bellek bütçesi: tahmin tam ayrıştırmayı aşıyorsa parça parça okunur
+    plan = estimate = None
+    if cached is None:
+        if kind in ('csv', 'excel'):
+            estimate = estimate_upload(data, kind, STREAM_CHUNK_ROWS, draws)
+        else:
+            columnar = ColumnarFile(data, kind)
+            estimate = estimate_columnar(len(data), columnar.num_rows, len(columnar.columns),
+                                         columnar.max_batch_rows, draws)
+        plan = memory.plan(estimate)
+
+    return {'data': data, 'kind': kind, 'source': source, 'profile': profile, 'compare': compare,
+            'draws': draws, 'hints': hints, 'version': version, 'key': key, 'cached': cached, 'plan': plan,
+            'estimate': estimate, 'rows': rows}
+
+
+def upload_payload(upload, on_chunk=None, scored=None):
+    # Yanıt içeriği; 'table' çıktı sınırında to_records() ile satırlara çevrilir.
+    # scored: önceden skorlanmış sonuç (ön izleme), verilirse yeniden skorlanmaz
+    cached = upload['cached']
+    cache_info = {'hit': cached is not None}
+    if cached is None:
+        if scored is None:
+            cached, chunk_info = score_upload(upload, on_chunk)
+            cache_info.update(chunk_info)
+        else:
+            cached = scored
+        upload_cache.put(upload['key'], cached)
+    elif on_chunk is not None:
+        on_chunk(cached['table'], len(cached['table']), len(upload['data']))
+
+    table = cached['table']
+    result_id = results_cache.put(table, {'source': cached['source'], 'profile': upload['profile']})
+    return {'table': table, 'stats': summarize(table), 'result_id': result_id, 'cache': cache_info,
+            'units': cached.get('units', {})}
+
+
+def score_upload(upload, on_chunk=None):
+    # Kesin analiz: ({'table', 'source'}, parça bilgisi). on_chunk(tablo, satır, bayt)
+    # her skorlanan parçadan sonra çağrılır (SSE akışı)
+    data, source, profile = upload['data'], upload['source'], upload['profile']
+    compare, draws, hints = upload['compare'], upload['draws'], upload['hints']
+    is_csv = upload['kind'] == 'csv'
+
+    if upload['kind'] in ('parquet', 'arrow'):
+        return score_columnar(data, upload['kind'], source, profile, compare, draws, on_chunk, hints), {}
+
+    # Parça önbelleği yolu split_csv'nin satır kopyalarını da taşır ('chunked' tahmini);
+    # dosya yalnızca bu tahmin bütçeye sığıyorsa parçalanır. Plan 'chunked' ise sığar
+    split = None
+    if is_csv and memory.fits(upload['estimate']['chunked']):
+        with memory.stage('parse'):
+            split = split_csv(data)
+    if split is not None:
+        return score_csv_chunks(split, source, upload['version'], profile, compare, draws, on_chunk, hints)
+    if is_csv and upload['plan'] == 'chunked':
+        return score_csv_stream(io.BytesIO(data), source, profile, compare, draws, on_chunk, hints=hints), {}
+
+    with memory.stage('parse'):
+        if is_csv:
+            df = load_nasa_csv(io.BytesIO(data))
+        else:
+            df = pd.read_excel(io.BytesIO(data))
+    with memory.stage('score'):
+        col_mapping = find_columns(df)
+        detected = detect_source(df, source)
+        units = column_units(df, col_mapping, hints)
+        table = score_dataframe(df, col_mapping, detected, 'FILE', profile, compare, draws, units)
+    if on_chunk is not None:
+        on_chunk(table, len(df), len(data))
+    return {'table': table, 'source': detected, 'units': units}, {}
+
+
+def score_columnar(data, kind, source, profile, compare, draws, on_chunk=None, hints=None):
+    # Parquet / Arrow: yalnızca eşleşen kolonlar satır grubu başına okunup DataFrame
+    # kurulmadan doğrudan skorlanır; satır numaraları atlanan gruplarda da dosya konumunu izler
+    reader = ColumnarFile(data, kind)
+    schema = pd.DataFrame(columns=reader.columns)
+    col_mapping = find_columns(schema)
+    source = detect_source(schema, source)
+    # Periyot, süre ve derinlik olmadan skor yok (score_profiles NaN döner)
+    required = [col_mapping.get(key) for key in ('period', 'duration', 'depth')]
+    if None in required:
+        return {'table': CandidateTable.empty(), 'source': source, 'units': infer_units(col_mapping, hints=hints)}
+
+    err_map = find_error_columns(schema, col_mapping) if draws else {}
+    numeric = {col_mapping[key] for key in PARAMS if key in col_mapping}
+    numeric |= {name for pair in err_map.values() for name in pair if name}
+    columns = sorted(numeric | ({col_mapping['id']} if 'id' in col_mapping else set()))
+
+    def column(batch, name, n):
+        return batch[name] if name else np.full(n, np.nan)
+
+    parts = []
+    units = None
+    for offset, n, batch in memory.iterate('parse', reader.batches(columns, numeric, required)):
+        with memory.stage('score'):
+            arrays = {key: column(batch, col_mapping.get(key), n) for key in PARAMS}
+            if units is None:
+                units = infer_units(col_mapping, arrays, hints)
+            ids = batch[col_mapping['id']] if 'id' in col_mapping else None
+            errors = {key: (column(batch, plus, n), column(batch, minus, n))
+                      for key, (plus, minus) in err_map.items()}
+            parts.append(score_arrays(arrays, np.arange(offset, offset + n), source, ids, 'FILE', profile,
+                                      compare, draws, errors, units))
+        if on_chunk is not None:
+            on_chunk(parts[-1], n, None)
+    return {'table': merge_scored(parts), 'source': source, 'units': units or infer_units(col_mapping, hints=hints)}
+
+
+def preview_csv(data, source, profile, compare=(), draws=None, hints=None):
+    # Tek geçiş: yalnızca skorda kullanılan kolonlar C motoruyla büyük parçalar halinde okunur.
+    # Parçalar kesin analizle aynı ayarlarla skorlanır; arka plan işi onları yeniden kullanır
+    header_df = pd.read_csv(io.BytesIO(data), comment="#", nrows=0)
+    col_mapping = find_columns(header_df)
+    source = detect_source(header_df, source)
+    usecols = {col_mapping[key] for key in ('id', 'period', 'duration', 'depth', 'star_mag') if key in col_mapping}
+    if draws:
+        usecols |= {name for pair in find_error_columns(header_df, col_mapping).values() for name in pair if name}
+
+    preview = Preview()
+    units = None
+    reader = pd.read_csv(io.BytesIO(data), comment="#", skip_blank_lines=True, usecols=sorted(usecols),
+                         chunksize=PREVIEW_CHUNK_ROWS)
+    for df in memory.iterate('parse', reader):
+        with memory.stage('score'):
+            if units is None:
+                units = column_units(df, col_mapping, hints)
+            preview.add(score_dataframe(df, col_mapping, source, 'FILE', profile, compare, draws, units))
+    return preview, source, units or infer_units(col_mapping, hints=hints)
+
+
+def background_payload(upload, scored):
+    # Kesin sonuç ön izlemenin skorladığı parçalardan kurulur (dosya ikinci kez okunmaz).
+    # Birleştirme ve önbelleğe yazma ön plan istekleriyle aynı kapasite bütçesinden (heavy)
+    # pay alır; sıra dolu veya bekleme uzunsa iş 'error' durumuyla biter (yük atma).
+    # Tablo iş durumuna değil results_cache'e yazılır (iş durumu worker'lar arası paylaşılır)
+    with admission.slot('heavy', JOB_ADMISSION_TIMEOUT):
+        table = merge_scored(scored['parts'])
+        payload = upload_payload(upload, scored={'table': table, 'source': scored['source'], 'units': scored['units']})
+    payload.pop('table')
+    return payload
+
+
+def preview_upload(upload):
+    profile = upload['profile']
+    preview, detected, units = preview_csv(upload['data'], upload['source'], profile, upload['compare'],
+                                           upload['draws'], upload['hints'])
+    # Grafikler örneklem üzerinden çizilir
+    result_id = results_cache.put(preview.sample(), {'source': detected, 'profile': profile, 'preview': True})
+
+    try:
+        job_id = background_jobs.submit(background_payload, upload,
+                                        {'parts': preview.parts, 'source': detected, 'units': units})
+    except JobQueueFull:
+        job_id = None
+
+    with memory.stage('serialize'):
+        return jsonify({'preview': True, 'data': preview.top_table().to_records(), 'stats': preview.stats(),
+                        'sample': len(preview.sample()), 'result_id': result_id, 'job_id': job_id,
+                        'cache': {'hit': False}, 'units': units})
+
+
+def detect_source(df, source):
+    #Otomatik kaynak algılama sistemi (TOI / KOI)
+    if source == 'file':
+        cols = [c.lower() for c in df.columns]
+
+        if any('kepmag' in c or 'koi_' in c for c in cols):
+            source = 'koi'
+        elif any('tmag' in c or 'toi' in c for c in cols):
+            source = 'toi'
+    return source
+
+
+def scoring_version(profile, compare, draws):
+    names = [profile] + list(compare)
+    return [RESULT_FORMAT_VERSION, draws] + [(n, get_profile(n).fingerprint()) for n in names]
+
+
+def score_csv_chunks(split, source, version, profile, compare, draws, on_chunk=None, hints=None):
+    # Her satır parçası (başlık + parça içeriği) anahtarıyla ayrı önbelleklenir;
+    # yalnızca önbellekte olmayan parçalar okunup skorlanır
+    header, chunks = split
+    header_df = load_nasa_csv(io.BytesIO(header))
+    col_mapping = find_columns(header_df)
+    source = detect_source(header_df, source)
+    header_digest = hashlib.sha256(header).hexdigest()
+    # Birimler ilk parçanın başından; parça önbellek anahtarına da girer
+    with memory.stage('parse'):
+        sample = pd.read_csv(io.BytesIO(header + chunks[0]), comment="#", nrows=SAMPLE_ROWS) if chunks else header_df
+    units = column_units(sample, col_mapping, hints)
+
+    parts = []
+    offset = 0
+    scored = 0
+    nbytes = len(header)
+    for chunk in chunks:
+        key = cache_key('chunk', header_digest, hashlib.sha256(chunk).hexdigest(), source, version,
+                        units_key(units))
+        entry = upload_cache.get(key)
+        if entry is None:
+            with memory.stage('parse'):
+                df = load_nasa_csv(io.BytesIO(header + chunk))
+            with memory.stage('score'):
+                table = score_dataframe(df, col_mapping, source, 'FILE', profile, compare, draws, units)
+            entry = {'table': table, 'rows': len(df)}
+            upload_cache.put(key, entry)
+            scored += 1
+
+        # Satır numaraları (ROW-n kimlikleri) dosyadaki konuma göre kaydırılır
+        parts.append(entry['table'].shift_rows(offset))
+        offset += entry['rows']
+        nbytes += len(chunk)
+        if on_chunk is not None:
+            on_chunk(parts[-1], entry['rows'], nbytes)
+
+    return ({'table': merge_scored(parts), 'source': source, 'units': units},
+            {'chunks': len(chunks), 'rescored_chunks': scored})
+
+
+def score_csv_stream(csv, source, profile, compare, draws, on_chunk=None, chunksize=STREAM_CHUNK_ROWS,
+                     hints=None):
+    # Parçalanamayan (tırnak içinde satır sonu olan) CSV bütçeyi aşıyorsa: tüm DataFrame
+    # yerine chunksize satırlık parçalar okunup skorlanır; indeks dosya sırasını korur.
+    # csv: dosya yolu veya okunabilir nesne
+    col_mapping = None
+    units = {}
+    parts = []
+    for df in memory.iterate('parse', load_nasa_csv(csv, chunksize)):
+        with memory.stage('score'):
+            if col_mapping is None:
+                col_mapping = find_columns(df)
+                source = detect_source(df, source)
+                units = column_units(df, col_mapping, hints)
+            parts.append(score_dataframe(df, col_mapping, source, 'FILE', profile, compare, draws, units))
+        if on_chunk is not None:
+            on_chunk(parts[-1], len(df), None)
+    return {'table': merge_scored(parts), 'source': source, 'units': units}
+
+
+def score_file(path, source='file', profile=DEFAULT_PROFILE, compare=(), draws=None,
+               chunksize=PREVIEW_CHUNK_ROWS, hints=None):
+    # HTTP dışı giriş (cli.py): yüklemeyle aynı okuma ve skorlama, önbelleksiz.
+    # CSV parça parça okunur, Parquet / Arrow memory-map ile açılır; {'table', 'source'} döner
+    kind = upload_kind(path.lower())
+    if kind is None:
+        raise ValueError(f'Unsupported format: {path}')
+    if kind in ('parquet', 'arrow'):
+        return score_columnar(path, kind, source, profile, compare, draws, hints=hints)
+    if kind == 'csv':
+        return score_csv_stream(path, source, profile, compare, draws, chunksize=chunksize, hints=hints)
+
+    df = pd.read_excel(path)
+    col_mapping = find_columns(df)
+    source = detect_source(df, source)
+    units = column_units(df, col_mapping, hints)
+    return {'table': score_dataframe(df, col_mapping, source, 'FILE', profile, compare, draws, units),
+            'source': source, 'units': units}
+
+
+LIGHTCURVE_DECIMALS = {
+    'period': 5, 'period_err': 6, 'duration_err': 3, 'depth_err': 1, 'fit_rms': 1,
+    'depth_odd': 0, 'depth_even': 0, 'odd_even_sigma': 2, 'secondary_depth': 0,
+    'secondary_sigma': 2, 'vshape': 2,
+}
+
+
+def lightcurve_input(lc, period, t0, duration=None, depth=None, star_mag=None, source='file'):
+    # Kaliteli noktalar + katalog değerleri -> score_lightcurves girdisi (hata mesajı ValueError)
+    time, flux = lc.clean()
+    meta = lc.meta
+    if len(time) == 0:
+        raise ValueError('No valid cadences in light curve')
+
+    # Katalog t0 tam BJD ise ışık eğrisinin zaman sistemine (BTJD / BKJD) çevrilir
+    if t0 > 2400000:
+        t0 -= meta['time_ref']
+    if star_mag is None:
+        star_mag = safe_float(meta['star_mag'])
+    if star_mag is None:
+        raise ValueError('No star magnitude in FITS header')
+
+    return {
+        'id': meta['id'], 'time': time, 'flux': flux, 'period': period, 't0': t0,
+        'duration': duration if duration is not None else np.nan,
+        'depth': depth if depth is not None else np.nan,
+        'star_mag': star_mag, 'source': meta['source'] if source == 'file' else source,
+    }
+
+
+def score_lightcurves(curves, profile=DEFAULT_PROFILE, demote=False):
+    # Tüm ışık eğrileri tek LightCurveBatch'te: fit, skor ve vetting aday başına döngüsüz.
+    # Skoru hesaplanamayan (fit ve katalog değerleri eksik) satırlar NaN skorla kalır
+    batch = LightCurveBatch([c['time'] for c in curves], [c['flux'] for c in curves])
+    period, t0, duration, depth, star_mag = (
+        np.array([c[key] for c in curves], dtype=np.float64)
+        for key in ('period', 't0', 'duration', 'depth', 'star_mag')
+    )
+    sources = np.array([c['source'] for c in curves], dtype=object)
+
+    with memory.stage('score'):
+        refined, fit = refine_catalog(batch, period, t0, duration, depth)
+
+        # Fit değerleri zaten gün / saat / ppm cinsinden; parlaklık ölçeği kaynağa göre
+        score = np.full(len(curves), np.nan)
+        code = np.zeros(len(curves), dtype=np.uint8)
+        for source in sorted(set(sources)):
+            rows = sources == source
+            scored = score_profiles([profile], refined['period'][rows], refined['duration'][rows],
+                                    refined['depth'][rows], star_mag[rows], source)
+            score[rows], code[rows] = scored[profile]
+
+        # Örten çift yıldız taraması; demote ise bayraklı aday bir seviye düşer
+        fit_t0 = np.where(fit['ok'], fit['t0'], t0)
+        vet = vet_candidates(batch, refined['period'], fit_t0, refined['duration'])
+    if demote:
+        code = demote_labels(code, vet['flags'])
+
+    columns = {
+        'period': refined['period'],
+        'duration': refined['duration'],
+        'depth': refined['depth'],
+        'star_mag': star_mag,
+        'score': score,
+        'label': code,
+        'period_err': fit['period_err'],
+        'duration_err': fit['duration_err'],
+        'depth_err': fit['depth_err'],
+        'fit_ok': fit['ok'],
+        'fit_rms': fit['rms'],
+        'depth_odd': vet['depth_odd'],
+        'depth_even': vet['depth_even'],
+        'odd_even_sigma': vet['odd_even_sigma'],
+        'secondary_depth': vet['secondary_depth'],
+        'secondary_sigma': vet['secondary_sigma'],
+        'vshape': vet['vshape'],
+        'vetting_flags': np.array([','.join(flag_names(f)) for f in vet['flags']], dtype=object),
+    }
+    # Fit değerleri float64 ve daha fazla basamakla tutulur
+    return CandidateTable(columns, [c['id'] for c in curves], decimals=LIGHTCURVE_DECIMALS).round(np.float64)
+
+
+def analyze_lightcurve(file, form, source='file'):
+    period = safe_float(form.get('period'))
+    t0 = safe_float(form.get('t0'))
+    if period is None or t0 is None or period <= 0:
+        return jsonify({'error': 'FITS analysis needs period and t0'}), 400
 
-@app.route('/api/export', methods=['POST'])
-def export_results():
     try:
-        data = request.json.get('data', [])
+        profile, _ = get_profile_args(form)
+        rows = rows_format(form)
+    except (KeyError, ValueError) as e:
+        return jsonify({'error': e.args[0]}), 400
+
+    # Bozuk / kesik dosya, eksik kolon (PDCSAP_FLUX) veya HDU: istemci hatası (400)
+    with memory.stage('parse'):
+        try:
+            with read_lightcurve(file) as lc:
+                curve = lightcurve_input(lc, period, t0, safe_float(form.get('duration')),
+                                         safe_float(form.get('depth')), safe_float(form.get('star_mag')), source)
+        except (KeyError, ValueError) as e:
+            return jsonify({'error': e.args[0]}), 400
 
-        if not data:
-            return jsonify({'error': 'No data'}), 400
+    table = score_lightcurves([curve], profile, form.get('demote', '').lower() in ('1', 'true', 'yes'))
+    if not np.isfinite(table.columns['score'][0]):
+        return jsonify({'error': 'Transit fit failed'}), 400
+    result_id = results_cache.put(table, {'source': curve['source'], 'profile': profile})
 
-        df = pd.DataFrame(data)
+    with memory.stage('serialize'):
+        return jsonify(add_rows({'stats': summarize(table), 'result_id': result_id}, table, rows))
+
+
+@app.route('/api/export', methods=['POST'])
+@admission.limit('medium')
+@memory.track
+def export_results():
+    try:
+        body = request.json or {}
+        export_format = body.get('format', 'xlsx')
+        if export_format not in ('xlsx', 'csv'):
+            return jsonify({'error': 'Unsupported export format'}), 400
+
+        # Önbellekteki tablo doğrudan yazılır; yoksa istemcinin gönderdiği satırlar
+        if body.get('result_id'):
+            entry = results_cache.get(body['result_id'])
+            if entry is None:
+                return jsonify({'error': 'Unknown or expired result_id'}), 404
+            with memory.stage('serialize'):
+                df = entry['table'].to_frame()
+        else:
+            data = body.get('data', [])
+            if not data:
+                return jsonify({'error': 'No data'}), 400
+            df = pd.DataFrame(data)
 
         output = io.BytesIO()
-        with pd.ExcelWriter(output, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, sheet_name='Results')
+        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        with memory.stage('export'):
+            if export_format == 'csv':
+                df.to_csv(output, index=False)
+                mimetype = 'text/csv'
+            else:
+                with pd.ExcelWriter(output, engine='openpyxl') as writer:
+                    df.to_excel(writer, index=False, sheet_name='Results')
+                mimetype = 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'
         output.seek(0)
 
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"exoplanet_results_{timestamp}.xlsx"
+        filename = f"exoplanet_results_{timestamp}.{export_format}"
 
         return send_file(
             output,
-            mimetype='application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+            mimetype=mimetype,
             as_attachment=True,
             download_name=filename
         )
@@ -1154,14 +2378,27 @@ def calculate():
         depth = data.get('depth')
         star_mag = data.get('star_mag')
         source = data.get('source', 'toi')
+        profile = data.get('profile') or DEFAULT_PROFILE
+
+        if profile == DEFAULT_PROFILE:
+            score = calculate_score(period, duration, depth, star_mag, source)
+            label = get_label(score) if score is not None else None
+        else:
+            try:
+                scored = score_profiles([profile], [safe_float(period)], [safe_float(duration)],
+                                        [safe_float(depth)], [safe_float(star_mag)], source)
+            except KeyError as e:
+                return jsonify({'error': e.args[0]}), 400
+            score = float(scored[profile][0][0])
+            label = LABELS[scored[profile][1][0]]
+            score = score if np.isfinite(score) else None
 
-        score = calculate_score(period, duration, depth, star_mag, source)
         if score is None:
             return jsonify({'error': 'Invalid input'}), 400
 
         return jsonify({
             'score': round(score, 1),
-            'label': get_label(score),
+            'label': label,
             'period': round(float(period), 2),
             'duration': round(float(duration), 2),
             'depth': round(float(depth), 1),
@@ -1171,91 +2408,285 @@ def calculate():
         return jsonify({'error': str(e)}), 500
 
 
-@app.route('/api/nasa_auto', methods=['GET'])
-def nasa_auto():
+@app.route('/api/profiles', methods=['GET'])
+def list_profiles():
+    return jsonify({
+        'default': DEFAULT_PROFILE,
+        'profiles': [p.describe() for p in get_profiles().values()]
+    })
+
+
+@app.route('/api/aggregate', methods=['GET'])
+@admission.limit('medium')
+def aggregate_results():
     try:
-        source = request.args.get('source', 'toi')
+        result_id = request.args.get('result_id', '')
+        entry = results_cache.get(result_id)
+        if entry is None:
+            return jsonify({'error': 'Unknown or expired result_id'}), 404
+
+        try:
+            bins = int(request.args.get('bins', DEFAULT_BINS))
+            grid = int(request.args.get('grid', DEFAULT_GRID))
+            score_range = (float(request.args.get('score_min', 0)), float(request.args.get('score_max', 100)))
+        except ValueError:
+            return jsonify({'error': 'bins, grid, score_min and score_max must be numbers'}), 400
+        if score_range[1] <= score_range[0]:
+            return jsonify({'error': 'score_max must be greater than score_min'}), 400
+
+        payload = aggregate(entry['table'].aggregate_columns(), bins, grid, score_range)
+        payload.update(entry['meta'])
+        payload['result_id'] = result_id
+        return jsonify(payload)
 
-        if source == 'toi':
-            query = "select * from toi"
-        elif source == 'koi':
-            query = """SELECT kepid, koi_period, koi_duration, koi_depth, koi_kepmag FROM cumulative WHERE koi_disposition IN ('CANDIDATE','CONFIRMED') AND koi_period IS NOT NULL AND koi_duration IS NOT NULL AND koi_depth IS NOT NULL AND koi_kepmag IS NOT NULL """
-        else:
-            return jsonify({'error': 'Invalid data source'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        params = {
-            'query': query,
-            'format': 'csv'
-        }
 
-        r = requests.get(NASA_API_URL, params=params, timeout=60)
-        r.raise_for_status()
+@app.route('/api/snapshots', methods=['GET'])
+def snapshot_versions():
+    # nasa_auto ile aynı parametreler (source, profile, profiles, uncertainty); saklanan sürümler
+    try:
+        params = nasa_params(request.args)
+    except (KeyError, ValueError) as e:
+        return jsonify({'error': e.args[0]}), 400
+
+    name = nasa_snapshot_name(params)
+    versions = []
+    for version in snapshots.versions(name):
+        snap = snapshots.open_version(name, version)
+        if snap is not None:
+            versions.append({'version': version, 'created': snap.created,
+                             'total': len(snap.column('rows', '__rows'))})
+    return jsonify({'source': params['source'], 'versions': versions})
+
+
+@app.route('/api/diff', methods=['GET'])
+@admission.limit('medium')
+def snapshot_diff():
+    # from / to: /api/snapshots sürümleri (varsayılan: son iki sürüm). Yalnızca yeni, kaldırılan
+    # ve etiketi değişen veya skoru threshold'dan fazla değişen adaylar döner
+    try:
+        try:
+            params = nasa_params(request.args)
+        except (KeyError, ValueError) as e:
+            return jsonify({'error': e.args[0]}), 400
+        try:
+            threshold = float(request.args.get('threshold', DEFAULT_THRESHOLD))
+            limit = int(request.args.get('limit', DEFAULT_LIMIT))
+            requested = [int(request.args[k]) if request.args.get(k) else None for k in ('from', 'to')]
+        except ValueError:
+            return jsonify({'error': 'threshold, limit, from and to must be numbers'}), 400
+
+        name = nasa_snapshot_name(params)
+        versions = snapshots.versions(name)
+        if requested[1] is None:
+            requested[1] = versions[-1] if versions else None
+        if requested[0] is None:
+            earlier = [v for v in versions if requested[1] is not None and v < requested[1]]
+            requested[0] = earlier[-1] if earlier else None
+        if None in requested:
+            return jsonify({'error': 'Need at least two snapshot versions to diff'}), 404
+
+        old, new = (snapshots.open_version(name, v) for v in requested)
+        if old is None or new is None:
+            return jsonify({'error': 'Unknown or expired snapshot version'}), 404
+
+        try:
+            with memory.stage('score'):
+                payload = diff_tables(old, new, table_from_snapshot(old), table_from_snapshot(new),
+                                      threshold, limit)
+        except UnkeyedSnapshot as e:
+            return jsonify({'error': str(e)}), 409
+        payload['source'] = params['source']
+        with memory.stage('serialize'):
+            return jsonify(payload)
 
-        df = load_nasa_csv(io.StringIO(r.text))
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
 
-        col_mapping = find_columns(df)
-        results = []
 
-        for _, row in df.iterrows():
-            try:
-                period = safe_float(row[col_mapping.get('period')])
-                duration = safe_float(row[col_mapping.get('duration')])
-                depth = safe_float(row[col_mapping.get('depth')])
-                star_mag = safe_float(row[col_mapping.get('star_mag')])
-
-
-                if None in [period, duration, depth, star_mag]:
-                    continue
-
-                score = calculate_score(period, duration, depth, star_mag, source)
-                if score is None:
-                    continue
-
-                raw_id = row[col_mapping['id']]
-
-                if source == 'toi':
-                    obj_id = f"TOI-{raw_id}"
-                elif source == 'koi':
-                    obj_id = f"KOI-{raw_id}"
-                else:
-                    obj_id = str(raw_id)
-
-                results.append({
-                    'id': str(obj_id),
-                    'period': round(period, 2),
-                    'duration': round(duration, 2),
-                    'depth': round(depth, 0),
-                    'star_mag': round(star_mag, 2),
-                    'score': round(score, 1),
-                    'label': get_label(score)
-                })
-            except:
-                continue
-
-        results.sort(key=lambda x: x['score'], reverse=True)
-
-        scores = [r['score'] for r in results]
-        stats = {
-            'total': len(results),
-            'mean': round(np.mean(scores), 2) if scores else 0,
-            'median': round(np.median(scores), 2) if scores else 0,
-            'pass_rate': round(
-                sum(1 for s in scores if s >= 80) / len(scores) * 100, 2
-            ) if scores else 0
-        }
-
-        return jsonify({'data': results, 'stats': stats})
+@app.route('/api/admission', methods=['GET'])
+def admission_stats():
+    # İzleme: kuyruk derinliği, çalışan istekler ve red sayıları
+    return jsonify(admission.stats())
+
+
+@app.route('/api/jobs/<job_id>', methods=['GET'])
+@admission.limit('medium')
+def job_status(job_id):
+    # Ön izlemeden sonra arka planda süren kesin analiz; bitince tüm sonuç döner
+    job = background_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Unknown or expired job_id'}), 404
+
+    try:
+        rows = rows_format(request.args)
+    except ValueError as e:
+        return jsonify({'error': e.args[0]}), 400
+
+    payload = {'job_id': job_id, 'status': job['status']}
+    if job['status'] == 'error':
+        payload['error'] = job['error']
+    elif job['status'] == 'done':
+        # İş durumu küçük tutulur; tablo paylaşılan sonuç önbelleğinden (başka worker'da üretilmiş olabilir)
+        result = job['result']
+        entry = results_cache.get(result['result_id'])
+        if entry is None:
+            return jsonify({'error': 'Job result has expired'}), 404
+        payload.update(stats=result['stats'], result_id=result['result_id'], cache=result['cache'],
+                       units=result['units'])
+        add_rows(payload, entry['table'], rows)
+    return jsonify(payload)
+
+
+@app.route('/api/memory', methods=['GET'])
+def memory_stats():
+    # İzleme: MEMTRACK=1 iken son isteklerin aşama bazında bellek kullanımı
+    return jsonify(memory.stats())
+
+
+@app.route('/api/nasa_auto', methods=['GET'])
+@admission.limit('heavy')
+@memory.track
+def nasa_auto():
+    try:
+        try:
+            params = nasa_params(request.args)
+        except (KeyError, ValueError) as e:
+            return jsonify({'error': e.args[0]}), 400
+
+        try:
+            snap, shared = nasa_snapshot(params)
+        except TimeoutError as e:
+            return jsonify({'error': str(e)}), 504
+        except TapError as e:
+            # partitioned modda tamamlanan parçalar saklanır, aynı istek kaldığı yerden devam eder
+            return jsonify({'error': str(e)}), 502
+
+        with memory.stage('serialize'):
+            return jsonify(nasa_payload(params, snap, shared))
 
     except Exception as e:
         return jsonify({'error': str(e)}), 500
----
 
-## 👥 Proje Ekibi
 
-- **Hızır Kaan Erkan** – Havacılık ve Uzay Mühendisliği  
-- **Fatma Yalçın**  
-- **Sefa Gakçı**
-- **İrem Arıoğlu**
+@app.route('/api/nasa_auto/stream', methods=['GET'])
+@admission.limit('heavy')
+def nasa_auto_stream():
+    # nasa_auto'nun SSE sürümü: indirme sürerken her parçadan sonra ilerleme ve ara sonuç
+    try:
+        params = nasa_params(request.args)
+    except (KeyError, ValueError) as e:
+        return jsonify({'error': e.args[0]}), 400
+
+    def work(stream):
+        with memory.background('nasa_auto_stream'):
+            try:
+                snap, shared = nasa_snapshot(params, stream.chunk)
+            except TimeoutError as e:
+                raise StreamError(str(e), 504)
+            except TapError as e:
+                raise StreamError(str(e), 502)
+            with memory.stage('serialize'):
+                return nasa_payload(params, snap, shared)
+
+    return sse_response(ProgressStream().run(work))
+
+
+def nasa_params(args):
+    # nasa_auto parametreleri; hatalı parametrede KeyError / ValueError
+    source = args.get('source', 'toi')
+    if source not in NASA_TABLES:
+        raise ValueError('Invalid data source')
+    spec = NASA_TABLES[source]
+
+    mode = args.get('tap', TAP_MODE)
+    if mode not in TAP_MODES:
+        raise ValueError(f'Invalid TAP mode, expected one of {list(TAP_MODES)}')
+
+    profile, compare = get_profile_args(args)
+    return {
+        'source': source,
+        'spec': spec,
+        'query': build_query(spec['columns'], spec['table'], spec['where']),
+        'mode': mode,
+        'profile': profile,
+        'compare': compare,
+        'draws': get_draws(args),
+        'refresh': args.get('refresh', '').lower() in ('1', 'true', 'yes'),
+        'rows': rows_format(args),
+    }
+
+
+def nasa_snapshot(params, on_chunk=None):
+    # (snapshot, paylaşıldı mı). Skorlanmış katalog tüm worker'ların mmap ile paylaştığı
+    # snapshot dosyasından okunur; yoksa veya eskidiyse (SNAPSHOT_TTL, refresh=1) yeniden
+    # indirilip yayınlanır. on_chunk(tablo, satır, bayt) her skorlanan parçadan sonra çağrılır
+    snapshot_name = nasa_snapshot_name(params)
+
+    def fetch_and_score(on_chunk=None):
+        # İndirme sürerken gelen her parça skorlanır
+        progress = {}
+        frames = stream_nasa_csv(params['spec'], params['mode'], progress=progress, refresh=params['refresh'])
+        return publish_catalog(params, frames, on_chunk, progress)
+
+    # Aynı anda gelen aynı istekler tek bir indirme + skorlama sonucunu paylaşır
+    key = nasa_flight_key(params)
+    snap = None if params['refresh'] else snapshots.open(snapshot_name)
+    if snap is not None and snap.age <= SNAPSHOT_TTL:
+        return snap, True
+    if snap is not None and snap.age <= SNAPSHOT_TTL + SNAPSHOT_MAX_STALE:
+        nasa_flights.do_background(key, fetch_and_score)
+        return snap, True
+
+    _, shared = nasa_flights.do(key, lambda: fetch_and_score(on_chunk))
+    return snapshots.open(snapshot_name), shared
+
+
+def nasa_snapshot_name(params):
+    version = scoring_version(params['profile'], params['compare'], params['draws'])
+    return cache_key('nasa_auto', params['source'], params['query'], version)[:32]
+
+
+def nasa_flight_key(params):
+    return ('nasa_auto', params['source'], params['query'], params['profile'], tuple(params['compare']),
+            params['draws'])
+
+
+def publish_catalog(params, frames, on_chunk=None, progress=None):
+    # DataFrame parçalarını skorlayıp snapshot olarak yayınlar (sürüm döner); asgi.py de
+    # indirdiği yanıtı bununla skorlar
+    source, profile = params['source'], params['profile']
+    col_mapping = None
+    units = {}
+    parts = []
+    for df in memory.iterate('parse', frames):
+        with memory.stage('score'):
+            if col_mapping is None:
+                col_mapping = find_columns(df)
+                units = column_units(df, col_mapping)
+            parts.append(score_dataframe(df, col_mapping, source, source.upper(), profile,
+                                         params['compare'], params['draws'], units))
+        if on_chunk is not None:
+            on_chunk(parts[-1], len(df), (progress or {}).get('bytes'))
+    return snapshots.publish(nasa_snapshot_name(params), snapshot_tables(merge_scored(parts)),
+                             {'source': source, 'profile': profile, 'id_prefix': source.upper(), 'units': units})
+
+
+def nasa_payload(params, snap, shared, data=None):
+    # data: önceden üretilmiş satırlar (asgi.py satırların JSON'unu snapshot sürümü başına önbellekler)
+    table = table_from_snapshot(snap)
+    # Aynı snapshot sürümü aynı result_id: paylaşılan önbelleğe istek başına yeniden yazılmaz
+    result_id = results_cache.put(table, {'source': params['source'], 'profile': params['profile']},
+                                  cache_key(nasa_snapshot_name(params), snap.version)[:32])
+    payload = {'stats': summarize(table), 'result_id': result_id, 'shared': shared, 'snapshot': snap.version,
+               'stale': snap.age > SNAPSHOT_TTL, 'units': snap.meta.get('units', {})}
+    if data is not None:
+        payload['data'] = data
+        return payload
+    return add_rows(payload, table, params['rows'])
+
 
 if __name__ == '__main__':
     print("\n" + "=" * 60)
@@ -1270,4 +2701,7 @@ if __name__ == '__main__':
     print("   ✓ CSV/Excel dosya analizi")
     print("   ✓ Excel çıktısı")
     print("\n⏹️  Durdurmak için: Ctrl+C")
+    print("   (Toplu skorlama için: python cli.py --help)")
     print("=" * 60 + "\n")
+
+    app.run(host='0.0.0.0', port=int(os.environ.get('PORT', 5000)))
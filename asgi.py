@@ -0,0 +1,249 @@
+# ASGI giriş noktası: NASA uç noktası için async I/O
+#   uvicorn asgi:app --workers 1
+# /api/nasa_auto olay döngüsünde çalışır; bekleyen istemci worker ya da iş parçacığı tutmaz:
+#   - TAP sync sorgusu havuzlu, zaman aşımlı httpx.AsyncClient ile akış halinde (gzip açılarak)
+#     geçici dosyaya indirilir
+#   - CSV ayrıştırma, skorlama, snapshot yayınlama ve JSON üretimi sınırlı bir iş parçacığı
+#     havuzunda (ASGI_CPU_WORKERS); satırların JSON'u snapshot sürümü başına bir kez üretilir,
+#     istek başına yalnızca result_id / shared / stale alanları eklenir
+#   - aynı anahtar için eşzamanlı istekler tek bir görevi bekler; son bekleyen istemci de
+#     bağlantıyı keserse indirme iptal edilir
+# Snapshot, SNAPSHOT_TTL / SNAPSHOT_MAX_STALE ve yanıt biçimi app.nasa_auto ile aynıdır.
+# Diğer yollar ve async / partitioned TAP modları a2wsgi ile Flask uygulamasına gider
+# (ASGI_WSGI_WORKERS iş parçacığında, admission / bellek kontrolleriyle).
+# Gereken paketler: httpx, a2wsgi ve bir ASGI sunucusu (uvicorn).
+
+import asyncio
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import parse_qsl
+
+import httpx
+from a2wsgi import WSGIMiddleware
+
+from app import (NASA_TAP_URL, SNAPSHOT_MAX_STALE, SNAPSHOT_TTL, TAP_MODE, app as flask_app, nasa_flight_key,
+                 nasa_params, nasa_payload, nasa_snapshot_name, publish_catalog, table_from_snapshot)
+from snapshot import snapshots
+from tap_client import DEFAULT_TIMEOUT, TapError, read_csv_chunks
+
+CPU_WORKERS = int(os.environ.get('ASGI_CPU_WORKERS', min(4, os.cpu_count() or 1)))
+TAP_CONNECTIONS = int(os.environ.get('ASGI_TAP_CONNECTIONS', 20))
+# Flask'a giden istekler için iş parçacığı (gunicorn --threads karşılığı)
+WSGI_WORKERS = int(os.environ.get('ASGI_WSGI_WORKERS', 16))
+# İndirme + skorlama için toplam süre (SINGLEFLIGHT_TIMEOUT ile aynı)
+FETCH_TIMEOUT = float(os.environ.get('SINGLEFLIGHT_TIMEOUT', 120))
+DOWNLOAD_CHUNK = 2 ** 16
+ROWS_PLACEHOLDER = '__rows__'
+
+
+class _Flight:
+    def __init__(self, task, detached):
+        self.task = task
+        self.waiters = 0
+        self.detached = detached
+
+
+class AsyncFlights:
+    # singleflight.SingleFlight'ın olay döngüsü karşılığı (süreç içi). Bekleyen kalmazsa
+    # görev iptal edilir; arka plan yenilemesi (detached) iptal edilmez
+    def __init__(self):
+        self._flights = {}
+
+    def _start(self, key, factory, detached):
+        flight = self._flights.get(key)
+        if flight is not None:
+            return flight, True
+        flight = _Flight(asyncio.ensure_future(factory()), detached)
+        self._flights[key] = flight
+
+        def done(task):
+            if self._flights.get(key) is flight:
+                del self._flights[key]
+            if not task.cancelled() and task.exception() is not None and detached:
+                print(f"⚠️ Arka plan yenilemesi başarısız: {task.exception()}")
+
+        flight.task.add_done_callback(done)
+        return flight, False
+
+    async def do(self, key, factory):
+        # (sonuç, paylaşıldı mı)
+        flight, shared = self._start(key, factory, False)
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task), shared
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.detached and not flight.task.done():
+                flight.task.cancel()
+
+    def do_background(self, key, factory):
+        self._start(key, factory, True)
+
+
+class AsyncNasaService:
+    def __init__(self, base_url=NASA_TAP_URL, cpu_workers=CPU_WORKERS, connections=TAP_CONNECTIONS):
+        self.base_url = base_url.rstrip('/')
+        self.connections = connections
+        self.flights = AsyncFlights()
+        self.executor = ThreadPoolExecutor(max_workers=cpu_workers, thread_name_prefix='cpu')
+        self._client = None
+        # snapshot adı -> (sürüm, satırların JSON'u)
+        self._rows = {}
+
+    @property
+    def client(self):
+        # Olay döngüsü içinde ilk kullanımda oluşturulur; bağlantılar istekler arasında paylaşılır
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=httpx.Timeout(DEFAULT_TIMEOUT, connect=10.0),
+                limits=httpx.Limits(max_connections=self.connections),
+            )
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.aclose()
+        self.executor.shutdown(wait=False)
+
+    def run_cpu(self, fn, *args):
+        return asyncio.get_running_loop().run_in_executor(self.executor, fn, *args)
+
+    async def download(self, query, fh):
+        # Yanıt parça parça dosyaya yazılır; TapClient.sync ile aynı istek
+        params = {'query': query, 'format': 'csv'}
+        try:
+            async with self.client.stream('GET', f'{self.base_url}/sync', params=params) as r:
+                r.raise_for_status()
+                async for chunk in r.aiter_bytes(DOWNLOAD_CHUNK):
+                    fh.write(chunk)
+        except httpx.TimeoutException as e:
+            raise TimeoutError(f'TAP request timed out: {e}')
+        except httpx.HTTPError as e:
+            raise TapError(f'TAP request failed: {e}')
+        fh.seek(0)
+
+    async def fetch_and_score(self, params):
+        with tempfile.TemporaryFile() as fh:
+            await self.download(params['query'], fh)
+            return await self.run_cpu(lambda: publish_catalog(params, read_csv_chunks(fh)))
+
+    async def snapshot(self, params):
+        # app.nasa_snapshot ile aynı akış; süre aşımında TimeoutError
+        name = nasa_snapshot_name(params)
+        key = nasa_flight_key(params)
+        snap = None if params['refresh'] else snapshots.open(name)
+        if snap is not None and snap.age <= SNAPSHOT_TTL:
+            return snap, True
+        if snap is not None and snap.age <= SNAPSHOT_TTL + SNAPSHOT_MAX_STALE:
+            self.flights.do_background(key, lambda: self.fetch_and_score(params))
+            return snap, True
+
+        try:
+            _, shared = await asyncio.wait_for(self.flights.do(key, lambda: self.fetch_and_score(params)),
+                                               FETCH_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise TimeoutError(f'Timed out after {FETCH_TIMEOUT:.0f}s waiting for in-flight request')
+        return snapshots.open(name), shared
+
+    async def handle(self, scope, receive, send):
+        try:
+            params = nasa_params(query_args(scope))
+        except (KeyError, ValueError) as e:
+            return await self.send_json(send, 400, {'error': e.args[0]})
+
+        work = asyncio.ensure_future(self.respond(params))
+        disconnect = asyncio.ensure_future(wait_disconnect(receive))
+        try:
+            await asyncio.wait({work, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+        finally:
+            disconnect.cancel()
+        if not work.done():
+            # İstemci gitti: bekleme iptal edilir (başka bekleyen yoksa indirme de)
+            work.cancel()
+            return
+        status, body = work.result()
+        await self.send_json(send, status, body)
+
+    async def respond(self, params):
+        try:
+            snap, shared = await self.snapshot(params)
+            return 200, await self.run_cpu(self.render, params, snap, shared)
+        except TimeoutError as e:
+            return 504, {'error': str(e)}
+        except TapError as e:
+            return 502, {'error': str(e)}
+        except Exception as e:
+            return 500, {'error': str(e)}
+
+    def render(self, params, snap, shared):
+        if params['rows'] != 'json':
+            return dumps(nasa_payload(params, snap, shared))
+        # Yer tutucu "data" anahtarında (sıralı anahtarlarda ilk) tek kez geçer
+        name = os.path.basename(snap.path)
+        cached = self._rows.get(name)
+        if cached is None or cached[0] != snap.version:
+            cached = self._rows[name] = (snap.version, dumps(table_from_snapshot(snap).to_records()).rstrip('\n'))
+        body = dumps(nasa_payload(params, snap, shared, ROWS_PLACEHOLDER))
+        return body.replace(f'"{ROWS_PLACEHOLDER}"', cached[1], 1)
+
+    async def send_json(self, send, status, body):
+        if not isinstance(body, str):
+            body = dumps(body)
+        data = body.encode('utf-8')
+        await send({'type': 'http.response.start', 'status': status,
+                    'headers': [(b'content-type', b'application/json'),
+                                (b'content-length', str(len(data)).encode())]})
+        await send({'type': 'http.response.body', 'body': data})
+
+
+def query_args(scope):
+    # request.args gibi: aynı parametre birden çok kez verilirse ilki
+    args = {}
+    for name, value in parse_qsl(scope['query_string'].decode('latin-1'), keep_blank_values=True):
+        args.setdefault(name, value)
+    return args
+
+
+def dumps(payload):
+    # jsonify ile aynı çıktı (sıralı anahtarlar, boşluksuz)
+    return flask_app.json.dumps(payload, separators=(',', ':')) + '\n'
+
+
+async def wait_disconnect(receive):
+    while True:
+        message = await receive()
+        if message['type'] == 'http.disconnect':
+            return
+
+
+class AsgiApp:
+    # /api/nasa_auto (GET, sync TAP modu) -> AsyncNasaService, diğer her şey -> Flask
+    def __init__(self, wsgi_app, nasa, wsgi_workers=WSGI_WORKERS):
+        self.wsgi = WSGIMiddleware(wsgi_app, workers=wsgi_workers)
+        self.nasa = nasa
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+        if (scope['type'] == 'http' and scope['method'] == 'GET' and scope['path'] == '/api/nasa_auto'
+                and self.is_sync_mode(scope)):
+            return await self.nasa.handle(scope, receive, send)
+        return await self.wsgi(scope, receive, send)
+
+    @staticmethod
+    def is_sync_mode(scope):
+        return query_args(scope).get('tap', TAP_MODE) == 'sync'
+
+    async def lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await self.nasa.close()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+app = AsgiApp(flask_app, AsyncNasaService())
@@ -0,0 +1,264 @@
+# Aday tablosu (struct-of-arrays)
+# Satır başına sözlük yerine tipli NumPy kolonları: float32 parametreler ve skorlar,
+# uint8 etiket kodları, ortak önek + sabit genişlikli bayt dizisi olarak kimlikler.
+# Sıralama, süzme, dilimleme ve yuvarlama vektörel; JSON / Excel / CSV'ye yalnızca
+# çıktı sınırında çevrilir.
+
+import json
+
+import numpy as np
+
+from lazy_imports import lazy_import
+from scoring import LABELS
+
+pd = lazy_import('pandas')
+
+# Çıktıdaki ondalık basamaklar (eski round(float(x), n) çağrılarıyla aynı)
+DECIMALS = {
+    'period': 2,
+    'duration': 2,
+    'depth': 0,
+    'star_mag': 2,
+    'score': 1,
+    'p_cp': 3,
+    'p_pc': 3,
+    'p_apc': 3,
+    'score_lo': 1,
+    'score_hi': 1,
+}
+SCORE_PREFIX = 'score_'
+LABEL_PREFIX = 'label_'
+
+# İkili kolon biçimi (to_binary; arayüzdeki sanal tablo bunu okur):
+#   'EXOT' | uint32 başlık uzunluğu | başlık JSON'u | 8 bayta hizalı kolon tamponları (little-endian)
+#   başlık: {'rows': n, 'columns': [{'name', 'type', 'offset', ...}]}, offset'ler tampon başından
+#   f32 / f64 ('decimals': gösterimde yuvarlama), u8 ('labels' varsa etiket kodu), i32,
+#   str ('offset': uint32 n + 1 konum, 'data' / 'length': UTF-8 baytları, 'prefix': ortak önek)
+BINARY_MAGIC = b'EXOT'
+
+
+def is_label(name):
+    return name == 'label' or name.startswith(LABEL_PREFIX)
+
+
+def decimals_for(name, decimals):
+    if name in decimals:
+        return decimals[name]
+    if name.startswith(SCORE_PREFIX):
+        return decimals['score']
+    return None
+
+
+def string_buffers(values):
+    # (uint32 konumlar, birleştirilmiş UTF-8 baytları)
+    if values.dtype.kind == 'S':
+        lengths = np.char.str_len(values)
+        data = b''.join(values.tolist())
+    else:
+        encoded = [str(v).encode('utf-8') for v in values]
+        lengths = np.fromiter((len(b) for b in encoded), dtype=np.int64, count=len(encoded))
+        data = b''.join(encoded)
+    offsets = np.zeros(len(values) + 1, dtype='<u4')
+    np.cumsum(lengths, out=offsets[1:])
+    return offsets, data
+
+
+def encode_ids(values):
+    # Kimlikler UTF-8 baytları olarak sabit genişlikli 'S' dizisinde tutulur
+    values = np.asarray(values)
+    if values.dtype.kind == 'S':
+        return values
+    return np.char.encode(values.astype(str), 'utf-8')
+
+
+class CandidateTable:
+    def __init__(self, columns, ids=None, id_prefix=None, rows=None, decimals=None):
+        # columns: {ad: dizi}; 'label' ve 'label_*' kolonları scoring.LABELS kodlarıdır (uint8).
+        # ids yoksa kimlik ROW-<rows + 1> olur
+        self.columns = dict(columns)
+        n = len(next(iter(self.columns.values()))) if self.columns else 0
+        self.ids = encode_ids(ids) if ids is not None else None
+        self.id_prefix = id_prefix
+        self.rows = np.arange(n, dtype=np.int64) if rows is None else np.asarray(rows, dtype=np.int64)
+        self.decimals = dict(DECIMALS, **(decimals or {}))
+
+    @classmethod
+    def empty(cls):
+        return cls({'period': np.empty(0, np.float32), 'duration': np.empty(0, np.float32),
+                    'depth': np.empty(0, np.float32), 'star_mag': np.empty(0, np.float32),
+                    'score': np.empty(0, np.float32), 'label': np.empty(0, np.uint8)})
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.columns[key]
+        if isinstance(key, slice):
+            return self.take(np.arange(len(self))[key])
+        return self.take(key)
+
+    def _replace(self, columns=None, ids=None, rows=None):
+        table = CandidateTable.__new__(CandidateTable)
+        table.columns = self.columns if columns is None else columns
+        table.ids = self.ids if ids is None else ids
+        table.id_prefix = self.id_prefix
+        table.rows = self.rows if rows is None else rows
+        table.decimals = self.decimals
+        return table
+
+    # --- vektörel işlemler ---
+
+    def take(self, index):
+        index = np.asarray(index)
+        return self._replace(
+            {name: col[index] for name, col in self.columns.items()},
+            self.ids[index] if self.ids is not None else None,
+            self.rows[index],
+        )
+
+    def filter(self, mask):
+        return self.take(np.flatnonzero(mask))
+
+    def sort(self, by='score', descending=True):
+        # Kararlı: eşit skorlarda dosya sırası korunur (eski list.sort(reverse=True) ile aynı)
+        values = self.values(by)
+        order = np.argsort(-values if descending else values, kind='stable')
+        return self.take(order)
+
+    def round(self, dtype=np.float32):
+        # Ondalık basamağı tanımlı kolonlar yuvarlanıp dtype'a (varsayılan float32) çevrilir
+        columns = {}
+        for name, col in self.columns.items():
+            digits = decimals_for(name, self.decimals)
+            if digits is not None and col.dtype.kind == 'f':
+                col = np.round(col.astype(np.float64), digits).astype(dtype)
+            columns[name] = col
+        return self._replace(columns)
+
+    def shift_rows(self, offset):
+        return self._replace(rows=self.rows + offset)
+
+    @classmethod
+    def concat(cls, tables):
+        tables = [t for t in tables if t is not None]
+        if not tables:
+            return cls.empty()
+        first = tables[0]
+        columns = {name: np.concatenate([t.columns[name] for t in tables]) for name in first.columns}
+        ids = None if first.ids is None else np.concatenate([t.ids for t in tables])
+        return first._replace(columns, ids, np.concatenate([t.rows for t in tables]))
+
+    # --- okuma ---
+
+    def values(self, name):
+        # float32 değerden yuvarlanmış ondalık sayının float64 karşılığı geri elde edilir
+        col = self.columns[name]
+        digits = decimals_for(name, self.decimals)
+        if col.dtype.kind == 'f':
+            col = col.astype(np.float64)
+            if digits is not None:
+                col = np.round(col, digits)
+        return col
+
+    def id_strings(self):
+        if self.ids is None:
+            return [f"ROW-{i + 1}" for i in self.rows.tolist()]
+        ids = np.char.decode(self.ids, 'utf-8').tolist()
+        if self.id_prefix:
+            return [f"{self.id_prefix}-{x}" for x in ids]
+        return ids
+
+    def aggregate_columns(self):
+        # aggregate.aggregate() girdisi
+        columns = {key: self.columns[key] for key in ('period', 'duration', 'depth', 'star_mag', 'score')}
+        columns['codes'] = self.columns['label']
+        return columns
+
+    # --- çıktı sınırı ---
+
+    def _output_columns(self):
+        labels = np.asarray(LABELS, dtype=object)
+        out = {'id': self.id_strings()}
+        for name, col in self.columns.items():
+            if is_label(name):
+                out[name] = labels[col].tolist()
+            elif col.dtype.kind in 'fiub':
+                values = self.values(name)
+                out[name] = values.tolist()
+                # NaN / inf JSON'da geçersiz (jsonify çıplak NaN yazar): boş değer None olur
+                if values.dtype.kind == 'f':
+                    for i in np.flatnonzero(~np.isfinite(values)).tolist():
+                        out[name][i] = None
+            else:
+                out[name] = [str(v) for v in col]
+        return out
+
+    def to_records(self):
+        out = self._output_columns()
+        names = list(out)
+        return [dict(zip(names, row)) for row in zip(*out.values())]
+
+    def to_frame(self):
+        return pd.DataFrame(self._output_columns())
+
+    def to_binary(self):
+        chunks = []
+        size = 0
+
+        def push(data):
+            nonlocal size
+            data = data.tobytes() if isinstance(data, np.ndarray) else data
+            start = size
+            padding = -len(data) % 8
+            chunks.extend((data, b'\0' * padding))
+            size += len(data) + padding
+            return start
+
+        columns = []
+        if self.ids is None:
+            columns.append({'name': 'id', 'type': 'i32', 'prefix': 'ROW-',
+                            'offset': push((self.rows + 1).astype('<i4'))})
+        else:
+            offsets, data = string_buffers(self.ids)
+            columns.append({'name': 'id', 'type': 'str', 'prefix': f'{self.id_prefix}-' if self.id_prefix else '',
+                            'offset': push(offsets), 'data': push(data), 'length': len(data)})
+
+        for name, col in self.columns.items():
+            if is_label(name):
+                columns.append({'name': name, 'type': 'u8', 'labels': list(LABELS),
+                                'offset': push(col.astype(np.uint8))})
+            elif col.dtype.kind in 'fiub':
+                dtype = '<f4' if col.dtype == np.float32 else '<f8'
+                columns.append({'name': name, 'type': 'f32' if dtype == '<f4' else 'f64',
+                                'decimals': decimals_for(name, self.decimals),
+                                'offset': push(col.astype(dtype))})
+            else:
+                offsets, data = string_buffers(col)
+                columns.append({'name': name, 'type': 'str', 'prefix': '', 'offset': push(offsets),
+                                'data': push(data), 'length': len(data)})
+
+        # Başlık boşlukla doldurulur: tamponlar 8 baytlık sınırdan başlar (Float64Array için)
+        header = json.dumps({'rows': len(self), 'columns': columns}).encode('utf-8')
+        header += b' ' * (-(len(BINARY_MAGIC) + 4 + len(header)) % 8)
+        return b''.join([BINARY_MAGIC, np.uint32(len(header)).astype('<u4').tobytes(), header] + chunks)
+
+    # --- snapshot / diziler ---
+
+    def to_arrays(self):
+        arrays = dict(self.columns)
+        arrays['__rows'] = self.rows
+        if self.ids is not None:
+            arrays['__ids'] = self.ids
+        return arrays
+
+    @classmethod
+    def from_arrays(cls, arrays, id_prefix=None, decimals=None):
+        arrays = dict(arrays)
+        rows = arrays.pop('__rows')
+        ids = arrays.pop('__ids', None)
+        return cls(arrays, ids, id_prefix, rows, decimals)
+
+    def nbytes(self):
+        total = self.rows.nbytes + sum(col.nbytes for col in self.columns.values())
+        return total + (self.ids.nbytes if self.ids is not None else 0)
@@ -0,0 +1,366 @@
+# Komut satırı: HTTP katmanı olmadan toplu skorlama
+# Web uygulamasıyla aynı okuma (find_columns, CSV / Excel / Parquet / Arrow) ve skorlama
+# (score_profiles, etiketler, belirsizlik) kodu kullanılır; istek süresi sınırı yoktur.
+#
+# Kullanım:
+#   python cli.py score catalog.csv 'data/*.parquet' data/ --jobs 4 --format parquet -o results/
+#   python cli.py fetch --source koi -o cumulative.parquet
+#   python cli.py export --source toi --profiles smooth,conservative -o toi_scored.xlsx
+#   python cli.py warm -o warm_snapshots/    (WARM_SNAPSHOT_DIR ile açılışta yüklenir)
+#   python cli.py fit targets.csv -o fitted.csv   (file, period, t0[, duration, depth, star_mag])
+
+import argparse
+import contextlib
+import glob
+import json
+import os
+import shutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from app import (NASA_TABLES, TAP_MODE, get_draws, get_profile_args, get_unit_hints, lightcurve_input, nasa_params,
+                 nasa_snapshot, safe_float, score_file, score_lightcurves, stream_nasa_csv, summarize,
+                 table_from_snapshot, upload_kind)
+from candidate_table import CandidateTable
+from fits_io import read_lightcurve
+from profiles import DEFAULT_PROFILE
+from tap_client import TAP_MODES
+from uncertainty import DEFAULT_DRAWS
+
+OUTPUT_FORMATS = ('csv', 'parquet', 'xlsx')
+FETCH_CHUNK_ROWS = 20000
+# Süreç görevi başına ışık eğrisi: vektörel fit'in verimi için yeterince büyük, süreçler
+# arasında yük dengesi için yeterince küçük
+FIT_BATCH = 256
+
+
+def expand_inputs(patterns, recursive=False):
+    # Dosya, glob veya dizin; desteklenen uzantılar, yinelenmeden ve sıralı
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            walk = glob.glob(os.path.join(pattern, '**', '*'), recursive=True) if recursive else \
+                [os.path.join(pattern, name) for name in os.listdir(pattern)]
+            matches = sorted(p for p in walk if os.path.isfile(p) and upload_kind(p.lower()))
+        elif glob.has_magic(pattern):
+            matches = sorted(p for p in glob.glob(pattern, recursive=recursive) if os.path.isfile(p))
+        else:
+            matches = [pattern]
+        for path in matches:
+            if path not in paths:
+                paths.append(path)
+    return paths
+
+
+def output_format(path, default='csv'):
+    ext = os.path.splitext(path)[1].lower().lstrip('.')
+    return 'parquet' if ext == 'pq' else ext if ext in OUTPUT_FORMATS else default
+
+
+def write_table(df, path, fmt, stats=None):
+    # xlsx: sonuçlar 'Results', istatistikler 'Summary' sayfasında; diğer biçimlerde
+    # istatistikler yanına <ad>.summary.json olarak yazılır
+    if fmt == 'parquet':
+        try:
+            df.to_parquet(path, index=False)
+        except ImportError:
+            raise ValueError('Parquet output needs pyarrow (pip install pyarrow)')
+    elif fmt == 'xlsx':
+        with pd.ExcelWriter(path, engine='openpyxl') as writer:
+            df.to_excel(writer, index=False, sheet_name='Results')
+            if stats is not None:
+                pd.DataFrame([stats]).to_excel(writer, index=False, sheet_name='Summary')
+        return
+    else:
+        df.to_csv(path, index=False)
+
+    if stats is not None:
+        with open(os.path.splitext(path)[0] + '.summary.json', 'w') as f:
+            json.dump(stats, f, indent=2)
+
+
+def output_paths(paths, out_dir, fmt):
+    # <ad>_scored.<biçim>; farklı dizinlerdeki aynı adlı dosyalar için üst dizin adı eklenir
+    names = [os.path.splitext(os.path.basename(p))[0] for p in paths]
+    outputs = []
+    for path, name in zip(paths, names):
+        if names.count(name) > 1:
+            parent = os.path.basename(os.path.dirname(os.path.abspath(path)))
+            name = f'{parent}_{name}'
+        outputs.append(os.path.join(out_dir, f'{name}_scored.{fmt}'))
+    return outputs
+
+
+def score_one(path, output, source, profile, compare, draws, fmt, hints=None):
+    # Worker süreçte çalışır; sonuç dosyası yazılır, yalnızca özet döner
+    start = time.perf_counter()
+    scored = score_file(path, source, profile, compare, draws, hints=hints)
+    table = scored['table']
+    stats = summarize(table)
+    # Çıkarılan kolon birimleri: "duration=days(sample), depth=ppm(name)"
+    units = ', '.join(f"{key}={info['unit']}({info['basis']})" for key, info in scored['units'].items())
+    write_table(table.to_frame(), output, fmt, dict(stats, source=scored['source'], units=units, input=path))
+    return {'input': path, 'output': output, 'source': scored['source'], 'units': units,
+            'seconds': round(time.perf_counter() - start, 2), **stats}
+
+
+def cmd_score(args):
+    paths = expand_inputs(args.inputs, args.recursive)
+    if not paths:
+        raise SystemExit('No input files matched')
+    unsupported = [p for p in paths if upload_kind(p.lower()) is None]
+    if unsupported:
+        raise SystemExit(f'Unsupported format: {", ".join(unsupported)}')
+
+    profile, compare, draws = scoring_args(args)
+    try:
+        hints = get_unit_hints({'units': args.units})
+    except ValueError as e:
+        raise SystemExit(e.args[0])
+    os.makedirs(args.output, exist_ok=True)
+    jobs = max(1, min(args.jobs, len(paths)))
+    print(f"🚀 {len(paths)} dosya, {jobs} paralel iş")
+
+    summary = []
+    failed = 0
+    outputs = output_paths(paths, args.output, args.format)
+    task = (args.source, profile, compare, draws, args.format, hints)
+    if jobs == 1:
+        results = ((path, run(score_one, path, output, *task)) for path, output in zip(paths, outputs))
+    else:
+        pool = ProcessPoolExecutor(max_workers=jobs)
+        futures = [(path, pool.submit(run, score_one, path, output, *task)) for path, output in zip(paths, outputs)]
+        results = ((path, future.result()) for path, future in futures)
+
+    for path, (row, error) in results:
+        if error is not None:
+            failed += 1
+            print(f"❌ {path}: {error}")
+            continue
+        summary.append(row)
+        print(f"✅ {path} -> {row['output']}: {row['total']:,} aday, ortalama {row['mean']}, "
+              f"geçme oranı %{row['pass_rate']} ({row['seconds']} sn)")
+
+    if jobs > 1:
+        pool.shutdown()
+    if summary:
+        summary_path = os.path.join(args.output, 'summary.csv')
+        pd.DataFrame(summary).to_csv(summary_path, index=False)
+        print(f"\n📊 Özet: {summary_path}")
+    return 1 if failed else 0
+
+
+def scoring_args(args):
+    # Web uç noktalarıyla aynı ayrıştırma (draws sınırları dahil); bilinmeyen profil hemen reddedilir
+    options = {'profile': args.profile, 'profiles': args.profiles, 'draws': str(args.draws),
+               'uncertainty': '1' if args.uncertainty else ''}
+    try:
+        profile, compare = get_profile_args(options)
+    except KeyError as e:
+        raise SystemExit(e.args[0])
+    return profile, compare, get_draws(options)
+
+
+def run(fn, *args):
+    # (sonuç, hata): bir dosyanın hatası diğerlerini durdurmaz
+    try:
+        return fn(*args), None
+    except Exception as e:
+        return None, str(e)
+
+
+def cmd_fetch(args):
+    # Ham katalog (skorlanmamış) parça parça indirilip diske yazılır
+    spec = NASA_TABLES[args.source]
+    output = args.output or f"{spec['table']}.csv"
+    fmt = output_format(output)
+    parts = []
+    rows = 0
+    with open(output, 'w', newline='') if fmt == 'csv' else contextlib.nullcontext() as f:
+        for df in stream_nasa_csv(spec, args.tap, FETCH_CHUNK_ROWS):
+            if fmt == 'csv':
+                df.to_csv(f, index=False, header=rows == 0)
+            else:
+                parts.append(df)
+            rows += len(df)
+            print(f"⬇️  {rows:,} satır", end='\r')
+    if fmt != 'csv':
+        write_table(pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(), output, fmt)
+    print(f"\n💾 {rows:,} satır: {output}")
+    return 0
+
+
+def cmd_export(args):
+    # nasa_auto ile aynı: snapshot tazeyse oradan, değilse indirip skorlar ve yayınlar
+    # (böylece cron ile çalıştırıldığında web worker'ları da ısınmış snapshot'ı kullanır)
+    scoring_args(args)
+    params = nasa_params({
+        'source': args.source, 'tap': args.tap, 'profile': args.profile, 'profiles': args.profiles,
+        'uncertainty': '1' if args.uncertainty else '', 'draws': str(args.draws),
+        'refresh': '1' if args.refresh else '',
+    })
+    start = time.perf_counter()
+    snap, _ = nasa_snapshot(params)
+    table = table_from_snapshot(snap)
+    stats = summarize(table)
+
+    output = args.output or f"{args.source}_scored.xlsx"
+    write_table(table.to_frame(), output, output_format(output, 'xlsx'), dict(stats, source=args.source))
+    print(f"✅ {stats['total']:,} aday, ortalama {stats['mean']}, geçme oranı %{stats['pass_rate']} "
+          f"({time.perf_counter() - start:.1f} sn)")
+    print(f"💾 {output}")
+    return 0
+
+
+def fit_batch(targets, base, source, profile, demote):
+    # Worker süreçte çalışır: bir grup hedefin ışık eğrileri okunur ve tek batch'te fit edilir
+    # (/api/analyze_file FITS yolu ile aynı kod). (tablo veya None, hatalar, eğri, nokta, süre) döner
+    start = time.perf_counter()
+    curves = []
+    errors = []
+    for target in targets:
+        path = os.path.join(base, str(target['file']))
+        period, t0 = safe_float(target['period']), safe_float(target['t0'])
+        if period is None or t0 is None or period <= 0:
+            errors.append(f'{path}: needs period and t0')
+            continue
+        try:
+            with read_lightcurve(path) as lc:
+                curves.append(lightcurve_input(lc, period, t0, safe_float(target.get('duration')),
+                                               safe_float(target.get('depth')), safe_float(target.get('star_mag')),
+                                               source))
+        except (OSError, ValueError, KeyError) as e:
+            errors.append(f'{path}: {e}')
+
+    table = score_lightcurves(curves, profile, demote) if curves else None
+    cadences = sum(len(c['time']) for c in curves)
+    return table, errors, len(curves), cadences, time.perf_counter() - start
+
+
+def cmd_fit(args):
+    # Hedef listesi: file (listeye göre yol), period, t0 ve isteğe bağlı duration / depth / star_mag.
+    # Hedefler --batch'lik gruplara bölünür; her grup bir süreçte okunup vektörel fit edilir
+    # (tek çekirdekte ~1e3 eğri/sn), gruplar --jobs süreçte paralel çalışır. Sonuç hedef sırasındadır
+    profile, _, _ = scoring_args(args)
+    targets = pd.read_csv(args.targets)
+    missing = [c for c in ('file', 'period', 't0') if c not in targets.columns]
+    if missing:
+        raise SystemExit(f'Target list needs columns: {", ".join(missing)}')
+    base = os.path.dirname(os.path.abspath(args.targets))
+
+    records = targets.to_dict('records')
+    size = max(1, args.batch)
+    batches = [records[i:i + size] for i in range(0, len(records), size)]
+    jobs = max(1, min(args.jobs, len(batches)))
+    task = (base, args.source, profile, args.demote)
+
+    start = time.perf_counter()
+    if jobs == 1:
+        results = [fit_batch(batch, *task) for batch in batches]
+    else:
+        with ProcessPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(fit_batch, batches, *[[value] * len(batches) for value in task]))
+    seconds = time.perf_counter() - start
+
+    tables = []
+    failed = 0
+    curves = cadences = 0
+    busy = 0.0
+    for table, errors, n_curves, n_cadences, batch_seconds in results:
+        for error in errors:
+            print(f"❌ {error}")
+        failed += len(errors)
+        if table is not None:
+            tables.append(table.shift_rows(curves))
+        curves += n_curves
+        cadences += n_cadences
+        busy += batch_seconds
+    if not tables:
+        raise SystemExit('No light curves could be read')
+
+    table = CandidateTable.concat(tables)
+    stats = summarize(table)
+    output = args.output or 'fitted.csv'
+    write_table(table.to_frame(), output, output_format(output), stats)
+    print(f"📖 {curves:,} ışık eğrisi, {cadences:,} nokta, {len(batches)} grup, {jobs} süreç")
+    print(f"✅ oku + fit + skor + vetting: {seconds:.2f} sn ({curves / max(seconds, 1e-9):,.0f} eğri/sn; "
+          f"süreç başına {curves / max(busy, 1e-9):,.0f} eğri/sn), fit başarılı {int(table.columns['fit_ok'].sum()):,}")
+    print(f"💾 {output}")
+    return 1 if failed else 0
+
+
+def cmd_warm(args):
+    # Varsayılan parametrelerle (arayüzün ilk isteği) skorlanmış katalog snapshot'ları;
+    # dağıtımla birlikte paketlenir, uygulama açılışta WARM_SNAPSHOT_DIR'den yükler
+    os.makedirs(args.output, exist_ok=True)
+    for source in args.sources:
+        start = time.perf_counter()
+        snap, _ = nasa_snapshot(nasa_params({'source': source, 'tap': args.tap, 'refresh': '1'}))
+        shutil.copyfile(snap.path, os.path.join(args.output, os.path.basename(snap.path)))
+        print(f"🔥 {source}: {len(table_from_snapshot(snap)):,} aday -> {args.output} "
+              f"({time.perf_counter() - start:.1f} sn)")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Score exoplanet candidate catalogs without the web server')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    def scoring_options(p):
+        p.add_argument('--profile', default=DEFAULT_PROFILE, help='primary scoring profile')
+        p.add_argument('--profiles', default='', help='extra profiles to compare, comma separated')
+        p.add_argument('--uncertainty', action='store_true', help='add Monte Carlo score intervals')
+        p.add_argument('--draws', type=int, default=DEFAULT_DRAWS)
+
+    score = commands.add_parser('score', help='score local CSV / Excel / Parquet / Arrow files')
+    score.add_argument('inputs', nargs='+', help='files, glob patterns or directories')
+    score.add_argument('--source', default='file', choices=('file', 'toi', 'koi'),
+                       help="catalog type; 'file' detects it from the column names")
+    score.add_argument('-o', '--output', default='results', help='output directory (default: results)')
+    score.add_argument('--format', default='csv', choices=OUTPUT_FORMATS)
+    score.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='files scored in parallel')
+    score.add_argument('-r', '--recursive', action='store_true', help='descend into subdirectories')
+    score.add_argument('--units', default='', help="column units overriding inference, e.g. 'depth:ppm,duration:days'")
+    scoring_options(score)
+    score.set_defaults(func=cmd_score)
+
+    fetch = commands.add_parser('fetch', help='download a raw NASA catalog')
+    fetch.add_argument('--source', default='toi', choices=sorted(NASA_TABLES))
+    fetch.add_argument('--tap', default=TAP_MODE, choices=list(TAP_MODES))
+    fetch.add_argument('-o', '--output', help='.csv, .parquet or .xlsx (default: <table>.csv)')
+    fetch.set_defaults(func=cmd_fetch)
+
+    export = commands.add_parser('export', help='fetch, score and export a NASA catalog')
+    export.add_argument('--source', default='toi', choices=sorted(NASA_TABLES))
+    export.add_argument('--tap', default=TAP_MODE, choices=list(TAP_MODES))
+    export.add_argument('--refresh', action='store_true', help='ignore a fresh shared snapshot')
+    export.add_argument('-o', '--output', help='.xlsx, .csv or .parquet (default: <source>_scored.xlsx)')
+    scoring_options(export)
+    export.set_defaults(func=cmd_export)
+
+    fit = commands.add_parser('fit', help='batch-fit FITS light curves and score the refined parameters')
+    fit.add_argument('targets', help='CSV with file, period, t0 and optional duration, depth, star_mag')
+    fit.add_argument('--source', default='file', choices=('file', 'toi', 'koi'),
+                     help="magnitude scale; 'file' reads the mission from each FITS header")
+    fit.add_argument('--demote', action='store_true', help='demote candidates flagged by vetting')
+    fit.add_argument('-j', '--jobs', type=int, default=os.cpu_count() or 1, help='processes fitting in parallel')
+    fit.add_argument('--batch', type=int, default=FIT_BATCH, help='light curves fitted together per process task')
+    fit.add_argument('-o', '--output', help='.csv, .parquet or .xlsx (default: fitted.csv)')
+    scoring_options(fit)
+    fit.set_defaults(func=cmd_fit)
+
+    warm = commands.add_parser('warm', help='build scored catalog snapshots to bundle for fast cold starts')
+    warm.add_argument('--sources', nargs='+', default=sorted(NASA_TABLES), choices=sorted(NASA_TABLES))
+    warm.add_argument('--tap', default=TAP_MODE, choices=list(TAP_MODES))
+    warm.add_argument('-o', '--output', default='warm_snapshots', help='directory (default: warm_snapshots)')
+    warm.set_defaults(func=cmd_warm)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == '__main__':
+    sys.exit(main())
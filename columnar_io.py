@@ -0,0 +1,114 @@
+# Kolonsal girdi: Parquet ve Feather / Arrow IPC
+# Şemadaki kolon adlarından find_columns ile gereken kolonlar bulunur; yalnızca o kolonlar
+# okunur, Parquet'te skorlanabilir satır içermeyen satır grupları (gerekli bir kolonu
+# tamamen boş) istatistiklerden atlanır. Arrow IPC dosyası diskteyse memory-map ile,
+# yüklenen içerikse bayt tamponu üzerinde kopyasız açılır; null içermeyen float64 kolonlar
+# NumPy'a kopyasız görünüm olarak geçer.
+# pyarrow opsiyoneldir; yüklü değilse bu biçimler açık bir hata mesajıyla reddedilir.
+
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+pa = lazy_import('pyarrow', optional=True)
+ipc = lazy_import('pyarrow.ipc')
+pq = lazy_import('pyarrow.parquet')
+
+PARQUET_EXTENSIONS = ('.parquet', '.pq')
+ARROW_EXTENSIONS = ('.feather', '.arrow', '.arrows', '.ipc')
+COLUMNAR_EXTENSIONS = PARQUET_EXTENSIONS + ARROW_EXTENSIONS
+
+
+def columnar_kind(filename):
+    name = filename.lower()
+    if name.endswith(PARQUET_EXTENSIONS):
+        return 'parquet'
+    if name.endswith(ARROW_EXTENSIONS):
+        return 'arrow'
+    return None
+
+
+def to_float(array):
+    # Null içermeyen float64 kolon kopyasız; sayısal kolonlar float64'e (null -> NaN),
+    # metin kolonları pd.to_numeric ile (sayıya çevrilemeyen -> NaN) çevrilir
+    if array.type == pa.float64() and array.null_count == 0:
+        return array.to_numpy(zero_copy_only=True)
+    if pa.types.is_integer(array.type) or pa.types.is_floating(array.type) or pa.types.is_decimal(array.type):
+        return array.cast(pa.float64()).to_numpy(zero_copy_only=False)
+    return pd.to_numeric(array.to_pandas(), errors='coerce').to_numpy(dtype=float)
+
+
+def _single_chunk(column):
+    # Bir satır grubu genelde tek parçadır; o zaman kopyalanmaz
+    return column.chunk(0) if column.num_chunks == 1 else column.combine_chunks()
+
+
+class ColumnarFile:
+    def __init__(self, source, kind):
+        # source: dosya yolu (memory-map) veya bayt içerik (kopyasız tampon)
+        if pa is None:
+            raise ValueError('Parquet / Arrow input needs pyarrow (pip install pyarrow)')
+        self.kind = kind
+        if isinstance(source, (bytes, bytearray, memoryview)):
+            stream = pa.BufferReader(pa.py_buffer(source))
+        else:
+            stream = pa.memory_map(source)
+
+        try:
+            if kind == 'parquet':
+                self._parquet = pq.ParquetFile(stream)
+                self.columns = self._parquet.schema_arrow.names
+                self.num_rows = self._parquet.metadata.num_rows
+                self._groups = [self._parquet.metadata.row_group(i).num_rows
+                                for i in range(self._parquet.metadata.num_row_groups)]
+            else:
+                try:
+                    self._batches = ipc.open_file(stream)
+                    batches = [self._batches.get_batch(i) for i in range(self._batches.num_record_batches)]
+                except pa.ArrowInvalid:
+                    # Dosya değil akış biçimi (.arrows)
+                    stream.seek(0)
+                    batches = list(ipc.open_stream(stream))
+                self._batches = batches
+                self.columns = batches[0].schema.names if batches else []
+                self.num_rows = sum(b.num_rows for b in batches)
+                self._groups = [b.num_rows for b in batches]
+        except (pa.ArrowInvalid, OSError) as e:
+            raise ValueError(f'Invalid {kind} file: {e}')
+
+    @property
+    def max_batch_rows(self):
+        return max(self._groups, default=0)
+
+    def _skip(self, index, required):
+        # Parquet istatistikleri: gerekli kolonlardan biri satır grubunda tamamen null ise
+        # hiçbir satırın skoru olamaz
+        if self.kind != 'parquet' or not required:
+            return False
+        group = self._parquet.metadata.row_group(index)
+        names = self._parquet.schema_arrow.names
+        for name in required:
+            stats = group.column(names.index(name)).statistics
+            if stats is not None and stats.has_null_count and stats.null_count == group.num_rows:
+                return True
+        return False
+
+    def batches(self, columns, numeric=(), required=()):
+        # (ilk satır konumu, satır sayısı, {kolon: NumPy dizisi}) üretir; numeric kolonlar
+        # float64, diğerleri NumPy nesne / sayı dizisi
+        offset = 0
+        for index, n in enumerate(self._groups):
+            if n == 0 or self._skip(index, required):
+                offset += n
+                continue
+            if self.kind == 'parquet':
+                table = self._parquet.read_row_group(index, columns=list(columns))
+                arrays = {name: _single_chunk(table.column(name)) for name in columns}
+            else:
+                batch = self._batches[index]
+                arrays = {name: batch.column(name) for name in columns}
+
+            yield offset, n, {
+                name: to_float(array) if name in numeric else array.to_numpy(zero_copy_only=False)
+                for name, array in arrays.items()
+            }
+            offset += n
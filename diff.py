@@ -0,0 +1,123 @@
+# İki katalog snapshot'ı arasındaki fark: yeni, kaldırılan ve etiketi / skoru değişen adaylar
+# Snapshot yayınlanırken kimliğe (aynı kimlikte periyoda) göre sıralama permütasyonu da yazılır
+# ('by_id' tablosu); fark anında iki sıralı kimlik dizisi birleştirilerek eşleştirilir:
+# art arda eklenmiş iki sıralı dizinin kararlı sıralaması (timsort) tek geçişlik birleştirmedir, O(n).
+# Aynı kimlik birden çok kez geçebilir (KOI kepid: yıldız başına birden çok aday); kimlik
+# grubundaki k. eski satır k. yeni satırla eşleşir.
+# Kimliksiz (id kolonu olmayan) snapshot'lar karşılaştırılmaz: satır numarası sürümler arasında
+# aynı adayı göstermez, konuma göre eşleştirme yanlış 'değişti' sonuçları üretir.
+
+import numpy as np
+
+from scoring import LABELS
+
+DEFAULT_THRESHOLD = 5.0
+DEFAULT_LIMIT = 1000
+
+
+class UnkeyedSnapshot(Exception):
+    pass
+
+
+def id_order(ids, period):
+    # Kimliğe, eşitlikte periyoda göre sıralama permütasyonu (snapshot'a yazılır)
+    return np.lexsort((period, ids)).astype(np.int64)
+
+
+def table_keys(snap):
+    # (sıralı kimlikler, sıralama permütasyonu); eski snapshot'larda permütasyon hesaplanır
+    if '__ids' not in snap.columns('rows'):
+        raise UnkeyedSnapshot(f'Snapshot version {snap.version} has no candidate ids; '
+                              'rows cannot be matched across versions')
+    rows = snap.column('rows', '__ids')
+    if 'by_id' in snap.tables():
+        order = snap.column('by_id', 'order')
+    else:
+        order = id_order(rows, snap.column('rows', 'period'))
+    return rows[order], order
+
+
+def merge_join(a, b):
+    # a, b: sıralı kimlik dizileri -> eşleşen (a konumları, b konumları)
+    n = len(a)
+    if n == 0 or len(b) == 0:
+        return np.empty(0, np.int64), np.empty(0, np.int64)
+    if a.dtype != b.dtype:
+        # Farklı genişlikli 'S' dizileri ortak genişliğe çıkarılır
+        dtype = np.promote_types(a.dtype, b.dtype)
+        a, b = a.astype(dtype), b.astype(dtype)
+
+    keys = np.concatenate([a, b])
+    order = np.argsort(keys, kind='stable')
+    merged = keys[order]
+    from_b = order >= n
+
+    starts_mask = np.ones(len(merged), dtype=bool)
+    starts_mask[1:] = merged[1:] != merged[:-1]
+    group = np.cumsum(starts_mask) - 1
+    starts = np.flatnonzero(starts_mask)
+
+    # Grupta önce a'nın, sonra b'nin elemanları gelir (kararlı sıralama); b'deki r. eleman
+    # grupta en az r + 1 tane a elemanı varsa a'nın r. elemanıyla eşleşir
+    position = np.arange(len(merged)) - starts[group]
+    a_count = np.bincount(group, weights=~from_b).astype(np.int64)
+    rank = position - a_count[group]
+    matched = from_b & (rank < a_count[group])
+    ia = order[starts[group[matched]] + rank[matched]]
+    ib = order[matched] - n
+    return ia, ib
+
+
+def diff_tables(old_snap, new_snap, old_table, new_table, threshold=DEFAULT_THRESHOLD, limit=DEFAULT_LIMIT):
+    # old_table / new_table: snapshot'ların CandidateTable'ları (satır sırası snapshot ile aynı)
+    old_keys, old_order = table_keys(old_snap)
+    new_keys, new_order = table_keys(new_snap)
+    ia, ib = merge_join(old_keys, new_keys)
+    old_idx, new_idx = old_order[ia], new_order[ib]
+
+    removed = np.ones(len(old_table), dtype=bool)
+    removed[old_idx] = False
+    added = np.ones(len(new_table), dtype=bool)
+    added[new_idx] = False
+
+    old_score = old_table.values('score')[old_idx]
+    new_score = new_table.values('score')[new_idx]
+    old_label = old_table['label'][old_idx]
+    new_label = new_table['label'][new_idx]
+    delta = np.round(new_score - old_score, 1)
+    label_changed = old_label != new_label
+    score_changed = np.abs(delta) > threshold
+    changed = np.flatnonzero(label_changed | score_changed)
+    # En büyük değişim önce
+    changed = changed[np.argsort(-np.abs(delta[changed]), kind='stable')]
+
+    transitions = {}
+    if label_changed.any():
+        pairs = old_label[label_changed].astype(np.int64) * len(LABELS) + new_label[label_changed]
+        for code, count in zip(*np.unique(pairs, return_counts=True)):
+            transitions[f'{LABELS[code // len(LABELS)]}→{LABELS[code % len(LABELS)]}'] = int(count)
+
+    changed_records = new_table.take(new_idx[changed[:limit]]).to_records()
+    for record, i in zip(changed_records, changed[:limit].tolist()):
+        record['score_from'] = float(old_score[i])
+        record['label_from'] = LABELS[old_label[i]]
+        record['score_delta'] = float(delta[i])
+
+    return {
+        'from': {'version': old_snap.version, 'created': old_snap.created, 'total': len(old_table)},
+        'to': {'version': new_snap.version, 'created': new_snap.created, 'total': len(new_table)},
+        'threshold': threshold,
+        'summary': {
+            'added': int(added.sum()),
+            'removed': int(removed.sum()),
+            'changed': len(changed),
+            'label_changed': int(label_changed.sum()),
+            'score_changed': int(score_changed.sum()),
+            'unchanged': int(len(new_idx) - len(changed)),
+            'transitions': transitions,
+        },
+        'added': new_table.filter(added).sort()[:limit].to_records(),
+        'removed': old_table.filter(removed).sort()[:limit].to_records(),
+        'changed': changed_records,
+        'truncated': max(int(added.sum()), int(removed.sum()), len(changed)) > limit,
+    }
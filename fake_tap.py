@@ -0,0 +1,272 @@
+# Yerel sahte TAP sunucusu (geliştirme / test için)
+# CSV dosyalarını tablo olarak sunar; tap_client'ın ürettiği ADQL alt kümesini anlar:
+#   SELECT <kolonlar | MIN(k) AS lo, MAX(k) AS hi, COUNT(*) AS n> FROM <tablo>
+#   [WHERE a >= 1 AND b < 2 AND c IS NOT NULL AND d IN ('X','Y')] [ORDER BY k]
+# /TAP/sync, /TAP/async (UWS: 303 yönlendirme, phase, results/result, error) ve gzip yanıt.
+# Tablolar sabit olduğundan her sorgunun CSV'si bir kez üretilip tekrar sunulur; --delay sorgu
+# başına gecikme, --bandwidth bağlantı başına bant genişliği (bayt/s) ekler.
+#
+# Kullanım:
+#   python fake_tap.py --table toi=toi.csv --table cumulative=koi.csv --port 8765
+#   NASA_TAP_URL=http://127.0.0.1:8765/TAP python app.py
+
+import argparse
+import gzip
+import random
+import re
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+_SELECT = re.compile(
+    r'^\s*SELECT\s+(?P<columns>.+?)\s+FROM\s+(?P<table>\w+)'
+    r'(?:\s+WHERE\s+(?P<where>.+?))?(?:\s+ORDER\s+BY\s+(?P<order>\w+))?\s*$',
+    re.IGNORECASE | re.DOTALL,
+)
+_TERM = re.compile(
+    r'^(?P<col>\w+)\s*(?:(?P<op>>=|<=|<>|!=|=|<|>)\s*(?P<value>\S+)|'
+    r'(?P<null>IS\s+(?:NOT\s+)?NULL)|IN\s*\((?P<values>[^)]*)\))$',
+    re.IGNORECASE,
+)
+_AGGREGATE = re.compile(r'^(MIN|MAX|COUNT)\((\w+|\*)\)\s+AS\s+(\w+)$', re.IGNORECASE)
+CACHE_QUERIES = 64
+SEND_CHUNK = 2 ** 14
+
+
+def _literal(text):
+    text = text.strip()
+    if text[:1] == "'" and text[-1:] == "'":
+        return text[1:-1]
+    return float(text)
+
+
+def _split_terms(where):
+    # Yalnızca AND bağlaçları desteklendiği için gruplama parantezleri atılır, IN (...) korunur
+    where = re.sub(r'IN\s*\(([^)]*)\)', lambda m: f'IN [{m.group(1)}]', where, flags=re.IGNORECASE)
+    where = where.replace('(', ' ').replace(')', ' ')
+    return [t.strip().replace('[', '(').replace(']', ')')
+            for t in re.split(r'\s+AND\s+', where.strip(), flags=re.IGNORECASE)]
+
+
+def run_query(tables, query):
+    match = _SELECT.match(query)
+    if not match:
+        raise ValueError(f'Unsupported query: {query}')
+    table = match.group('table').lower()
+    if table not in tables:
+        raise ValueError(f'Unknown table: {table}')
+    df = tables[table]
+
+    if match.group('where'):
+        mask = pd.Series(True, index=df.index)
+        for term in _split_terms(match.group('where')):
+            t = _TERM.match(term)
+            if not t:
+                raise ValueError(f'Unsupported condition: {term}')
+            col = df[t.group('col').lower()]
+            if t.group('null'):
+                mask &= col.isna() if 'NOT' not in t.group('null').upper() else col.notna()
+            elif t.group('values') is not None:
+                mask &= col.isin([_literal(v) for v in t.group('values').split(',')])
+            else:
+                value = _literal(t.group('value'))
+                op = t.group('op')
+                mask &= {
+                    '>=': col >= value, '<=': col <= value, '>': col > value, '<': col < value,
+                    '=': col == value, '<>': col != value, '!=': col != value,
+                }[op]
+        df = df[mask]
+
+    if match.group('order'):
+        df = df.sort_values(match.group('order').lower(), kind='stable')
+
+    columns = [c.strip() for c in match.group('columns').split(',')]
+    aggregates = [_AGGREGATE.match(c) for c in columns]
+    if all(aggregates):
+        row = {}
+        for a in aggregates:
+            func, col, alias = a.group(1).upper(), a.group(2).lower(), a.group(3)
+            if func == 'COUNT':
+                row[alias] = len(df)
+            else:
+                row[alias] = getattr(df[col], func.lower())()
+        return pd.DataFrame([row])
+    if columns != ['*']:
+        df = df[[c.lower() for c in columns]]
+    return df
+
+
+class FakeTapHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'FakeTAP/1.0'
+
+    def log_message(self, fmt, *args):
+        if self.server.verbose:
+            super().log_message(fmt, *args)
+
+    def _send(self, status, body=b'', content_type='text/plain', headers=None):
+        if isinstance(body, str):
+            body = body.encode()
+        if 'gzip' in self.headers.get('Accept-Encoding', '') and len(body) > 1024:
+            body = gzip.compress(body, compresslevel=1)
+            headers = dict(headers or {}, **{'Content-Encoding': 'gzip'})
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        if not self.server.bandwidth:
+            self.wfile.write(body)
+            return
+        # Bant genişliği sınırı: parça parça, her parçadan sonra aktarım süresi kadar beklenir
+        for start in range(0, len(body), SEND_CHUNK):
+            chunk = body[start:start + SEND_CHUNK]
+            self.wfile.write(chunk)
+            time.sleep(len(chunk) / self.server.bandwidth)
+
+    def _maybe_fail(self):
+        # Hata enjeksiyonu: parça devam ettirme / yeniden deneme testleri için
+        if self.server.fail_rate and random.random() < self.server.fail_rate:
+            self._send(503, 'injected failure')
+            return True
+        return False
+
+    def _csv(self, query):
+        time.sleep(self.server.delay)
+        return self.server.cached_csv(query)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        params = {k.lower(): v[0] for k, v in parse_qs(url.query).items()}
+        parts = url.path.rstrip('/').split('/')
+
+        if url.path.rstrip('/').endswith('/TAP/sync'):
+            if self._maybe_fail():
+                return
+            try:
+                self._send(200, self._csv(params.get('query', '')), 'text/csv')
+            except (ValueError, KeyError) as e:
+                self._send(400, f'ERROR: {e}')
+            return
+
+        if 'async' in parts[:-1]:
+            at = parts.index('async')
+            job = self.server.jobs.get(parts[at + 1])
+            if job is None:
+                self._send(404, 'no such job')
+                return
+            tail = parts[at + 2:]
+            if tail == ['phase']:
+                self._send(200, job['phase'])
+            elif tail == ['error']:
+                self._send(200, job.get('error', ''))
+            elif tail == ['results', 'result'] and job['phase'] == 'COMPLETED':
+                if self._maybe_fail():
+                    return
+                self._send(200, job['result'], 'text/csv')
+            else:
+                self._send(404, 'not found')
+            return
+
+        self._send(404, 'not found')
+
+    def do_POST(self):
+        url = urlparse(self.path)
+        if not url.path.rstrip('/').endswith('/TAP/async'):
+            self._send(404, 'not found')
+            return
+        length = int(self.headers.get('Content-Length', 0))
+        form = {k.upper(): v[0] for k, v in parse_qs(self.rfile.read(length).decode()).items()}
+
+        job_id = uuid.uuid4().hex[:12]
+        job = {'phase': 'QUEUED'}
+        self.server.jobs[job_id] = job
+
+        def execute():
+            job['phase'] = 'EXECUTING'
+            try:
+                job['result'] = self._csv(form.get('QUERY', ''))
+                job['phase'] = 'COMPLETED'
+            except (ValueError, KeyError) as e:
+                job['error'] = str(e)
+                job['phase'] = 'ERROR'
+
+        threading.Thread(target=execute, daemon=True).start()
+        self._send(303, '', headers={'Location': f'{url.path.rstrip("/")}/{job_id}'})
+
+
+class FakeTapServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def cached_csv(self, query):
+        with self.cache_lock:
+            text = self.cache.get(query)
+            if text is not None:
+                self.cache.move_to_end(query)
+                return text
+        text = run_query(self.tables, query).to_csv(index=False)
+        with self.cache_lock:
+            self.cache[query] = text
+            while len(self.cache) > CACHE_QUERIES:
+                self.cache.popitem(last=False)
+        return text
+
+    def handle_error(self, request, client_address):
+        # İstemcinin kopardığı bağlantılar (hata enjeksiyonu sonrası) sessizce geçilir
+        if self.verbose:
+            super().handle_error(request, client_address)
+
+
+def make_server(tables, host='127.0.0.1', port=8765, delay=0.0, fail_rate=0.0, verbose=False, bandwidth=0):
+    server = FakeTapServer((host, port), FakeTapHandler)
+    server.tables = {}
+    for name, source in tables.items():
+        df = source if isinstance(source, pd.DataFrame) else pd.read_csv(source, comment='#')
+        df.columns = [c.lower() for c in df.columns]
+        server.tables[name.lower()] = df
+    server.jobs = {}
+    server.delay = delay
+    server.fail_rate = fail_rate
+    server.verbose = verbose
+    server.bandwidth = bandwidth
+    server.cache = OrderedDict()
+    server.cache_lock = threading.Lock()
+    return server
+
+
+def serve_in_thread(tables, **kwargs):
+    server = make_server(tables, **kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve CSV files through a minimal fake TAP endpoint')
+    parser.add_argument('--table', action='append', required=True, metavar='NAME=CSV',
+                        help='table name and CSV path, e.g. toi=toi.csv (repeatable)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--delay', type=float, default=0.0, help='seconds to sleep per query')
+    parser.add_argument('--fail-rate', type=float, default=0.0, help='fraction of data requests answered with 503')
+    parser.add_argument('--bandwidth', type=float, default=0,
+                        help='bytes per second per connection (0 for unlimited)')
+    parser.add_argument('--verbose', action='store_true')
+    args = parser.parse_args(argv)
+
+    tables = dict(t.split('=', 1) for t in args.table)
+    server = make_server(tables, args.host, args.port, args.delay, args.fail_rate, args.verbose, args.bandwidth)
+    print(f"🛰️ Sahte TAP: http://{args.host}:{args.port}/TAP  tablolar: {', '.join(server.tables)}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,342 @@
+# FITS ışık eğrisi okuyucu (TESS / Kepler LC dosyaları)
+# astropy gibi ağır bir bağımlılık olmadan sadece header ve BINTABLE
+# yerleşimini çözer; kolonlar dosya üzerine memory-map edilmiş NumPy view'larıdır.
+
+import mmap
+import os
+
+import numpy as np
+
+BLOCK_SIZE = 2880
+CARD_SIZE = 80
+
+# TFORM tip kodu -> big-endian NumPy dtype
+TFORM_DTYPES = {
+    'L': 'S1',
+    'B': 'u1',
+    'I': '>i2',
+    'J': '>i4',
+    'K': '>i8',
+    'E': '>f4',
+    'D': '>f8',
+    'C': '>c8',
+    'M': '>c16',
+    'P': '>i4',
+    'Q': '>i8',
+}
+
+# lightkurve'un "default" maskesi ile aynı bitler:
+# AttitudeTweak, SafeMode, CoarsePoint, EarthPoint, Desat, ManualExclude
+DEFAULT_QUALITY_BITMASK = 1 | 2 | 4 | 8 | 32 | 128
+
+LIGHTCURVE_COLUMNS = ('TIME', 'SAP_FLUX', 'PDCSAP_FLUX', 'QUALITY')
+
+
+def _parse_value(raw):
+    raw = raw.strip()
+    if raw.startswith("'"):
+        # String değer: '' kaçışlı tırnak, sondaki boşluklar anlamsız
+        end = 1
+        chars = []
+        while end < len(raw):
+            if raw[end] == "'":
+                if end + 1 < len(raw) and raw[end + 1] == "'":
+                    chars.append("'")
+                    end += 2
+                    continue
+                break
+            chars.append(raw[end])
+            end += 1
+        return ''.join(chars).rstrip()
+
+    value = raw.split('/', 1)[0].strip()
+    if value == 'T':
+        return True
+    if value == 'F':
+        return False
+    if value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        pass
+    try:
+        return float(value.replace('D', 'E'))
+    except ValueError:
+        return value
+
+
+def read_header(buf, offset=0):
+    header = {}
+    pos = offset
+    size = len(buf)
+
+    while pos + BLOCK_SIZE <= size:
+        block = bytes(buf[pos:pos + BLOCK_SIZE])
+        pos += BLOCK_SIZE
+        for i in range(0, BLOCK_SIZE, CARD_SIZE):
+            card = block[i:i + CARD_SIZE].decode('ascii', errors='replace')
+            key = card[:8].strip()
+            if key == 'END':
+                return header, pos
+            if not key or card[8:10] != '= ':
+                continue
+            header.setdefault(key, _parse_value(card[10:]))
+
+    raise ValueError('FITS header is not terminated by END')
+
+
+def _data_size(header):
+    naxis = header.get('NAXIS', 0)
+    if not naxis:
+        return 0
+    count = 1
+    for i in range(1, naxis + 1):
+        count *= header.get(f'NAXIS{i}', 0)
+    bits = abs(header.get('BITPIX', 8))
+    size = bits // 8 * header.get('GCOUNT', 1) * (header.get('PCOUNT', 0) + count)
+    return size
+
+
+def _padded(size):
+    return (size + BLOCK_SIZE - 1) // BLOCK_SIZE * BLOCK_SIZE
+
+
+def parse_tform(tform):
+    tform = tform.strip()
+    i = 0
+    while i < len(tform) and tform[i].isdigit():
+        i += 1
+    repeat = int(tform[:i]) if i else 1
+    code = tform[i:i + 1]
+
+    if code == 'A':
+        return np.dtype(f'S{repeat}'), ()
+    if code == 'X':
+        return np.dtype('u1'), ((repeat + 7) // 8,)
+    if code in ('P', 'Q'):
+        # Heap dizileri için (eleman sayısı, heap offset) tanımlayıcısı
+        return np.dtype(TFORM_DTYPES[code]), (2,)
+    if code not in TFORM_DTYPES:
+        raise ValueError(f'Unsupported TFORM: {tform}')
+
+    dtype = np.dtype(TFORM_DTYPES[code])
+    return dtype, (repeat,) if repeat != 1 else ()
+
+
+def bintable_dtype(header):
+    names, formats = [], []
+    for n in range(1, header.get('TFIELDS', 0) + 1):
+        name = str(header.get(f'TTYPE{n}', f'COL{n}')).strip() or f'COL{n}'
+        base, shape = parse_tform(header[f'TFORM{n}'])
+        names.append(name)
+        formats.append((base, shape) if shape else base)
+
+    dtype = np.dtype({'names': names, 'formats': formats})
+    if dtype.itemsize != header.get('NAXIS1'):
+        raise ValueError(
+            f'BINTABLE row size mismatch: TFORM gives {dtype.itemsize}, NAXIS1 is {header.get("NAXIS1")}'
+        )
+    return dtype
+
+
+def _map_source(source):
+    # Dosya yolu -> mmap; bytes/memoryview -> kopyasız buffer
+    if isinstance(source, (bytes, bytearray, memoryview)):
+        return memoryview(source), None
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, 'rb') as fh:
+            mm = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(mm), mm
+
+    try:
+        mm = mmap.mmap(source.fileno(), 0, access=mmap.ACCESS_READ)
+        return memoryview(mm), mm
+    except (AttributeError, OSError, ValueError):
+        # Upload stream gibi fileno'su olmayan nesneler bir kez okunur
+        source.seek(0)
+        return memoryview(source.read()), None
+
+
+class FitsFile:
+    def __init__(self, source):
+        self.buffer, self._mmap = _map_source(source)
+        self.hdus = []
+        try:
+            self._read_hdus()
+        except BaseException:
+            # Hatalı dosyada mmap açık kalmasın
+            self.close()
+            raise
+
+    def _read_hdus(self):
+        if bytes(self.buffer[:9]) != b'SIMPLE  =':
+            raise ValueError('Not a FITS file')
+
+        pos = 0
+        size = len(self.buffer)
+        while pos < size:
+            try:
+                header, data_start = read_header(self.buffer, pos)
+            except ValueError:
+                if not self.hdus:
+                    raise
+                break
+            data_size = _data_size(header)
+            self.hdus.append({'header': header, 'offset': data_start, 'size': data_size})
+            pos = data_start + _padded(data_size)
+
+        if not self.hdus or self.hdus[0]['header'].get('SIMPLE') is not True:
+            raise ValueError('Not a FITS file')
+
+    def find_hdu(self, ext):
+        if isinstance(ext, int):
+            if not 0 <= ext < len(self.hdus):
+                raise KeyError(f'HDU not found: {ext}')
+            return self.hdus[ext]
+        for hdu in self.hdus:
+            if str(hdu['header'].get('EXTNAME', '')).upper() == ext.upper():
+                return hdu
+        raise KeyError(f'HDU not found: {ext}')
+
+    def bintable(self, ext=1):
+        hdu = self.find_hdu(ext)
+        header = hdu['header']
+        if header.get('XTENSION') != 'BINTABLE':
+            raise ValueError(f'HDU {ext} is not a BINTABLE')
+
+        dtype = bintable_dtype(header)
+        nrows = header.get('NAXIS2', 0)
+        if hdu['offset'] + nrows * dtype.itemsize > len(self.buffer):
+            raise ValueError(f'FITS file is truncated: HDU {ext} data ends past end of file')
+        rows = np.frombuffer(self.buffer, dtype=dtype, count=nrows, offset=hdu['offset'])
+        return BinTable(header, rows)
+
+    def close(self):
+        # Dışarıda yaşayan view'lar varsa mmap GC ile kapanır
+        self.buffer = None
+        if self._mmap is not None:
+            try:
+                self._mmap.close()
+            except BufferError:
+                pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class BinTable:
+    def __init__(self, header, rows):
+        self.header = header
+        self.rows = rows
+        self.names = list(rows.dtype.names)
+        self._index = {name.upper(): name for name in self.names}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def __contains__(self, name):
+        return name.upper() in self._index
+
+    def column(self, name):
+        try:
+            field = self._index[name.upper()]
+        except KeyError:
+            raise KeyError(f'Column not found: {name}') from None
+        data = self.rows[field]
+
+        # TSCAL/TZERO yoksa sonuç dosyaya bakan kopyasız bir view'dır
+        n = self.names.index(field) + 1
+        scale = self.header.get(f'TSCAL{n}', 1)
+        zero = self.header.get(f'TZERO{n}', 0)
+        if scale != 1 or zero != 0:
+            data = data * scale + zero
+        return data
+
+
+def quality_mask(quality, bitmask=DEFAULT_QUALITY_BITMASK):
+    return (np.asarray(quality) & bitmask) == 0
+
+
+class LightCurve:
+    def __init__(self, fits, table):
+        self._fits = fits
+        self.table = table
+        self.header = fits.hdus[0]['header']
+        self.meta = lightcurve_meta(self.header, table.header)
+
+        self.time = table.column('TIME')
+        self.sap_flux = table.column('SAP_FLUX') if 'SAP_FLUX' in table else None
+        self.pdcsap_flux = table.column('PDCSAP_FLUX') if 'PDCSAP_FLUX' in table else None
+        self.quality = table.column('QUALITY') if 'QUALITY' in table else None
+
+    def mask(self, flux_column='PDCSAP_FLUX', bitmask=DEFAULT_QUALITY_BITMASK):
+        flux = self.table.column(flux_column)
+        good = np.isfinite(self.time) & np.isfinite(flux)
+        if self.quality is not None and bitmask:
+            good &= quality_mask(self.quality, bitmask)
+        return good
+
+    def clean(self, flux_column='PDCSAP_FLUX', bitmask=DEFAULT_QUALITY_BITMASK):
+        # Kaliteli noktalar, native-endian kopya olarak (hesaplama için)
+        good = self.mask(flux_column, bitmask)
+        time = self.time[good].astype(np.float64)
+        flux = self.table.column(flux_column)[good].astype(np.float64)
+        return time, flux
+
+    def close(self):
+        self._fits.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def lightcurve_meta(primary, table_header):
+    mission = str(primary.get('MISSION') or primary.get('TELESCOP') or '').upper()
+    if 'TESS' in mission:
+        obj_id = primary.get('TICID')
+        star_mag = primary.get('TESSMAG')
+        source = 'toi'
+        prefix = 'TIC'
+    else:
+        obj_id = primary.get('KEPLERID')
+        star_mag = primary.get('KEPMAG')
+        source = 'koi'
+        prefix = 'KIC'
+
+    if obj_id is None:
+        obj_id = primary.get('OBJECT', '')
+        prefix = None
+
+    return {
+        'id': f'{prefix}-{obj_id}' if prefix else str(obj_id),
+        'mission': mission,
+        'source': source,
+        'star_mag': star_mag,
+        'object': primary.get('OBJECT'),
+        'time_ref': table_header.get('BJDREFI', 0) + table_header.get('BJDREFF', 0.0),
+        'time_unit': table_header.get('TIMEUNIT', 'd'),
+    }
+
+
+def read_lightcurve(source, ext='LIGHTCURVE'):
+    # Hata (ValueError / KeyError) durumunda dosya kapatılıp yeniden yükseltilir
+    fits = FitsFile(source)
+    try:
+        try:
+            table = fits.bintable(ext)
+        except KeyError:
+            table = fits.bintable(1)
+
+        if 'TIME' not in table:
+            raise ValueError('Light curve table has no TIME column')
+        return LightCurve(fits, table)
+    except BaseException:
+        fits.close()
+        raise
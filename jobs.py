@@ -0,0 +1,101 @@
+# Arka plan işleri
+# Ön izleme yanıtı döndükten sonra kesin analiz burada sürer; istemci job_id ile sorgular.
+# İşler sınırlı bir iş parçacığı havuzunda çalışır, bekleyen iş sayısı da sınırlıdır.
+# Durum, result_cache.ResultCache gibi paylaşılan disk önbelleğine de yazılır: gunicorn'da
+# /api/jobs/<id> sorgusu işi çalıştıran worker'a düşmese de bulunur. İş sonucu küçük
+# tutulmalıdır (büyük tablolar results_cache'te, burada yalnızca result_id).
+
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from upload_cache import DiskCache
+
+JOB_WORKERS = int(os.environ.get('JOB_WORKERS', 1))
+MAX_PENDING = int(os.environ.get('JOB_MAX_PENDING', 4))
+JOB_TTL = 3600
+JOB_DIR = os.environ.get('JOB_DIR', os.path.join(tempfile.gettempdir(), 'exoplanet-jobs'))
+JOB_BYTES = 16 * 2 ** 20
+
+# job_id dosya adı olarak kullanılır
+JOB_ID = re.compile(r'[0-9a-f]{32}')
+
+
+class JobQueueFull(Exception):
+    pass
+
+
+class JobRegistry:
+    def __init__(self, workers=JOB_WORKERS, max_pending=MAX_PENDING, ttl=JOB_TTL, directory=JOB_DIR):
+        self.max_pending = max_pending
+        self.ttl = ttl
+        self.disk = DiskCache(directory, JOB_BYTES) if directory else None
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='job')
+        self._jobs = {}
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        for job_id, job in list(self._jobs.items()):
+            if job['finished'] is not None and now - job['finished'] > self.ttl:
+                del self._jobs[job_id]
+
+    def submit(self, fn, *args, **kwargs):
+        job_id = uuid.uuid4().hex
+        with self._lock:
+            self._expire(time.time())
+            pending = sum(1 for job in self._jobs.values() if job['finished'] is None)
+            if pending >= self.max_pending:
+                raise JobQueueFull('Too many background jobs pending')
+            self._jobs[job_id] = {'status': 'queued', 'created': time.time(), 'finished': None,
+                                  'result': None, 'error': None}
+        self._publish(job_id)
+
+        def run():
+            self._update(job_id, status='running')
+            try:
+                result = fn(*args, **kwargs)
+            except Exception as e:
+                self._update(job_id, status='error', error=str(e), finished=time.time())
+            else:
+                self._update(job_id, status='done', result=result, finished=time.time())
+
+        self._pool.submit(run)
+        return job_id
+
+    def _update(self, job_id, **values):
+        with self._lock:
+            if job_id in self._jobs:
+                self._jobs[job_id].update(values)
+        self._publish(job_id)
+
+    def _publish(self, job_id):
+        # Diğer worker'lar için durumun kopyası (atomik dosya değişimi)
+        with self._lock:
+            job = dict(self._jobs[job_id]) if job_id in self._jobs else None
+        if job is not None and self.disk is not None:
+            self.disk.put(job_id, job)
+
+    def get(self, job_id):
+        if not JOB_ID.fullmatch(job_id or ''):
+            return None
+        with self._lock:
+            self._expire(time.time())
+            job = self._jobs.get(job_id)
+            if job is not None:
+                return dict(job)
+
+        # Başka worker'ın işi. TTL bitmiş işte bitişten, bitmemişte oluşturulmadan sayılır
+        # (worker iş sürerken öldüyse kayıt sonsuza dek 'running' kalmaz)
+        if self.disk is None:
+            return None
+        job = self.disk.get(job_id)
+        if job is None or time.time() - (job['finished'] or job['created']) > self.ttl:
+            return None
+        return job
+
+
+background_jobs = JobRegistry()
@@ -0,0 +1,45 @@
+# Ağır modüllerin (pandas, requests, pyarrow) ertelenmiş yüklenmesi
+# Modül ilk öznitelik erişiminde içe aktarılır; yalnızca snapshot'tan yanıt veren veya
+# HTML döndüren uç noktalar bu maliyeti hiç ödemez. Yükleme kilitlidir (iş parçacıkları
+# aynı anda ilk erişimi yapabilir) ve sys.modules'a dokunmaz, modül yüklendikten sonra
+# gerçek modülle aynı davranır.
+
+import importlib
+import importlib.util
+import threading
+
+_lock = threading.Lock()
+
+
+class LazyModule:
+    def __init__(self, name):
+        self.__dict__['_name'] = name
+        self.__dict__['_module'] = None
+
+    def _load(self):
+        module = self.__dict__['_module']
+        if module is None:
+            with _lock:
+                module = self.__dict__['_module']
+                if module is None:
+                    module = importlib.import_module(self.__dict__['_name'])
+                    self.__dict__['_module'] = module
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self.__dict__['_module'] is not None else 'not loaded'
+        return f"<lazy module '{self.__dict__['_name']}' ({state})>"
+
+
+def lazy_import(name, optional=False):
+    # optional: kurulu değilse None (find_spec üst düzey paketi içe aktarmaz)
+    if optional and importlib.util.find_spec(name.partition('.')[0]) is None:
+        return None
+    return LazyModule(name)
+
+
+def is_loaded(module):
+    return not isinstance(module, LazyModule) or module.__dict__['_module'] is not None
@@ -0,0 +1,466 @@
+# Uçtan uca yük testi
+# Sahte TAP sunucusunu (fake_tap.py, kayıtlı TOI / KOI CSV'leri, gecikme ve bant genişliği
+# ayarlı) ayrı bir süreçte başlatır, uygulamayı NASA_TAP_URL onu gösterecek şekilde
+# gunicorn / uvicorn / Flask ile ayağa kaldırır ve artan eşzamanlılıkta karışık bir senaryo
+# çalıştırır. Her sanal kullanıcı kapalı döngüde ağırlıklara göre bir adım seçer:
+#   index     - GET /
+#   calculate - POST /api/calculate (rastgele parametreler)
+#   nasa      - GET /api/nasa_auto (verilen tablolara göre toi / koi)
+#   upload    - POST /api/analyze_file (--upload dosyası; --unique-uploads ile önbelleği atlar)
+#   export    - POST /api/export (son sonucun result_id'si; sonuç süresi dolup 404 alırsa
+#               arayüz gibi satırlarla tekrar: export_rows)
+# Rapor: her seviye ve uç nokta için istek sayısı, verim (istek/s), p50 / p95 / p99 gecikme,
+# hata oranı ve durum kodları; sunucu süreç ağacının tepe RSS'i (Linux, /proc).
+#
+# Kullanım:
+#   python loadtest.py --table toi=toi.csv --table cumulative=koi.csv \
+#       --server gunicorn --workers 2 --threads 8 --levels 1,4,16,32 --duration 30 \
+#       --latency 0.5 --bandwidth 2000000 --json report.json
+#   python loadtest.py --target http://127.0.0.1:5000 --levels 8   # çalışan sunucuya karşı
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+import requests
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_MIX = 'index=3,calculate=5,nasa=2,upload=1,export=1'
+SCENARIOS = ('index', 'calculate', 'nasa', 'upload', 'export')
+# Sahte TAP tablo adı -> nasa_auto kaynağı
+TABLE_SOURCES = {'toi': 'toi', 'cumulative': 'koi'}
+PERCENTILES = (50, 95, 99)
+RSS_INTERVAL = 0.2
+READY_TIMEOUT = 60
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def wait_ready(url, proc=None, timeout=READY_TIMEOUT):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if proc is not None and proc.poll() is not None:
+            raise RuntimeError(f'process exited with code {proc.returncode}: {url}')
+        try:
+            requests.get(url, timeout=2)
+            return
+        except requests.RequestException:
+            time.sleep(0.2)
+    raise RuntimeError(f'not ready after {timeout:.0f}s: {url}')
+
+
+def parse_mix(text):
+    mix = {}
+    for part in text.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f'Unknown scenario: {name}, expected one of {list(SCENARIOS)}')
+        mix[name] = float(weight or 1)
+    return {name: weight for name, weight in mix.items() if weight > 0}
+
+
+def percentile(sorted_values, q):
+    # En yakın sıra yöntemi
+    if not sorted_values:
+        return None
+    k = max(0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[k]
+
+
+# --- süreçler ---
+
+def start_fake_tap(tables, latency, bandwidth, fail_rate):
+    port = free_port()
+    cmd = [sys.executable, os.path.join(HERE, 'fake_tap.py'), '--port', str(port), '--delay', str(latency),
+           '--bandwidth', str(bandwidth), '--fail-rate', str(fail_rate)]
+    for name, path in tables.items():
+        cmd += ['--table', f'{name}={os.path.abspath(path)}']
+    proc = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    url = f'http://127.0.0.1:{port}/TAP'
+    wait_ready(url + '/', proc)
+    return proc, url
+
+
+def server_command(kind, port, workers, threads, timeout):
+    if kind == 'gunicorn':
+        return [sys.executable, '-m', 'gunicorn', 'app:app', '-b', f'127.0.0.1:{port}', '-w', str(workers),
+                '--threads', str(threads), '--timeout', str(int(timeout))]
+    if kind == 'uvicorn':
+        return [sys.executable, '-m', 'uvicorn', 'asgi:app', '--port', str(port), '--workers', str(workers),
+                '--log-level', 'warning']
+    # Geliştirme sunucusu (app.py __main__, iş parçacıklı)
+    return [sys.executable, 'app.py']
+
+
+def start_app(kind, tap_url, workers, threads, timeout, env_overrides, log):
+    port = free_port()
+    env = dict(os.environ, NASA_TAP_URL=tap_url, PORT=str(port), **env_overrides)
+    proc = subprocess.Popen(server_command(kind, port, workers, threads, timeout), cwd=HERE, env=env,
+                            stdout=log, stderr=subprocess.STDOUT)
+    url = f'http://127.0.0.1:{port}'
+    wait_ready(url + '/api/profiles', proc)
+    return proc, url
+
+
+def stop(proc):
+    if proc is None or proc.poll() is not None:
+        return
+    proc.terminate()
+    try:
+        proc.wait(10)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+        proc.wait()
+
+
+# --- RSS ---
+
+def process_tree(pid):
+    # pid ve tüm alt süreçleri (gunicorn / uvicorn worker'ları)
+    children = {}
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as fh:
+                ppid = int(fh.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    tree, stack = [], [pid]
+    while stack:
+        p = stack.pop()
+        tree.append(p)
+        stack.extend(children.get(p, ()))
+    return tree
+
+
+def process_rss(pid):
+    try:
+        with open(f'/proc/{pid}/status') as fh:
+            for line in fh:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return 0
+
+
+class RssSampler:
+    # Sunucu süreç ağacının toplam RSS'i arka planda örneklenir; yalnızca Linux
+    def __init__(self, pid, interval=RSS_INTERVAL):
+        self.pid = pid
+        self.interval = interval
+        self.enabled = pid is not None and os.path.exists('/proc/self/status')
+        self.peak = 0
+        self.overall = 0
+        self._stop = threading.Event()
+        self._thread = None
+
+    def sample(self):
+        return sum(process_rss(p) for p in process_tree(self.pid))
+
+    def reset(self):
+        # Seviye başında tepe değer o anki RSS'e çekilir; overall tüm seviyelerin tepesidir
+        self.peak = self.sample() if self.enabled else 0
+        self.overall = max(self.overall, self.peak)
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.peak = max(self.peak, self.sample())
+            self.overall = max(self.overall, self.peak)
+
+    def __enter__(self):
+        if self.enabled:
+            self.reset()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+# --- senaryo ---
+
+class VirtualUser:
+    def __init__(self, base_url, mix, sources, upload, unique_uploads, timeout, seed):
+        self.base_url = base_url
+        self.names = list(mix)
+        self.weights = list(mix.values())
+        self.sources = sources
+        self.upload = upload
+        self.unique_uploads = unique_uploads
+        self.timeout = timeout
+        self.random = random.Random(seed)
+        self.session = requests.Session()
+        # Son analizin sonucu (export için)
+        self.result_id = None
+        self.rows = None
+
+    def close(self):
+        self.session.close()
+
+    def request(self, method, path, **kwargs):
+        # (durum kodu ya da hata adı, yanıt)
+        try:
+            r = self.session.request(method, self.base_url + path, timeout=self.timeout, **kwargs)
+            return r.status_code, r
+        except requests.Timeout:
+            return 'timeout', None
+        except requests.RequestException as e:
+            return type(e).__name__, None
+
+    def remember(self, status, r):
+        if status != 200:
+            return
+        try:
+            body = r.json()
+        except ValueError:
+            return
+        if body.get('data'):
+            self.result_id = body.get('result_id')
+            self.rows = body['data']
+
+    # Her adım [(uç nokta, durum, süre)] döndürür
+
+    def index(self):
+        return [('index',) + self.timed('GET', '/')]
+
+    def calculate(self):
+        rnd = self.random
+        body = {'period': round(rnd.uniform(0.5, 400), 3), 'duration': round(rnd.uniform(0.5, 12), 2),
+                'depth': round(rnd.uniform(50, 20000), 1), 'star_mag': round(rnd.uniform(7, 16), 2),
+                'source': rnd.choice(('toi', 'koi'))}
+        return [('calculate',) + self.timed('POST', '/api/calculate', json=body)]
+
+    def nasa(self):
+        status, seconds, r = self.timed('GET', '/api/nasa_auto', keep=True,
+                                        params={'source': self.random.choice(self.sources)})
+        self.remember(status, r)
+        return [('nasa', status, seconds)]
+
+    def upload_file(self):
+        name, data = self.upload
+        if self.unique_uploads:
+            # CSV yorum satırı: içerik (ve önbellek anahtarı) değişir, skorlanan satırlar değişmez
+            data = data + f'\n# loadtest {uuid.uuid4().hex}\n'.encode()
+        status, seconds, r = self.timed('POST', '/api/analyze_file', keep=True,
+                                        files={'file': (name, data)}, data={'source': 'file', 'mode': 'full'})
+        self.remember(status, r)
+        return [('upload', status, seconds)]
+
+    def export(self):
+        fmt = self.random.choice(('csv', 'xlsx'))
+        if self.rows is None:
+            # Henüz analiz yok: arayüzdeki gibi önce bir katalog yüklenir
+            steps = self.nasa() if self.sources else self.upload_file()
+            if self.rows is None:
+                return steps
+        else:
+            steps = []
+        if self.result_id:
+            status, seconds = self.timed('POST', '/api/export', json={'format': fmt, 'result_id': self.result_id})
+            steps.append(('export', status, seconds))
+            if status != 404:
+                return steps
+            self.result_id = None
+        steps.append(('export_rows',) + self.timed('POST', '/api/export', json={'format': fmt, 'data': self.rows}))
+        return steps
+
+    def timed(self, method, path, keep=False, **kwargs):
+        start = time.perf_counter()
+        status, r = self.request(method, path, **kwargs)
+        seconds = time.perf_counter() - start
+        return (status, seconds, r) if keep else (status, seconds)
+
+    def step(self):
+        name = self.random.choices(self.names, self.weights)[0]
+        if name == 'upload':
+            return self.upload_file()
+        return getattr(self, name)()
+
+
+def run_level(base_url, users, duration, mix, sources, upload, unique_uploads, timeout, seed):
+    # Kapalı döngü: her kullanıcı yanıtı bekleyip sıradaki adıma geçer; süre dolunca
+    # devam eden adım tamamlanır
+    samples = []
+    lock = threading.Lock()
+    deadline = time.monotonic() + duration
+
+    def worker(i):
+        user = VirtualUser(base_url, mix, sources, upload, unique_uploads, timeout, seed * 1000003 + i)
+        try:
+            while time.monotonic() < deadline:
+                steps = user.step()
+                with lock:
+                    samples.extend(steps)
+        finally:
+            user.close()
+
+    start = time.perf_counter()
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(users)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return samples, time.perf_counter() - start
+
+
+def summarize(samples, wall):
+    by_endpoint = {}
+    for endpoint, status, seconds in samples:
+        by_endpoint.setdefault(endpoint, []).append((status, seconds))
+    by_endpoint['total'] = [(status, seconds) for _, status, seconds in samples]
+
+    report = {}
+    for endpoint, items in by_endpoint.items():
+        latencies = sorted(seconds for _, seconds in items)
+        codes = {}
+        for status, _ in items:
+            codes[str(status)] = codes.get(str(status), 0) + 1
+        errors = sum(1 for status, _ in items if not (isinstance(status, int) and status < 400))
+        report[endpoint] = {
+            'requests': len(items),
+            'throughput': len(items) / wall if wall else 0.0,
+            **{f'p{q}': percentile(latencies, q) for q in PERCENTILES},
+            'max': latencies[-1] if latencies else None,
+            'error_rate': errors / len(items) if items else 0.0,
+            'codes': codes,
+        }
+    return report
+
+
+def print_level(level):
+    ms = lambda v: f"{v * 1000:9.0f}" if v is not None else f"{'-':>9}"
+    rss = f"{level['peak_rss'] / 2 ** 20:.0f} MB" if level['peak_rss'] else '-'
+    print(f"\n👥 {level['users']} eşzamanlı kullanıcı, {level['wall']:.1f} s, tepe RSS {rss}")
+    print(f"   {'uç nokta':<12}{'istek':>7}{'istek/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+          f"{'hata %':>8}  durum kodları")
+    for endpoint, row in level['endpoints'].items():
+        codes = ' '.join(f'{k}:{v}' for k, v in sorted(row['codes'].items()))
+        print(f"   {endpoint:<12}{row['requests']:>7}{row['throughput']:>9.1f}{ms(row['p50'])}{ms(row['p95'])}"
+              f"{ms(row['p99'])}{row['error_rate'] * 100:>8.1f}  {codes}")
+
+
+def read_upload(path, tables):
+    # Varsayılan yükleme: ilk tablonun CSV'si
+    path = path or next(iter(tables.values()), None)
+    if path is None:
+        return None
+    with open(path, 'rb') as fh:
+        return os.path.basename(path), fh.read()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Load-test the app against a local fake NASA TAP server')
+    parser.add_argument('--table', action='append', default=[], metavar='NAME=CSV',
+                        help='recorded TAP table for the fake server, e.g. toi=toi.csv or cumulative=koi.csv')
+    parser.add_argument('--latency', type=float, default=0.0, help='fake TAP delay per query in seconds')
+    parser.add_argument('--bandwidth', type=float, default=0,
+                        help='fake TAP bytes per second per connection (0 for unlimited)')
+    parser.add_argument('--tap-fail-rate', type=float, default=0.0, help='fraction of TAP requests answered with 503')
+    parser.add_argument('--server', choices=('gunicorn', 'uvicorn', 'flask'), default='gunicorn')
+    parser.add_argument('--workers', type=int, default=1)
+    parser.add_argument('--threads', type=int, default=8, help='gunicorn threads per worker')
+    parser.add_argument('--env', action='append', default=[], metavar='NAME=VALUE',
+                        help='extra environment for the app, e.g. SNAPSHOT_TTL=0 (repeatable)')
+    parser.add_argument('--target', help='test an already running server instead (no fake TAP, no RSS)')
+    parser.add_argument('--levels', default='1,4,16,32', help='comma-separated concurrent user counts')
+    parser.add_argument('--duration', type=float, default=20, help='seconds per level')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f'scenario weights (default {DEFAULT_MIX})')
+    parser.add_argument('--upload', help='file for upload steps (default: the first --table CSV)')
+    parser.add_argument('--unique-uploads', action='store_true',
+                        help='make every upload distinct so the upload cache is bypassed')
+    parser.add_argument('--timeout', type=float, default=120, help='client timeout per request in seconds')
+    parser.add_argument('--max-error-rate', type=float, default=None,
+                        help='stop ramping once a level exceeds this total error rate (0-1)')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help='also write the report to this file')
+    args = parser.parse_args(argv)
+
+    try:
+        mix = parse_mix(args.mix)
+        levels = [int(x) for x in args.levels.split(',') if x.strip()]
+    except ValueError as e:
+        parser.error(str(e))
+    tables = dict(t.split('=', 1) for t in args.table)
+    sources = [TABLE_SOURCES[name] for name in tables if name in TABLE_SOURCES]
+    if args.target is None and 'nasa' in mix and not sources:
+        parser.error('the nasa scenario needs --table toi=... and/or --table cumulative=...')
+    if args.target is not None and not sources:
+        sources = ['toi']
+    upload = read_upload(args.upload, tables)
+    if upload is None:
+        mix.pop('upload', None)
+    if not mix:
+        parser.error('empty scenario mix')
+
+    tap = app_proc = None
+    log = tempfile.NamedTemporaryFile(prefix='loadtest-', suffix='.log', delete=False)
+    snapshot_dir = tempfile.TemporaryDirectory(prefix='loadtest-snapshots-')
+    try:
+        if args.target:
+            base_url = args.target.rstrip('/')
+        else:
+            tap, tap_url = start_fake_tap(tables, args.latency, args.bandwidth, args.tap_fail_rate)
+            env = {'SNAPSHOT_DIR': snapshot_dir.name, 'UPLOAD_CACHE_DIR': os.path.join(snapshot_dir.name, 'uploads'),
+                   'RESULT_CACHE_DIR': os.path.join(snapshot_dir.name, 'results'),
+                   'JOB_DIR': os.path.join(snapshot_dir.name, 'jobs')}
+            env.update(dict(e.split('=', 1) for e in args.env))
+            app_proc, base_url = start_app(args.server, tap_url, args.workers, args.threads, args.timeout, env, log)
+            print(f"🛰️ Sahte TAP: {tap_url} (gecikme {args.latency} s, bant genişliği "
+                  f"{args.bandwidth / 1e6:.1f} MB/s)" if args.bandwidth else
+                  f"🛰️ Sahte TAP: {tap_url} (gecikme {args.latency} s)")
+            print(f"🚀 {args.server}: {base_url} ({args.workers} worker, {args.threads} thread), log: {log.name}")
+
+        report = {
+            'config': {'server': None if args.target else args.server, 'workers': args.workers,
+                       'threads': args.threads, 'target': base_url, 'latency': args.latency,
+                       'bandwidth': args.bandwidth, 'mix': mix, 'duration': args.duration},
+            'levels': [],
+        }
+        with RssSampler(app_proc.pid if app_proc else None) as rss:
+            for users in levels:
+                rss.reset()
+                samples, wall = run_level(base_url, users, args.duration, mix, sources, upload,
+                                          args.unique_uploads, args.timeout, args.seed + users)
+                level = {'users': users, 'wall': wall, 'peak_rss': rss.peak if rss.enabled else None,
+                         'endpoints': summarize(samples, wall)}
+                report['levels'].append(level)
+                print_level(level)
+                if args.max_error_rate is not None and level['endpoints']['total']['error_rate'] > args.max_error_rate:
+                    print(f"\n⛔ Hata oranı %{args.max_error_rate * 100:.1f} sınırını aştı, artış durduruldu")
+                    break
+            report['peak_rss'] = rss.overall if rss.enabled else None
+        if report['peak_rss']:
+            print(f"\n📈 Tepe RSS (tüm seviyeler): {report['peak_rss'] / 2 ** 20:.0f} MB")
+
+        if args.json:
+            with open(args.json, 'w') as fh:
+                json.dump(report, fh, indent=2)
+            print(f"💾 Rapor: {args.json}")
+    finally:
+        stop(app_proc)
+        stop(tap)
+        log.close()
+        snapshot_dir.cleanup()
+
+
+if __name__ == '__main__':
+    main()
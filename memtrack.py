@@ -0,0 +1,356 @@
+# İstek başına bellek muhasebesi ve bellek bütçesi
+# MEMTRACK=1 ile açılır: her izlenen istek için tracemalloc tepe ayırması ve RSS artışı
+# aşama bazında (parse, score, serialize, export) kaydedilir ve her istek sonunda log'a
+# tek satır yazılır; OOM ile ölen worker'da son satırlar hangi isteğin büyüdüğünü gösterir.
+# tracemalloc süreç genelidir: aynı anda çalışan istekler birbirinin tepesini görebilir,
+# bu kayıtlar 'overlapped' ile işaretlenir. SSE üreticisi gibi yanıt döndükten sonra
+# süren işler background() ile kendi iş parçacığında aynı şekilde kaydedilir.
+#
+# MEMORY_BUDGET_MB verilirse (izleme kapalı olsa da) yükleme ayrıştırılmadan önce boyut,
+# satır ve kolon sayısından bellek tahmini yapılır; bütçeyi aşacak istekler parçalı yola
+# alınır, o da aşıyorsa 413 ile reddedilir.
+
+import contextlib
+import functools
+import io
+import os
+import threading
+import time
+import tracemalloc
+import zipfile
+from collections import deque
+
+from flask import g, has_request_context, request
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+MEMTRACK = os.environ.get('MEMTRACK', '').lower() in ('1', 'true', 'yes')
+MEMORY_BUDGET = int(float(os.environ.get('MEMORY_BUDGET_MB', 0)) * 2 ** 20)
+HISTORY = 100
+
+# Tahmin katsayıları (pandas 'python' motoru, TOI / KOI katalogları ile ölçüldü)
+PARSE_BYTES_PER_BYTE = 10       # CSV metni -> DataFrame tepe ayırması
+PARSE_BYTES_PER_CELL = 96       # çok kolonlu, kısa değerli dosyalar için alt sınır
+XLSX_BYTES_PER_XML_BYTE = 2     # openpyxl: açılmış sayfa XML'i başına
+SPLIT_BYTES_PER_BYTE = 2.5      # split_csv: satır listesi + parçalar
+SCORE_BYTES_PER_ROW = 400       # skor dizileri + CandidateTable
+SERIALIZE_BYTES_PER_ROW = 1100  # to_records + JSON
+TABLE_BYTES_PER_ROW = 64        # birleştirilmiş CandidateTable
+COLUMNAR_BYTES_PER_CELL = 16    # Parquet çözme + float64 dönüşümü
+DRAW_BYTES = 8 * 12             # uncertainty._BYTES_PER_DRAW
+DRAW_WORKSPACE = 64 * 2 ** 20   # uncertainty.DEFAULT_MEMORY_BUDGET
+# Okumadan önce: ham yükleme en az bu kadar katı yer tutar
+MIN_BYTES_PER_UPLOAD_BYTE = 2
+
+MB = 2 ** 20
+
+
+class MemoryBudgetExceeded(Exception):
+    def __init__(self, estimate, budget, hint=''):
+        self.estimate = estimate
+        self.budget = budget
+        message = (f'Request needs an estimated {estimate / MB:.0f} MB of memory, '
+                   f'over the {budget / MB:.0f} MB budget')
+        super().__init__(f'{message}; {hint}' if hint else message)
+
+
+def current_rss():
+    # Linux: /proc'tan anlık RSS; diğerlerinde tepe RSS (yoksa None)
+    try:
+        with open('/proc/self/statm') as fh:
+            return int(fh.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError, AttributeError):
+        return peak_rss()
+
+
+def peak_rss():
+    if resource is None:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def _csv_shape(data):
+    # (satır, kolon): yorum / boş satırlardan sonraki ilk satır başlıktır
+    start = 0
+    while True:
+        end = data.find(b'\n', start)
+        line = data[start:end if end >= 0 else len(data)].strip()
+        if line and not line.startswith(b'#'):
+            break
+        if end < 0:
+            return 0, 0
+        start = end + 1
+    return max(data.count(b'\n', start) - 1, 1), line.count(b',') + 1
+
+
+def _excel_shape(data):
+    # (satır, kolon, açılmış sayfa XML boyutu); sayfa okunmadan, yalnızca boyut etiketinden
+    try:
+        from openpyxl import load_workbook
+        with zipfile.ZipFile(io.BytesIO(data)) as z:
+            xml = sum(i.file_size for i in z.infolist()
+                      if i.filename.startswith('xl/worksheets/') or 'sharedStrings' in i.filename)
+        wb = load_workbook(io.BytesIO(data), read_only=True)
+        ws = wb.worksheets[0]
+        shape = (ws.max_row or 1) - 1, ws.max_column or 1, xml
+        wb.close()
+        return shape
+    except Exception:
+        # .xls veya okunamayan dosya: CSV katsayıları ile kaba tahmin
+        return len(data) // 100, 1, len(data)
+
+
+def _work(n, draws):
+    # n satırlık bir parçanın skorlama + belirsizlik çalışma alanı
+    total = n * SCORE_BYTES_PER_ROW
+    if draws:
+        total += min(n * draws * DRAW_BYTES, DRAW_WORKSPACE)
+    return total
+
+
+def estimate_upload(data, kind='csv', chunk_rows=2000, draws=None):
+    # Ayrıştırmadan önce bayt cinsinden tahmin: tam ayrıştırma ve parça parça ayrıştırma
+    size = len(data)
+    if kind == 'csv':
+        rows, columns = _csv_shape(data)
+        parse_full = max(size * PARSE_BYTES_PER_BYTE, rows * columns * PARSE_BYTES_PER_CELL)
+    else:
+        rows, columns, xml = _excel_shape(data)
+        parse_full = max(xml * XLSX_BYTES_PER_XML_BYTE, rows * columns * PARSE_BYTES_PER_CELL)
+
+    serialize = rows * SERIALIZE_BYTES_PER_ROW
+    estimate = {
+        'bytes': size,
+        'rows': rows,
+        'columns': columns,
+        'full': size + parse_full + _work(rows, draws) + serialize,
+        'chunked': None,
+    }
+    if kind == 'csv' and rows:
+        chunk = min(rows, chunk_rows)
+        estimate['chunked'] = int(size + size * SPLIT_BYTES_PER_BYTE + parse_full * chunk / rows
+                                  + _work(chunk, draws) + rows * TABLE_BYTES_PER_ROW + serialize)
+    return estimate
+
+
+def estimate_columnar(size, rows, columns, batch_rows, draws=None):
+    # Parquet / Arrow her zaman satır grubu başına okunur: ham içerik + en büyük grubun
+    # float64 kolonları + skorlama + birleştirilmiş tablo + JSON
+    batch = min(rows, batch_rows)
+    return {
+        'bytes': size,
+        'rows': rows,
+        'columns': columns,
+        'full': int(size + batch * columns * COLUMNAR_BYTES_PER_CELL + _work(batch, draws)
+                    + rows * TABLE_BYTES_PER_ROW + rows * SERIALIZE_BYTES_PER_ROW),
+        'chunked': None,
+    }
+
+
+class RequestMemory:
+    def __init__(self, endpoint):
+        self.endpoint = endpoint
+        self.started = time.monotonic()
+        self.rss_start = current_rss()
+        self.base = tracemalloc.get_traced_memory()[0]
+        self.peak = 0
+        self.stages = {}
+        self.notes = {}
+        self.overlapped = False
+
+    def record(self, name, seconds, peak, retained, rss_growth):
+        stage = self.stages.setdefault(name, {'calls': 0, 'seconds': 0.0, 'peak': 0,
+                                              'retained': 0, 'rss_growth': 0})
+        stage['calls'] += 1
+        stage['seconds'] += seconds
+        stage['peak'] = max(stage['peak'], peak)
+        stage['retained'] += retained
+        if rss_growth is not None:
+            stage['rss_growth'] += rss_growth
+
+    def finish(self, status):
+        current, peak = tracemalloc.get_traced_memory()
+        self.peak = max(self.peak, peak - self.base)
+        rss_end = current_rss()
+        return {
+            'endpoint': self.endpoint,
+            'status': status,
+            'time': time.time(),
+            'seconds': round(time.monotonic() - self.started, 3),
+            'peak': self.peak,
+            'retained': current - self.base,
+            'rss_growth': rss_end - self.rss_start if rss_end is not None and self.rss_start is not None else None,
+            'rss': rss_end,
+            'overlapped': self.overlapped,
+            'stages': {name: dict(stage, seconds=round(stage['seconds'], 3))
+                       for name, stage in self.stages.items()},
+            **self.notes,
+        }
+
+
+class MemoryTracker:
+    def __init__(self, enabled=MEMTRACK, budget=MEMORY_BUDGET, history=HISTORY):
+        self.enabled = enabled
+        self.budget = budget
+        self.history = deque(maxlen=history)
+        self._active = 0
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _current(self):
+        if not self.enabled:
+            return None
+        if has_request_context():
+            return g.get('_memory')
+        return getattr(self._local, 'memory', None)
+
+    # --- izleme ---
+
+    def _begin(self, endpoint):
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        with self._lock:
+            self._active += 1
+        return RequestMemory(endpoint)
+
+    def _end(self, mem, status):
+        with self._lock:
+            mem.overlapped = mem.overlapped or self._active > 1
+            self._active -= 1
+        record = mem.finish(status)
+        self.history.append(record)
+        self._log(record)
+
+    def track(self, view):
+        # Flask view dekoratörü; izleme kapalıysa doğrudan view çağrılır
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if not self.enabled:
+                return view(*args, **kwargs)
+
+            g._memory = mem = self._begin(request.endpoint)
+            status = 500
+            try:
+                response = view(*args, **kwargs)
+                status = response[1] if isinstance(response, tuple) else getattr(response, 'status_code', 200)
+                return response
+            finally:
+                self._end(mem, status)
+        return wrapper
+
+    @contextlib.contextmanager
+    def background(self, endpoint):
+        # İstek bağlamı dışındaki iş parçacığı (SSE üreticisi) için track karşılığı: stage /
+        # iterate / note bu iş parçacığında bu kayda yazılır. Durum: hatada e.status veya 500
+        if not self.enabled:
+            yield
+            return
+
+        self._local.memory = mem = self._begin(endpoint)
+        status = 500
+        try:
+            yield
+            status = 200
+        except Exception as e:
+            status = getattr(e, 'status', 500)
+            raise
+        finally:
+            self._local.memory = None
+            self._end(mem, status)
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        mem = self._current()
+        if mem is None:
+            yield
+            return
+
+        start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        rss = current_rss()
+        t0 = time.monotonic()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            rss_end = current_rss()
+            mem.peak = max(mem.peak, peak - mem.base)
+            mem.record(name, time.monotonic() - t0, peak - start, current - start,
+                       rss_end - rss if rss is not None and rss_end is not None else None)
+            with self._lock:
+                mem.overlapped = mem.overlapped or self._active > 1
+
+    def iterate(self, name, iterable):
+        # Üreteç tabanlı okuma (akış halinde CSV / TAP): her next() çağrısı aşamaya sayılır
+        iterator = iter(iterable)
+        while True:
+            with self.stage(name):
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    return
+            yield item
+
+    def note(self, **values):
+        # Tahmin ve seçilen yol gibi bilgiler istek kaydına eklenir
+        mem = self._current()
+        if mem is not None:
+            mem.notes.update(values)
+
+    def _log(self, record):
+        stages = ', '.join(f"{name} {stage['peak'] / MB:.1f} MB" for name, stage in record['stages'].items())
+        rss = f"{record['rss_growth'] / MB:+.1f} MB" if record['rss_growth'] is not None else '?'
+        print(f"🧠 {record['endpoint']} [{record['status']}] tepe {record['peak'] / MB:.1f} MB, "
+              f"RSS {rss} ({stages}){' *' if record['overlapped'] else ''}", flush=True)
+
+    # --- bütçe ---
+
+    def check_upload(self, content_length):
+        # Dosya okunmadan önce (Content-Length) ve okunurken (o ana kadar okunan bayt):
+        # ham içerik tek başına bütçeyi aşacaksa hemen reddedilir
+        if self.budget and content_length and content_length * MIN_BYTES_PER_UPLOAD_BYTE > self.budget:
+            raise MemoryBudgetExceeded(content_length * MIN_BYTES_PER_UPLOAD_BYTE, self.budget,
+                                       'upload a smaller file')
+
+    def fits(self, nbytes):
+        # Tahmini bütçeye sığıyor mu (bütçe yoksa her zaman)
+        return not self.budget or (nbytes is not None and nbytes <= self.budget)
+
+    def plan(self, estimate):
+        # 'full' (tek DataFrame) veya 'chunked' (parça parça); ikisi de sığmıyorsa hata
+        self.note(estimate=estimate, budget=self.budget)
+        if self.fits(estimate['full']):
+            plan = 'full'
+        elif self.fits(estimate['chunked']):
+            plan = 'chunked'
+        else:
+            hint = 'split the file into smaller files' if estimate['chunked'] is not None else \
+                'convert it to CSV or split it into smaller files'
+            raise MemoryBudgetExceeded(estimate['chunked'] or estimate['full'], self.budget, hint)
+        self.note(plan=plan)
+        return plan
+
+    def stats(self):
+        traced = tracemalloc.get_traced_memory() if tracemalloc.is_tracing() else (None, None)
+        history = list(self.history)
+        worst = {}
+        for record in history:
+            if record['peak'] > worst.get(record['endpoint'], {'peak': -1})['peak']:
+                worst[record['endpoint']] = record
+        return {
+            'enabled': self.enabled,
+            'budget': self.budget or None,
+            'rss': current_rss(),
+            'rss_peak': peak_rss(),
+            'traced_current': traced[0],
+            'traced_peak': traced[1],
+            'active': self._active,
+            'recent': history[-20:],
+            'worst': worst,
+        }
+
+
+memory = MemoryTracker()
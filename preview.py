@@ -0,0 +1,160 @@
+# Büyük yüklemeler için hızlı ön izleme
+# Dosya bir kez akış halinde, yalnızca skor kolonları okunarak taranır; skorlanan her parça:
+#   - sabit boyutlu, düzgün dağılımlı rezervuar örneklemine (Algoritma R, vektörel; grafikler)
+#   - skora göre kesin ilk k adaya
+#   - skorlanmış parçalar listesine eklenir.
+# Tüm satırlar zaten skorlandığı için istatistikler kesindir (summarize ile aynı alanlar +
+# etiket payları); parçalar arka plandaki kesin analize verilir, dosya yeniden ayrıştırılıp
+# skorlanmaz. estimate_stats örneklem verilirse güven aralıklarıyla tahmin de yapar.
+
+import math
+
+import numpy as np
+
+from candidate_table import DECIMALS, CandidateTable
+from scoring import LABELS
+
+PREVIEW_SAMPLE = 5000
+PREVIEW_TOP = 100
+CONFIDENCE = 0.95
+Z_SCORE = 1.959964
+PASS_SCORE = 80
+
+
+class Reservoir:
+    def __init__(self, size=PREVIEW_SAMPLE, seed=None):
+        self.size = size
+        self.seen = 0
+        self.table = None
+        self._rng = np.random.default_rng(seed)
+
+    def add(self, table):
+        # t. eleman (0 tabanlı) t < size ise doğrudan eklenir, değilse [0, t] aralığından
+        # çekilen yuva size'dan küçükse o yuvaya yazılır. Aynı parçada aynı yuvaya düşen
+        # elemanlardan sonuncusu kalır (sıralı Algoritma R ile aynı)
+        n = len(table)
+        if n == 0:
+            return
+        t = self.seen + np.arange(n)
+        slots = np.where(t < self.size, t, self._rng.integers(0, t + 1))
+        keep = np.flatnonzero(slots < self.size)
+        self.seen += n
+        if len(keep) == 0:
+            return
+
+        current = 0 if self.table is None else len(self.table)
+        combined = CandidateTable.concat([self.table, table])
+        index = np.arange(min(self.size, self.seen))
+        index[slots[keep]] = current + keep
+        self.table = combined.take(index)
+
+
+class TopK:
+    def __init__(self, k=PREVIEW_TOP):
+        self.k = k
+        self.table = None
+
+    def add(self, table):
+        # Önceki ilk k dosyada önce geldiği için kararlı sıralama eşitlikte dosya sırasını korur
+        self.table = CandidateTable.concat([self.table, table]).sort()[:self.k]
+
+
+def wilson(successes, n, z):
+    # Oran için Wilson aralığı (0-1)
+    if n == 0:
+        return 0.0, 0.0
+    p = successes / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return max(0.0, center - half), min(1.0, center + half)
+
+
+def estimate_stats(scores, codes, population, z=Z_SCORE):
+    # summarize() ile aynı alanlar + güven aralıkları. Sonlu popülasyon düzeltmesi:
+    # örneklem tüm satırları kapsıyorsa aralıklar tek noktaya iner
+    scores = np.asarray(scores, dtype=np.float64)
+    m = len(scores)
+    if m == 0:
+        return {'total': population, 'mean': 0, 'median': 0, 'std': 0, 'pass_rate': 0,
+                'estimated': True, 'sample': 0, 'confidence': CONFIDENCE, 'intervals': {}, 'labels': {}}
+
+    fpc = math.sqrt((population - m) / (population - 1)) if population > 1 else 0.0
+    zf = z * fpc
+
+    mean = float(np.mean(scores))
+    std = float(np.std(scores))
+    median = float(np.median(scores))
+    mean_half = zf * float(np.std(scores, ddof=1)) / math.sqrt(m) if m > 1 else 0.0
+    std_half = zf * std / math.sqrt(2 * (m - 1)) if m > 1 else 0.0
+
+    # Medyan: dağılımdan bağımsız sıra istatistiği aralığı
+    median_interval = (median, median)
+    if zf > 0:
+        ordered = np.sort(scores)
+        lo = max(0, math.floor((m - zf * math.sqrt(m)) / 2) - 1)
+        hi = min(m - 1, math.ceil((m + zf * math.sqrt(m)) / 2))
+        median_interval = (min(float(ordered[lo]), median), max(float(ordered[hi]), median))
+
+    passed = int(np.count_nonzero(scores >= PASS_SCORE))
+    pass_interval = wilson(passed, m, zf)
+
+    codes = np.asarray(codes)
+    labels = {}
+    for code, label in enumerate(LABELS):
+        count = int(np.count_nonzero(codes == code))
+        share_lo, share_hi = wilson(count, m, zf)
+        labels[label] = {
+            'share': round(count / m * 100, 2),
+            'interval': [round(share_lo * 100, 2), round(share_hi * 100, 2)],
+            'count': round(count / m * population),
+        }
+
+    return {
+        'total': population,
+        'mean': round(mean, 2),
+        'median': round(median, 2),
+        'std': round(std, 2),
+        'pass_rate': round(passed / m * 100, 2),
+        'estimated': fpc > 0,
+        'sample': m,
+        'confidence': CONFIDENCE,
+        'intervals': {
+            'mean': [round(mean - mean_half, 2), round(mean + mean_half, 2)],
+            'median': [round(median_interval[0], 2), round(median_interval[1], 2)],
+            'std': [round(max(0.0, std - std_half), 2), round(std + std_half, 2)],
+            'pass_rate': [round(pass_interval[0] * 100, 2), round(pass_interval[1] * 100, 2)],
+        },
+        'labels': labels,
+    }
+
+
+class Preview:
+    def __init__(self, sample=PREVIEW_SAMPLE, top=PREVIEW_TOP, seed=None):
+        self.reservoir = Reservoir(sample, seed)
+        self.top = TopK(top)
+        self.parts = []
+
+    def add(self, table):
+        self.reservoir.add(table)
+        self.top.add(table)
+        self.parts.append(table)
+
+    @property
+    def total(self):
+        return self.reservoir.seen
+
+    def sample(self):
+        return self.reservoir.table if self.reservoir.table is not None else CandidateTable.empty()
+
+    def top_table(self):
+        return self.top.table if self.top.table is not None else CandidateTable.empty()
+
+    def stats(self):
+        # Örneklem = tüm satırlar: aralıklar tek noktaya iner, 'estimated' False.
+        # Skorlar CandidateTable.values('score') gibi yuvarlanır (tam analizle aynı sayılar)
+        if not self.parts:
+            return estimate_stats([], [], 0)
+        scores = np.concatenate([part['score'] for part in self.parts]).astype(np.float64)
+        codes = np.concatenate([part['label'] for part in self.parts])
+        return estimate_stats(np.round(scores, DECIMALS['score']), codes, self.total)
@@ -0,0 +1,194 @@
+# Skorlama profilleri
+# Ağırlıklar, bileşen fonksiyonları (basamak veya yumuşak sigmoid) ve get_label eşikleri
+# config dosyasından okunur ve vektörel dizi çekirdeklerine derlenir.
+#
+# scoring_profiles.json örneği:
+#   {"smooth": {"weights": [0.58, 0.27, 0.08, 0.07],
+#               "components": {"depth": {"type": "sigmoid", "op": ">", "cut": 500, "width": 150,
+#                                        "then": 1.0, "else": 0.3}},
+#               "labels": {"mid": 46, "high": 80}}}
+
+import hashlib
+import json
+import os
+import threading
+
+import numpy as np
+
+from scoring import MAG_SCALES, WEIGHTS
+
+PROFILES_PATH = os.environ.get(
+    'SCORING_PROFILES',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scoring_profiles.json')
+)
+DEFAULT_PROFILE = 'default'
+
+COMPONENTS = ('depth', 'period', 'duration')
+
+# f_depth / f_period / f_duration ile aynı basamaklar
+DEFAULT_COMPONENTS = {
+    'depth': {'type': 'step', 'op': '>', 'cut': 500.0, 'then': 1.0, 'else': 0.3},
+    'period': {'type': 'step', 'op': '<', 'cut': 30.0, 'then': 1.0, 'else': 0.4},
+    'duration': {'type': 'step', 'op': '<', 'cut': 10.0, 'then': 1.0, 'else': 0.6},
+}
+DEFAULT_LABELS = {'mid': 46.0, 'high': 80.0}
+
+
+def compile_component(spec):
+    kind = spec.get('type', 'step')
+    op = spec.get('op', '>')
+    cut = float(spec['cut'])
+    then = float(spec.get('then', 1.0))
+    other = float(spec.get('else', 0.0))
+    if op not in ('>', '<'):
+        raise ValueError(f'Unknown component op: {op}')
+
+    if kind == 'step':
+        if op == '>':
+            return lambda x: np.where(x > cut, then, other)
+        return lambda x: np.where(x < cut, then, other)
+
+    if kind == 'sigmoid':
+        width = float(spec.get('width', 1.0))
+        if width <= 0:
+            raise ValueError('Sigmoid width must be positive')
+        sign = 1.0 if op == '>' else -1.0
+
+        def sigmoid(x):
+            z = np.clip(sign * (x - cut) / width, -60.0, 60.0)
+            return other + (then - other) / (1.0 + np.exp(-z))
+        return sigmoid
+
+    raise ValueError(f'Unknown component type: {kind}')
+
+
+class ScoringProfile:
+    def __init__(self, name, spec=None):
+        spec = spec or {}
+        self.name = name
+        self.spec = spec
+
+        self.weights = np.asarray(spec.get('weights', WEIGHTS), dtype=np.float64)
+        if self.weights.shape != (4,):
+            raise ValueError(f'Profile {name}: weights must have 4 values')
+
+        components = dict(DEFAULT_COMPONENTS)
+        components.update(spec.get('components', {}))
+        self.component_specs = components
+        self._kernels = {key: compile_component(components[key]) for key in COMPONENTS}
+
+        labels = dict(DEFAULT_LABELS)
+        labels.update(spec.get('labels', {}))
+        self.mid = float(labels['mid'])
+        self.high = float(labels['high'])
+
+        self.mag_scales = dict(MAG_SCALES)
+        self.mag_scales.update({k: tuple(v) for k, v in spec.get('magnitude', {}).items()})
+
+    def normalize_star_mag(self, mag, source):
+        mag = np.asarray(mag, dtype=np.float64)
+        if source not in self.mag_scales:
+            return np.full(mag.shape, np.nan)
+        zero, scale = self.mag_scales[source]
+        return np.where(mag > 0, np.clip((zero - mag) / scale, 0.0, 1.0), np.nan)
+
+    def components(self, period, duration, depth, star_mag, source, cache=None):
+        # Birimler çevrilmiş kabul edilir (saat / ppm). cache verilirse aynı tanımlı
+        # bileşenler profiller arasında bir kez hesaplanır
+        cache = {} if cache is None else cache
+        inputs = {'depth': depth, 'period': period, 'duration': duration}
+
+        mag_key = ('mag', source, self.mag_scales.get(source))
+        if mag_key not in cache:
+            cache[mag_key] = self.normalize_star_mag(star_mag, source)
+        columns = [cache[mag_key]]
+
+        for name in COMPONENTS:
+            key = (name, json.dumps(self.component_specs[name], sort_keys=True))
+            if key not in cache:
+                cache[key] = self._kernels[name](inputs[name])
+            columns.append(cache[key])
+        return np.stack(columns, axis=-1)
+
+    def score(self, period, duration, depth, star_mag, source, cache=None):
+        comp = self.components(period, duration, depth, star_mag, source, cache)
+        return 100.0 * (comp @ self.weights)
+
+    def label_codes(self, score):
+        score = np.asarray(score)
+        return np.where(score >= self.high, 0, np.where(score >= self.mid, 1, 2)).astype(np.uint8)
+
+    def fingerprint(self):
+        # Skorları etkileyen her şeyin özeti; önbellek anahtarlarında sürüm olarak kullanılır
+        spec = dict(self.describe(), magnitude=self.mag_scales)
+        return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()[:16]
+
+    def describe(self):
+        return {
+            'name': self.name,
+            'weights': self.weights.tolist(),
+            'components': self.component_specs,
+            'labels': {'mid': self.mid, 'high': self.high},
+        }
+
+
+def load_profiles(path=PROFILES_PATH):
+    profiles = {DEFAULT_PROFILE: ScoringProfile(DEFAULT_PROFILE)}
+    if not path or not os.path.exists(path):
+        return profiles
+
+    with open(path, encoding='utf-8') as fh:
+        config = json.load(fh)
+
+    for name, spec in config.items():
+        # Varsayılan profil calculate_score ile aynı kalmalı, config ile ezilemez
+        if name == DEFAULT_PROFILE:
+            print(f"⚠️ '{DEFAULT_PROFILE}' profili config'den değiştirilemez, atlandı")
+            continue
+        profiles[name] = ScoringProfile(name, spec)
+    return profiles
+
+
+_registry = {}
+_registry_mtime = None
+_registry_lock = threading.Lock()
+
+
+def get_profiles():
+    # Config dosyası değişirse profiller yeniden derlenir
+    global _registry, _registry_mtime
+    try:
+        mtime = os.path.getmtime(PROFILES_PATH)
+    except OSError:
+        mtime = None
+
+    with _registry_lock:
+        if not _registry or mtime != _registry_mtime:
+            _registry = load_profiles(PROFILES_PATH)
+            _registry_mtime = mtime
+        return _registry
+
+
+def get_profile(name=None):
+    profiles = get_profiles()
+    name = name or DEFAULT_PROFILE
+    if name not in profiles:
+        raise KeyError(f'Unknown scoring profile: {name}')
+    return profiles[name]
+
+
+def score_profiles(names, period, duration, depth, star_mag, source):
+    # Birden fazla profil aynı diziler üzerinde, parlaklık bir kez. Birimler gün / saat / ppm
+    # (units.convert ile kolon başına çevrilmiş)
+    period = np.asarray(period, dtype=np.float64)
+    duration = np.asarray(duration, dtype=np.float64)
+    depth = np.asarray(depth, dtype=np.float64)
+    valid = np.isfinite(period) & np.isfinite(duration) & np.isfinite(depth)
+
+    results = {}
+    cache = {}
+    for name in names:
+        profile = get_profile(name)
+        score = np.where(valid, profile.score(period, duration, depth, star_mag, source, cache), np.nan)
+        results[name] = (score, profile.label_codes(score))
+    return results
@@ -0,0 +1,88 @@
+# Sunucu tarafı sonuç önbelleği
+# Analiz sonuçları (CandidateTable) result_id altında tutulur; grafikler için toplama
+# (/api/aggregate) ve dışa aktarma tüm satırları istemciden geri almadan çalışır.
+# Sonuç ayrıca paylaşılan disk önbelleğine (upload_cache.DiskCache) yazılır: gunicorn'da
+# aggregate / export isteği sonucu üreten worker'a düşmese de bulunur. Bellekteki LRU
+# sıcak katmandır. Kayıtlar pickle olduğundan dizin yalnızca bu kullanıcıya ait (0700)
+# olmalıdır; başkasının oluşturduğu veya yazabildiği dizin reddedilir (upload_cache.private_dir).
+
+import os
+import re
+import tempfile
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+from upload_cache import DiskCache
+
+MAX_RESULTS = 32
+RESULT_TTL = 3600
+RESULT_DIR = os.environ.get('RESULT_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'exoplanet-results'))
+RESULT_BYTES = int(os.environ.get('RESULT_CACHE_BYTES', 512 * 2 ** 20))
+
+# result_id dosya adı olarak kullanılır; yalnızca put'un ürettiği biçim kabul edilir
+RESULT_ID = re.compile(r'[0-9a-f]{32}')
+
+
+class ResultCache:
+    def __init__(self, max_results=MAX_RESULTS, ttl=RESULT_TTL, directory=RESULT_DIR, max_bytes=RESULT_BYTES):
+        self.max_results = max_results
+        self.ttl = ttl
+        self.disk = DiskCache(directory, max_bytes) if directory else None
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        while self._entries:
+            key, (stamp, _) = next(iter(self._entries.items()))
+            if now - stamp < self.ttl:
+                break
+            del self._entries[key]
+
+    def put(self, table, meta=None, result_id=None):
+        # result_id verilirse (örn. snapshot sürümünden türetilmiş) diskte zaten varsa yeniden yazılmaz
+        entry = {'table': table, 'meta': dict(meta or {})}
+        result_id = result_id or uuid.uuid4().hex
+
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            self._entries[result_id] = (now, entry)
+            while len(self._entries) > self.max_results:
+                self._entries.popitem(last=False)
+
+        if self.disk is not None and not self.disk.touch(result_id):
+            self.disk.put(result_id, entry)
+        return result_id
+
+    def get(self, result_id):
+        if not RESULT_ID.fullmatch(result_id or ''):
+            return None
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            if result_id in self._entries:
+                # Son kullanılan sona taşınır (LRU), TTL son erişimden sayılır
+                entry = self._entries.pop(result_id)[1]
+                self._entries[result_id] = (now, entry)
+                return entry
+
+        # Başka worker'ın ürettiği sonuç; TTL dosyanın son erişiminden (mtime) sayılır
+        if self.disk is None or self.disk.age(result_id) >= self.ttl:
+            return None
+        entry = self.disk.get(result_id)
+        if entry is None:
+            return None
+        with self._lock:
+            self._entries[result_id] = (now, entry)
+            while len(self._entries) > self.max_results:
+                self._entries.popitem(last=False)
+        return entry
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+
+results_cache = ResultCache()
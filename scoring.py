@@ -0,0 +1,42 @@
+# Vektörel skor çekirdeği
+# app.calculate_score ile aynı bileşenler, tek tek satır yerine dizi üzerinde. Ağırlıklı toplam ve
+# etiket eşikleri profiles.Profile'dadır (score / label_codes); buradaki WEIGHTS varsayılan profildir.
+
+import numpy as np
+
+WEIGHTS = (0.58, 0.27, 0.08, 0.07)
+LABELS = ('CP', 'PC', 'APC')
+
+# source -> (sıfır noktası, ölçek); normalize_star_mag ile aynı
+MAG_SCALES = {
+    'toi': (13.0, 5.0),
+    'koi': (14.0, 6.0),
+    'file': (13.5, 6.0),
+}
+
+
+def normalize_star_mag_array(mag, source):
+    mag = np.asarray(mag, dtype=np.float64)
+    if source not in MAG_SCALES:
+        return np.full(mag.shape, np.nan)
+
+    zero, scale = MAG_SCALES[source]
+    norm = np.clip((zero - mag) / scale, 0.0, 1.0)
+    return np.where(mag > 0, norm, np.nan)
+
+
+def components(period, duration, depth, star_mag, source='toi',
+               depth_cut=500.0, period_cut=30.0, duration_cut=10.0):
+    # Skorun 4 bileşeni (n, 4): parlaklık, f_depth, f_period, f_duration.
+    # Birimler gün / saat / ppm (units.convert ile kolon başına çevrilmiş)
+    period = np.asarray(period, dtype=np.float64)
+    duration = np.asarray(duration, dtype=np.float64)
+    depth = np.asarray(depth, dtype=np.float64)
+
+    return np.stack([
+        normalize_star_mag_array(star_mag, source),
+        np.where(depth > depth_cut, 1.0, 0.3),
+        np.where(period < period_cut, 1.0, 0.4),
+        np.where(duration < duration_cut, 1.0, 0.6),
+    ], axis=-1)
+
@@ -0,0 +1,177 @@
+# Eşzamanlı aynı isteklerin birleştirilmesi (single-flight)
+# Aynı anahtar için yalnızca bir çağrı çalışır, diğerleri onun sonucunu (veya hatasını) bekler.
+# Süreç içinde threading.Event ile, aynı makinedeki gunicorn worker'ları arasında
+# ise anahtar başına bir kilit dosyası (fcntl.flock) ve paylaşılan sonuç dosyasıyla.
+# Sonuç dosyaları pickle'dır: dizin upload_cache.private_dir ile denetlenir (0700, bu
+# kullanıcıya ait); güvenli değilse yalnızca süreç içi birleştirme yapılır.
+
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: yalnızca süreç içi birleştirme
+    fcntl = None
+
+from upload_cache import private_dir
+
+LOCK_DIR = os.environ.get('SINGLEFLIGHT_DIR', os.path.join(tempfile.gettempdir(), 'exoplanet-singleflight'))
+DEFAULT_TIMEOUT = float(os.environ.get('SINGLEFLIGHT_TIMEOUT', 120))
+POLL_INTERVAL = 0.05
+
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    def __init__(self, lock_dir=LOCK_DIR, cross_process=True):
+        self.lock_dir = lock_dir
+        self.cross_process = cross_process and fcntl is not None
+        self._calls = {}
+        self._lock = threading.Lock()
+
+    def do(self, key, fn, timeout=DEFAULT_TIMEOUT):
+        # (sonuç, paylaşıldı mı) döner; fn hata verirse aynı hata tüm bekleyenlere iletilir.
+        # shareable = False olan hata (sse.StreamCancelled: liderin istemcisi koptu) yalnızca
+        # lidere aittir: bekleyenler işi kendileri yeniden başlatır
+        while True:
+            with self._lock:
+                call = self._calls.get(key)
+                leader = call is None
+                if leader:
+                    call = self._calls[key] = _Call()
+            if leader:
+                break
+
+            if not call.done.wait(timeout):
+                raise TimeoutError(f'Timed out after {timeout:.0f}s waiting for in-flight request')
+            if call.error is None:
+                return call.result, True
+            if getattr(call.error, 'shareable', True):
+                raise call.error
+
+        shared = False
+        try:
+            if self.cross_process and self._private():
+                call.result, shared = self._run_locked(key, fn, timeout)
+            else:
+                call.result = fn()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, shared
+
+    def do_background(self, key, fn, timeout=DEFAULT_TIMEOUT):
+        # Beklemeden arka planda çalıştırır (stale-while-revalidate); bu süreçte aynı anahtar
+        # zaten çalışıyorsa yeni iş açılmaz. Hata yalnızca loglanır, sonraki istek yeniden dener
+        with self._lock:
+            if key in self._calls:
+                return False
+
+        def run():
+            try:
+                self.do(key, fn, timeout)
+            except Exception as e:
+                print(f"⚠️ Arka plan yenilemesi başarısız: {e}")
+
+        threading.Thread(target=run, daemon=True).start()
+        return True
+
+    def _private(self):
+        # Dizin her liderlikte oluşturulur / denetlenir (silinmişse yeniden 0700 açılır);
+        # başkasının yazabildiği dizindeki sonuç dosyası yüklenmez, birleştirme süreç içi kalır
+        try:
+            private_dir(self.lock_dir)
+            return True
+        except OSError as e:
+            print(f"⚠️ Süreçler arası birleştirme devre dışı: {e}")
+            self.cross_process = False
+            return False
+
+    def _paths(self, key):
+        name = hashlib.sha256(repr(key).encode()).hexdigest()[:32]
+        return (os.path.join(self.lock_dir, name + '.lock'),
+                os.path.join(self.lock_dir, name + '.result'))
+
+    def _run_locked(self, key, fn, timeout):
+        # Kilidi alan worker çalıştırır; bekleyen worker kilidi aldığında, beklerken
+        # yazılmış taze bir sonuç dosyası varsa yeniden çalıştırmadan onu kullanır
+        lock_path, result_path = self._paths(key)
+        started = time.time()
+
+        with open(lock_path, 'a') as lock_file:
+            waited = not self._acquire(lock_file, timeout)
+            try:
+                if waited:
+                    published = self._read_result(result_path, started)
+                    if published is not None:
+                        ok, value = published
+                        if not ok:
+                            raise value
+                        return value, True
+
+                try:
+                    value = fn()
+                except Exception as e:
+                    # Paylaşılamayan hatada dosya yazılmaz: bekleyen worker kendisi çalıştırır
+                    if getattr(e, 'shareable', True):
+                        self._write_result(result_path, (False, e))
+                    raise
+                self._write_result(result_path, (True, value))
+                return value, False
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _acquire(self, lock_file, timeout):
+        # Kilit hemen alındıysa True, başka bir worker'ı bekledikten sonra alındıysa False
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            pass
+
+        deadline = time.monotonic() + timeout
+        while True:
+            time.sleep(POLL_INTERVAL)
+            try:
+                fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return False
+            except BlockingIOError:
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f'Timed out after {timeout:.0f}s waiting for another worker')
+
+    def _read_result(self, path, since):
+        try:
+            if os.path.getmtime(path) < since:
+                return None
+            with open(path, 'rb') as fh:
+                return pickle.load(fh)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+    def _write_result(self, path, value):
+        try:
+            data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception:
+            # Pickle edilemeyen hata / sonuç: diğer worker'lar kendi çağrısını yapar
+            return
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(data)
+        os.replace(tmp, path)
+
+
+nasa_flights = SingleFlight()
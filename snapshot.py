@@ -0,0 +1,263 @@
+# Paylaşılan, salt okunur katalog anlık görüntüsü (snapshot)
+# Skorlanmış katalog kolonları tek bir dosyaya yazılır ve her gunicorn worker'ında
+# mmap ile açılır; tüm worker'lar aynı sayfa önbelleğini paylaşır, okuma kopyasız
+# (np.frombuffer görünümleri) ve pickle'sızdır. Yeni sürüm geçici dosyaya yazılıp
+# os.replace ile atomik olarak değiştirilir; eski sürümü eşlemiş okuyucular etkilenmez.
+#
+# Dosya düzeni:
+#   b'EXOSNAP1' | başlık uzunluğu (uint64 LE) | JSON başlık | 64 bayt hizalı veri blokları
+# Sayısal kolon: tek blok. Metin kolonu: (n + 1) int64 ofset + UTF-8 veri bloğu.
+# Geçmiş: yayınlanan her sürüm history/<ad>/<sürüm>.snap olarak aynı dosyaya hard link'tir
+# (kopya yok); en eski sürümler SNAPSHOT_HISTORY'yi aşınca silinir.
+
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+import threading
+import time
+
+import numpy as np
+
+SNAPSHOT_DIR = os.environ.get(
+    'SNAPSHOT_DIR', os.path.join(tempfile.gettempdir(), 'exoplanet-snapshots')
+)
+SNAPSHOT_TTL = float(os.environ.get('SNAPSHOT_TTL', 3600))
+# Her snapshot adı için saklanan eski sürüm sayısı (/api/diff); 0 ise geçmiş tutulmaz
+SNAPSHOT_HISTORY = int(os.environ.get('SNAPSHOT_HISTORY', 10))
+
+MAGIC = b'EXOSNAP1'
+ALIGN = 64
+
+
+def _align(n):
+    return (n + ALIGN - 1) // ALIGN * ALIGN
+
+
+def _encode_column(values):
+    # (başlık girdisi, [bloklar]) döner
+    if len(values) and all(isinstance(v, str) for v in values):
+        data = [v.encode('utf-8') for v in values]
+        offsets = np.zeros(len(data) + 1, dtype='<i8')
+        np.cumsum([len(d) for d in data], out=offsets[1:])
+        return {'kind': 'string', 'length': len(data)}, [offsets.tobytes(), b''.join(data)]
+
+    array = np.ascontiguousarray(values)
+    if array.dtype == object:
+        array = np.asarray(values, dtype=np.float64)
+    array = array.astype(array.dtype.newbyteorder('<'), copy=False)
+    return {'kind': 'array', 'dtype': array.dtype.str, 'length': len(array)}, [array.tobytes()]
+
+
+def write_snapshot(path, tables, meta=None, archive_dir=None):
+    # tables: {tablo: {kolon: dizi veya str listesi}}; archive_dir verilirse dosya yerine
+    # konmadan önce oraya <sürüm>.snap olarak bağlanır (eşzamanlı yayınlarda sürüm karışmaz)
+    header = {'version': time.time_ns(), 'created': time.time(), 'meta': meta or {}, 'tables': {}}
+    blocks = []
+    position = 0
+    for table, columns in tables.items():
+        entries = header['tables'][table] = {}
+        for name, values in columns.items():
+            entry, data = _encode_column(values)
+            entry['blocks'] = []
+            for block in data:
+                entry['blocks'].append([position, len(block)])
+                blocks.append((position, block))
+                position = _align(position + len(block))
+            entries[name] = entry
+
+    encoded = json.dumps(header).encode('utf-8')
+    data_start = _align(len(MAGIC) + 8 + len(encoded))
+
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=directory, suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(MAGIC + struct.pack('<Q', len(encoded)) + encoded)
+            for offset, block in blocks:
+                fh.seek(data_start + offset)
+                fh.write(block)
+            fh.truncate(data_start + position)
+            fh.flush()
+            os.fsync(fh.fileno())
+        if archive_dir is not None:
+            _archive(tmp, archive_dir, header['version'])
+        os.replace(tmp, path)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+    return header['version']
+
+
+def _archive(path, directory, version):
+    os.makedirs(directory, exist_ok=True)
+    target = os.path.join(directory, f'{version}.snap')
+    try:
+        os.link(path, target)
+    except OSError:
+        # Hard link desteklenmiyorsa (farklı dosya sistemi vb.) kopyalanır
+        shutil.copyfile(path, target)
+
+
+class Snapshot:
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as fh:
+            st = os.fstat(fh.fileno())
+            self.identity = (st.st_ino, st.st_mtime_ns)
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f'Not a snapshot file: {path}')
+        (length,) = struct.unpack_from('<Q', self._map, len(MAGIC))
+        start = len(MAGIC) + 8
+        header = json.loads(self._map[start:start + length].decode('utf-8'))
+        self._data_start = _align(start + length)
+
+        self.version = header['version']
+        self.created = header['created']
+        self.meta = header['meta']
+        self._tables = header['tables']
+
+    @property
+    def age(self):
+        return time.time() - self.created
+
+    def _view(self, offset, count, dtype):
+        return np.frombuffer(self._map, dtype=dtype, count=count, offset=self._data_start + offset)
+
+    def column(self, table, name):
+        # Sayısal kolonlar için salt okunur, kopyasız görünüm; metin kolonları için
+        # (ofsetler, veri) görünümleri
+        entry = self._tables[table][name]
+        if entry['kind'] == 'array':
+            (offset, _), = entry['blocks']
+            return self._view(offset, entry['length'], np.dtype(entry['dtype']))
+        (off_offset, _), (data_offset, nbytes) = entry['blocks']
+        offsets = self._view(off_offset, entry['length'] + 1, '<i8')
+        return offsets, self._view(data_offset, nbytes, np.uint8)
+
+    def strings(self, table, name):
+        offsets, data = self.column(table, name)
+        raw = data.tobytes()
+        return [raw[a:b].decode('utf-8') for a, b in zip(offsets[:-1].tolist(), offsets[1:].tolist())]
+
+    def tables(self):
+        return list(self._tables)
+
+    def columns(self, table):
+        return list(self._tables[table])
+
+    def kind(self, table, name):
+        return self._tables[table][name]['kind']
+
+    def table(self, table):
+        return {
+            name: self.strings(table, name) if self.kind(table, name) == 'string' else self.column(table, name)
+            for name in self.columns(table)
+        }
+
+
+class SnapshotStore:
+    def __init__(self, directory=SNAPSHOT_DIR, history=SNAPSHOT_HISTORY):
+        self.directory = directory
+        self.history = history
+        self._open = {}
+        self._lock = threading.Lock()
+
+    def path(self, name):
+        return os.path.join(self.directory, f'{name}.snap')
+
+    def history_dir(self, name):
+        return os.path.join(self.directory, 'history', name)
+
+    def publish(self, name, tables, meta=None):
+        if not self.history:
+            return write_snapshot(self.path(name), tables, meta)
+        version = write_snapshot(self.path(name), tables, meta, self.history_dir(name))
+        for old in self.versions(name)[:-self.history]:
+            try:
+                os.remove(os.path.join(self.history_dir(name), f'{old}.snap'))
+            except OSError:
+                pass
+        return version
+
+    def versions(self, name):
+        # Geçmişteki sürümler, eskiden yeniye
+        try:
+            filenames = os.listdir(self.history_dir(name))
+        except OSError:
+            return []
+        return sorted(int(f[:-len('.snap')]) for f in filenames
+                      if f.endswith('.snap') and f[:-len('.snap')].isdigit())
+
+    def open_version(self, name, version):
+        # Sürümler değişmez; silinmişse None
+        try:
+            return Snapshot(os.path.join(self.history_dir(name), f'{int(version)}.snap'))
+        except (OSError, ValueError):
+            return None
+
+    def seed(self, directory):
+        # Paketle gelen, önceden skorlanmış snapshot'ları (cli.py warm) bu dizine kopyalar;
+        # yalnızca burada olmayan veya daha eski olanlar. Kopya geçici dosyadan os.replace ile
+        # yayınlanır, aynı anda açılan worker'lar yarım dosya görmez
+        seeded = []
+        try:
+            filenames = sorted(os.listdir(directory))
+        except OSError:
+            return seeded
+
+        for filename in filenames:
+            if not filename.endswith('.snap'):
+                continue
+            name = filename[:-len('.snap')]
+            path = os.path.join(directory, filename)
+            try:
+                bundled = Snapshot(path)
+            except (OSError, ValueError):
+                continue
+            current = self.open(name)
+            if current is not None and current.created >= bundled.created:
+                continue
+
+            os.makedirs(self.directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+            os.close(fd)
+            try:
+                shutil.copyfile(path, tmp)
+                if self.history:
+                    _archive(tmp, self.history_dir(name), bundled.version)
+                os.replace(tmp, self.path(name))
+            except BaseException:
+                if os.path.exists(tmp):
+                    os.remove(tmp)
+                raise
+            seeded.append(name)
+        return seeded
+
+    def open(self, name):
+        # Dosya değiştiyse (yeni inode) yeniden eşlenir; eski eşleme, görünümleri
+        # kullanan istekler bitene kadar çöp toplayıcıya bırakılır
+        path = self.path(name)
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+
+        with self._lock:
+            snap = self._open.get(name)
+            if snap is None or snap.identity != (st.st_ino, st.st_mtime_ns):
+                try:
+                    snap = Snapshot(path)
+                except (OSError, ValueError):
+                    return None
+                self._open[name] = snap
+            return snap
+
+
+snapshots = SnapshotStore()
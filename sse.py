@@ -0,0 +1,142 @@
+# Server-Sent Events ile kademeli sonuç akışı
+# Analiz bir arka plan iş parçacığında çalışır ve her skorlanan parçadan sonra olayları
+# kuyruğa yazar; yanıt üreteci kuyruğu okuyup text/event-stream olarak gönderir:
+#   progress - ağdan okunan bayt, ayrıştırılan satır, parça ve aday sayısı
+#   partial  - o ana kadarki istatistikler (preview.estimate_stats) ve ilk N aday
+#   done     - akışsız uç noktanın JSON yanıtıyla aynı içerik
+#   error    - {'error', 'status'}
+# İstemci bağlantıyı keserse (yanıt kapanır) iptal bayrağı kalkar; üretici bir sonraki
+# parçada StreamCancelled ile durur, kalan indirme / skorlama yapılmaz.
+
+import json
+import queue
+import threading
+import time
+
+from flask import Response
+
+from preview import PREVIEW_TOP, Preview
+
+# İki 'partial' olayı arasında en az geçen süre (ilk parça hemen gönderilir)
+PARTIAL_INTERVAL = 0.5
+HEARTBEAT = 15
+
+
+class StreamError(Exception):
+    def __init__(self, message, status=500):
+        super().__init__(message)
+        self.status = status
+
+
+class StreamCancelled(Exception):
+    # İstemci koptu. Yalnızca bu akışa ait: single-flight ile aynı işi bekleyen diğer
+    # isteklere iletilmez, onlar işi yeniden başlatır (singleflight 'shareable')
+    shareable = False
+    status = 499
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, default=str, sort_keys=True, separators=(',', ':'))}\n\n"
+
+
+def sse_response(events):
+    # Ara vekillerin (nginx) yanıtı tamponlamaması için
+    return Response(events, mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+
+class ProgressStream:
+    def __init__(self, top=PREVIEW_TOP, interval=PARTIAL_INTERVAL):
+        self.interval = interval
+        self.rows = 0
+        self.chunks = 0
+        self.bytes = None
+        self._preview = Preview(top=top)
+        self._last = None
+        self._queue = queue.Queue()
+        self._cancelled = threading.Event()
+        self._finished = False
+        self._callbacks = []
+        self._lock = threading.Lock()
+
+    def on_finish(self, callback):
+        # Üretici iş parçacığı bittiğinde çağrılır (istemci bağlantısından bağımsız);
+        # admission.limit kapasiteyi burada bırakır. Zaten bittiyse hemen çağrılır
+        with self._lock:
+            if not self._finished:
+                self._callbacks.append(callback)
+                return
+        callback()
+
+    def _finish(self):
+        with self._lock:
+            self._finished = True
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback()
+            except Exception as e:
+                print(f"⚠️ Akış kapanış geri çağrısı başarısız: {e}")
+
+    def emit(self, event, data):
+        self._queue.put((event, data))
+
+    @property
+    def cancelled(self):
+        return self._cancelled.is_set()
+
+    def close(self):
+        # Yanıt kapanınca (WSGI close; istemci koptuysa da) çağrılır
+        self._cancelled.set()
+
+    def chunk(self, table, rows, nbytes=None):
+        # Skorlanan her parça: ilerleme her seferinde, ara sonuç en fazla interval'de bir.
+        # Parçalar arasında iptal denetlenir: istemci koptuysa iş burada kesilir
+        if self._cancelled.is_set():
+            raise StreamCancelled('Client disconnected')
+        self.chunks += 1
+        self.rows += rows
+        if nbytes is not None:
+            self.bytes = nbytes
+        self._preview.add(table)
+        self.emit('progress', {'rows': self.rows, 'chunks': self.chunks, 'bytes': self.bytes,
+                               'candidates': self._preview.total})
+
+        now = time.monotonic()
+        if self._last is None or now - self._last >= self.interval:
+            self._last = now
+            self.emit('partial', {'rows': self.rows, 'stats': self._preview.stats(),
+                                  'data': self._preview.top_table().to_records()})
+
+    def run(self, work):
+        # work(stream) akışsız yanıtın içeriğini döner. Dönen nesne yanıt gövdesidir: SSE
+        # satırları üretir, on_finish ile üreticinin bitişi izlenebilir
+        def target():
+            try:
+                self.emit('done', work(self))
+            except StreamCancelled:
+                pass
+            except StreamError as e:
+                self.emit('error', {'error': str(e), 'status': e.status})
+            except Exception as e:
+                self.emit('error', {'error': str(e), 'status': 500})
+            finally:
+                self._queue.put(None)
+                self._finish()
+
+        threading.Thread(target=target, daemon=True).start()
+        return self
+
+    def __iter__(self):
+        return self._events()
+
+    def _events(self):
+        while True:
+            try:
+                item = self._queue.get(timeout=HEARTBEAT)
+            except queue.Empty:
+                yield ': keep-alive\n\n'
+                continue
+            if item is None:
+                return
+            yield format_event(*item)
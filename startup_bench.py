@@ -0,0 +1,106 @@
+# Soğuk başlangıç ölçümü
+# Her tekrar yeni bir Python sürecinde (boş snapshot dizini ile) çalışır ve şunları ölçer:
+#   import  - 'import app' süresi
+#   index   - ilk GET / (HTML)
+#   nasa    - ilk GET /api/nasa_auto (--warm verilirse hazır snapshot'tan, yoksa ağdan)
+# Her adımdan sonra pandas / requests / pyarrow'un yüklenip yüklenmediği de raporlanır.
+# --importtime N: 'python -X importtime' çıktısından en pahalı N modül.
+#
+# Kullanım:
+#   python startup_bench.py --runs 5
+#   python cli.py warm -o warm_snapshots && python startup_bench.py --warm warm_snapshots --nasa
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+HEAVY_MODULES = ('pandas', 'requests', 'pyarrow')
+MARKER = 'STARTUP_BENCH '
+
+CHILD = '''
+import json, sys, time
+loaded = lambda: [m for m in %(heavy)r if m in sys.modules]
+result = {}
+start = time.perf_counter()
+import app
+result['import'] = time.perf_counter() - start
+result['import_loaded'] = loaded()
+client = app.app.test_client()
+start = time.perf_counter()
+assert client.get('/').status_code == 200
+result['index'] = time.perf_counter() - start
+result['index_loaded'] = loaded()
+if %(nasa)r:
+    start = time.perf_counter()
+    response = client.get('/api/nasa_auto?source=%(source)s')
+    result['nasa'] = time.perf_counter() - start
+    result['nasa_status'] = response.status_code
+    result['nasa_stale'] = (response.get_json() or {}).get('stale')
+    result['nasa_loaded'] = loaded()
+print(%(marker)r + json.dumps(result))
+'''
+
+
+def run_once(nasa, source, warm):
+    with tempfile.TemporaryDirectory() as snapshot_dir:
+        env = dict(os.environ, SNAPSHOT_DIR=snapshot_dir)
+        if warm:
+            env['WARM_SNAPSHOT_DIR'] = os.path.abspath(warm)
+        code = CHILD % {'heavy': HEAVY_MODULES, 'nasa': nasa, 'source': source, 'marker': MARKER}
+        out = subprocess.run([sys.executable, '-c', code], env=env, capture_output=True, text=True,
+                             cwd=os.path.dirname(os.path.abspath(__file__)))
+    for line in out.stdout.splitlines():
+        if line.startswith(MARKER):
+            return json.loads(line[len(MARKER):])
+    raise RuntimeError(f'benchmark run failed:\n{out.stderr[-2000:]}')
+
+
+def import_profile(top):
+    # (kümülatif µs, modül) - en pahalı üst düzey içe aktarmalar
+    out = subprocess.run([sys.executable, '-X', 'importtime', '-c', 'import app'], capture_output=True,
+                         text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    rows = []
+    for line in out.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, self_us, cumulative, name = [part.strip() for part in line.replace('import time:', '|').split('|')]
+        rows.append((int(cumulative), name))
+    rows.sort(reverse=True)
+    return rows[:top]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Measure cold-start import and first-request latency')
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--nasa', action='store_true', help='also time the first /api/nasa_auto request')
+    parser.add_argument('--source', default='toi')
+    parser.add_argument('--warm', help='bundled snapshot directory (WARM_SNAPSHOT_DIR)')
+    parser.add_argument('--importtime', type=int, default=10, metavar='N',
+                        help='show the N most expensive imports (0 to skip)')
+    args = parser.parse_args(argv)
+
+    runs = [run_once(args.nasa, args.source, args.warm) for _ in range(args.runs)]
+    metrics = ['import', 'index'] + (['nasa'] if args.nasa else [])
+
+    print("\n" + "=" * 60)
+    print(f"🚀 Soğuk başlangıç, {args.runs} tekrar" + (f" (hazır snapshot: {args.warm})" if args.warm else ""))
+    print("=" * 60)
+    for name in metrics:
+        values = [r[name] * 1000 for r in runs]
+        print(f"   {name:<8} medyan {statistics.median(values):8.1f} ms   "
+              f"min {min(values):8.1f} ms   yüklü: {', '.join(runs[-1][name + '_loaded']) or '-'}")
+    if args.nasa:
+        print(f"   nasa yanıtı: HTTP {runs[-1]['nasa_status']}, stale={runs[-1]['nasa_stale']}")
+
+    if args.importtime:
+        print(f"\n📦 En pahalı {args.importtime} içe aktarma (kümülatif):")
+        for cumulative, name in import_profile(args.importtime):
+            print(f"   {cumulative / 1000:8.1f} ms  {name}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,245 @@
+# NASA Exoplanet Archive TAP istemcisi
+# Üç mod:
+#   sync        - /TAP/sync, tek istek, yanıt akış halinde okunur
+#   async       - /TAP/async iş protokolü (gönder, PHASE sorgula, sonucu indir)
+#   partitioned - sorgu anahtar kolonunun (toi, kepid, ...) aralıklarına bölünür, parçalar
+#                 paralel indirilir ve sırayla birleştirilir; tamamlanan parçalar diskte
+#                 tutulduğu için başarısız bir çekim tekrarlandığında kaldığı yerden devam eder.
+#                 Tutulan parçalar yalnızca PARTITION_TTL içinde yeniden kullanılır; tüketici
+#                 çekimi yarıda bırakırsa (skorlama hatası, istemci kopması) parçalar silinir.
+#
+# Yerel test için: python fake_tap.py --table toi=toi.csv
+
+import hashlib
+import io
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
+
+from lazy_imports import lazy_import
+
+pd = lazy_import('pandas')
+requests = lazy_import('requests')
+
+TAP_BASE_URL = "https://exoplanetarchive.ipac.caltech.edu/TAP"
+TAP_MODES = ('sync', 'async', 'partitioned')
+
+DEFAULT_TIMEOUT = 60
+DEFAULT_PARTITIONS = 4
+DEFAULT_WORKERS = 4
+DEFAULT_RETRIES = 2
+POLL_INTERVAL = 2.0
+JOB_TIMEOUT = 900
+CHUNK_ROWS = 2000
+WORK_DIR = os.environ.get('TAP_WORK_DIR', os.path.join(tempfile.gettempdir(), 'exoplanet-tap'))
+# Devam için tutulan parçanın en fazla yaşı (s); daha eskisi yeniden indirilir
+PARTITION_TTL = float(os.environ.get('TAP_PARTITION_TTL', 900))
+
+FINAL_PHASES = ('COMPLETED', 'ERROR', 'ABORTED')
+
+
+class TapError(Exception):
+    pass
+
+
+class PartitionError(TapError):
+    def __init__(self, failed, work_dir):
+        self.failed = failed
+        self.work_dir = work_dir
+        super().__init__(f'{len(failed)} partition(s) failed: {sorted(failed)}; '
+                         f'completed partitions are kept in {work_dir} for resume')
+
+    def __reduce__(self):
+        return PartitionError, (self.failed, self.work_dir)
+
+
+def build_query(columns, table, where=None, order_by=None):
+    query = f"SELECT {columns} FROM {table}"
+    if where:
+        query += f" WHERE {where}"
+    if order_by:
+        query += f" ORDER BY {order_by}"
+    return query
+
+
+def read_csv_chunks(source, chunksize=CHUNK_ROWS):
+    return pd.read_csv(source, comment="#", skip_blank_lines=True, chunksize=chunksize)
+
+
+class TapClient:
+    def __init__(self, base_url=TAP_BASE_URL, timeout=DEFAULT_TIMEOUT, session=None,
+                 poll_interval=POLL_INTERVAL, job_timeout=JOB_TIMEOUT):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+
+    # --- sync ---
+
+    def sync(self, query):
+        r = self.session.get(f'{self.base_url}/sync', params={'query': query, 'format': 'csv'},
+                             timeout=self.timeout, stream=True)
+        r.raise_for_status()
+        r.raw.decode_content = True
+        return r
+
+    # --- async (UWS iş protokolü) ---
+
+    def submit(self, query):
+        r = self.session.post(f'{self.base_url}/async', data={
+            'REQUEST': 'doQuery', 'LANG': 'ADQL', 'QUERY': query, 'FORMAT': 'csv', 'PHASE': 'RUN',
+        }, timeout=self.timeout, allow_redirects=False)
+        r.raise_for_status()
+        location = r.headers.get('Location')
+        if not location:
+            raise TapError('TAP async submit returned no job location')
+        return urljoin(r.url, location)
+
+    def phase(self, job_url):
+        r = self.session.get(f'{job_url}/phase', timeout=self.timeout)
+        r.raise_for_status()
+        return r.text.strip().upper()
+
+    def wait(self, job_url):
+        # Kısa işler için sık, uzun işler için poll_interval'a kadar seyrekleşen sorgulama
+        deadline = time.monotonic() + self.job_timeout
+        delay = 0.1
+        while True:
+            phase = self.phase(job_url)
+            if phase in FINAL_PHASES:
+                break
+            if time.monotonic() > deadline:
+                raise TapError(f'TAP job did not finish in {self.job_timeout:.0f}s: {job_url}')
+            time.sleep(delay)
+            delay = min(delay * 2, self.poll_interval)
+
+        if phase != 'COMPLETED':
+            try:
+                detail = self.session.get(f'{job_url}/error', timeout=self.timeout).text.strip()
+            except requests.RequestException:
+                detail = ''
+            raise TapError(f'TAP job {phase}: {detail[:500]}')
+        return phase
+
+    def run_async(self, query):
+        job_url = self.submit(query)
+        self.wait(job_url)
+        r = self.session.get(f'{job_url}/results/result', timeout=self.timeout, stream=True)
+        r.raise_for_status()
+        r.raw.decode_content = True
+        return r
+
+    def open(self, query, mode='sync'):
+        # Akış halinde okunabilir yanıt (r.raw)
+        if mode == 'async':
+            return self.run_async(query)
+        return self.sync(query)
+
+    # --- anahtar aralığı bölümleme ---
+
+    def bounds(self, table, key, where=None):
+        query = build_query(f'MIN({key}) AS lo, MAX({key}) AS hi, COUNT(*) AS n', table, where)
+        with self.sync(query) as r:
+            df = pd.read_csv(io.BytesIO(r.content), comment="#")
+        if df.empty or pd.isna(df['lo'].iloc[0]):
+            return None
+        return float(df['lo'].iloc[0]), float(df['hi'].iloc[0]), int(df['n'].iloc[0])
+
+    def partition_filters(self, table, key, n_partitions, where=None, retries=DEFAULT_RETRIES):
+        # Eşit genişlikte [lo, hi) aralıkları; son aralık hi dahil
+        bounds = self._retry(lambda: self.bounds(table, key, where), retries)
+        if bounds is None:
+            return []
+        lo, hi, _ = bounds
+        n_partitions = max(1, n_partitions)
+        if hi <= lo:
+            n_partitions = 1
+        step = (hi - lo) / n_partitions
+        edges = [lo + i * step for i in range(n_partitions)] + [hi]
+
+        filters = []
+        for i in range(n_partitions):
+            upper = '<=' if i == n_partitions - 1 else '<'
+            clause = f'{key} >= {edges[i]!r} AND {key} {upper} {edges[i + 1]!r}'
+            filters.append(f'({where}) AND {clause}' if where else clause)
+        return filters
+
+    def _retry(self, fn, retries):
+        for attempt in range(retries + 1):
+            try:
+                return fn()
+            except (requests.RequestException, TapError, OSError):
+                if attempt == retries:
+                    raise
+                time.sleep(min(2 ** attempt, 10))
+
+    def _download(self, query, path, mode):
+        # Parça önce geçici dosyaya yazılır; yalnızca tamamlanan parça yerine taşınır
+        tmp = path + '.part'
+        with self.open(query, mode) as r:
+            with open(tmp, 'wb') as fh:
+                shutil.copyfileobj(r.raw, fh, 2 ** 20)
+        os.replace(tmp, path)
+        return path
+
+    def fetch_partitioned(self, columns, table, key, where=None, n_partitions=DEFAULT_PARTITIONS,
+                          workers=DEFAULT_WORKERS, mode='sync', retries=DEFAULT_RETRIES,
+                          work_dir=None, chunksize=CHUNK_ROWS, max_age=None):
+        # DataFrame parçaları üretir; parçalar arka planda paralel indirilirken
+        # sıradaki tamamlanan parça ayrıştırılır. Sıra: anahtar aralığı, aralık içinde anahtar.
+        # max_age: yeniden kullanılacak parçanın en fazla yaşı (varsayılan PARTITION_TTL, 0: hiç)
+        filters = self.partition_filters(table, key, n_partitions, where, retries)
+        queries = [build_query(columns, table, f, order_by=key) for f in filters]
+
+        digest = hashlib.sha256('\n'.join([self.base_url] + queries).encode()).hexdigest()[:16]
+        work_dir = work_dir or os.path.join(WORK_DIR, digest)
+        os.makedirs(work_dir, mode=0o700, exist_ok=True)
+        paths = [os.path.join(work_dir, f'part-{i:04d}.csv') for i in range(len(queries))]
+        max_age = PARTITION_TTL if max_age is None else max_age
+
+        failed = []
+        keep = False
+        offset = 0
+        pool = ThreadPoolExecutor(max_workers=max(1, workers))
+        try:
+            futures = [
+                None if partition_age(path) < max_age else pool.submit(self._retry, lambda q=query, p=path: self._download(q, p, mode), retries)
+                for query, path in zip(queries, paths)
+            ]
+            for i, (future, path) in enumerate(zip(futures, paths)):
+                if future is not None:
+                    try:
+                        future.result()
+                    except Exception:
+                        failed.append(i)
+                        continue
+                if failed:
+                    # Sıra bozulmasın diye başarısız parçadan sonrası yalnızca indirilir
+                    continue
+                for df in read_csv_chunks(path, chunksize):
+                    df.index = pd.RangeIndex(offset, offset + len(df))
+                    offset += len(df)
+                    yield df
+
+            if failed:
+                # Yalnızca indirme hatasında parçalar devam için tutulur
+                keep = True
+                raise PartitionError(failed, work_dir)
+        finally:
+            # Başarı, tüketici hatası veya generator kapanması (GeneratorExit): bekleyen
+            # indirmeler iptal edilir, yarım kalan çekimin parçaları sonraki çekime kalmaz
+            pool.shutdown(wait=True, cancel_futures=True)
+            if not keep:
+                shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def partition_age(path):
+    # Parçanın indirilmesinden bu yana saniye; yoksa sonsuz
+    try:
+        return time.time() - os.path.getmtime(path)
+    except OSError:
+        return float('inf')
@@ -0,0 +1,108 @@
+# Modüller depo kökünde (paket yok); testler `pytest` ile de bulabilsin
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fits_io import BLOCK_SIZE  # noqa: E402
+
+
+def make_toi(n=3000, seed=0):
+    # TOI tablosu kolonlarıyla sentetik katalog (pl_trandep ppm, pl_trandurh saat)
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'toi': np.arange(100, 100 + n) + 0.01,
+        'pl_orbper': rng.uniform(0.5, 40, n),
+        'pl_orbpererr1': np.full(n, 1e-4), 'pl_orbpererr2': np.full(n, -1e-4),
+        'pl_trandurh': rng.uniform(1, 8, n),
+        'pl_trandurherr1': np.full(n, 0.2), 'pl_trandurherr2': np.full(n, -0.2),
+        'pl_trandep': rng.uniform(100, 20000, n),
+        'pl_trandeperr1': np.full(n, 50.0), 'pl_trandeperr2': np.full(n, -50.0),
+        'st_tmag': rng.uniform(6, 15, n),
+    })
+
+
+# --- elle yazılmış FITS ışık eğrileri (astropy gerekmez) ---
+
+def card(key, value=None):
+    if value is None:
+        return key.ljust(80)
+    if isinstance(value, bool):
+        value = 'T' if value else 'F'
+        text = value.rjust(20)
+    elif isinstance(value, str):
+        text = f"'{value:<8}'".ljust(20)
+    else:
+        text = str(value).rjust(20)
+    return f'{key:<8}= {text}'.ljust(80)
+
+
+def header_block(cards):
+    raw = ''.join(cards + [card('END')]).encode('ascii')
+    return raw + b' ' * (-len(raw) % BLOCK_SIZE)
+
+
+def padded(data):
+    return data + b'\0' * (-len(data) % BLOCK_SIZE)
+
+
+ROW_DTYPE = np.dtype([('TIME', '>f8'), ('SAP_FLUX', '>f4'), ('PDCSAP_FLUX', '>f4'), ('QUALITY', '>i4')])
+
+
+def lightcurve_bytes(n=50, quality=None, xtension='BINTABLE', time=None, flux=None, ticid=123456):
+    # time / flux verilmezse doğrusal artan sahte değerler
+    if time is not None:
+        n = len(time)
+    primary = header_block([
+        card('SIMPLE', True), card('BITPIX', 8), card('NAXIS', 0), card('EXTEND', True),
+        card('TELESCOP', 'TESS'), card('TICID', ticid), card('TESSMAG', 9.5),
+    ])
+    rows = np.zeros(n, dtype=ROW_DTYPE)
+    rows['TIME'] = 1000.0 + np.arange(n) * 0.02 if time is None else time
+    rows['SAP_FLUX'] = 1.0 + np.arange(n) * 1e-3 if flux is None else flux
+    rows['PDCSAP_FLUX'] = 2.0 + np.arange(n) * 1e-3 if flux is None else flux
+    rows['QUALITY'] = quality if quality is not None else 0
+    table = header_block([
+        card('XTENSION', xtension), card('BITPIX', 8), card('NAXIS', 2),
+        card('NAXIS1', ROW_DTYPE.itemsize), card('NAXIS2', n), card('PCOUNT', 0), card('GCOUNT', 1),
+        card('TFIELDS', 4),
+        card('TTYPE1', 'TIME'), card('TFORM1', 'D'),
+        card('TTYPE2', 'SAP_FLUX'), card('TFORM2', 'E'),
+        card('TTYPE3', 'PDCSAP_FLUX'), card('TFORM3', 'E'),
+        card('TTYPE4', 'QUALITY'), card('TFORM4', 'J'),
+        card('EXTNAME', 'LIGHTCURVE'), card('BJDREFI', 2457000),
+    ])
+    return primary + table + padded(rows.tobytes()), rows
+
+
+# --- kataloglar ve uygulama ---
+
+@pytest.fixture
+def toi_csv():
+    def build(n=3000, seed=0):
+        return make_toi(n, seed).to_csv(index=False).encode()
+    return build
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    # Flask test istemcisi; önbellekler ve iş durumu teste özel dizinlerde
+    import app
+    from jobs import JobRegistry
+    from result_cache import ResultCache
+    from upload_cache import DiskCache
+
+    monkeypatch.setattr(app, 'results_cache', ResultCache(directory=str(tmp_path / 'results')))
+    monkeypatch.setattr(app, 'upload_cache', DiskCache(str(tmp_path / 'uploads')))
+    monkeypatch.setattr(app, 'background_jobs', JobRegistry(directory=str(tmp_path / 'jobs')))
+    return app.app.test_client()
+
+
+def upload(client, data, filename='catalog.csv', **form):
+    return client.post('/api/analyze_file', data=dict(form, file=(io.BytesIO(data), filename)),
+                       content_type='multipart/form-data')
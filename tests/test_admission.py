@@ -0,0 +1,83 @@
+# Kabul kontrolü: kapasite, sıra, 429 ve akış yanıtlarında kapasitenin ne zaman bırakıldığı
+
+import threading
+
+import pytest
+from flask import Flask, jsonify
+
+from admission import AdmissionController, Rejected
+from sse import ProgressStream, sse_response
+
+
+def make_app(controller, release):
+    app = Flask(__name__)
+
+    @app.route('/stream')
+    @controller.limit('heavy')
+    def stream():
+        def work(s):
+            s.emit('progress', {'rows': 0})
+            release.wait(5)
+            return {'ok': True}
+        return sse_response(ProgressStream().run(work))
+
+    @app.route('/plain')
+    @controller.limit('heavy')
+    def plain():
+        return jsonify({'ok': True})
+
+    return app
+
+
+def test_queue_full_and_timeout_are_rejected():
+    controller = AdmissionController(capacity=4, classes={'heavy': (4, 1)}, queue_timeout=0.05)
+    controller.acquire('heavy')
+    with pytest.raises(Rejected, match='timed out'):
+        controller.acquire('heavy')
+
+    waiter = threading.Thread(target=controller.acquire, args=('heavy', 5))
+    waiter.start()
+    while controller.stats()['queue_depth'] == 0:
+        pass
+    with pytest.raises(Rejected, match='queue is full'):
+        controller.acquire('heavy')
+    controller.release('heavy', 0.1)
+    waiter.join()
+    stats = controller.stats()
+    assert stats['in_use'] == 4 and stats['classes']['heavy']['admitted'] == 2
+    assert stats['classes']['heavy']['rejected_queue_full'] == 1
+
+
+def test_plain_response_releases_immediately():
+    controller = AdmissionController(capacity=4, classes={'heavy': (4, 2)})
+    client = make_app(controller, threading.Event()).test_client()
+    assert client.get('/plain').status_code == 200
+    assert controller.stats()['in_use'] == 0
+
+
+def test_dropped_stream_keeps_slot_until_producer_finishes():
+    # İstemci akışı açıp hemen kapatır; analiz sürdükçe kapasite dolu kalır
+    controller = AdmissionController(capacity=4, classes={'heavy': (4, 2)}, queue_timeout=0.05)
+    release = threading.Event()
+    client = make_app(controller, release).test_client()
+
+    response = client.get('/stream', buffered=False)
+    assert response.status_code == 200
+    response.close()
+    assert controller.stats()['in_use'] == 4
+    assert client.get('/stream').status_code == 429
+
+    finished = threading.Event()
+    controller.release = (lambda original: lambda *a: (original(*a), finished.set()))(controller.release)
+    release.set()
+    assert finished.wait(5)
+    assert controller.stats()['in_use'] == 0
+    assert client.get('/plain').status_code == 200
+
+
+def test_on_finish_after_producer_ended_runs_immediately():
+    stream = ProgressStream().run(lambda s: {'ok': True})
+    assert list(stream)[-1].startswith('event: done')
+    called = []
+    stream.on_finish(lambda: called.append(1))
+    assert called == [1]
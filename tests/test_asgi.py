@@ -0,0 +1,162 @@
+# asgi: /api/nasa_auto'nun olay döngüsü yolu; eşzamanlı isteklerin tek indirmede birleşmesi,
+# istemci ayrılınca iptal, Flask ile aynı yanıt ve diğer yolların Flask'a yönlenmesi
+
+import asyncio
+
+import httpx
+import pytest
+
+import app
+import asgi
+from asgi import AsgiApp, AsyncFlights, AsyncNasaService
+from conftest import make_toi
+from fake_tap import serve_in_thread
+from snapshot import SnapshotStore
+
+URL = '/api/nasa_auto?source=toi'
+
+
+class CountingService(AsyncNasaService):
+    # TAP'a giden indirmeler sayılır
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.downloads = 0
+
+    async def download(self, query, fh):
+        self.downloads += 1
+        await super().download(query, fh)
+
+
+@pytest.fixture
+def tap():
+    srv = serve_in_thread({'toi': make_toi(500)}, port=0, delay=0.3)
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def service(client, tap, tmp_path, monkeypatch):
+    # Flask ve ASGI yolu aynı geçici snapshot deposunu kullanır
+    store = SnapshotStore(str(tmp_path / 'snapshots'))
+    monkeypatch.setattr(app, 'snapshots', store)
+    monkeypatch.setattr(asgi, 'snapshots', store)
+    monkeypatch.setattr(app, 'NASA_TAP_URL', f'http://127.0.0.1:{tap.server_address[1]}/TAP')
+    return CountingService(app.NASA_TAP_URL, cpu_workers=2)
+
+
+def run(service, *paths):
+    # Yollar aynı anda istenir; (durum, JSON veya metin) listesi döner
+    async def main():
+        transport = httpx.ASGITransport(app=AsgiApp(app.app, service, wsgi_workers=2))
+        async with httpx.AsyncClient(transport=transport, base_url='http://test') as c:
+            try:
+                responses = await asyncio.gather(*(c.get(p) for p in paths))
+            finally:
+                await service.close()
+        return [(r.status_code, r.json() if r.headers['content-type'] == 'application/json' else r.text)
+                for r in responses]
+    return asyncio.run(main())
+
+
+def test_concurrent_requests_share_one_download(service):
+    results = run(service, *[URL] * 5)
+    assert service.downloads == 1
+    assert [status for status, _ in results] == [200] * 5
+    assert sorted(body['shared'] for _, body in results) == [False] + [True] * 4
+    rows = [body['data'] for _, body in results]
+    assert all(r == rows[0] for r in rows) and len(rows[0]) == 500
+
+
+def test_response_matches_flask_endpoint(service, client):
+    (status, body), = run(service, URL)
+    assert status == 200
+    expected = client.get(URL).get_json()
+    # Aynı snapshot sürümü: aynı satırlar ve result_id; Flask isteği snapshot'ı paylaşır
+    assert body.pop('shared') is False and expected.pop('shared') is True
+    assert body == expected
+
+    # Satırların JSON'u snapshot sürümü başına önbellekte
+    snap = app.snapshots.open(app.nasa_snapshot_name(app.nasa_params({'source': 'toi'})))
+    assert [version for version, _ in service._rows.values()] == [snap.version]
+
+    # Taze snapshot varken yeni süreç TAP'a gitmez
+    service = CountingService(service.base_url, cpu_workers=1)
+    (_, again), = run(service, URL)
+    assert service.downloads == 0 and again['data'] == body['data'] and again['shared'] is True
+
+
+def test_invalid_params_and_tap_errors(service):
+    (status, body), = run(service, '/api/nasa_auto?source=nope')
+    assert status == 400 and body == {'error': 'Invalid data source'}
+
+    dead = CountingService('http://127.0.0.1:9/TAP', cpu_workers=1)
+    (status, body), = run(dead, URL)
+    assert status == 502 and 'TAP request failed' in body['error']
+
+
+def test_other_paths_and_modes_go_to_flask(service, monkeypatch):
+    calls = []
+    monkeypatch.setattr(app, 'nasa_snapshot', lambda params, on_chunk=None: calls.append(params['mode']) or
+                        (_ for _ in ()).throw(TimeoutError('flask path')))
+    (index_status, html), (status, body) = run(service, '/', URL + '&tap=async')
+    assert index_status == 200 and '<html' in html.lower()
+    # async TAP modu Flask uygulamasının nasa_auto'sunda işlenir
+    assert calls == ['async'] and status == 504 and body['error'] == 'flask path'
+    assert service.downloads == 0
+
+
+def test_client_disconnect_cancels_the_download(service):
+    sent = []
+
+    async def main():
+        async def receive():
+            await asyncio.sleep(0.05)
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': 'GET', 'path': '/api/nasa_auto', 'query_string': b'source=toi'}
+        await service.handle(scope, receive, send)
+        # Bekleyen kalmadı: görev iptal edildi ve kayıttan düştü
+        await asyncio.sleep(0.05)
+        assert service.flights._flights == {}
+        await service.close()
+
+    asyncio.run(main())
+    assert sent == [] and service.downloads == 1
+    assert app.snapshots.versions(app.nasa_snapshot_name(app.nasa_params({'source': 'toi'}))) == []
+
+
+def test_flights_cancel_only_when_the_last_waiter_leaves():
+    async def main():
+        flights = AsyncFlights()
+        started = []
+
+        async def work():
+            started.append(1)
+            await asyncio.sleep(0.2)
+            return 'done'
+
+        first = asyncio.ensure_future(flights.do('k', work))
+        second = asyncio.ensure_future(flights.do('k', work))
+        await asyncio.sleep(0.01)
+        task = flights._flights['k'].task
+        first.cancel()
+        assert await second == ('done', True)
+        assert len(started) == 1 and not task.cancelled()
+
+        third = asyncio.ensure_future(flights.do('k', work))
+        await asyncio.sleep(0.01)
+        task = flights._flights['k'].task
+        third.cancel()
+        await asyncio.sleep(0.01)
+        assert task.cancelled() and 'k' not in flights._flights
+
+        # Arka plan yenilemesi bekleyen olmadan da tamamlanır
+        flights.do_background('k', work)
+        task = flights._flights['k'].task
+        assert await task == 'done'
+
+    asyncio.run(main())
@@ -0,0 +1,118 @@
+# CandidateTable: vektörel işlemler, çıktı sınırı ve ikili kolon biçiminin (to_binary) çözümü
+
+import base64
+import json
+
+import numpy as np
+import pytest
+
+from candidate_table import BINARY_MAGIC, CandidateTable
+from conftest import make_toi, upload
+from scoring import LABELS
+
+
+def table(ids=('101.01', '102.01', 'ğ-3', '104.01'), prefix='TOI'):
+    columns = {
+        'period': np.array([3.512345, 12.0, np.nan, 7.25], dtype=np.float64),
+        'depth': np.array([1200.4, 450.6, 80.0, 990.0]),
+        'score': np.array([60.44, 87.25, 60.44, 12.0]),
+        'label': np.array([1, 0, 1, 2], dtype=np.uint8),
+        'score_smooth': np.array([61.0, 88.0, 59.0, 13.0]),
+        'label_smooth': np.array([1, 0, 1, 2], dtype=np.uint8),
+        'note': np.array(['a', 'çok uzun not', '', 'x'], dtype=object),
+    }
+    return CandidateTable(columns, None if ids is None else list(ids), prefix).round()
+
+
+def decode_binary(data):
+    # Arayüzdeki JS okuyucunun Python karşılığı: kolon adı -> değer listesi
+    assert data[:4] == BINARY_MAGIC
+    length = int(np.frombuffer(data, '<u4', 1, 4)[0])
+    header = json.loads(data[8:8 + length])
+    base = 8 + length
+    assert base % 8 == 0
+    n = header['rows']
+    out = {}
+    for col in header['columns']:
+        offset = base + col['offset']
+        assert col['offset'] % 8 == 0
+        kind = col['type']
+        if kind in ('f32', 'f64'):
+            values = np.frombuffer(data, '<f4' if kind == 'f32' else '<f8', n, offset).astype(np.float64)
+            if col['decimals'] is not None:
+                values = np.round(values, col['decimals'])
+            out[col['name']] = [None if not np.isfinite(v) else v for v in values.tolist()]
+        elif kind == 'u8':
+            codes = np.frombuffer(data, np.uint8, n, offset)
+            out[col['name']] = [col['labels'][c] for c in codes]
+        elif kind == 'i32':
+            out[col['name']] = [f"{col['prefix']}{v}" for v in np.frombuffer(data, '<i4', n, offset).tolist()]
+        else:
+            positions = np.frombuffer(data, '<u4', n + 1, offset).tolist()
+            raw = data[base + col['data']:base + col['data'] + col['length']]
+            out[col['name']] = [col['prefix'] + raw[a:b].decode('utf-8') for a, b in zip(positions, positions[1:])]
+    return out
+
+
+def records(columns):
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+@pytest.mark.parametrize('ids, prefix', [(('101.01', '102.01', 'ğ-3', '104.01'), 'TOI'), (None, None)],
+                         ids=['string-ids', 'row-ids'])
+def test_binary_round_trip_matches_records(ids, prefix):
+    t = table(ids, prefix)
+    assert records(decode_binary(t.to_binary())) == t.to_records()
+
+
+def test_binary_of_empty_table():
+    decoded = decode_binary(CandidateTable.empty().to_binary())
+    assert set(decoded) == {'id', 'period', 'duration', 'depth', 'star_mag', 'score', 'label'}
+    assert all(v == [] for v in decoded.values())
+
+
+def test_records_round_and_blank_non_finite_values():
+    row = table().to_records()[2]
+    assert row == {'id': 'TOI-ğ-3', 'period': None, 'depth': 80.0, 'score': 60.4, 'label': 'PC',
+                   'score_smooth': 59.0, 'label_smooth': 'PC', 'note': ''}
+    assert table().to_records()[0]['period'] == 3.51
+    assert table().columns['score'].dtype == np.float32
+
+
+def test_sort_is_stable_and_take_keeps_ids_and_rows():
+    t = table().sort()
+    assert [r['id'] for r in t.to_records()] == ['TOI-102.01', 'TOI-101.01', 'TOI-ğ-3', 'TOI-104.01']
+    assert t.rows.tolist() == [1, 0, 2, 3]
+    ascending = table().sort('period', descending=False)
+    assert ascending.rows.tolist()[:3] == [0, 3, 1]
+    assert len(t[:2]) == 2 and t[1:2].to_records()[0]['id'] == 'TOI-101.01'
+    assert t.filter(t['label'] == 1).rows.tolist() == [0, 2]
+
+
+def test_concat_and_shift_rows_give_file_positions():
+    a = CandidateTable({'score': np.array([1.0, 2.0])})
+    b = CandidateTable({'score': np.array([3.0])}).shift_rows(2)
+    merged = CandidateTable.concat([a, None, b])
+    assert merged.id_strings() == ['ROW-1', 'ROW-2', 'ROW-3']
+    assert len(CandidateTable.concat([])) == 0
+
+
+def test_arrays_round_trip_and_frame():
+    t = table()
+    restored = CandidateTable.from_arrays(t.to_arrays(), 'TOI')
+    assert restored.to_records() == t.to_records()
+    frame = t.to_frame()
+    assert list(frame.columns)[:2] == ['id', 'period'] and frame['label'].tolist() == ['PC', 'CP', 'PC', 'APC']
+    assert t.nbytes() > 0 and set(LABELS) >= set(frame['label_smooth'])
+
+
+def test_columnar_upload_decodes_to_json_rows(client):
+    data = make_toi(300).to_csv(index=False).encode()
+    rows = upload(client, data).get_json()['data']
+    payload = upload(client, data, rows='columnar').get_json()
+    assert 'data' not in payload
+    assert records(decode_binary(base64.b64decode(payload['columns']))) == rows
+
+    r = upload(client, data, rows='xml')
+    assert r.status_code == 400
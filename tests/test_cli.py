@@ -0,0 +1,100 @@
+# cli: girdi genişletme, çıktı adları/biçimleri, profil ve birim hataları, score komutunun uçtan uca çalışması
+
+import json
+
+import pandas as pd
+import pytest
+
+import app
+import cli
+from conftest import make_toi
+
+
+def score(*argv):
+    return cli.main(['score', *argv, '-j', '1'])
+
+
+def test_expand_inputs_dirs_globs_and_recursion(tmp_path):
+    (tmp_path / 'sub').mkdir()
+    for name in ('a.csv', 'b.parquet', 'notes.txt', 'sub/c.csv'):
+        (tmp_path / name).write_text('x')
+    base = str(tmp_path)
+
+    assert cli.expand_inputs([base]) == [f'{base}/a.csv', f'{base}/b.parquet']
+    assert cli.expand_inputs([base], recursive=True) == [f'{base}/a.csv', f'{base}/b.parquet', f'{base}/sub/c.csv']
+    # Glob ve dizin aynı dosyayı verirse bir kez
+    assert cli.expand_inputs([f'{base}/*.csv', base]) == [f'{base}/a.csv', f'{base}/b.parquet']
+    # Açık verilen dosya uzantısından bağımsız listelenir (cmd_score reddeder)
+    assert cli.expand_inputs([f'{base}/notes.txt']) == [f'{base}/notes.txt']
+
+
+def test_output_format_and_paths():
+    assert cli.output_format('a.PQ') == 'parquet' and cli.output_format('a.xlsx') == 'xlsx'
+    assert cli.output_format('a.json', 'xlsx') == 'xlsx'
+    outputs = cli.output_paths(['x/cat.csv', 'y/cat.parquet', 'z/other.csv'], 'out', 'csv')
+    assert outputs == ['out/x_cat_scored.csv', 'out/y_cat_scored.csv', 'out/other_scored.csv']
+
+
+@pytest.mark.parametrize('fmt', ['csv', 'parquet', 'xlsx'])
+def test_write_table_formats_with_stats(tmp_path, fmt):
+    if fmt == 'parquet':
+        pytest.importorskip('pyarrow')
+    df = pd.DataFrame({'id': ['TOI-1', 'TOI-2'], 'score': [87.5, 40.0]})
+    path = tmp_path / f'out.{fmt}'
+    cli.write_table(df, str(path), fmt, {'total': 2})
+
+    if fmt == 'xlsx':
+        sheets = pd.read_excel(path, sheet_name=None)
+        assert list(sheets) == ['Results', 'Summary'] and sheets['Summary']['total'].tolist() == [2]
+        assert sheets['Results']['score'].tolist() == [87.5, 40.0]
+        return
+    back = pd.read_csv(path) if fmt == 'csv' else pd.read_parquet(path)
+    pd.testing.assert_frame_equal(back, df)
+    assert json.loads((tmp_path / 'out.summary.json').read_text()) == {'total': 2}
+
+
+def test_unknown_profile_exits_with_message(tmp_path):
+    path = tmp_path / 'cat.csv'
+    make_toi(10).to_csv(path, index=False)
+    for options in (['--profile', 'nope'], ['--profiles', 'smooth,nope']):
+        with pytest.raises(SystemExit, match='Unknown scoring profile: nope'):
+            score(str(path), '-o', str(tmp_path / 'out'), *options)
+    # Profil hatası dosyalar okunmadan, çıktı dizini oluşturulmadan yakalanır
+    assert not (tmp_path / 'out').exists()
+
+
+def test_bad_unit_hint_and_inputs_exit(tmp_path):
+    path = tmp_path / 'cat.csv'
+    make_toi(10).to_csv(path, index=False)
+    with pytest.raises(SystemExit, match='depth'):
+        score(str(path), '-o', str(tmp_path / 'out'), '--units', 'depth:furlongs')
+    with pytest.raises(SystemExit, match='No input files matched'):
+        score(str(tmp_path / '*.parquet'))
+    (tmp_path / 'notes.txt').write_text('x')
+    with pytest.raises(SystemExit, match='Unsupported format'):
+        score(str(tmp_path / 'notes.txt'))
+
+
+def test_score_writes_outputs_and_summary(tmp_path):
+    data = tmp_path / 'data'
+    data.mkdir()
+    df = make_toi(200)
+    df.to_csv(data / 'toi.csv', index=False)
+    (data / 'broken.parquet').write_bytes(b'not parquet at all')
+    out = tmp_path / 'out'
+
+    # Bozuk dosya diğerini durdurmaz ama çıkış kodu 1 olur
+    assert score(str(data), '-o', str(out), '--profiles', 'smooth') == 1
+    scored = pd.read_csv(out / 'toi_scored.csv')
+    expected = app.score_file(str(data / 'toi.csv'), 'file', compare=['smooth'])['table'].to_frame()
+    assert scored['score'].tolist() == expected['score'].tolist()
+    assert {'score_smooth', 'label_smooth'} <= set(scored.columns)
+    assert json.loads((out / 'toi_scored.summary.json').read_text())['total'] == len(scored)
+
+    summary = pd.read_csv(out / 'summary.csv')
+    assert summary['input'].tolist() == [str(data / 'toi.csv')]
+    assert summary['total'].tolist() == [len(scored)]
+
+    (data / 'broken.parquet').unlink()
+    assert score(str(data), '-o', str(out), '--format', 'parquet') == 0
+    assert (out / 'toi_scored.parquet').exists()
@@ -0,0 +1,93 @@
+# diff: sıralı kimlik birleştirmesi ve iki snapshot sürümü arasındaki fark
+
+import numpy as np
+import pytest
+
+import app
+from conftest import make_toi
+from diff import UnkeyedSnapshot, diff_tables, merge_join
+from snapshot import SnapshotStore
+
+
+def pairs(a, b):
+    ia, ib = merge_join(np.array(a), np.array(b))
+    return sorted(zip(np.array(a)[ia].tolist(), ia.tolist(), ib.tolist()))
+
+
+def test_merge_join_added_and_removed():
+    # 1 kaldırıldı, 4 eklendi
+    assert pairs([1, 2, 3], [2, 3, 4]) == [(2, 1, 0), (3, 2, 1)]
+
+
+def test_merge_join_empty_and_disjoint():
+    assert pairs([], [1, 2]) == []
+    assert pairs([1, 2], []) == []
+    assert pairs([1, 2], [3, 4]) == []
+
+
+def test_merge_join_duplicate_ids_pair_in_order():
+    # k. eski satır k. yeni satırla; fazlası eklenmiş / kaldırılmış sayılır
+    assert pairs([5, 5, 5, 7], [5, 5, 7, 7]) == [(5, 0, 0), (5, 1, 1), (7, 3, 2)]
+
+
+def test_merge_join_mixed_string_widths():
+    ia, ib = merge_join(np.array([b'KOI-1', b'KOI-10']), np.array([b'KOI-10', b'KOI-100']))
+    assert ia.tolist() == [1] and ib.tolist() == [0]
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = SnapshotStore(str(tmp_path / 'snapshots'))
+    monkeypatch.setattr(app, 'snapshots', store)
+    return store
+
+
+def publish(df, ids=True):
+    params = app.nasa_params({})
+    if ids:
+        return app.publish_catalog(params, [df])
+    df = df.drop(columns='toi')
+    table = app.score_dataframe(df, app.find_columns(df), 'toi')
+    return app.snapshots.publish(app.nasa_snapshot_name(params), app.snapshot_tables(table))
+
+
+def open_pair(store, old, new):
+    name = app.nasa_snapshot_name(app.nasa_params({}))
+    return store.open_version(name, old), store.open_version(name, new)
+
+
+def test_diff_tables_added_removed_changed(store):
+    old_df = make_toi(200, seed=1)
+    # Yeni sürüm: ilk 5 aday kaldırıldı, 3 yeni aday, bir adayın derinliği değişti (skor değişir)
+    new_df = old_df.iloc[5:].copy()
+    extra = make_toi(3, seed=2)
+    extra['toi'] = [9001.01, 9002.01, 9003.01]
+    new_df = app.pd.concat([extra, new_df], ignore_index=True)
+    row = new_df.index[new_df['toi'] == old_df['toi'].iloc[50]][0]
+    new_df.loc[row, 'pl_trandep'] = 50.0
+
+    old, new = open_pair(store, publish(old_df), publish(new_df))
+    result = diff_tables(old, new, app.table_from_snapshot(old), app.table_from_snapshot(new), threshold=1.0)
+
+    summary = result['summary']
+    assert summary['added'] == 3 and summary['removed'] == 5
+    assert summary['unchanged'] + summary['changed'] == 195
+    assert sorted(r['id'] for r in result['added']) == ['TOI-9001.01', 'TOI-9002.01', 'TOI-9003.01']
+    changed = {r['id']: r for r in result['changed']}
+    record = changed[f"TOI-{old_df['toi'].iloc[50]:.2f}"]
+    assert record['score_delta'] < -1.0
+    assert record['score_delta'] == pytest.approx(record['score'] - record['score_from'], abs=0.11)
+    # Yalnızca değişen aday; satır numaraları kaysa da diğerleri kimlikle eşleşir
+    assert summary['changed'] == 1
+
+
+def test_diff_refuses_snapshots_without_ids(store, client):
+    df = make_toi(50)
+    versions = [publish(df, ids=False), publish(df, ids=False)]
+    old, new = open_pair(store, *versions)
+    with pytest.raises(UnkeyedSnapshot):
+        diff_tables(old, new, app.table_from_snapshot(old), app.table_from_snapshot(new))
+
+    r = client.get('/api/diff')
+    assert r.status_code == 409
+    assert 'no candidate ids' in r.get_json()['error']
@@ -0,0 +1,129 @@
+# fits_io için küçük, elle yazılmış FITS dosyaları (astropy gerekmez)
+
+import io
+
+import numpy as np
+import pytest
+
+from conftest import lightcurve_bytes
+from fits_io import BLOCK_SIZE, DEFAULT_QUALITY_BITMASK, FitsFile, read_lightcurve
+
+
+@pytest.fixture
+def lc_path(tmp_path):
+    quality = np.zeros(50, dtype=np.int32)
+    quality[[3, 10, 11]] = [1, 32, 128]
+    quality[20] = 2048          # varsayılan maskede olmayan bit
+    data, rows = lightcurve_bytes(quality=quality)
+    path = tmp_path / 'lc.fits'
+    path.write_bytes(data)
+    return path, rows
+
+
+def test_column_dtypes_are_big_endian(lc_path):
+    path, _ = lc_path
+    with read_lightcurve(str(path)) as lc:
+        assert lc.time.dtype == np.dtype('>f8')
+        assert lc.sap_flux.dtype == np.dtype('>f4')
+        assert lc.pdcsap_flux.dtype == np.dtype('>f4')
+        assert lc.quality.dtype == np.dtype('>i4')
+        assert lc.meta['id'] == 'TIC-123456'
+        assert lc.meta['time_ref'] == 2457000
+
+
+def test_columns_are_views_of_the_mmap(lc_path):
+    path, rows = lc_path
+    with read_lightcurve(str(path)) as lc:
+        buffer = np.frombuffer(lc._fits.buffer, dtype=np.uint8)
+        for column in (lc.time, lc.sap_flux, lc.pdcsap_flux, lc.quality):
+            assert np.shares_memory(column, buffer)
+            assert not column.flags.owndata
+        np.testing.assert_array_equal(lc.time, rows['TIME'])
+        np.testing.assert_array_equal(lc.pdcsap_flux, rows['PDCSAP_FLUX'])
+
+
+def test_quality_mask_matches_bits(lc_path):
+    path, rows = lc_path
+    with read_lightcurve(str(path)) as lc:
+        good = lc.mask()
+        expected = (rows['QUALITY'] & DEFAULT_QUALITY_BITMASK) == 0
+        np.testing.assert_array_equal(good, expected)
+        assert list(np.flatnonzero(~good)) == [3, 10, 11]
+
+        time, flux = lc.clean()
+        assert time.dtype == np.float64 and time.dtype.isnative
+        np.testing.assert_array_equal(time, rows['TIME'][expected])
+        np.testing.assert_array_equal(flux, rows['PDCSAP_FLUX'][expected].astype(np.float64))
+
+        assert lc.mask(bitmask=0).all()
+
+
+def test_bytes_source(lc_path):
+    path, rows = lc_path
+    with read_lightcurve(path.read_bytes()) as lc:
+        assert len(lc.table) == len(rows)
+
+
+def test_truncated_data(lc_path):
+    path, _ = lc_path
+    data = path.read_bytes()
+    with pytest.raises(ValueError, match='truncated'):
+        read_lightcurve(data[:len(data) - BLOCK_SIZE + 100])
+
+
+def test_truncated_header(lc_path):
+    path, _ = lc_path
+    with pytest.raises(ValueError, match='not terminated'):
+        FitsFile(path.read_bytes()[:1000])
+
+
+def test_not_fits():
+    with pytest.raises(ValueError, match='Not a FITS file'):
+        FitsFile(b'time,flux\n' * 400)
+
+
+def test_not_bintable():
+    data, _ = lightcurve_bytes(xtension='TABLE')
+    with pytest.raises(ValueError, match='not a BINTABLE'):
+        read_lightcurve(data)
+
+
+def test_mmap_is_closed_when_reading_fails(lc_path, monkeypatch):
+    path, _ = lc_path
+    data = path.read_bytes()
+    closed = []
+    original = FitsFile.close
+    monkeypatch.setattr(FitsFile, 'close', lambda self: (closed.append(self._mmap), original(self)))
+
+    truncated = path.with_name('truncated.fits')
+    truncated.write_bytes(data[:len(data) - BLOCK_SIZE + 100])
+    with pytest.raises(ValueError, match='truncated'):
+        read_lightcurve(str(truncated))
+    not_fits = path.with_name('table.csv')
+    not_fits.write_bytes(b'time,flux\n' * 400)
+    with pytest.raises(ValueError, match='Not a FITS file'):
+        read_lightcurve(str(not_fits))
+
+    assert len(closed) == 2 and all(mm is not None and mm.closed for mm in closed)
+
+
+def test_missing_flux_column(lc_path):
+    path, _ = lc_path
+    data = path.read_bytes().replace(b"'PDCSAP_FLUX'", b"'KSPSAP_FLUX'")
+    with read_lightcurve(data) as lc:
+        assert lc.pdcsap_flux is None
+        with pytest.raises(KeyError, match='Column not found: PDCSAP_FLUX'):
+            lc.clean()
+
+
+@pytest.mark.parametrize('data, error', [
+    (b'time,flux\n' * 400, 'Not a FITS file'),
+    (lightcurve_bytes()[0][:-BLOCK_SIZE + 100], 'truncated'),
+    (lightcurve_bytes()[0].replace(b"'PDCSAP_FLUX'", b"'KSPSAP_FLUX'"), 'Column not found'),
+    (lightcurve_bytes()[0][:BLOCK_SIZE], 'HDU not found'),
+], ids=['not-fits', 'truncated', 'no-pdcsap', 'primary-only'])
+def test_bad_uploads_are_client_errors(client, data, error):
+    response = client.post('/api/analyze_file', data={'file': (io.BytesIO(data), 'lc.fits'), 'period': '3.5',
+                                                      't0': '1001'}, content_type='multipart/form-data')
+    assert response.status_code == 400
+    assert error in response.get_json()['error']
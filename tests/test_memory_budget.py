@@ -0,0 +1,77 @@
+# Yükleme bellek bütçesi: plan ayrıştırmadan (ve split_csv'den) önce seçilir
+
+import pytest
+
+import app
+from conftest import make_toi, upload
+
+MB = 2 ** 20
+
+
+def scores(payload):
+    return sorted((r['id'], r['score'], r['label']) for r in payload['data'])
+
+
+@pytest.fixture
+def budget(monkeypatch):
+    def set_budget(mb):
+        monkeypatch.setattr(app.memory, 'budget', int(mb * MB))
+    return set_budget
+
+
+@pytest.fixture
+def large_csv():
+    # ~0.55 MB: tam ayrıştırma ~13 MB, parçalı ~10.5 MB tahmin
+    return make_toi(5000).to_csv(index=False).encode()
+
+
+def test_oversized_upload_is_rejected(client, budget, large_csv):
+    budget(4)
+    r = upload(client, large_csv)
+    assert r.status_code == 413
+    body = r.get_json()
+    assert body['budget'] == 4 * MB and body['estimate'] > body['budget']
+    assert 'split the file' in body['error']
+
+
+def test_over_full_budget_takes_chunked_path(client, budget, large_csv):
+    expected = scores(upload(client, large_csv, source='toi').get_json())
+    budget(12)
+    r = upload(client, large_csv, source='file')
+    assert r.status_code == 200
+    payload = r.get_json()
+    assert payload['cache']['chunks'] > 1
+    assert scores(payload) == expected
+
+
+def test_unsplittable_csv_over_budget_is_streamed(client, budget, monkeypatch):
+    df = make_toi(5000)
+    df['note'] = ''
+    df.loc[10, 'note'] = 'two\nlines'
+    data = df.to_csv(index=False).encode()
+    expected = scores(upload(client, data).get_json())
+
+    budget(12)
+    streamed = []
+    score_csv_stream = app.score_csv_stream
+    monkeypatch.setattr(app, 'score_csv_stream', lambda *a, **k: streamed.append(1) or score_csv_stream(*a, **k))
+    r = upload(client, data, source='toi')
+    assert r.status_code == 200
+    assert streamed and 'chunks' not in r.get_json()['cache']
+    assert scores(r.get_json()) == expected
+
+
+def test_split_is_skipped_when_only_full_parse_fits(client, budget, monkeypatch):
+    # Küçük dosyada split_csv'nin kopyaları tam ayrıştırmadan pahalı: plan 'full' ve
+    # parçalama hiç denenmez
+    data = make_toi(500).to_csv(index=False).encode()
+
+    def split_csv(_):
+        raise AssertionError('split_csv ran over budget')
+
+    budget(1.4)
+    monkeypatch.setattr(app, 'split_csv', split_csv)
+    r = upload(client, data)
+    assert r.status_code == 200
+    assert 'chunks' not in r.get_json()['cache']
+    assert len(r.get_json()['data']) == 500
@@ -0,0 +1,77 @@
+# stream_nasa_csv: TAP yanıtı indirilirken parça parça ayrıştırılır (gzip dahil)
+
+import pandas as pd
+import pytest
+
+import app
+from conftest import make_toi
+from fake_tap import serve_in_thread
+
+ROWS = 12000
+
+
+@pytest.fixture
+def tap(monkeypatch):
+    table = make_toi(ROWS).round(6)
+    srv = serve_in_thread({'toi': table}, port=0)
+    monkeypatch.setattr(app, 'NASA_TAP_URL', f'http://127.0.0.1:{srv.server_address[1]}/TAP')
+    yield table
+    srv.shutdown()
+    srv.server_close()
+
+
+@pytest.fixture
+def responses(monkeypatch):
+    # Açılan yanıtlar kapatıldı mı diye izlenir
+    opened = []
+
+    class TrackingClient(app.TapClient):
+        def open(self, query, mode='sync'):
+            r = super().open(query, mode)
+            opened.append(r)
+            return r
+
+    monkeypatch.setattr(app, 'TapClient', TrackingClient)
+    return opened
+
+
+@pytest.mark.parametrize('mode', ['sync', 'async'])
+def test_chunks_rebuild_the_table(tap, mode):
+    progress = {}
+    sizes = []
+    frames = []
+    for df in app.stream_nasa_csv(app.NASA_TABLES['toi'], mode, chunksize=1000, progress=progress):
+        sizes.append(progress['bytes'])
+        frames.append(df)
+
+    assert max(len(df) for df in frames) == 1000 and len(frames) == ROWS // 1000
+    pd.testing.assert_frame_equal(pd.concat(frames, ignore_index=True), tap, check_dtype=False)
+    # İlerleme ağdan okunan (gzip'li) bayttır, parça parça artar
+    assert sizes == sorted(sizes) and sizes[0] < sizes[-1]
+    assert sizes[-1] < len(tap.to_csv(index=False))
+
+
+def test_first_chunk_arrives_before_the_download_ends(tap, responses):
+    progress = {}
+    stream = app.stream_nasa_csv(app.NASA_TABLES['toi'], 'sync', chunksize=500, progress=progress)
+    first = next(stream)
+    assert len(first) == 500
+    read = progress['bytes']
+    r = responses[0]
+    assert read < int(r.headers['Content-Length'])
+
+    # Tüketici erken bırakırsa yanıt kapanır
+    stream.close()
+    assert r.raw.closed
+
+
+def test_partitioned_mode_streams_in_key_order(tap, tmp_path, monkeypatch):
+    import tap_client
+    monkeypatch.setattr(tap_client, 'WORK_DIR', str(tmp_path))
+    frames = list(app.stream_nasa_csv(app.NASA_TABLES['toi'], 'partitioned', chunksize=3000))
+    merged = pd.concat(frames)
+    assert merged.index.tolist() == list(range(ROWS))
+    assert merged['toi'].is_monotonic_increasing
+    assert len(merged) == ROWS
+    # Başarılı çekimin parçaları silinir
+    assert not any(tmp_path.iterdir())
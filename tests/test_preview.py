@@ -0,0 +1,97 @@
+# Ön izleme: istatistikler tüm satırlardan (kesin), grafik örneklemi sabit boyutlu;
+# arka plandaki kesin analiz ön izlemenin skorlarını yeniden kullanır
+
+import time
+
+import numpy as np
+
+from app import summarize
+from candidate_table import CandidateTable
+from conftest import upload
+from jobs import JobRegistry
+from preview import Preview
+from result_cache import ResultCache
+from upload_cache import DiskCache
+
+
+def chunk(rng, n, offset):
+    score = rng.uniform(20, 100, n).astype(np.float32)
+    return CandidateTable({'period': rng.uniform(1, 30, n).astype(np.float32),
+                           'score': score,
+                           'label': np.where(score >= 80, 0, np.where(score >= 46, 1, 2)).astype(np.uint8)},
+                          rows=np.arange(offset, offset + n))
+
+
+def test_stats_are_exact_and_match_full_analysis():
+    rng = np.random.default_rng(3)
+    parts = [chunk(rng, 4000, i * 4000) for i in range(5)]
+    preview = Preview(sample=1000, top=50, seed=1)
+    for part in parts:
+        preview.add(part)
+
+    full = CandidateTable.concat(parts)
+    stats = preview.stats()
+    assert not stats['estimated']
+    assert {key: stats[key] for key in summarize(full)} == summarize(full)
+    assert sum(label['count'] for label in stats['labels'].values()) == len(full)
+
+    assert len(preview.sample()) == 1000
+    top = preview.top_table().values('score')
+    assert np.array_equal(top, np.sort(full.values('score'))[::-1][:50])
+
+
+def test_empty_preview():
+    assert Preview().stats()['total'] == 0
+
+
+def wait_for(jobs, job_id, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        job = jobs.get(job_id)
+        if job['status'] in ('done', 'error'):
+            return job
+        time.sleep(0.02)
+    raise AssertionError('job did not finish')
+
+
+def test_background_job_reuses_preview_scores(client, toi_csv, monkeypatch):
+    # Kesin analiz dosyayı yeniden ayrıştırıp skorlamaz; sonuç mode=full ile aynıdır
+    import app
+    data = toi_csv(5000)
+    monkeypatch.setattr(app, 'PREVIEW_CHUNK_ROWS', 1200)
+    full = upload(client, data).get_json()
+
+    def rescored(*args, **kwargs):
+        raise AssertionError('upload scored twice')
+
+    monkeypatch.setattr(app, 'score_upload', rescored)
+    monkeypatch.setattr(app, 'upload_cache', DiskCache(str(app.upload_cache.directory) + '-preview'))
+    preview = upload(client, data, mode='preview').get_json()
+    assert preview['preview'] and preview['stats']['total'] == 5000
+
+    job = wait_for(app.background_jobs, preview['job_id'])
+    assert job['status'] == 'done', job['error']
+    done = client.get(f"/api/jobs/{preview['job_id']}").get_json()
+    assert done['stats'] == full['stats']
+    assert done['data'] == full['data']
+
+    # Belirsizlik istenirse ön izleme hata kolonlarını da okur, iş yine yeniden skorlamaz
+    preview = upload(client, data, mode='preview', uncertainty='1', draws='20').get_json()
+    assert wait_for(app.background_jobs, preview['job_id'])['status'] == 'done'
+    done = client.get(f"/api/jobs/{preview['job_id']}").get_json()
+    assert [row['score'] for row in done['data']] == [row['score'] for row in full['data']]
+    assert all('p_cp' in row for row in done['data'])
+
+
+def test_job_status_is_visible_from_other_workers(client, toi_csv, tmp_path):
+    import app
+    preview = upload(client, toi_csv(500), mode='preview').get_json()
+    wait_for(app.background_jobs, preview['job_id'])
+
+    # Başka bir worker: aynı paylaşılan dizinler, boş bellek
+    other = JobRegistry(directory=app.background_jobs.disk.directory)
+    job = other.get(preview['job_id'])
+    assert job['status'] == 'done'
+    assert 'table' not in job['result']
+    assert ResultCache(directory=app.results_cache.disk.directory).get(job['result']['result_id']) is not None
+    assert other.get('../' + preview['job_id'][3:]) is None
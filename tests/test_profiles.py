@@ -0,0 +1,118 @@
+# profiles: bileşen çekirdekleri, config'den yükleme ve tek geçişte çoklu profil skoru
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+import profiles
+from conftest import make_toi, upload
+from profiles import DEFAULT_PROFILE, ScoringProfile, compile_component, get_profile, score_profiles
+from scoring import WEIGHTS, components
+
+PERIOD = np.array([0.8, 12.0, 29.9, 30.0, 45.0])
+DURATION = np.array([1.5, 9.9, 10.0, 4.0, 12.0])
+DEPTH = np.array([120.0, 500.0, 501.0, 2500.0, 80.0])
+MAG = np.array([8.0, 11.0, 13.0, -1.0, 16.0])
+
+
+@pytest.fixture
+def config(tmp_path, monkeypatch):
+    # Registry geçici config dosyasına yönlendirilir
+    path = tmp_path / 'profiles.json'
+
+    def write(spec):
+        path.write_text(json.dumps(spec))
+        os.utime(path, ns=(os.stat(path).st_mtime_ns + 10 ** 9,) * 2)
+
+    monkeypatch.setattr(profiles, 'PROFILES_PATH', str(path))
+    monkeypatch.setattr(profiles, '_registry', {})
+    return write
+
+
+def test_default_profile_matches_scoring_components():
+    expected = 100.0 * components(PERIOD, DURATION, DEPTH, MAG, 'toi') @ np.asarray(WEIGHTS)
+    score = get_profile().score(PERIOD, DURATION, DEPTH, MAG, 'toi')
+    np.testing.assert_allclose(score, expected)
+
+
+def test_step_and_sigmoid_kernels():
+    step = compile_component({'type': 'step', 'op': '<', 'cut': 10, 'then': 1.0, 'else': 0.6})
+    assert step(np.array([9.9, 10.0])).tolist() == [1.0, 0.6]
+    sigmoid = compile_component({'type': 'sigmoid', 'op': '>', 'cut': 500, 'width': 100, 'then': 1.0, 'else': 0.3})
+    values = sigmoid(np.array([-1e9, 500.0, 1e9]))
+    assert values == pytest.approx([0.3, 0.65, 1.0])
+    # Azalan sigmoid
+    falling = compile_component({'type': 'sigmoid', 'op': '<', 'cut': 30, 'width': 5, 'then': 1.0, 'else': 0.4})
+    assert np.all(np.diff(falling(np.linspace(0, 60, 50))) <= 0)
+
+
+@pytest.mark.parametrize('spec, message', [
+    ({'cut': 1, 'op': '>='}, 'Unknown component op'),
+    ({'cut': 1, 'type': 'cubic'}, 'Unknown component type'),
+    ({'cut': 1, 'type': 'sigmoid', 'width': 0}, 'width must be positive'),
+])
+def test_invalid_component_specs(spec, message):
+    with pytest.raises(ValueError, match=message):
+        compile_component(spec)
+
+
+def test_invalid_weights():
+    with pytest.raises(ValueError, match='4 values'):
+        ScoringProfile('bad', {'weights': [0.5, 0.5]})
+
+
+def test_label_codes_at_thresholds():
+    profile = ScoringProfile('p', {'labels': {'mid': 50, 'high': 70}})
+    assert profile.label_codes([49.99, 50.0, 69.99, 70.0]).tolist() == [2, 1, 1, 0]
+
+
+def test_config_profiles_load_and_reload(config):
+    config({'strict': {'labels': {'high': 90}}, DEFAULT_PROFILE: {'weights': [1, 0, 0, 0]}})
+    # 'default' config ile ezilemez
+    assert get_profile(DEFAULT_PROFILE).weights.tolist() == list(WEIGHTS)
+    assert get_profile('strict').high == 90.0
+    fingerprint = get_profile('strict').fingerprint()
+
+    config({'strict': {'labels': {'high': 95}}})
+    assert get_profile('strict').high == 95.0
+    assert get_profile('strict').fingerprint() != fingerprint
+    with pytest.raises(KeyError, match='Unknown scoring profile'):
+        get_profile('missing')
+
+
+def test_score_profiles_in_one_pass_matches_each_profile(config):
+    config({'smooth': {'components': {'depth': {'type': 'sigmoid', 'op': '>', 'cut': 500, 'width': 150,
+                                                'then': 1.0, 'else': 0.3}}},
+            'heavy_mag': {'weights': [0.7, 0.1, 0.1, 0.1], 'labels': {'mid': 40, 'high': 75}}})
+    names = [DEFAULT_PROFILE, 'smooth', 'heavy_mag']
+    together = score_profiles(names, PERIOD, DURATION, DEPTH, MAG, 'toi')
+    for name in names:
+        alone = score_profiles([name], PERIOD, DURATION, DEPTH, MAG, 'toi')[name]
+        np.testing.assert_array_equal(together[name][0], alone[0])
+        np.testing.assert_array_equal(together[name][1], alone[1])
+
+    # Ortak bileşenler bir kez: parlaklık + varsayılan üç basamak + smooth'un derinlik sigmoidi
+    cache = {}
+    for name in names:
+        get_profile(name).components(PERIOD, DURATION, DEPTH, MAG, 'toi', cache)
+    assert len(cache) == 5
+
+
+def test_invalid_rows_score_nan():
+    period = PERIOD.copy()
+    period[1] = np.nan
+    score, codes = score_profiles([DEFAULT_PROFILE], period, DURATION, DEPTH, MAG, 'toi')[DEFAULT_PROFILE]
+    assert np.isnan(score[1]) and np.isfinite(np.delete(score, [1, 3])).all()
+
+
+def test_upload_compares_profiles(client):
+    data = make_toi(100).to_csv(index=False).encode()
+    payload = upload(client, data, profiles='smooth,conservative').get_json()
+    row = payload['data'][0]
+    assert {'score_smooth', 'label_smooth', 'score_conservative', 'label_conservative'} <= set(row)
+
+    r = upload(client, data, profile='nope')
+    assert r.status_code == 400
+    assert 'Unknown scoring profile' in r.get_json()['error']
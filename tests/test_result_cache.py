@@ -0,0 +1,73 @@
+# ResultCache: sonuç, onu üretmeyen bir worker'dan da (paylaşılan dizin) okunabilir
+
+import os
+import time
+
+import numpy as np
+
+from candidate_table import CandidateTable
+from result_cache import ResultCache
+
+
+def table():
+    return CandidateTable({'period': np.array([1.5, 3.0], np.float32), 'score': np.array([80.0, 40.0], np.float32),
+                           'label': np.array([0, 2], np.uint8)}, ['A', 'B'], id_prefix='TOI')
+
+
+def test_result_is_visible_to_other_workers(tmp_path):
+    producer = ResultCache(directory=str(tmp_path))
+    consumer = ResultCache(directory=str(tmp_path))
+    result_id = producer.put(table(), {'source': 'toi'})
+
+    entry = consumer.get(result_id)
+    assert entry is not None
+    assert entry['meta'] == {'source': 'toi'}
+    assert entry['table'].to_records() == table().to_records()
+
+
+def test_fixed_result_id_is_written_once(tmp_path):
+    cache = ResultCache(directory=str(tmp_path))
+    result_id = cache.put(table(), result_id='ab' * 16)
+    path = cache.disk._path(result_id)
+    written = os.stat(path).st_ino
+    assert cache.put(table(), result_id=result_id) == result_id
+    assert os.stat(path).st_ino == written
+
+
+def test_expired_and_invalid_ids(tmp_path):
+    producer = ResultCache(directory=str(tmp_path), ttl=60)
+    result_id = producer.put(table())
+    past = time.time() - 120
+    os.utime(producer.disk._path(result_id), (past, past))
+
+    assert ResultCache(directory=str(tmp_path), ttl=60).get(result_id) is None
+    assert producer.get('../' + result_id[3:]) is None
+    assert producer.get(None) is None
+
+
+def test_cache_directory_is_private(tmp_path):
+    directory = tmp_path / 'results'
+    cache = ResultCache(directory=str(directory))
+    result_id = cache.put(table())
+    assert os.stat(directory).st_mode & 0o777 == 0o700
+    assert os.path.exists(cache.disk._path(result_id))
+
+
+def test_shared_writable_directory_is_refused(tmp_path):
+    # Başka bir kullanıcının önceden oluşturup kayıt bırakabileceği dizin kullanılmaz
+    directory = tmp_path / 'results'
+    directory.mkdir()
+    os.chmod(directory, 0o777)
+    producer = ResultCache(directory=str(directory))
+    result_id = producer.put(table())
+    assert not os.path.exists(producer.disk._path(result_id))
+    assert producer.get(result_id) is not None
+    assert ResultCache(directory=str(directory)).get(result_id) is None
+
+
+def test_directory_owned_by_another_user_is_refused(tmp_path, monkeypatch):
+    cache = ResultCache(directory=str(tmp_path / 'results'))
+    monkeypatch.setattr(os, 'getuid', lambda: os.stat(tmp_path).st_uid + 1)
+    result_id = cache.put(table())
+    assert not cache.disk.usable()
+    assert not os.path.exists(cache.disk._path(result_id))
@@ -0,0 +1,70 @@
+# SingleFlight: aynı anahtar tek çalışır; sonuç dosyaları yalnızca özel dizinden okunur
+
+import fcntl
+import os
+import pickle
+import threading
+import time
+
+import pytest
+
+from singleflight import SingleFlight
+
+
+def test_concurrent_calls_share_one_result(tmp_path):
+    flights = SingleFlight(str(tmp_path / 'sf'))
+    calls = []
+    results = []
+
+    def fn():
+        calls.append(1)
+        time.sleep(0.2)
+        return 42
+
+    threads = [threading.Thread(target=lambda: results.append(flights.do('k', fn))) for _ in range(5)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert sorted(r[0] for r in results) == [42] * 5
+    assert sum(shared for _, shared in results) == 4
+    assert os.stat(tmp_path / 'sf').st_mode & 0o777 == 0o700
+
+
+def test_error_is_shared(tmp_path):
+    flights = SingleFlight(str(tmp_path / 'sf'))
+    with pytest.raises(ValueError):
+        flights.do('k', lambda: (_ for _ in ()).throw(ValueError('boom')))
+
+
+class Planted:
+    def __reduce__(self):
+        return (os.mkdir, (PLANTED,))
+
+
+PLANTED = None
+
+
+def test_planted_result_in_shared_directory_is_not_loaded(tmp_path):
+    # Herkesin yazabildiği dizine bırakılmış sonuç dosyası unpickle edilmez
+    global PLANTED
+    PLANTED = str(tmp_path / 'pwned')
+    directory = tmp_path / 'sf'
+    directory.mkdir()
+    os.chmod(directory, 0o777)
+    flights = SingleFlight(str(directory))
+    lock_path, result_path = flights._paths('k')
+    with open(result_path, 'wb') as fh:
+        pickle.dump((True, Planted()), fh)
+    future = time.time() + 60
+    os.utime(result_path, (future, future))
+
+    # Kilidi başka bir "worker" tutuyor: eski davranışta bekleyen taraf sonuç dosyasını okurdu
+    holder = open(lock_path, 'a')
+    fcntl.flock(holder, fcntl.LOCK_EX)
+    threading.Timer(0.2, holder.close).start()
+
+    assert flights.do('k', lambda: 'fresh') == ('fresh', False)
+    assert not flights.cross_process
+    assert not os.path.exists(PLANTED)
@@ -0,0 +1,118 @@
+# snapshot: dosya biçiminin yazılıp okunması, mmap görünümleri, sürüm geçmişi ve seed
+
+import os
+
+import numpy as np
+import pytest
+
+import app
+from conftest import make_toi
+from snapshot import ALIGN, MAGIC, Snapshot, SnapshotStore, write_snapshot
+
+TABLES = {
+    'rows': {
+        'score': np.array([87.2, 42.8, 10.5]),
+        'label': np.array([0, 2, 1], dtype=np.uint8),
+        'rows': np.array([0, 1, 2], dtype=np.int64),
+        'name': ['TOI-101.01', 'Kepler-22 b', 'çift'],
+        'big_endian': np.array([1.5, 2.5, 3.5], dtype='>f8'),
+    },
+    'extra': {'order': np.array([2, 0, 1], dtype=np.int64)},
+}
+
+
+def test_write_and_read_round_trip(tmp_path):
+    path = str(tmp_path / 'a.snap')
+    version = write_snapshot(path, TABLES, {'source': 'toi'})
+    snap = Snapshot(path)
+
+    assert snap.version == version and snap.meta == {'source': 'toi'}
+    assert snap.tables() == ['rows', 'extra'] and snap.columns('rows') == list(TABLES['rows'])
+    for name, values in TABLES['rows'].items():
+        if isinstance(values, list):
+            assert snap.kind('rows', name) == 'string'
+            assert snap.strings('rows', name) == values
+        else:
+            column = snap.column('rows', name)
+            np.testing.assert_array_equal(column, values)
+            # Disk düzeni little-endian
+            assert column.dtype.byteorder in ('<', '=', '|')
+    assert snap.table('extra')['order'].tolist() == [2, 0, 1]
+
+
+def test_columns_are_aligned_read_only_mmap_views(tmp_path):
+    path = str(tmp_path / 'a.snap')
+    write_snapshot(path, TABLES)
+    snap = Snapshot(path)
+    score = snap.column('rows', 'score')
+    # Kopya değil: eşlemeyi paylaşan, yazılamaz görünüm
+    assert not score.flags.writeable and not score.flags.owndata
+    assert np.shares_memory(score, np.frombuffer(snap._map, dtype=np.uint8))
+    with pytest.raises(ValueError):
+        score[0] = 1.0
+    # Veri blokları 64 bayt hizalı
+    for entry in snap._tables['rows'].values():
+        for offset, _ in entry['blocks']:
+            assert (snap._data_start + offset) % ALIGN == 0
+
+
+def test_rejects_non_snapshot_files(tmp_path):
+    path = tmp_path / 'bad.snap'
+    path.write_bytes(b'NOTASNAP' + bytes(64))
+    with pytest.raises(ValueError, match='Not a snapshot'):
+        Snapshot(str(path))
+    # Başlığı yarım kalmış dosya da açılmaz
+    path.write_bytes(MAGIC + (1000).to_bytes(8, 'little') + b'{')
+    with pytest.raises(ValueError):
+        Snapshot(str(path))
+
+
+def test_replacement_keeps_old_mapping_valid(tmp_path):
+    store = SnapshotStore(str(tmp_path), history=0)
+    store.publish('cat', {'rows': {'score': np.array([1.0, 2.0])}})
+    old = store.open('cat')
+    view = old.column('rows', 'score')
+    assert store.open('cat') is old
+
+    store.publish('cat', {'rows': {'score': np.array([3.0])}})
+    new = store.open('cat')
+    assert new is not old and new.column('rows', 'score').tolist() == [3.0]
+    # Eski eşlemeyi kullanan istek etkilenmez
+    assert view.tolist() == [1.0, 2.0]
+    assert [f for f in os.listdir(tmp_path) if f.endswith('.tmp')] == []
+
+
+def test_history_keeps_the_newest_versions(tmp_path):
+    store = SnapshotStore(str(tmp_path), history=2)
+    versions = [store.publish('cat', {'rows': {'score': np.array([float(i)])}}) for i in range(4)]
+    assert store.versions('cat') == versions[-2:]
+    assert store.open_version('cat', versions[0]) is None
+    assert store.open_version('cat', versions[-1]).column('rows', 'score').tolist() == [3.0]
+    # Sürümler yayınlanan dosyaya hard link (kopya değil)
+    latest = os.path.join(store.history_dir('cat'), f'{versions[-1]}.snap')
+    assert os.stat(latest).st_ino == os.stat(store.path('cat')).st_ino
+
+
+def test_seed_copies_only_newer_bundled_snapshots(tmp_path):
+    bundle = tmp_path / 'bundle'
+    write_snapshot(str(bundle / 'cat.snap'), {'rows': {'score': np.array([1.0])}})
+    (bundle / 'broken.snap').write_bytes(b'junk')
+    store = SnapshotStore(str(tmp_path / 'store'))
+
+    assert store.seed(str(bundle)) == ['cat']
+    assert store.open('cat').column('rows', 'score').tolist() == [1.0]
+    assert store.versions('cat') == [store.open('cat').version]
+    # Yerelde daha yeni sürüm varsa ezilmez
+    store.publish('cat', {'rows': {'score': np.array([2.0])}})
+    assert store.seed(str(bundle)) == []
+    assert store.open('cat').column('rows', 'score').tolist() == [2.0]
+    assert store.seed(str(tmp_path / 'missing')) == []
+
+
+def test_candidate_table_round_trip_through_snapshot(tmp_path):
+    df = make_toi(300)
+    table = app.score_dataframe(df, app.find_columns(df), 'toi', 'TOI', draws=50)
+    store = SnapshotStore(str(tmp_path))
+    store.publish('cat', app.snapshot_tables(table), {'id_prefix': 'TOI'})
+    restored = app.table_from_snapshot(store.open('cat'))
+    assert restored.to_records() == table.to_records()
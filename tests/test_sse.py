@@ -0,0 +1,116 @@
+# SSE akışı: olay sırası, istemci kopunca üreticinin durması, üretici bellek kaydı
+
+import io
+import json
+import threading
+import time
+
+import numpy as np
+
+from candidate_table import CandidateTable
+from conftest import upload
+from memtrack import MemoryTracker
+from singleflight import SingleFlight
+from sse import ProgressStream, StreamCancelled
+
+
+def part(n=10):
+    score = np.linspace(30, 95, n).astype(np.float32)
+    return CandidateTable({'period': np.ones(n, np.float32), 'score': score,
+                           'label': np.where(score >= 80, 0, 2).astype(np.uint8)})
+
+
+def events(lines):
+    parsed = []
+    for block in ''.join(lines).split('\n\n'):
+        if block.startswith('event: '):
+            name, data = block.split('\n', 1)
+            parsed.append((name[7:], json.loads(data[6:])))
+    return parsed
+
+
+def test_events_end_with_done():
+    def work(stream):
+        for _ in range(3):
+            stream.chunk(part(), 10)
+        return {'ok': True}
+
+    parsed = events(ProgressStream(interval=0).run(work))
+    assert [name for name, _ in parsed] == ['progress', 'partial'] * 3 + ['done']
+    assert parsed[-2][1]['stats']['total'] == 30
+    assert parsed[-1][1] == {'ok': True}
+
+
+def test_closing_the_response_stops_the_producer():
+    chunks = []
+    stopped = threading.Event()
+
+    def work(stream):
+        try:
+            for _ in range(200):
+                stream.chunk(part(), 10)
+                chunks.append(1)
+                time.sleep(0.01)
+        finally:
+            stopped.set()
+        return {'ok': True}
+
+    stream = ProgressStream().run(work)
+    iterator = iter(stream)
+    next(iterator)
+    stream.close()
+    assert stopped.wait(5)
+    assert len(chunks) < 200
+
+
+def test_producer_memory_is_recorded():
+    tracker = MemoryTracker(enabled=True)
+
+    def work(stream):
+        with tracker.background('stream_endpoint'):
+            with tracker.stage('score'):
+                data = [0] * 100000
+            stream.chunk(part(), len(data) // 10000)
+            return {'ok': True}
+
+    list(ProgressStream().run(work))
+    record = tracker.history[-1]
+    assert record['endpoint'] == 'stream_endpoint' and record['status'] == 200
+    assert record['stages']['score']['peak'] > 100000 * 8
+
+
+def test_cancelled_leader_does_not_fail_followers(tmp_path):
+    # Liderin istemcisi koptu: aynı işi bekleyen istek hata almaz, işi kendisi yapar
+    flights = SingleFlight(str(tmp_path / 'sf'))
+    started = threading.Event()
+    results = []
+
+    def cancelled():
+        started.set()
+        time.sleep(0.1)
+        raise StreamCancelled('Client disconnected')
+
+    def leader():
+        try:
+            flights.do('k', cancelled)
+        except StreamCancelled:
+            results.append('cancelled')
+
+    thread = threading.Thread(target=leader)
+    thread.start()
+    started.wait(5)
+    results.append(flights.do('k', lambda: 'fresh'))
+    thread.join()
+    assert results == ['cancelled', ('fresh', False)]
+
+
+def test_file_stream_matches_plain_response(client, toi_csv):
+    data = toi_csv(3000)
+    response = client.post('/api/analyze_file/stream', data={'file': (io.BytesIO(data), 'c.csv')},
+                           content_type='multipart/form-data')
+    parsed = events(response.get_data(as_text=True))
+    plain = upload(client, data).get_json()
+    assert parsed[0][0] == 'progress'
+    name, done = parsed[-1]
+    assert name == 'done'
+    assert done['stats'] == plain['stats'] and done['data'] == plain['data']
@@ -0,0 +1,86 @@
+# Soğuk başlangıç: ertelenmiş içe aktarma, startup_bench ölçümü ve açılışta hazır snapshot yüklenmesi
+
+import sys
+import threading
+
+import pytest
+
+import app
+import cli
+import startup_bench
+from conftest import make_toi
+from fake_tap import serve_in_thread
+from lazy_imports import LazyModule, is_loaded, lazy_import
+from snapshot import SnapshotStore
+
+
+@pytest.fixture
+def slow_module(tmp_path, monkeypatch):
+    # Her içe aktarıldığında sayacı artıran geçici modül
+    (tmp_path / 'lazy_probe.py').write_text(
+        'import builtins, time\n'
+        'builtins.lazy_probe_imports = getattr(builtins, "lazy_probe_imports", 0) + 1\n'
+        'time.sleep(0.05)\n'
+        'VALUE = 42\n')
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.delitem(sys.modules, 'lazy_probe', raising=False)
+    import builtins
+    monkeypatch.setattr(builtins, 'lazy_probe_imports', 0, raising=False)
+    yield builtins
+    sys.modules.pop('lazy_probe', None)
+
+
+def test_module_loads_on_first_attribute_access(slow_module):
+    module = lazy_import('lazy_probe')
+    assert isinstance(module, LazyModule) and not is_loaded(module)
+    assert 'not loaded' in repr(module) and slow_module.lazy_probe_imports == 0
+    assert module.VALUE == 42
+    assert is_loaded(module) and "'lazy_probe' (loaded)" in repr(module)
+    assert module.VALUE == 42 and slow_module.lazy_probe_imports == 1
+    # Gerçek modüller her zaman yüklü sayılır
+    assert is_loaded(sys)
+
+
+def test_concurrent_first_access_imports_once(slow_module):
+    module = lazy_import('lazy_probe')
+    values = []
+    threads = [threading.Thread(target=lambda: values.append(module.VALUE)) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert values == [42] * 8 and slow_module.lazy_probe_imports == 1
+
+
+def test_optional_missing_module_is_none():
+    assert lazy_import('no_such_module_xyz', optional=True) is None
+    assert lazy_import('no_such_module_xyz.sub', optional=True) is None
+    # optional olmayan eksik modül ilk erişimde hata verir
+    with pytest.raises(ImportError):
+        lazy_import('no_such_module_xyz').anything
+
+
+def test_import_and_index_do_not_load_heavy_modules():
+    result = startup_bench.run_once(False, 'toi', None)
+    assert result['import_loaded'] == [] and result['index_loaded'] == []
+    assert result['import'] > 0 and result['index'] > 0
+
+
+def test_warm_snapshots_serve_first_request_without_network(tmp_path, monkeypatch):
+    # cli warm ile üretilen snapshot'lar WARM_SNAPSHOT_DIR'den yüklenir; TAP'a hiç gidilmez
+    srv = serve_in_thread({'toi': make_toi(300)}, port=0)
+    try:
+        monkeypatch.setattr(app, 'NASA_TAP_URL', f'http://127.0.0.1:{srv.server_address[1]}/TAP')
+        monkeypatch.setattr(app, 'snapshots', SnapshotStore(str(tmp_path / 'store')))
+        warm = tmp_path / 'warm'
+        assert cli.main(['warm', '--sources', 'toi', '-o', str(warm)]) == 0
+    finally:
+        srv.shutdown()
+        srv.server_close()
+    assert len(list(warm.glob('*.snap'))) == 1
+
+    monkeypatch.setenv('NASA_TAP_URL', 'http://127.0.0.1:9/TAP')
+    result = startup_bench.run_once(True, 'toi', str(warm))
+    assert result['nasa_status'] == 200
+    # Snapshot'tan yanıt pandas / requests yüklemez
+    assert 'pandas' not in result['nasa_loaded'] and 'requests' not in result['nasa_loaded']
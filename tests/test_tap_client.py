@@ -0,0 +1,166 @@
+# TapClient, yerel sahte TAP sunucusuna (fake_tap.py) karşı: sync, async, partitioned,
+# yeniden deneme ve yarım kalan çekimin devamı
+
+import os
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pandas as pd
+import pytest
+import requests
+
+import tap_client
+from fake_tap import serve_in_thread
+from tap_client import PartitionError, TapClient, TapError, build_query
+
+
+def catalog(n=400, scale=1.0):
+    return pd.DataFrame({'toi': np.arange(1, n + 1) + 0.01, 'pl_orbper': np.linspace(1, 20, n) * scale})
+
+
+@pytest.fixture
+def server():
+    srv = serve_in_thread({'toi': catalog()}, port=0)
+    yield srv
+    srv.shutdown()
+    srv.server_close()
+
+
+def patch_sleep(monkeypatch, sleep):
+    # Yalnızca istemcinin beklemesi değişir (sunucu iş parçacıkları gerçek time'ı kullanır)
+    monkeypatch.setattr(tap_client, 'time', SimpleNamespace(time=time.time, monotonic=time.monotonic, sleep=sleep))
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    # Yeniden denemeler arasındaki bekleme testleri yavaşlatmasın
+    patch_sleep(monkeypatch, lambda s: None)
+
+
+def base_url(srv):
+    return f'http://127.0.0.1:{srv.server_address[1]}/TAP'
+
+
+def replace_table(srv, df):
+    # Yukarı akıştaki katalog değişti: sunucunun sorgu önbelleği de boşaltılır
+    srv.tables['toi'] = df
+    with srv.cache_lock:
+        srv.cache.clear()
+
+
+class FailingSession(requests.Session):
+    # Sorgusu verilen alt dizgeyi içeren istekler bağlantı hatası verir
+    def __init__(self, marker):
+        super().__init__()
+        self.marker = marker
+        self.queries = []
+
+    def get(self, url, params=None, **kwargs):
+        query = (params or {}).get('query', '')
+        self.queries.append(query)
+        if self.marker and self.marker in query and 'MIN(' not in query:
+            raise requests.ConnectionError('injected')
+        return super().get(url, params=params, **kwargs)
+
+
+def fetch(client, work_dir, **kwargs):
+    frames = client.fetch_partitioned('toi, pl_orbper', 'toi', 'toi', n_partitions=4, workers=2,
+                                      work_dir=str(work_dir), chunksize=50, **kwargs)
+    return pd.concat(list(frames))
+
+
+def test_sync_and_async_return_the_same_rows(server):
+    client = TapClient(base_url(server), poll_interval=0.01)
+    query = build_query('toi, pl_orbper', 'toi', 'pl_orbper >= 10')
+    with client.open(query, 'sync') as r:
+        sync = pd.concat(tap_client.read_csv_chunks(r.raw, 64))
+    with client.open(query, 'async') as r:
+        async_ = pd.concat(tap_client.read_csv_chunks(r.raw, 64))
+    expected = catalog().query('pl_orbper >= 10')
+    assert len(sync) == len(expected)
+    pd.testing.assert_frame_equal(sync.reset_index(drop=True), async_.reset_index(drop=True))
+
+
+def test_async_job_error_is_reported(server):
+    client = TapClient(base_url(server), poll_interval=0.01)
+    with pytest.raises(TapError, match='ERROR'):
+        client.run_async(build_query('*', 'missing'))
+
+
+def test_partitioned_matches_full_table_in_key_order(server, tmp_path):
+    client = TapClient(base_url(server))
+    df = fetch(client, tmp_path / 'work')
+    assert list(df.index) == list(range(400))
+    np.testing.assert_allclose(df['toi'], catalog()['toi'])
+    # Başarılı çekimden sonra devam parçaları silinir
+    assert not os.path.exists(tmp_path / 'work')
+
+
+def test_transient_failures_are_retried(server, monkeypatch):
+    server.fail_rate = 1.0
+    sleeps = []
+
+    def recover(seconds):
+        sleeps.append(seconds)
+        server.fail_rate = 0.0
+
+    patch_sleep(monkeypatch, recover)
+    client = TapClient(base_url(server))
+    assert client._retry(lambda: client.bounds('toi', 'toi'), retries=2)[2] == 400
+    assert sleeps == [1]
+
+
+def test_failed_partition_resumes_without_refetching_completed_ones(server, tmp_path):
+    work = tmp_path / 'work'
+    client = TapClient(base_url(server))
+    filters = client.partition_filters('toi', 'toi', 4)
+    failing = FailingSession(filters[2])
+    with pytest.raises(PartitionError) as err:
+        fetch(TapClient(base_url(server), session=failing), work, retries=1)
+    assert err.value.failed == [2]
+    assert sorted(os.listdir(work)) == ['part-0000.csv', 'part-0001.csv', 'part-0003.csv']
+
+    counting = FailingSession(None)
+    df = fetch(TapClient(base_url(server), session=counting), work)
+    assert len(df) == 400
+    downloads = [q for q in counting.queries if 'MIN(' not in q]
+    assert downloads == [build_query('toi, pl_orbper', 'toi', filters[2], order_by='toi')]
+
+
+def test_stale_partitions_are_not_reused(server, tmp_path):
+    work = tmp_path / 'work'
+    client = TapClient(base_url(server))
+    failing = FailingSession(client.partition_filters('toi', 'toi', 4)[3])
+    with pytest.raises(PartitionError):
+        fetch(TapClient(base_url(server), session=failing), work, retries=0)
+
+    replace_table(server, catalog(scale=2.0))
+    # refresh (max_age=0): tutulan parçalar yok sayılır
+    df = fetch(client, work, max_age=0)
+    np.testing.assert_allclose(df['pl_orbper'], catalog(scale=2.0)['pl_orbper'])
+
+    with pytest.raises(PartitionError):
+        fetch(TapClient(base_url(server), session=failing), work, retries=0)
+    replace_table(server, catalog(scale=3.0))
+    old = time.time() - tap_client.PARTITION_TTL - 1
+    for name in os.listdir(work):
+        os.utime(work / name, (old, old))
+    df = fetch(client, work)
+    np.testing.assert_allclose(df['pl_orbper'], catalog(scale=3.0)['pl_orbper'])
+
+
+def test_abandoned_fetch_removes_partitions(server, tmp_path):
+    # Tüketici ilk parçadan sonra vazgeçer (istemci koptu / skorlama hatası)
+    work = tmp_path / 'work'
+    client = TapClient(base_url(server))
+    frames = client.fetch_partitioned('toi, pl_orbper', 'toi', 'toi', n_partitions=4, work_dir=str(work),
+                                      chunksize=50)
+    next(frames)
+    assert os.path.exists(work)
+    frames.close()
+    assert not os.path.exists(work)
+
+    replace_table(server, catalog(scale=2.0))
+    df = fetch(client, work)
+    np.testing.assert_allclose(df['pl_orbper'], catalog(scale=2.0)['pl_orbper'])
@@ -0,0 +1,115 @@
+# transit_fit: sentetik trapez transitlerde parametrelerin geri bulunması, analitik Jacobian
+# ve cli fit'in süreç havuzunda tek süreçle aynı sonucu vermesi
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import cli
+from conftest import lightcurve_bytes
+from transit_fit import N_PARAMS, LightCurveBatch, fit_transits, trapezoid_model
+
+CADENCE = 2.0 / 60 / 24
+
+# t0, period, depth (kesir), T14 (gün), ingress oranı, baseline
+TRUE_PARAMS = np.array([
+    [1.30, 3.20, 2.0e-3, 3.0 / 24, 0.15, 1.0],
+    [0.70, 5.75, 8.0e-4, 4.5 / 24, 0.20, 1.0],
+    [2.10, 9.40, 5.0e-3, 6.0 / 24, 0.10, 1.0],
+])
+
+
+def synthetic_curves(params, days=27.0, noise=1e-4, seed=0):
+    rng = np.random.default_rng(seed)
+    time = np.arange(0.0, days, CADENCE)
+    t = np.broadcast_to(time, (len(params), len(time)))
+    flux = trapezoid_model(params, t)
+    return [time] * len(params), [f + rng.normal(0.0, noise, len(time)) for f in flux]
+
+
+def test_fit_recovers_known_parameters():
+    times, fluxes = synthetic_curves(TRUE_PARAMS)
+    batch = LightCurveBatch(times, fluxes)
+    # Katalog değerleri bilinçli olarak kaydırılmış: t0 ±20 dk, süre %25, derinlik %40
+    t0 = TRUE_PARAMS[:, 0] + np.array([15, -20, 10]) / 60 / 24
+    duration = TRUE_PARAMS[:, 3] * 24 * np.array([1.25, 0.8, 1.2])
+    depth = TRUE_PARAMS[:, 2] * 1e6 * np.array([0.6, 1.4, 0.7])
+
+    fit = fit_transits(batch, TRUE_PARAMS[:, 1], t0, duration, depth, n_iter=20)
+
+    assert fit['ok'].all()
+    assert fit['t0'] == pytest.approx(TRUE_PARAMS[:, 0], abs=3.0 / 60 / 24)
+    assert fit['period'] == pytest.approx(TRUE_PARAMS[:, 1], rel=1e-4)
+    assert fit['depth'] == pytest.approx(TRUE_PARAMS[:, 2] * 1e6, rel=0.05)
+    assert fit['duration'] == pytest.approx(TRUE_PARAMS[:, 3] * 24, rel=0.05)
+    # Hatalar gerçek sapmayı kapsayacak büyüklükte ve sonlu
+    assert np.all(np.abs(fit['depth'] - TRUE_PARAMS[:, 2] * 1e6) < 5 * fit['depth_err'])
+    assert fit['red_chi2'] == pytest.approx(1e-8, rel=0.2)
+
+
+def test_fit_without_duration_and_depth_uses_guesses():
+    times, fluxes = synthetic_curves(TRUE_PARAMS[:1], seed=1)
+    fit = fit_transits(LightCurveBatch(times, fluxes), TRUE_PARAMS[:1, 1], TRUE_PARAMS[:1, 0], n_iter=20)
+    assert fit['ok'][0]
+    assert fit['depth'][0] == pytest.approx(TRUE_PARAMS[0, 2] * 1e6, rel=0.1)
+
+
+def test_fixed_period_is_not_changed():
+    times, fluxes = synthetic_curves(TRUE_PARAMS)
+    period = TRUE_PARAMS[:, 1] * (1 + 1e-5)
+    fit = fit_transits(LightCurveBatch(times, fluxes), period, TRUE_PARAMS[:, 0], fit_period=False)
+    assert np.array_equal(fit['period'], period)
+    assert np.all(fit['period_err'] == 0)
+
+
+def test_jacobian_matches_finite_differences():
+    # Rampadaki noktalar yoğun örneklenir (türevler yalnızca orada sıfır değil); kenar kırılma
+    # noktalarından uzak tutulur ki sonlu fark tek bir parçada kalsın
+    params = TRUE_PARAMS.copy()
+    params[:, 5] = [1.0, 0.98, 1.01]
+    t = params[:, :1] + params[:, 1:2] * 2 + np.linspace(-0.6, 0.6, 4001)[None, :] * params[:, 3:4]
+
+    model, jac = trapezoid_model(params, t, jacobian=True)
+    assert model == pytest.approx(trapezoid_model(params, t))
+    assert jac.shape == (len(params), N_PARAMS, t.shape[1])
+
+    for i in range(N_PARAMS):
+        h = 1e-7 * max(abs(params[:, i]).max(), 1e-3)
+        up, down = params.copy(), params.copy()
+        up[:, i] += h
+        down[:, i] -= h
+        numeric = (trapezoid_model(up, t) - trapezoid_model(down, t)) / (2 * h)
+
+        # Kırılma noktasına h'den yakın noktalarda sonlu fark iki parçayı karıştırır
+        ramp = (0.5 * params[:, 3:4] - np.abs(t - params[:, :1] - 2 * params[:, 1:2])) / (params[:, 4:5] * params[:, 3:4])
+        smooth = (np.abs(ramp) > 1e-3) & (np.abs(ramp - 1) > 1e-3)
+        assert np.any(smooth & (jac[:, i] != 0)), i
+        np.testing.assert_allclose(jac[:, i][smooth], numeric[smooth], rtol=1e-4, atol=1e-6, err_msg=str(i))
+
+
+def test_cli_fit_in_processes_matches_single_process(tmp_path, capsys):
+    times, fluxes = synthetic_curves(np.repeat(TRUE_PARAMS, 2, axis=0), days=10.0)
+    rows = []
+    for i, (time, flux) in enumerate(zip(times, fluxes)):
+        data, _ = lightcurve_bytes(time=time, flux=flux, ticid=1000 + i)
+        (tmp_path / f'lc{i}.fits').write_bytes(data)
+        params = TRUE_PARAMS[i // 2]
+        rows.append({'file': f'lc{i}.fits', 'period': params[1], 't0': params[0],
+                     'duration': params[3] * 24, 'depth': params[2] * 1e6})
+    rows.append({'file': 'missing.fits', 'period': 3.0, 't0': 1.0})
+    pd.DataFrame(rows).to_csv(tmp_path / 'targets.csv', index=False)
+
+    def fit(jobs, batch, name):
+        output = tmp_path / name
+        code = cli.main(['fit', str(tmp_path / 'targets.csv'), '-j', str(jobs), '--batch', str(batch),
+                         '-o', str(output)])
+        return code, pd.read_csv(output)
+
+    code_one, single = fit(1, 100, 'single.csv')
+    code_pool, pooled = fit(2, 2, 'pooled.csv')
+
+    # Okunamayan hedef raporlanır ama diğerleri yazılır; satırlar hedef sırasında
+    assert code_one == code_pool == 1
+    assert len(single) == len(TRUE_PARAMS) * 2
+    pd.testing.assert_frame_equal(single, pooled)
+    assert '4 grup, 2 süreç' in capsys.readouterr().out
@@ -0,0 +1,109 @@
+# tuning: vektörel ızgara araması, naif döngüyle ve uygulamanın skoru ile karşılaştırılır
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import tuning
+from profiles import DEFAULT_PROFILE, score_profiles
+from scoring import WEIGHTS
+
+
+def koi_table(n=400, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'kepid': np.arange(n),
+        'koi_disposition': rng.choice(['CONFIRMED', 'FALSE POSITIVE', 'CANDIDATE'], n),
+        'koi_period': rng.uniform(0.5, 60, n),
+        'koi_duration': rng.uniform(1, 15, n),
+        'koi_depth': rng.uniform(50, 3000, n),
+        'koi_kepmag': rng.uniform(9, 17, n),
+    })
+
+
+def test_weight_grid_is_a_simplex_with_current_weights_first():
+    grid = tuning.weight_grid(0.25)
+    assert grid.shape == (4, 1 + 35)
+    assert grid.sum(axis=0) == pytest.approx(np.ones(grid.shape[1]))
+    assert grid[:, 0] == pytest.approx(WEIGHTS)
+    assert tuning.weight_grid(0.25, minimum=0.25).shape == (4, 2)
+
+
+def test_ground_truth_and_candidates():
+    df = pd.DataFrame({'koi_disposition': ['CONFIRMED', ' false positive', 'CANDIDATE', 'NOT DISPOSITIONED']})
+    assert tuning.ground_truth(df).tolist() == [1, 0, -1, -1]
+    assert tuning.ground_truth(df, candidates_as=1).tolist() == [1, 0, 1, -1]
+
+
+def test_evaluate_matches_naive_loop():
+    rng = np.random.default_rng(1)
+    comp = rng.uniform(0, 1, (300, 4))
+    truth = rng.integers(0, 2, 300)
+    weights = tuning.weight_grid(0.2)
+    thresholds = (40.0, 55.0, 70.0)
+    tp, fp, fn = tuning.evaluate(comp, truth, weights, thresholds)
+
+    for i, t in enumerate(thresholds):
+        for j in range(weights.shape[1]):
+            hit = (100.0 * comp.astype(np.float32)) @ weights[:, j].astype(np.float32) >= np.float32(t)
+            assert tp[i, j] == np.sum(hit & (truth == 1))
+            assert fp[i, j] == np.sum(hit & (truth == 0))
+            assert fn[i, j] == np.sum(~hit & (truth == 1))
+
+
+def test_metrics_handle_empty_denominators():
+    precision, recall, f1 = tuning.metrics(np.array([0, 3]), np.array([0, 1]), np.array([0, 3]))
+    assert precision.tolist() == [0.0, 0.75]
+    assert recall.tolist() == [0.0, 0.5]
+    assert f1[1] == pytest.approx(0.6)
+
+
+def test_pareto_front_matches_brute_force():
+    rng = np.random.default_rng(2)
+    precision, recall = rng.uniform(size=200).round(2), rng.uniform(size=200).round(2)
+    front = set(tuning.pareto_front(precision, recall).tolist())
+    for i in range(200):
+        dominated = np.any((precision >= precision[i]) & (recall >= recall[i])
+                           & ((precision > precision[i]) | (recall > recall[i])))
+        if i in front:
+            assert not dominated
+        elif not dominated:
+            # Eşit (precision, recall) çiftlerinden yalnızca biri cephede
+            twins = np.flatnonzero((precision == precision[i]) & (recall == recall[i]))
+            assert front & set(twins.tolist())
+
+
+def test_baseline_row_matches_app_labels():
+    # Mevcut ağırlık / kesim / yüksek eşik satırı, uygulamanın CP etiketleriyle aynı sayıları verir
+    df = koi_table()
+    results, n_rows, n_pos = tuning.grid_search(df, weight_step=0.25, thresholds=(80.0,))
+    base = tuning.baseline_row(results)
+    assert len(base) == 1
+
+    truth = tuning.ground_truth(df)
+    keep = truth >= 0
+    score = score_profiles([DEFAULT_PROFILE], df['koi_period'], df['koi_duration'], df['koi_depth'],
+                           df['koi_kepmag'], 'koi')[DEFAULT_PROFILE][0][keep]
+    hit = score >= 80.0
+    assert n_rows == keep.sum() and n_pos == (truth == 1).sum()
+    assert int(base['tp'].iloc[0]) == np.sum(hit & (truth[keep] == 1))
+    assert int(base['fp'].iloc[0]) == np.sum(hit & (truth[keep] == 0))
+    assert results['pareto'].any()
+
+
+def test_main_writes_results(tmp_path, capsys):
+    path = tmp_path / 'cumulative.csv'
+    koi_table(100).to_csv(path, index=False)
+    output = tmp_path / 'grid.csv'
+    tuning.main(['--input', str(path), '--weight-step', '0.5', '--thresholds', '60,80', '--output', str(output)])
+    grid = pd.read_csv(output)
+    # 4 x 4 x 3 kesim, 2 eşik, 1 + 10 ağırlık
+    assert len(grid) == 4 * 4 * 3 * 2 * 11
+    assert 'Pareto' in capsys.readouterr().out
+
+
+def test_load_koi_table_requires_columns(tmp_path):
+    path = tmp_path / 'bad.csv'
+    pd.DataFrame({'koi_period': [1.0]}).to_csv(path, index=False)
+    with pytest.raises(ValueError, match='missing columns'):
+        tuning.load_koi_table(str(path))
@@ -0,0 +1,94 @@
+# uncertainty: asimetrik örnekleme, olasılıkların tutarlılığı ve skor aralıkları
+
+import numpy as np
+import pytest
+
+from conftest import make_toi, upload
+from profiles import DEFAULT_PROFILE, get_profile, score_profiles
+from uncertainty import chunk_rows, sample_split_normal, score_probabilities
+
+VALUES = {
+    'period': np.array([3.5, 12.0, 1.2, 25.0]),
+    'duration': np.array([2.9, 5.1, 1.5, 9.0]),
+    'depth': np.array([1200.0, 450.0, 8000.0, 150.0]),
+    'star_mag': np.array([9.1, 11.3, 7.5, 14.0]),
+}
+
+
+def errors(scale):
+    # Değerlerin scale katı simetrik hata
+    return {key: (values * scale, -values * scale) for key, values in VALUES.items()}
+
+
+def point_scores():
+    score, codes = score_profiles([DEFAULT_PROFILE], VALUES['period'], VALUES['duration'], VALUES['depth'],
+                                  VALUES['star_mag'], 'toi')[DEFAULT_PROFILE]
+    return score, codes
+
+
+def test_sample_split_normal_uses_side_specific_errors():
+    z = np.array([[-2.0, -1.0, 0.0, 1.0, 2.0]])
+    out = sample_split_normal(np.array([10.0]), np.array([1.0]), np.array([-3.0]), z)
+    assert out.tolist() == [[4.0, 7.0, 10.0, 11.0, 12.0]]
+    # Hatası olmayan değer kesin
+    out = sample_split_normal(np.array([10.0]), np.array([np.nan]), np.array([np.nan]), z)
+    assert np.all(out == 10.0)
+
+
+def test_without_errors_probabilities_are_the_point_label():
+    score, codes = point_scores()
+    out = score_probabilities(VALUES, {}, 'toi', n_draws=50, seed=0)
+    expected = np.eye(3)[codes]
+    assert np.column_stack([out['p_cp'], out['p_pc'], out['p_apc']]) == pytest.approx(expected)
+    assert out['score_lo'] == pytest.approx(score)
+    assert out['score_hi'] == pytest.approx(score)
+
+
+def test_probabilities_sum_to_one_and_interval_brackets_score():
+    score, _ = point_scores()
+    out = score_probabilities(VALUES, errors(0.05), 'toi', n_draws=2000, seed=1)
+    total = out['p_cp'] + out['p_pc'] + out['p_apc']
+    assert total == pytest.approx(np.ones(len(total)))
+    assert np.all(out['score_lo'] <= score + 1e-9) and np.all(score <= out['score_hi'] + 1e-9)
+    # Daha büyük hata daha geniş aralık
+    wide = score_probabilities(VALUES, errors(0.3), 'toi', n_draws=2000, seed=1)
+    assert np.all(wide['score_hi'] - wide['score_lo'] >= out['score_hi'] - out['score_lo'])
+
+
+def test_candidate_near_threshold_splits_between_labels():
+    # Skoru mid eşiğine yakın bir aday: iki etiket de anlamlı olasılık alır
+    mid = get_profile(DEFAULT_PROFILE).mid
+    periods = np.linspace(0.5, 40, 400)
+    candidates = {key: np.full(len(periods), values[1]) for key, values in VALUES.items()}
+    candidates['period'] = periods
+    score = score_profiles([DEFAULT_PROFILE], *(candidates[k] for k in ('period', 'duration', 'depth', 'star_mag')),
+                           'toi')[DEFAULT_PROFILE][0]
+    i = int(np.nanargmin(np.abs(score - mid)))
+    near = {key: values[i:i + 1] for key, values in candidates.items()}
+    out = score_probabilities(near, {key: (v * 0.2, -v * 0.2) for key, v in near.items()}, 'toi',
+                              n_draws=4000, seed=2)
+    assert out['p_pc'][0] > 0.1 and out['p_apc'][0] > 0.1
+
+
+def test_seed_reproducible_and_chunking_is_bounded():
+    a = score_probabilities(VALUES, errors(0.1), 'toi', n_draws=200, seed=3)
+    b = score_probabilities(VALUES, errors(0.1), 'toi', n_draws=200, seed=3)
+    for key in a:
+        assert np.array_equal(a[key], b[key])
+    assert chunk_rows(1000, 64 * 2 ** 20) == 64 * 2 ** 20 // (1000 * 96)
+    assert chunk_rows(10 ** 9, 1) == 1
+    # Tek satırlık parçalarla da (bellek bütçesi çok küçük) aynı dağılım
+    small = score_probabilities(VALUES, errors(0.1), 'toi', n_draws=4000, seed=4, memory_budget=1)
+    large = score_probabilities(VALUES, errors(0.1), 'toi', n_draws=4000, seed=5)
+    assert small['p_cp'] == pytest.approx(large['p_cp'], abs=0.05)
+
+
+def test_upload_with_uncertainty_adds_probabilities(client):
+    data = make_toi(200).to_csv(index=False).encode()
+    payload = upload(client, data, uncertainty='1', draws='100').get_json()
+    for row in payload['data']:
+        assert row['p_cp'] + row['p_pc'] + row['p_apc'] == pytest.approx(1.0, abs=1e-3)
+        # Yanıttaki değerler 0.1'e yuvarlanmış
+        assert row['score_lo'] - 0.1 <= row['score'] <= row['score_hi'] + 0.1
+    plain = upload(client, data).get_json()
+    assert 'p_cp' not in plain['data'][0]
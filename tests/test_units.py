@@ -0,0 +1,117 @@
+# units: örneklem eşikleri, açık birim ipuçları ve KOI / TOI skor değerleri
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import app
+from conftest import make_toi, upload
+from units import (DEPTH_FRACTION_BELOW, DEPTH_PERCENT_BELOW, DURATION_DAYS_BELOW, infer_column, infer_units,
+                   parse_hints, sample_unit)
+
+
+def around(median, n=9, spread=0.5):
+    # Medyanı tam olarak median olan, simetrik örneklem
+    return np.full(n, float(median)) * np.linspace(1 - spread, 1 + spread, n)
+
+
+@pytest.mark.parametrize('median, unit', [
+    (DEPTH_FRACTION_BELOW * 0.99, 'fraction'),
+    (DEPTH_FRACTION_BELOW, 'percent'),
+    (DEPTH_PERCENT_BELOW * 0.99, 'percent'),
+    (DEPTH_PERCENT_BELOW, 'ppm'),
+    (500.0, 'ppm'),
+])
+def test_depth_threshold_boundaries(median, unit):
+    assert sample_unit('depth', around(median)) == unit
+
+
+@pytest.mark.parametrize('median, unit', [(DURATION_DAYS_BELOW * 0.99, 'days'), (DURATION_DAYS_BELOW, 'hours')])
+def test_duration_threshold_boundary(median, unit):
+    assert sample_unit('duration', around(median)) == unit
+
+
+def test_shallow_ppm_catalog_is_not_read_as_percent():
+    # Medyanı 10'un altında ama yüzde olamayacak (> 100) değerleri olan ppm kataloğu.
+    # Eski eşiklerle 'percent' okunup derinlikler 1e4 ile çarpılıyordu
+    values = np.array([2.0, 3.5, 4.0, 5.0, 6.0, 8.0, 9.0, 150.0, 400.0])
+    assert sample_unit('depth', values) == 'ppm'
+    # Kesir aralığındaki medyan, 1'i aşan bir değerle kesir sayılmaz
+    values = np.array([0.001, 0.002, 0.003, 0.004, 0.005, 0.006, 2.5])
+    assert sample_unit('depth', values) == 'percent'
+
+
+def test_small_or_invalid_sample_falls_back_to_default():
+    assert sample_unit('depth', np.array([np.nan, -1.0, 0.0, 5.0])) is None
+    assert infer_column('depth', 'col', np.array([1.0, 2.0])) == ('ppm', 'default')
+
+
+def test_hint_overrides_archive_name_and_sample():
+    assert infer_column('duration', 'koi_duration', around(0.1), hint='days') == ('days', 'hint')
+    assert infer_column('depth', 'depth_pct', around(0.001), hint='ppm') == ('ppm', 'hint')
+    units = infer_units({'depth': 'pl_trandep', 'duration': 'dur'}, {'depth': around(5.0), 'duration': around(3.0)},
+                        {'depth': 'ppm'})
+    assert units['depth'] == {'column': 'pl_trandep', 'unit': 'ppm', 'basis': 'hint', 'factor': 1.0}
+    assert units['duration']['basis'] == 'sample'
+
+
+def test_parse_hints():
+    assert parse_hints('') == {}
+    assert parse_hints(' Depth:PPM , duration:days,') == {'depth': 'ppm', 'duration': 'days'}
+    with pytest.raises(ValueError, match='Invalid unit hint'):
+        parse_hints('mass:kg')
+    with pytest.raises(ValueError, match='Invalid unit for depth'):
+        parse_hints('depth:days')
+
+
+KOI = pd.DataFrame({'kepoi_name': ['K00001.01', 'K00002.01'], 'koi_period': [3.5, 12.0],
+                    'koi_duration': [2.9, 5.1], 'koi_depth': [1200.0, 450.0], 'koi_kepmag': [12.1, 14.3]})
+TOI = pd.DataFrame({'toi': [101.01, 102.01], 'pl_orbper': [3.5, 12.0], 'pl_trandurh': [2.9, 5.1],
+                    'pl_trandep': [1200.0, 450.0], 'st_tmag': [9.1, 11.3]})
+
+
+def scores(df, source):
+    table = app.score_dataframe(df, app.find_columns(df), source)
+    return [(r['duration'], r['score'], r['label']) for r in table.to_records()]
+
+
+def test_koi_duration_is_hours():
+    # Arşivde koi_duration saattir; eskiden günden saate çevrilip (x 24) skorlanıyordu
+    assert scores(KOI, 'koi') == [(2.9, 60.4, 'PC'), (5.1, 23.1, 'APC')]
+    before = KOI.assign(koi_duration=KOI['koi_duration'] * 24)
+    assert scores(before, 'koi') == [(69.6, 57.6, 'PC'), (122.4, 20.3, 'APC')]
+
+
+def test_toi_scores_unchanged():
+    # TOI kolonları zaten saat / ppm: birim çıkarımından önceki değerlerle aynı
+    assert scores(TOI, 'toi') == [(2.9, 87.2, 'CP'), (5.1, 42.8, 'APC')]
+
+
+def test_upload_unit_hint(client):
+    # Sığ ppm kataloğu: ipucu olmadan örneklemden, ipucuyla açık birimden
+    df = make_toi(50).rename(columns={'pl_trandep': 'depth'})
+    df['depth'] = np.linspace(1.0, 9.0, 50)
+    data = df.to_csv(index=False).encode()
+
+    inferred = upload(client, data).get_json()
+    assert inferred['units']['depth']['unit'] == 'percent'
+    hinted = upload(client, data, units='depth:ppm').get_json()
+    assert hinted['units']['depth'] == {'column': 'depth', 'unit': 'ppm', 'basis': 'hint', 'factor': 1.0}
+    # Farklı ipucu farklı önbellek girdisi
+    assert hinted['cache']['hit'] is False
+    assert max(r['depth'] for r in hinted['data']) <= 9.0
+
+    r = upload(client, data, units='depth:meters')
+    assert r.status_code == 400
+    assert 'Invalid unit for depth' in r.get_json()['error']
+
+
+def test_score_file_hint(tmp_path):
+    path = tmp_path / 'catalog.csv'
+    df = make_toi(20)
+    df['pl_trandep'] = np.linspace(1.0, 9.0, 20)
+    df.to_csv(path, index=False)
+    assert app.score_file(str(path))['units']['depth']['unit'] == 'percent'
+    scored = app.score_file(str(path), hints={'depth': 'ppm'})
+    assert scored['units']['depth']['basis'] == 'hint'
+    assert scored['table'].values('depth').max() <= 9.0
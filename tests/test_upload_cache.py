@@ -0,0 +1,68 @@
+# DiskCache: bütçe dizin başına ortak (birden fazla worker aynı dizini kullanır)
+
+import io
+import multiprocessing
+import os
+import time
+
+import pytest
+
+from memtrack import MemoryBudgetExceeded, MemoryTracker
+from upload_cache import DiskCache, read_upload
+
+VALUE = b'x' * 10000
+
+
+def fill(directory, worker, count, max_bytes):
+    cache = DiskCache(directory, max_bytes)
+    for i in range(count):
+        cache.put(f'{worker:02d}{i:04d}', VALUE)
+
+
+def test_budget_is_shared_between_instances(tmp_path):
+    # Her örnek ayrı bir worker gibi: bütçe toplamda aşılmaz
+    workers = [DiskCache(str(tmp_path), 100000) for _ in range(4)]
+    for i in range(40):
+        workers[i % 4].put(f'{i:04d}', VALUE)
+    assert workers[0].size() <= 100000
+    assert workers[0]._read_total() == workers[0].size()
+
+
+def test_budget_across_processes(tmp_path):
+    ctx = multiprocessing.get_context('fork')
+    procs = [ctx.Process(target=fill, args=(str(tmp_path), w, 30, 150000)) for w in range(4)]
+    for p in procs:
+        p.start()
+    for p in procs:
+        p.join()
+    assert all(p.exitcode == 0 for p in procs)
+    cache = DiskCache(str(tmp_path), 150000)
+    assert cache.size() <= 150000
+    assert cache._read_total() == cache.size()
+
+
+def test_recently_read_entry_survives_eviction(tmp_path):
+    writer = DiskCache(str(tmp_path), 50000)
+    reader = DiskCache(str(tmp_path), 50000)
+    for i in range(4):
+        writer.put(f'{i:04d}', VALUE)
+        past = time.time() - 100 + i
+        os.utime(writer._path(f'{i:04d}'), (past, past))
+    # Başka bir worker'ın okuması eviction sırasını değiştirir
+    assert reader.get('0000') == VALUE
+    writer.put('0004', VALUE)
+    writer.put('0005', VALUE)
+    assert writer.get('0000') == VALUE
+    assert writer.get('0001') is None
+
+
+def test_read_upload_stops_at_budget():
+    stream = io.BytesIO(b'x' * 100000)
+    tracker = MemoryTracker(enabled=False, budget=50000)
+    with pytest.raises(MemoryBudgetExceeded):
+        read_upload(stream, block=4096, check=tracker.check_upload)
+    # Bütçenin yarısı (ham bayt x2) aşıldığı blokta durur, dosyanın sonuna kadar okunmaz
+    assert stream.tell() <= 25000 + 4096
+
+    data, _ = read_upload(io.BytesIO(b'y' * 1000), check=tracker.check_upload)
+    assert data == b'y' * 1000
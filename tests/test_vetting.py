@@ -0,0 +1,78 @@
+# vetting: sentetik kutu transitler üzerinde tek/çift, ikincil tutulma ve V şekli bayrakları
+
+import json
+
+import numpy as np
+import pytest
+
+from transit_fit import LightCurveBatch
+from vetting import FLAG_ODD_EVEN, FLAG_SECONDARY, demote_labels, flag_names, vet_candidates
+
+CADENCE = 2.0 / 60 / 24
+
+
+def box_curve(days, period, t0, duration_hours, depth_ppm, odd_depth_ppm=None, secondary_ppm=0.0,
+              noise=5e-5, seed=0):
+    rng = np.random.default_rng(seed)
+    time = np.arange(0.0, days, CADENCE)
+    half = duration_hours / 48.0
+    phase = np.mod(time - t0 + 0.5 * period, period) - 0.5 * period
+    epoch = np.floor((time - t0) / period + 0.5).astype(int)
+    depth = np.where(epoch % 2 == 1, odd_depth_ppm if odd_depth_ppm is not None else depth_ppm, depth_ppm)
+    flux = 1.0 - np.where(np.abs(phase) < half, depth, 0.0) / 1e6
+    secondary = np.abs(np.mod(phase, period) - 0.5 * period) < half
+    flux -= np.where(secondary, secondary_ppm, 0.0) / 1e6
+    return time, flux + rng.normal(0.0, noise, len(time))
+
+
+def vet(curves, period, t0, duration):
+    batch = LightCurveBatch([c[0] for c in curves], [c[1] for c in curves])
+    return vet_candidates(batch, period, t0, duration)
+
+
+def test_planet_is_not_flagged():
+    result = vet([box_curve(27, 3.0, 1.0, 3.0, 2000)], [3.0], [1.0], [3.0])
+    assert result['flags'][0] == 0
+    assert result['depth_odd'][0] == pytest.approx(2000, rel=0.05)
+    assert result['depth_even'][0] == pytest.approx(2000, rel=0.05)
+    assert result['vshape'][0] < 0.5
+
+
+def test_eclipsing_binary_flags():
+    curves = [
+        box_curve(27, 3.0, 1.0, 3.0, 4000, odd_depth_ppm=2000, seed=1),
+        box_curve(27, 3.0, 1.0, 3.0, 3000, secondary_ppm=1000, seed=2),
+    ]
+    result = vet(curves, [3.0, 3.0], [1.0, 1.0], [3.0, 3.0])
+    assert result['flags'][0] & FLAG_ODD_EVEN
+    assert result['flags'][1] & FLAG_SECONDARY
+    assert not result['flags'][1] & FLAG_ODD_EVEN
+    assert flag_names(result['flags'][0]) == ['odd_even']
+    assert list(demote_labels(np.array([0, 1], dtype=np.uint8), result['flags'])) == [1, 2]
+
+
+def test_single_transit_has_no_odd_or_secondary_measurement():
+    # 3 günlük eğride tek transit: tek numaralı taban ve faz 0.5 penceresi boş
+    result = vet([box_curve(3, 10.0, 1.5, 3.0, 1500)], [10.0], [1.5], [3.0])
+    for key in ('depth_odd', 'odd_even_sigma', 'secondary_depth', 'secondary_sigma'):
+        assert np.isnan(result[key][0]), key
+    assert result['depth_even'][0] == pytest.approx(1500, rel=0.05)
+    assert result['flags'][0] == 0
+
+
+def test_single_transit_serializes_to_valid_json():
+    from app import app, score_lightcurves
+
+    time, flux = box_curve(3, 10.0, 1.5, 3.0, 1500)
+    curve = {'id': 'TIC-1', 'time': time, 'flux': flux, 'period': 10.0, 't0': 1.5,
+             'duration': 3.0, 'depth': 1500.0, 'star_mag': 10.0, 'source': 'toi'}
+    records = score_lightcurves([curve]).to_records()
+
+    def reject(name):
+        raise ValueError(f'non-standard JSON constant {name}')
+
+    with app.app_context():
+        parsed = json.loads(app.json.dumps(records), parse_constant=reject)
+    assert parsed[0]['depth_odd'] is None
+    assert parsed[0]['secondary_sigma'] is None
+    assert parsed[0]['depth_even'] is not None
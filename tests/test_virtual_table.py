@@ -0,0 +1,129 @@
+# Arayüzün sanal tablosu: sayfadaki betik geçerli JS; ikili kolon tablosunu çözen, süzen ve sıralayan
+# fonksiyonlar (decodeTable, computeOrder, tableRecords) Node'da sunucunun JSON satırlarıyla karşılaştırılır
+
+import base64
+import json
+import math
+import re
+import shutil
+import subprocess
+
+import numpy as np
+import pytest
+
+from conftest import make_toi, upload
+from test_asgi import URL, run, service, tap  # noqa: F401 (fixture'lar)
+from test_candidate_table import table as sample_table
+
+NODE = shutil.which('node')
+pytestmark = pytest.mark.skipif(NODE is None, reason='needs node')
+
+FUNCTIONS = ('decodeTable', 'cellText', 'sortValue', 'labelCode', 'computeOrder', 'base64ToBuffer',
+             'resultRows', 'tableRecords')
+
+HARNESS = '''
+const input = JSON.parse(require('fs').readFileSync(0, 'utf8'));
+const table = resultRows(input.payload).table;
+const names = Object.keys(table.columns);
+const cells = [];
+for (let i = 0; i < table.rows; i++) cells.push(names.map(name => cellText(table.columns[name], i)));
+console.log(JSON.stringify({
+    names: names,
+    cells: cells,
+    records: tableRecords(table),
+    orders: input.queries.map(q => Array.from(computeOrder(table, q))),
+}));
+'''
+
+
+@pytest.fixture(scope='module')
+def page_script():
+    import app
+    html = app.app.test_client().get('/').get_data(as_text=True)
+    return re.findall(r'<script>(.*?)</script>', html, re.S)[-1]
+
+
+def js_functions(script):
+    # Sayfa betiğinden DOM'a dokunmayan tablo fonksiyonları (8 boşluk girintili üst düzey tanımlar)
+    parts = []
+    for name in FUNCTIONS:
+        start = script.index(f'        function {name}(')
+        parts.append(script[start:script.index('\n        }\n', start) + 10])
+    return '\n'.join(parts)
+
+
+def run_node(script, payload, queries=()):
+    source = js_functions(script) + HARNESS
+    out = subprocess.run([NODE, '-e', source], input=json.dumps({'payload': payload, 'queries': list(queries)}),
+                         capture_output=True, text=True, check=True)
+    return json.loads(out.stdout)
+
+
+def query(key=None, desc=True, label=-1, min_score=None, text=''):
+    return {'key': key, 'desc': desc, 'label': label, 'minScore': min_score, 'text': text}
+
+
+def expected_order(records, q):
+    # computeOrder'ın Python karşılığı: süzme, kararlı sıralama, boş değerler sonda
+    rows = [i for i, r in enumerate(records)
+            if (q['label'] < 0 or r['label'] == ('CP', 'PC', 'APC')[q['label']])
+            and (q['minScore'] is None or (r['score'] is not None and r['score'] >= q['minScore']))
+            and q['text'].lower() in r['id'].lower()]
+    if q['key'] is None:
+        return rows
+    present = [i for i in rows if records[i][q['key']] is not None]
+    present.sort(key=lambda i: records[i][q['key']], reverse=q['desc'])
+    # reverse=True eşitlerin sırasını bozmaz (Python'un sıralaması kararlı)
+    return present + [i for i in rows if records[i][q['key']] is None]
+
+
+def test_page_script_is_valid_javascript(page_script, tmp_path):
+    path = tmp_path / 'page.js'
+    path.write_text(page_script)
+    subprocess.run([NODE, '--check', str(path)], check=True, capture_output=True)
+
+
+def test_columnar_payload_decodes_filters_and_sorts_like_json(client, page_script):
+    df = make_toi(400)
+    df.loc[::37, 'pl_orbper'] = np.nan
+    data = df.to_csv(index=False).encode()
+    records = upload(client, data, profiles='smooth').get_json()['data']
+    columnar = upload(client, data, profiles='smooth', rows='columnar').get_json()
+    queries = [query('score'), query('period', desc=False), query('id', desc=False, text='10'),
+               query('score', label=1, min_score=50.0), query(label=0)]
+
+    decoded = run_node(page_script, columnar, queries)
+    # Dışa aktarma yedeği sunucunun JSON satırlarını aynen verir
+    assert decoded['records'] == records
+    for q, order in zip(queries, decoded['orders']):
+        assert order == expected_order(records, q), q
+
+    # Ara sonuçların JSON satırları da aynı fonksiyonlardan geçer
+    from_json = run_node(page_script, {'data': records}, queries)
+    assert from_json['orders'] == decoded['orders']
+    # jsonify anahtarları sıralar; tablo kolonları ada göre seçtiğinden sıra önemsiz
+    assert sorted(from_json['names']) == sorted(decoded['names'])
+
+
+def test_cell_text_of_strings_ids_and_blanks(page_script):
+    t = sample_table()
+    decoded = run_node(page_script, {'columns': base64.b64encode(t.to_binary()).decode('ascii')})
+    for cells, record in zip(decoded['cells'], t.to_records()):
+        row = dict(zip(decoded['names'], cells))
+        for name, value in record.items():
+            if isinstance(value, float):
+                assert math.isclose(float(row[name]), value), name
+            else:
+                assert row[name] == ('' if value is None else value), name
+
+    rows = sample_table(ids=None, prefix=None)
+    decoded = run_node(page_script, {'columns': base64.b64encode(rows.to_binary()).decode('ascii')})
+    assert [cells[0] for cells in decoded['cells']] == ['ROW-1', 'ROW-2', 'ROW-3', 'ROW-4']
+
+
+def test_nasa_auto_columnar_on_flask_and_asgi(service, client, page_script):
+    # İstekler aynı indirmeyi paylaşır; Flask yolu da aynı snapshot'tan aynı ikili tabloyu verir
+    (_, body), (_, columnar), (status, error) = run(service, URL, URL + '&rows=columnar', URL + '&rows=xml')
+    assert 'data' not in columnar and status == 400 and 'error' in error
+    assert run_node(page_script, columnar)['records'] == body['data']
+    assert client.get(URL + '&rows=columnar').get_json()['columns'] == columnar['columns']
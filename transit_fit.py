@@ -0,0 +1,287 @@
+# Toplu (batch) trapez transit modeli fiti
+# Her aday için ayrı optimizer döngüsü yerine, tüm adaylar tek bir
+# (N aday x M nokta) dizisinde sabit sayıda Levenberg-Marquardt adımıyla fit edilir.
+
+import numpy as np
+
+# Parametre sırası: t0 (gün), period (gün), depth (kesir), T14 (gün),
+# ingress oranı (tau / T14), baseline akı
+PARAM_NAMES = ('t0', 'period', 'depth', 'duration', 'ingress', 'baseline')
+N_PARAMS = len(PARAM_NAMES)
+
+MIN_INGRESS = 0.01
+MAX_INGRESS = 0.5
+
+
+class LightCurveBatch:
+    # Farklı uzunluktaki ışık eğrileri tek dizide; offsets ile ayrılır (CSR düzeni)
+    def __init__(self, times, fluxes):
+        if len(times) != len(fluxes):
+            raise ValueError('times and fluxes must have the same length')
+
+        lengths = np.array([len(t) for t in times], dtype=np.int64)
+        self.offsets = np.concatenate([[0], np.cumsum(lengths)])
+        self.time = np.concatenate([np.asarray(t, dtype=np.float64) for t in times]) if len(times) else np.empty(0)
+        flux = np.concatenate([np.asarray(f, dtype=np.float64) for f in fluxes]) if len(fluxes) else np.empty(0)
+
+        # Her eğri kendi medyanına normalize edilir
+        self.index = np.repeat(np.arange(len(lengths)), lengths)
+        medians = np.array([
+            np.nanmedian(flux[a:b]) if b > a else np.nan
+            for a, b in zip(self.offsets[:-1], self.offsets[1:])
+        ])
+        self.flux = flux / medians[self.index]
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def phase(self, period, t0):
+        # Transit merkezine göre faz zamanı (gün), [-P/2, P/2)
+        period = np.asarray(period, dtype=np.float64)[self.index]
+        t0 = np.asarray(t0, dtype=np.float64)[self.index]
+        return np.mod(self.time - t0 + 0.5 * period, period) - 0.5 * period
+
+    def epoch(self, period, t0):
+        period = np.asarray(period, dtype=np.float64)[self.index]
+        t0 = np.asarray(t0, dtype=np.float64)[self.index]
+        return np.floor((self.time - t0) / period + 0.5).astype(np.int64)
+
+    def padded(self, keep=None, max_points=None, rows=None):
+        # Seçilen eğrilerin (rows) seçilen noktalarını (N, M) matrisine yerleştirir;
+        # boş hücrelerin ağırlığı 0
+        rows = np.arange(len(self)) if rows is None else np.asarray(rows)
+        position = np.full(len(self), -1)
+        position[rows] = np.arange(len(rows))
+
+        sel = position[self.index] >= 0
+        if keep is not None:
+            sel &= keep
+        idx = position[self.index[sel]]
+        order = np.argsort(idx, kind='stable')
+        idx = idx[order]
+        time = self.time[sel][order]
+        flux = self.flux[sel][order]
+
+        n = len(rows)
+        counts = np.bincount(idx, minlength=n)
+        width = max(int(counts.max()) if n else 1, 1)
+        if max_points:
+            width = min(width, max_points)
+
+        starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        col = np.arange(len(idx)) - starts[idx]
+        inside = col < width
+
+        t = np.zeros((n, width))
+        f = np.ones((n, width))
+        w = np.zeros((n, width))
+        t[idx[inside], col[inside]] = time[inside]
+        f[idx[inside], col[inside]] = flux[inside]
+        w[idx[inside], col[inside]] = 1.0
+        return t, f, w
+
+
+def trapezoid_model(params, t, jacobian=False):
+    # params: (N, 6), t: (N, M). jacobian=True ise analitik türevler de (N, 6, M) döner
+    t0, period, depth, duration, ingress, baseline = (params[:, i:i + 1] for i in range(N_PARAMS))
+
+    epoch = np.floor((t - t0) / period + 0.5)
+    dt = t - t0 - epoch * period
+    x = np.abs(dt)
+    tau = np.maximum(ingress * duration, 1e-9)
+    ramp = (0.5 * duration - x) / tau
+    shape = np.clip(ramp, 0.0, 1.0)
+    model = baseline * (1.0 - depth * shape)
+    if not jacobian:
+        return model
+
+    # Türevler sadece ingress/egress rampasında sıfırdan farklı (düz tabanda shape = 1)
+    on_ramp = (ramp > 0.0) & (ramp < 1.0)
+    amp = np.where(on_ramp, -baseline * depth / tau, 0.0)
+    sign = np.sign(dt)
+
+    jac = np.empty((len(params), N_PARAMS, t.shape[1]))
+    jac[:, 0] = amp * sign
+    jac[:, 1] = amp * sign * epoch
+    jac[:, 2] = -baseline * shape
+    jac[:, 3] = amp * (0.5 - ingress * ramp)
+    jac[:, 4] = amp * (-duration * ramp)
+    jac[:, 5] = 1.0 - depth * shape
+    return model, jac
+
+
+def _clip_params(params):
+    params[:, 2] = np.clip(params[:, 2], 1e-7, 0.9)
+    params[:, 3] = np.maximum(params[:, 3], 1e-3)
+    params[:, 4] = np.clip(params[:, 4], MIN_INGRESS, MAX_INGRESS)
+    params[:, 1] = np.maximum(params[:, 1], 1e-3)
+    return params
+
+
+def initial_guess(batch, period, t0, duration_hours=None, depth_ppm=None):
+    period = np.asarray(period, dtype=np.float64)
+    t0 = np.asarray(t0, dtype=np.float64)
+    n = len(batch)
+
+    # Süre yoksa Güneş benzeri yıldız için kaba tahmin: ~13 saat * (P / 365)^(1/3)
+    if duration_hours is None:
+        duration = 13.0 / 24.0 * np.cbrt(period / 365.25)
+    else:
+        duration = np.asarray(duration_hours, dtype=np.float64) / 24.0
+        duration = np.where(np.isfinite(duration) & (duration > 0), duration,
+                            13.0 / 24.0 * np.cbrt(period / 365.25))
+
+    if depth_ppm is None:
+        depth = np.full(n, np.nan)
+    else:
+        depth = np.asarray(depth_ppm, dtype=np.float64) / 1e6
+
+    # Derinlik yoksa transit içi medyan akıdan tahmin edilir
+    missing = ~(np.isfinite(depth) & (depth > 0))
+    if missing.any():
+        phase = batch.phase(period, t0)
+        in_transit = np.abs(phase) < 0.25 * duration[batch.index]
+        sums = np.bincount(batch.index, weights=np.where(in_transit, batch.flux, 0.0), minlength=n)
+        counts = np.bincount(batch.index, weights=in_transit.astype(float), minlength=n)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            measured = 1.0 - sums / counts
+        depth = np.where(missing, np.clip(np.nan_to_num(measured, nan=1e-4), 1e-6, 0.5), depth)
+
+    params = np.column_stack([
+        t0, period, depth, duration,
+        np.full(n, 0.2), np.ones(n),
+    ])
+    return params
+
+
+def _normal_equations(params, t, f, w, free):
+    model, jac = trapezoid_model(params, t, jacobian=True)
+    jac *= free[None, :, None]
+    jw = jac * w[:, None, :]
+    jtj = np.matmul(jw, jac.transpose(0, 2, 1))
+    grad = np.matmul(jw, (f - model)[..., None])[..., 0]
+
+    # Sabit tutulan parametrelerin satırı birim matris olur, adım 0 çıkar
+    fixed = np.flatnonzero(~free)
+    jtj[:, fixed, fixed] = 1.0
+    return model, jtj, grad
+
+
+def _fit_block(params, t, f, w, free, n_iter):
+    n = len(params)
+    lam = np.full(n, 1e-2)
+    model, jtj, grad = _normal_equations(params, t, f, w, free)
+    chi2 = np.sum(w * (f - model) ** 2, axis=1)
+    eye = np.eye(N_PARAMS)
+
+    for _ in range(n_iter):
+        # Verisi olmayan parametrelerin (örn. rampada nokta yok) köşegeni 1 yapılır
+        diag = np.einsum('nii->ni', jtj)
+        damped = jtj + (lam[:, None, None] * diag[:, :, None] + (diag == 0)[:, :, None]) * eye
+        try:
+            step = np.linalg.solve(damped, grad[..., None])[..., 0]
+        except np.linalg.LinAlgError:
+            step = np.zeros_like(params)
+        step = np.nan_to_num(step)
+
+        trial = _clip_params(params + step)
+        trial_model, trial_jtj, trial_grad = _normal_equations(trial, t, f, w, free)
+        trial_chi2 = np.sum(w * (f - trial_model) ** 2, axis=1)
+
+        better = trial_chi2 < chi2
+        params = np.where(better[:, None], trial, params)
+        jtj = np.where(better[:, None, None], trial_jtj, jtj)
+        grad = np.where(better[:, None], trial_grad, grad)
+        chi2 = np.where(better, trial_chi2, chi2)
+        lam = np.where(better, lam * 0.3, lam * 10.0)
+
+    # Belirsizlikler: kovaryans = (J^T W J)^-1 * indirgenmiş ki-kare.
+    # Ölçek farkı büyük olduğu için önce köşegene göre normalize edilir
+    n_points = w.sum(axis=1)
+    red_chi2 = chi2 / np.maximum(n_points - free.sum(), 1)
+    diag = np.einsum('nii->ni', jtj)
+    constrained = diag > 0
+    scale = np.where(constrained, 1.0 / np.sqrt(np.where(constrained, diag, 1.0)), 0.0)
+    scaled = jtj * scale[:, :, None] * scale[:, None, :] + (~constrained)[:, :, None] * eye
+    try:
+        inv = np.linalg.inv(scaled)
+    except np.linalg.LinAlgError:
+        inv = np.linalg.pinv(scaled)
+    var = np.einsum('nii->ni', inv) * scale ** 2 * red_chi2[:, None]
+    errors = np.where(constrained, np.sqrt(np.abs(var)), np.inf)
+    errors[:, ~free] = 0.0
+    return params, errors, red_chi2, n_points
+
+
+def fit_transits(batch, period, t0, duration_hours=None, depth_ppm=None,
+                 n_iter=10, window=2.0, max_points=2048, fit_period=True,
+                 block_bytes=64 * 2 ** 20):
+    params = initial_guess(batch, period, t0, duration_hours, depth_ppm)
+    n = len(batch)
+
+    # Sadece transit çevresindeki noktalar (window x T14) fit'e girer
+    phase = batch.phase(params[:, 1], params[:, 0])
+    keep = np.abs(phase) < window * params[batch.index, 3]
+
+    free = np.ones(N_PARAMS, dtype=bool)
+    free[1] = fit_period
+
+    # Adaylar nokta sayısına göre sıralanıp bloklanır: benzer genişlikteki eğriler
+    # aynı blokta olur (padding israfı az) ve Jacobian (N, 6, M) bellek bütçesini aşmaz
+    counts = np.minimum(np.bincount(batch.index[keep], minlength=n), max_points)
+    order = np.argsort(-counts, kind='stable')
+
+    errors = np.zeros_like(params)
+    red_chi2 = np.zeros(n)
+    n_points = np.zeros(n)
+    start = 0
+    while start < n:
+        # Azalan sırada ilerlendiği için bloğun ilk eğrisi en genişidir
+        width = max(int(counts[order[start]]), 1)
+        block = max(1, int(block_bytes // (width * 8 * (3 * N_PARAMS + 12))))
+        stop = min(start + block, n)
+        rows = order[start:stop]
+
+        t, f, w = batch.padded(keep, max_points=max_points, rows=rows)
+        params[rows], errors[rows], red_chi2[rows], n_points[rows] = _fit_block(
+            params[rows], t, f, w, free, n_iter
+        )
+        start = stop
+
+    ok = (n_points > N_PARAMS) & np.all(np.isfinite(params), axis=1) & np.isfinite(errors).all(axis=1)
+    ok &= params[:, 2] > errors[:, 2]
+
+    return {
+        'period': params[:, 1],
+        't0': params[:, 0],
+        'duration': params[:, 3] * 24.0,
+        'depth': params[:, 2] * 1e6,
+        'ingress': params[:, 4],
+        'baseline': params[:, 5],
+        'period_err': errors[:, 1],
+        't0_err': errors[:, 0],
+        'duration_err': errors[:, 3] * 24.0,
+        'depth_err': errors[:, 2] * 1e6,
+        'ingress_err': errors[:, 4],
+        'red_chi2': red_chi2,
+        'rms': np.sqrt(red_chi2) * 1e6,
+        'n_points': n_points.astype(np.int64),
+        'ok': ok,
+    }
+
+
+def refine_catalog(batch, period, t0, duration_hours, depth_ppm, **kwargs):
+    # Fit başarılıysa katalog değerleri yerine fit değerleri, değilse katalog değerleri
+    n = len(batch)
+    period = np.asarray(period, dtype=np.float64)
+    duration_hours = np.full(n, np.nan) if duration_hours is None else np.asarray(duration_hours, dtype=np.float64)
+    depth_ppm = np.full(n, np.nan) if depth_ppm is None else np.asarray(depth_ppm, dtype=np.float64)
+
+    fit = fit_transits(batch, period, t0, duration_hours, depth_ppm, **kwargs)
+    ok = fit['ok']
+    refined = {
+        'period': np.where(ok, fit['period'], period),
+        'duration': np.where(ok, fit['duration'], duration_hours),
+        'depth': np.where(ok, fit['depth'], depth_ppm),
+    }
+    return refined, fit
@@ -0,0 +1,235 @@
+# Ağırlık ve eşik ayarlama aracı
+# KOI cumulative tablosundaki koi_disposition gerçek etiket kabul edilir.
+# Her eşik kombinasyonu için bileşen matrisi (n x 4) bir kez hesaplanır,
+# tüm ağırlık kombinasyonları (4 x k) tek bir matris çarpımıyla skorlanır.
+#
+# Kullanım:
+#   python tuning.py --input cumulative.csv
+#   python tuning.py --fetch --weight-step 0.05 --output grid.csv
+
+import argparse
+import io
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+from scoring import WEIGHTS, components
+from units import convert, infer_units
+
+KOI_QUERY = (
+    "SELECT kepid, koi_disposition, koi_period, koi_duration, koi_depth, koi_kepmag "
+    "FROM cumulative WHERE koi_disposition IN ('CONFIRMED','FALSE POSITIVE','CANDIDATE')"
+)
+
+DEFAULT_DEPTH_CUTS = (250.0, 500.0, 1000.0, 2000.0)
+DEFAULT_PERIOD_CUTS = (10.0, 20.0, 30.0, 50.0)
+DEFAULT_DURATION_CUTS = (5.0, 10.0, 15.0)
+DEFAULT_THRESHOLDS = (46.0, 55.0, 60.0, 65.0, 70.0, 75.0, 80.0, 85.0)
+
+
+def load_koi_table(path=None, url=None):
+    if path is None:
+        import requests
+        from app import NASA_API_URL
+
+        r = requests.get(url or NASA_API_URL, params={'query': KOI_QUERY, 'format': 'csv'}, timeout=120)
+        r.raise_for_status()
+        path = io.StringIO(r.text)
+
+    df = pd.read_csv(path, comment='#', skip_blank_lines=True)
+    df.columns = [c.lower().strip() for c in df.columns]
+    needed = ['koi_disposition', 'koi_period', 'koi_duration', 'koi_depth', 'koi_kepmag']
+    missing = [c for c in needed if c not in df.columns]
+    if missing:
+        raise ValueError(f'KOI table is missing columns: {missing}')
+    return df
+
+
+def ground_truth(df, candidates_as=None):
+    # CONFIRMED = 1, FALSE POSITIVE = 0; CANDIDATE varsayılan olarak dışarıda bırakılır
+    disposition = df['koi_disposition'].astype(str).str.upper().str.strip()
+    truth = np.full(len(df), -1, dtype=np.int8)
+    truth[disposition.eq('CONFIRMED').to_numpy()] = 1
+    truth[disposition.eq('FALSE POSITIVE').to_numpy()] = 0
+    if candidates_as is not None:
+        truth[disposition.eq('CANDIDATE').to_numpy()] = candidates_as
+    return truth
+
+
+def weight_grid(step=0.05, minimum=0.0):
+    # 4 bileşenli, toplamı 1 olan ağırlıklar (simpleks ızgarası), (4, k)
+    units = int(round(1.0 / step))
+    rows = []
+    for a in range(units + 1):
+        for b in range(units + 1 - a):
+            for c in range(units + 1 - a - b):
+                rows.append((a, b, c, units - a - b - c))
+    grid = np.array(rows, dtype=np.float64) / units
+    grid = grid[(grid >= minimum).all(axis=1)]
+    # Mevcut ağırlıklar her zaman ızgarada, karşılaştırma için
+    grid = np.vstack([np.asarray(WEIGHTS, dtype=np.float64), grid])
+    return grid.T
+
+
+def evaluate(comp, truth, weights, thresholds):
+    # comp: (n, 4), truth: (n,) 0/1, weights: (4, k) -> her (eşik, ağırlık) için TP/FP/FN.
+    # Satırlar pozitifler önde olacak şekilde sıralanır; böylece skor matrisinin üst
+    # bloğu kopyasız olarak TP sayımına kullanılır
+    positive = truth == 1
+    order = np.argsort(~positive, kind='stable')
+    n_pos = int(positive.sum())
+
+    scores = (100.0 * comp[order].astype(np.float32)) @ weights.astype(np.float32)
+    thresholds = np.asarray(thresholds, dtype=np.float32)
+
+    tp = np.empty((len(thresholds), weights.shape[1]), dtype=np.int64)
+    fp = np.empty_like(tp)
+    for i, t in enumerate(thresholds):
+        hit = scores >= t
+        tp[i] = np.add.reduce(hit[:n_pos], axis=0, dtype=np.int32)
+        fp[i] = np.add.reduce(hit[n_pos:], axis=0, dtype=np.int32)
+
+    fn = n_pos - tp
+    return tp, fp, fn
+
+
+def metrics(tp, fp, fn):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        precision = np.where(tp + fp > 0, tp / (tp + fp), 0.0)
+        recall = np.where(tp + fn > 0, tp / (tp + fn), 0.0)
+        f1 = np.where(precision + recall > 0, 2 * precision * recall / (precision + recall), 0.0)
+    return precision, recall, f1
+
+
+def pareto_front(precision, recall):
+    # Hem precision hem recall'da başka bir konfigürasyon tarafından geçilmeyenler
+    order = np.lexsort((-precision, -recall))
+    best = -1.0
+    front = []
+    for i in order:
+        if precision[i] > best:
+            front.append(i)
+            best = precision[i]
+    return np.array(front, dtype=np.int64)
+
+
+def grid_search(df, weight_step=0.05, depth_cuts=DEFAULT_DEPTH_CUTS,
+                period_cuts=DEFAULT_PERIOD_CUTS, duration_cuts=DEFAULT_DURATION_CUTS,
+                thresholds=DEFAULT_THRESHOLDS, candidates_as=None, source='koi'):
+    truth = ground_truth(df, candidates_as)
+    col_mapping = {'period': 'koi_period', 'duration': 'koi_duration', 'depth': 'koi_depth'}
+    arrays = {key: pd.to_numeric(df[name], errors='coerce').to_numpy(dtype=float)
+              for key, name in col_mapping.items()}
+    arrays = convert(arrays, infer_units(col_mapping, arrays))
+    period, duration, depth = arrays['period'], arrays['duration'], arrays['depth']
+    mag = pd.to_numeric(df['koi_kepmag'], errors='coerce').to_numpy(dtype=float)
+
+    keep = (truth >= 0) & np.isfinite(period) & np.isfinite(duration) & np.isfinite(depth)
+    keep &= np.isfinite(mag) & (mag > 0)
+    truth = truth[keep]
+
+    weights = weight_grid(weight_step)
+    frames = []
+    for depth_cut, period_cut, duration_cut in itertools.product(depth_cuts, period_cuts, duration_cuts):
+        comp = components(period[keep], duration[keep], depth[keep], mag[keep], source,
+                          depth_cut=depth_cut, period_cut=period_cut, duration_cut=duration_cut)
+        tp, fp, fn = evaluate(comp, truth, weights, thresholds)
+        precision, recall, f1 = metrics(tp, fp, fn)
+
+        n_thr, k = tp.shape
+        frames.append(pd.DataFrame({
+            'w_mag': np.tile(weights[0], n_thr),
+            'w_depth': np.tile(weights[1], n_thr),
+            'w_period': np.tile(weights[2], n_thr),
+            'w_duration': np.tile(weights[3], n_thr),
+            'depth_cut': depth_cut,
+            'period_cut': period_cut,
+            'duration_cut': duration_cut,
+            'threshold': np.repeat(np.asarray(thresholds, dtype=float), k),
+            'tp': tp.ravel(),
+            'fp': fp.ravel(),
+            'fn': fn.ravel(),
+            'precision': precision.ravel(),
+            'recall': recall.ravel(),
+            'f1': f1.ravel(),
+        }))
+
+    results = pd.concat(frames, ignore_index=True)
+    front = pareto_front(results['precision'].to_numpy(), results['recall'].to_numpy())
+    results['pareto'] = False
+    results.loc[front, 'pareto'] = True
+    return results, int(keep.sum()), int(truth.sum())
+
+
+def baseline_row(results):
+    # Mevcut sabit ağırlıklar / eşikler (app.calculate_score) ile eşleşen satırlar
+    w = np.round(np.asarray(WEIGHTS), 6)
+    match = (
+        np.isclose(results['w_mag'], w[0]) & np.isclose(results['w_depth'], w[1]) &
+        np.isclose(results['w_period'], w[2]) & np.isclose(results['w_duration'], w[3]) &
+        np.isclose(results['depth_cut'], 500) & np.isclose(results['period_cut'], 30) &
+        np.isclose(results['duration_cut'], 10)
+    )
+    return results[match]
+
+
+def parse_floats(text):
+    return tuple(float(x) for x in text.split(',') if x.strip())
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Grid-search scoring weights and thresholds against KOI dispositions')
+    parser.add_argument('--input', help='KOI cumulative table CSV (default: fetch from NASA TAP)')
+    parser.add_argument('--fetch', action='store_true', help='fetch the KOI table from the NASA archive')
+    parser.add_argument('--weight-step', type=float, default=0.05)
+    parser.add_argument('--depth-cuts', type=parse_floats, default=DEFAULT_DEPTH_CUTS)
+    parser.add_argument('--period-cuts', type=parse_floats, default=DEFAULT_PERIOD_CUTS)
+    parser.add_argument('--duration-cuts', type=parse_floats, default=DEFAULT_DURATION_CUTS)
+    parser.add_argument('--thresholds', type=parse_floats, default=DEFAULT_THRESHOLDS)
+    parser.add_argument('--candidates-as', type=int, choices=(0, 1), default=None,
+                        help='treat CANDIDATE rows as negative (0) or positive (1); excluded by default')
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--output', help='write every configuration to this CSV')
+    args = parser.parse_args(argv)
+
+    if not args.input and not args.fetch:
+        parser.error('either --input or --fetch is required')
+
+    df = load_koi_table(args.input)
+
+    start = time.perf_counter()
+    results, n_rows, n_pos = grid_search(
+        df, args.weight_step, args.depth_cuts, args.period_cuts, args.duration_cuts,
+        args.thresholds, args.candidates_as,
+    )
+    elapsed = time.perf_counter() - start
+
+    print("\n" + "=" * 60)
+    print(f"📊 {len(results):,} konfigürasyon, {n_rows:,} KOI ({n_pos:,} CONFIRMED) — {elapsed:.2f} sn")
+    print("=" * 60)
+
+    columns = ['w_mag', 'w_depth', 'w_period', 'w_duration', 'depth_cut', 'period_cut',
+               'duration_cut', 'threshold', 'precision', 'recall', 'f1']
+    pd.set_option('display.width', 160)
+
+    print("\n🔧 Mevcut ayar (0.58 / 0.27 / 0.08 / 0.07):")
+    base = baseline_row(results)
+    print(base[columns].to_string(index=False) if len(base) else
+          "   (eşik ızgarası 500 / 30 / 10 kesimlerini içermiyor)")
+
+    print(f"\n🏆 En iyi {args.top} (F1):")
+    print(results.nlargest(args.top, 'f1')[columns].to_string(index=False))
+
+    front = results[results['pareto']].sort_values('recall')
+    print(f"\n📈 Pareto cephesi (precision / recall), {len(front)} nokta:")
+    print(front[columns].to_string(index=False))
+
+    if args.output:
+        results.to_csv(args.output, index=False)
+        print(f"\n💾 Tüm sonuçlar: {args.output}")
+
+
+if __name__ == '__main__':
+    main()
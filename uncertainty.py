@@ -0,0 +1,92 @@
+# Monte Carlo belirsizlik yayılımı
+# Her aday için katalogdaki asimetrik hatalardan (err1 / err2) N örnek çekilir,
+# tüm örnekler tek bir (aday x örnek) dizisinde skorlanır ve etiket olasılıkları çıkarılır.
+
+import warnings
+
+import numpy as np
+
+from profiles import DEFAULT_PROFILE, get_profile, score_profiles
+
+PARAMS = ('period', 'duration', 'depth', 'star_mag')
+
+DEFAULT_DRAWS = 1000
+MAX_DRAWS = 10000
+DEFAULT_MEMORY_BUDGET = 64 * 2 ** 20
+
+# Örnek başına çalışma alanı: 4 parametre + normal sayılar + skor ve geçiciler (float64)
+_BYTES_PER_DRAW = 8 * 12
+
+
+def chunk_rows(n_draws, memory_budget=DEFAULT_MEMORY_BUDGET):
+    return max(1, int(memory_budget // (n_draws * _BYTES_PER_DRAW)))
+
+
+def sample_split_normal(value, err_plus, err_minus, z):
+    # Asimetrik hata: z >= 0 için üst hata, z < 0 için alt hata ile ölçeklenir.
+    # Hatası olmayan (NaN) değerler kesin kabul edilir
+    err_plus = np.nan_to_num(np.abs(err_plus))[:, None]
+    err_minus = np.nan_to_num(np.abs(err_minus))[:, None]
+    return value[:, None] + z * np.where(z >= 0, err_plus, err_minus)
+
+
+def score_probabilities(values, errors, source='toi', n_draws=DEFAULT_DRAWS,
+                        profile=DEFAULT_PROFILE, interval=(5.0, 95.0),
+                        memory_budget=DEFAULT_MEMORY_BUDGET, seed=None):
+    # Etiket eşikleri (mid / high) profilden gelir
+    scoring_profile = get_profile(profile)
+    mid, high = scoring_profile.mid, scoring_profile.high
+    values = {k: np.asarray(values[k], dtype=np.float64) for k in PARAMS}
+    n = len(values['period'])
+    nan = np.full(n, np.nan)
+    errors = {
+        k: tuple(np.asarray(e, dtype=np.float64) for e in errors.get(k, (nan, nan)))
+        for k in PARAMS
+    }
+
+    rng = np.random.default_rng(seed)
+    out = {
+        'p_cp': np.zeros(n),
+        'p_pc': np.zeros(n),
+        'p_apc': np.zeros(n),
+        'score_lo': np.full(n, np.nan),
+        'score_hi': np.full(n, np.nan),
+    }
+
+    step = chunk_rows(n_draws, memory_budget)
+    for start in range(0, n, step):
+        stop = min(start + step, n)
+        rows = slice(start, stop)
+
+        draws = {}
+        for key in PARAMS:
+            z = rng.standard_normal((stop - start, n_draws))
+            plus, minus = errors[key]
+            draws[key] = sample_split_normal(values[key][rows], plus[rows], minus[rows], z)
+        # Fiziksel olmayan (negatif) periyot/süre/derinlik örnekleri sıfırın hemen üstüne kırpılır
+        for key in ('period', 'duration', 'depth'):
+            np.maximum(draws[key], 1e-9, out=draws[key])
+
+        score = score_profiles([profile], draws['period'], draws['duration'], draws['depth'],
+                               draws['star_mag'], source)[profile][0]
+        valid = np.isfinite(score)
+        n_valid = valid.sum(axis=1)
+
+        with np.errstate(invalid='ignore', divide='ignore'):
+            cp = (score >= high).sum(axis=1) / n_valid
+            pc = ((score >= mid) & (score < high)).sum(axis=1) / n_valid
+        out['p_cp'][rows] = cp
+        out['p_pc'][rows] = pc
+        out['p_apc'][rows] = np.where(n_valid > 0, 1.0 - cp - pc, np.nan)
+
+        if valid.all():
+            lo, hi = np.percentile(score, interval, axis=1)
+        else:
+            # Hiç geçerli örneği olmayan adaylar NaN kalır
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore', RuntimeWarning)
+                lo, hi = np.nanpercentile(score, interval, axis=1)
+        out['score_lo'][rows] = lo
+        out['score_hi'][rows] = hi
+
+    return out
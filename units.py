@@ -0,0 +1,150 @@
+# Kolon düzeyinde birim çıkarımı
+# find_columns'tan sonra her kolon için bir kez karar verilir (satır başına değil), sırayla:
+#   hint    - kullanıcının açıkça verdiği birim (units=depth:ppm,duration:days); çıkarımı geçersiz kılar
+#   archive - NASA Exoplanet Archive kolonlarının belgelenmiş birimleri (koi_duration saat, ...)
+#   name    - kolon adındaki ipucu: 'duration_days', 'depth_pct', 'Depth (ppm)', 'trandurh'
+#   sample  - ilk SAMPLE_ROWS satırdaki sonlu, pozitif değerlerin medyanı
+#             (süre: < 1 ise gün; derinlik: < 0.01 ve en büyüğü <= 1 ise kesir, < 10 ve en büyüğü
+#             <= 100 ise yüzde, yoksa ppm; kesir 1'i, yüzde 100'ü aşamaz, sığ ppm kataloglarındaki
+#             tek bir büyük değer yüzde / kesir okumasını engeller)
+#   default - örneklem yetersizse skor çekirdeğinin birimi
+# Skor çekirdeği periyodu gün, süreyi saat, derinliği ppm bekler; dönüşüm kolon başına tek bir
+# vektörel çarpmadır. pl_trandep arşivde tabloya göre ppm (TOI) ya da yüzde (PS) olduğu için
+# örneklemden çözülür.
+
+import re
+
+import numpy as np
+
+SAMPLE_ROWS = 1000
+MIN_SAMPLE = 5
+
+# Skor çekirdeğinin birimi -> 1.0
+FACTORS = {
+    'period': {'days': 1.0, 'hours': 1.0 / 24.0},
+    'duration': {'hours': 1.0, 'days': 24.0, 'minutes': 1.0 / 60.0},
+    'depth': {'ppm': 1.0, 'ppt': 1e3, 'percent': 1e4, 'fraction': 1e6},
+}
+CANONICAL = {'period': 'days', 'duration': 'hours', 'depth': 'ppm'}
+
+ARCHIVE_UNITS = {
+    'koi_period': 'days',
+    'pl_orbper': 'days',
+    'koi_duration': 'hours',
+    'pl_trandurh': 'hours',
+    'pl_trandur': 'hours',
+    'koi_depth': 'ppm',
+}
+
+# Kolon adı parçası -> birim
+NAME_HINTS = {
+    'period': {'d': 'days', 'day': 'days', 'days': 'days', 'h': 'hours', 'hr': 'hours', 'hrs': 'hours',
+               'hour': 'hours', 'hours': 'hours'},
+    'duration': {'d': 'days', 'day': 'days', 'days': 'days', 'h': 'hours', 'hr': 'hours', 'hrs': 'hours',
+                 'hour': 'hours', 'hours': 'hours', 'trandurh': 'hours', 'min': 'minutes',
+                 'mins': 'minutes', 'minute': 'minutes', 'minutes': 'minutes'},
+    'depth': {'ppm': 'ppm', 'ppt': 'ppt', 'pct': 'percent', 'percent': 'percent', '%': 'percent',
+              'frac': 'fraction', 'fraction': 'fraction', 'relflux': 'fraction'},
+}
+
+DURATION_DAYS_BELOW = 1.0
+DEPTH_FRACTION_BELOW = 0.01
+DEPTH_PERCENT_BELOW = 10.0
+DEPTH_FRACTION_MAX = 1.0
+DEPTH_PERCENT_MAX = 100.0
+
+
+def parse_hints(text):
+    # 'depth:ppm,duration:days' -> {'depth': 'ppm', 'duration': 'days'}; hatalı girdide ValueError
+    hints = {}
+    for item in (text or '').split(','):
+        if not item.strip():
+            continue
+        key, _, unit = (part.strip().lower() for part in item.partition(':'))
+        if key not in FACTORS:
+            raise ValueError(f'Invalid unit hint {item.strip()!r}, expected one of {sorted(FACTORS)}')
+        if unit not in FACTORS[key]:
+            raise ValueError(f'Invalid unit for {key}, expected one of {sorted(FACTORS[key])}')
+        hints[key] = unit
+    return hints
+
+
+def name_unit(key, column):
+    tokens = re.findall(r'[a-z]+|%', column.lower())
+    hints = NAME_HINTS[key]
+    for token in reversed(tokens):
+        if token in hints:
+            return hints[token]
+    return None
+
+
+def sample_unit(key, values):
+    if values is None or key == 'period':
+        return None
+    values = np.asarray(values[:SAMPLE_ROWS], dtype=np.float64)
+    values = values[np.isfinite(values) & (values > 0)]
+    if len(values) < MIN_SAMPLE:
+        return None
+    median = float(np.median(values))
+    if key == 'duration':
+        return 'days' if median < DURATION_DAYS_BELOW else 'hours'
+    top = float(values.max())
+    if median < DEPTH_FRACTION_BELOW and top <= DEPTH_FRACTION_MAX:
+        return 'fraction'
+    if median < DEPTH_PERCENT_BELOW and top <= DEPTH_PERCENT_MAX:
+        return 'percent'
+    return 'ppm'
+
+
+def infer_column(key, column, values=None, hint=None):
+    # (birim, dayanak)
+    if hint is not None:
+        return hint, 'hint'
+    unit = ARCHIVE_UNITS.get(column.lower().strip())
+    if unit is not None:
+        return unit, 'archive'
+    unit = name_unit(key, column)
+    if unit is not None:
+        return unit, 'name'
+    unit = sample_unit(key, values)
+    if unit is not None:
+        return unit, 'sample'
+    return CANONICAL[key], 'default'
+
+
+def infer_units(col_mapping, sample=None, hints=None):
+    # col_mapping: find_columns çıktısı, sample: {anahtar: dizi} (ilk parça / satır grubu),
+    # hints: parse_hints() çıktısı
+    # -> {anahtar: {'column', 'unit', 'basis', 'factor'}}; yanıtta olduğu gibi raporlanır
+    units = {}
+    for key in FACTORS:
+        column = col_mapping.get(key)
+        if column is None:
+            continue
+        unit, basis = infer_column(key, column, (sample or {}).get(key), (hints or {}).get(key))
+        units[key] = {'column': column, 'unit': unit, 'basis': basis, 'factor': FACTORS[key][unit]}
+    return units
+
+
+def convert(arrays, units):
+    # Kolon başına tek çarpma; birimi zaten çekirdeğinki olan kolonlar kopyalanmaz
+    out = dict(arrays)
+    for key, info in (units or {}).items():
+        if info['factor'] != 1.0 and key in out:
+            out[key] = out[key] * info['factor']
+    return out
+
+
+def convert_errors(errors, units):
+    # error_arrays() biçimi: {anahtar: (üst hata, alt hata)}, değerlerle aynı birimde
+    out = dict(errors)
+    for key, info in (units or {}).items():
+        if info['factor'] != 1.0 and key in out:
+            plus, minus = out[key]
+            out[key] = (plus * info['factor'], minus * info['factor'])
+    return out
+
+
+def units_key(units):
+    # Önbellek anahtarları için kısa özet
+    return sorted((key, info['column'], info['unit']) for key, info in (units or {}).items())
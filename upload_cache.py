@@ -0,0 +1,271 @@
+# İçerik adresli yükleme önbelleği
+# Yüklenen dosya okunurken SHA-256 ile özetlenir; (içerik özeti, kaynak, skor sürümü)
+# anahtarı diskteki skorlanmış sonuçlara eşlenir. CSV gövdesi içerik tanımlı satır
+# parçalarına bölünür, küçük değişikliklerde yalnızca değişen parçalar yeniden skorlanır.
+
+import contextlib
+import hashlib
+import json
+import os
+import pickle
+import stat
+import tempfile
+import threading
+import time
+import zlib
+
+try:
+    import fcntl
+except ImportError:
+    # Windows: kilit yalnızca süreç içi, boyut yine dizinden hesaplanır
+    fcntl = None
+
+CACHE_DIR = os.environ.get(
+    'UPLOAD_CACHE_DIR',
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '.upload_cache')
+)
+CACHE_BYTES = int(os.environ.get('UPLOAD_CACHE_BYTES', 256 * 2 ** 20))
+
+# Sonuç satırlarının biçimi değişirse artırılır (eski önbellek kayıtları geçersiz olur)
+RESULT_FORMAT_VERSION = 3
+
+READ_BLOCK = 2 ** 20
+
+# Parça sınırı: satırın CRC32'sinin alt bitleri sıfırsa (ortalama ~1024 satır)
+CHUNK_MASK = 0x3FF
+MIN_CHUNK_LINES = 256
+MAX_CHUNK_LINES = 8192
+
+# Bütçe aşılınca bu orana kadar silinir (her yazmada dizin taranmasın)
+EVICT_TARGET = 0.9
+
+
+def private_dir(path):
+    # Önbellek dizinleri pickle dosyası tutar; pickle.load dosyadaki kodu çalıştırabilir.
+    # Dizin yalnızca bu kullanıcıya ait (0700) olmalı: başka bir yerel kullanıcının önceden
+    # oluşturduğu, sembolik bağ olan veya grup / herkes yazabilen dizin reddedilir
+    os.makedirs(path, mode=0o700, exist_ok=True)
+    st = os.lstat(path)
+    if not stat.S_ISDIR(st.st_mode):
+        raise PermissionError(f'Cache directory is not a directory: {path}')
+    if hasattr(os, 'getuid') and st.st_uid != os.getuid():
+        raise PermissionError(f'Cache directory is owned by another user: {path}')
+    if st.st_mode & 0o022:
+        raise PermissionError(f'Cache directory is group/world writable: {path}')
+    return path
+
+
+def read_upload(stream, block=READ_BLOCK, check=None):
+    # Dosya blok blok okunurken özetlenir; içerik ayrıca bir kez daha taranmaz.
+    # check(okunan bayt) her bloktan sonra çağrılır (memtrack.check_upload): Content-Length'i
+    # olmayan / chunked yüklemeler de bütçeyi aşar aşmaz, tamamı belleğe alınmadan kesilir
+    digest = hashlib.sha256()
+    parts = []
+    size = 0
+    while True:
+        data = stream.read(block)
+        if not data:
+            break
+        size += len(data)
+        if check is not None:
+            check(size)
+        digest.update(data)
+        parts.append(data)
+    return b''.join(parts), digest.hexdigest()
+
+
+def cache_key(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def split_csv(data):
+    # (başlık, [parça, ...]) döner. Başlık: yorum / boş satırlar + kolon satırı.
+    # Tırnak içinde satır sonu olabilecek dosyalar parçalanmaz (None)
+    lines = data.splitlines(keepends=True)
+
+    start = 0
+    while start < len(lines):
+        stripped = lines[start].strip()
+        if stripped and not stripped.startswith(b'#'):
+            break
+        start += 1
+    if start >= len(lines):
+        return None
+
+    body = lines[start + 1:]
+    if b'"' in data and any(line.count(b'"') % 2 for line in body):
+        return None
+
+    chunks = []
+    current = []
+    for line in body:
+        current.append(line)
+        if len(current) >= MAX_CHUNK_LINES or (
+                len(current) >= MIN_CHUNK_LINES and not zlib.crc32(line) & CHUNK_MASK):
+            chunks.append(b''.join(current))
+            current = []
+    if current:
+        chunks.append(b''.join(current))
+
+    header = b''.join(lines[:start + 1])
+    if not header.endswith((b'\n', b'\r')):
+        header += b'\n'
+    return header, chunks
+
+
+class DiskCache:
+    # Boyut sınırlı, en eski erişilen kayıt önce silinir (LRU, dosya mtime ile).
+    # Bütçe tüm gunicorn worker'ları için ortaktır: toplam boyut dizindeki .size dosyasında
+    # tutulur ve .lock üzerinde fcntl.flock altında güncellenir. Bütçe aşılınca dizin taranır;
+    # silme kararı bellekteki bir indekse değil gerçek boyut ve mtime'lara (get'in dokunduğu)
+    # dayanır. Okunmakta olan dosyanın silinmesi okuyanı etkilemez (açık tanıtıcı).
+    # Dizin private_dir ile denetlenir; güvenli değilse önbellek devre dışı kalır (her get
+    # ıskalar, put yazmaz), istek yine de hesaplanarak yanıtlanır.
+    def __init__(self, directory=CACHE_DIR, max_bytes=CACHE_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._usable = None
+
+    def usable(self):
+        # Dizin ilk kullanımda oluşturulur / denetlenir; sonuç süreç boyunca saklanır
+        if self._usable is None:
+            try:
+                private_dir(self.directory)
+                self._usable = True
+            except OSError as e:
+                print(f"⚠️ Disk önbelleği devre dışı: {e}")
+                self._usable = False
+        return self._usable
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.pkl')
+
+    @contextlib.contextmanager
+    def _locked(self):
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            os.makedirs(self.directory, mode=0o700, exist_ok=True)
+            with open(os.path.join(self.directory, '.lock'), 'a') as lock_file:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+    def _scan(self):
+        # (mtime, boyut, yol) listesi; başka worker'ın sildiği dosyalar atlanır
+        entries = []
+        for root, _, files in os.walk(self.directory):
+            for name in files:
+                if not name.endswith('.pkl'):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                entries.append((st.st_mtime, st.st_size, path))
+        return entries
+
+    def _read_total(self):
+        try:
+            with open(os.path.join(self.directory, '.size')) as fh:
+                return int(fh.read())
+        except (OSError, ValueError):
+            return None
+
+    def _write_total(self, total):
+        with open(os.path.join(self.directory, '.size'), 'w') as fh:
+            fh.write(str(total))
+
+    def get(self, key):
+        if not self.usable():
+            return None
+        path = self._path(key)
+        try:
+            with open(path, 'rb') as fh:
+                value = pickle.load(fh)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            return None
+
+        # Erişim zamanı dosyada: eviction tüm worker'ların erişimlerini görür
+        self.touch(key)
+        return value
+
+    def touch(self, key):
+        # Kayıt varsa erişim zamanını günceller
+        if not self.usable():
+            return False
+        try:
+            os.utime(self._path(key))
+            return True
+        except OSError:
+            return False
+
+    def age(self, key):
+        # Son erişimden bu yana saniye; kayıt yoksa sonsuz
+        if not self.usable():
+            return float('inf')
+        try:
+            return time.time() - os.stat(self._path(key)).st_mtime
+        except OSError:
+            return float('inf')
+
+    def put(self, key, value):
+        if not self.usable():
+            return
+        data = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_bytes:
+            return
+
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), mode=0o700, exist_ok=True)
+        # Yarım yazılmış dosya okunmasın diye geçici dosya + atomik yer değiştirme
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as fh:
+            fh.write(data)
+
+        with self._locked():
+            try:
+                previous = os.stat(path).st_size
+            except OSError:
+                previous = 0
+            os.replace(tmp, path)
+
+            total = self._read_total()
+            if total is None:
+                total = sum(size for _, size, _ in self._scan())
+            else:
+                total += len(data) - previous
+            if total > self.max_bytes:
+                total = self._evict()
+            self._write_total(total)
+
+    def _evict(self):
+        # Kilit altında çağrılır; gerçek toplamı döner (.size kayması burada düzelir)
+        entries = sorted(self._scan())
+        total = sum(size for _, size, _ in entries)
+        target = self.max_bytes * EVICT_TARGET
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError:
+                continue
+            total -= size
+        return total
+
+    def size(self):
+        if not self.usable():
+            return 0
+        with self._locked():
+            return sum(size for _, size, _ in self._scan())
+
+
+upload_cache = DiskCache()
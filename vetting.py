@@ -0,0 +1,122 @@
+# Yanlış pozitif (örten çift yıldız) taraması
+# Tek/çift transit derinliği, faz 0.5'te ikincil tutulma ve V/U transit şekli;
+# tüm adaylar için faz katlanmış veri üzerinde tek vektörel geçişte hesaplanır.
+
+import numpy as np
+
+ODD_EVEN_SIGMA = 3.0
+SECONDARY_SIGMA = 3.0
+VSHAPE_LIMIT = 0.5
+
+FLAG_ODD_EVEN = 1
+FLAG_SECONDARY = 2
+FLAG_VSHAPE = 4
+FLAG_NAMES = {
+    FLAG_ODD_EVEN: 'odd_even',
+    FLAG_SECONDARY: 'secondary',
+    FLAG_VSHAPE: 'v_shape',
+}
+
+
+def _region_moments(index, region, flux, n, n_regions):
+    # (aday, bölge) hücresi başına sayı, toplam ve kare toplamı; 3 bincount ile
+    cell = index * n_regions + region
+    size = n * n_regions
+    count = np.bincount(cell, minlength=size).reshape(n, n_regions)
+    total = np.bincount(cell, weights=flux, minlength=size).reshape(n, n_regions)
+    total_sq = np.bincount(cell, weights=flux * flux, minlength=size).reshape(n, n_regions)
+    return count, total, total_sq
+
+
+def _mean_err(count, total, total_sq):
+    with np.errstate(invalid='ignore', divide='ignore'):
+        mean = total / count
+        var = np.maximum(total_sq / count - mean * mean, 0.0)
+        err = np.sqrt(var / count)
+    return mean, err
+
+
+# Birincil transit bölgeleri (faz 0 çevresi)
+_OUTSIDE, _BOTTOM_EVEN, _BOTTOM_ODD, _SHOULDER, _LOCAL = range(5)
+# İkincil tutulma bölgeleri (faz 0.5 çevresi)
+_SEC_OUTSIDE, _SEC_WINDOW, _SEC_LOCAL = range(3)
+
+
+def vet_candidates(batch, period, t0, duration_hours):
+    n = len(batch)
+    period = np.asarray(period, dtype=np.float64)
+    duration = np.asarray(duration_hours, dtype=np.float64) / 24.0
+
+    index = batch.index
+    flux = batch.flux
+    phase = batch.phase(period, t0)
+    epoch = batch.epoch(period, t0)
+    half = 0.5 * duration[index]
+
+    x = np.abs(phase)
+    x2 = np.abs(np.mod(phase, period[index]) - 0.5 * period[index])
+
+    # Her nokta tek bir birincil ve tek bir ikincil bölgeye düşer
+    region = np.full(len(flux), _OUTSIDE, dtype=np.int64)
+    region[(x > 1.5 * half) & (x < 4.0 * half)] = _LOCAL
+    region[(x >= 0.5 * half) & (x < half)] = _SHOULDER
+    bottom = x < 0.5 * half
+    region[bottom] = np.where((epoch[bottom] % 2) == 1, _BOTTOM_ODD, _BOTTOM_EVEN)
+
+    sec_region = np.full(len(flux), _SEC_OUTSIDE, dtype=np.int64)
+    sec_region[(x2 > 1.5 * half) & (x2 < 4.0 * half)] = _SEC_LOCAL
+    sec_region[x2 < half] = _SEC_WINDOW
+
+    count, total, total_sq = _region_moments(index, region, flux, n, 5)
+    sec_count, sec_total, sec_total_sq = _region_moments(index, sec_region, flux, n, 3)
+
+    mean, err = _mean_err(count, total, total_sq)
+    sec_mean, sec_err = _mean_err(sec_count, sec_total, sec_total_sq)
+    bottom_mean, _ = _mean_err(
+        count[:, _BOTTOM_EVEN] + count[:, _BOTTOM_ODD],
+        total[:, _BOTTOM_EVEN] + total[:, _BOTTOM_ODD],
+        total_sq[:, _BOTTOM_EVEN] + total_sq[:, _BOTTOM_ODD],
+    )
+
+    baseline = mean[:, _LOCAL]
+    sec_baseline = np.where(np.isfinite(sec_mean[:, _SEC_LOCAL]), sec_mean[:, _SEC_LOCAL], baseline)
+
+    depth_odd = baseline - mean[:, _BOTTOM_ODD]
+    depth_even = baseline - mean[:, _BOTTOM_EVEN]
+    err_odd = err[:, _BOTTOM_ODD]
+    err_even = err[:, _BOTTOM_EVEN]
+    depth_bottom = baseline - bottom_mean
+    depth_shoulder = baseline - mean[:, _SHOULDER]
+    depth_sec = sec_baseline - sec_mean[:, _SEC_WINDOW]
+    err_sec = sec_err[:, _SEC_WINDOW]
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        odd_even_sigma = np.abs(depth_odd - depth_even) / np.hypot(err_odd, err_even)
+        secondary_sigma = depth_sec / err_sec
+        # Kutu (U) şeklinde omuz derinliği ~ taban derinliği, V şeklinde çok daha az
+        vshape = np.clip(1.0 - depth_shoulder / depth_bottom, 0.0, 1.0)
+
+    flags = np.zeros(n, dtype=np.uint8)
+    flags |= np.where(odd_even_sigma > ODD_EVEN_SIGMA, FLAG_ODD_EVEN, 0).astype(np.uint8)
+    flags |= np.where(secondary_sigma > SECONDARY_SIGMA, FLAG_SECONDARY, 0).astype(np.uint8)
+    flags |= np.where(vshape > VSHAPE_LIMIT, FLAG_VSHAPE, 0).astype(np.uint8)
+
+    return {
+        'depth_odd': depth_odd * 1e6,
+        'depth_even': depth_even * 1e6,
+        'odd_even_sigma': odd_even_sigma,
+        'secondary_depth': depth_sec * 1e6,
+        'secondary_sigma': secondary_sigma,
+        'vshape': vshape,
+        'flags': flags,
+    }
+
+
+def flag_names(flags):
+    return [name for bit, name in FLAG_NAMES.items() if flags & bit]
+
+
+def demote_labels(codes, flags):
+    # Bayraklı adaylar bir seviye düşer: CP -> PC, PC -> APC (kodlar scoring.LABELS sırasında)
+    codes = np.asarray(codes, dtype=np.uint8)
+    return np.where(np.asarray(flags) != 0, np.minimum(codes + 1, 2), codes).astype(np.uint8)